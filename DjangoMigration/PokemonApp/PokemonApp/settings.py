@@ -74,6 +74,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
     'myPokemonApp.middleware.starter_required.StarterRequiredMiddleware',
+    'myPokemonApp.middleware.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'PokemonApp.urls'
@@ -141,6 +142,21 @@ STATICFILES_DIRS = [
 ]
 
 
+# ─── Profilage des endpoints chauds ───────────────────────────────────────────
+# Section optionnelle `profiling` de secrets.yaml ; valeurs par défaut dans
+# myPokemonApp/services/profiling.py (DEFAULTS).
+
+PROFILING = _secrets.get('profiling') or {}
+
+
+# ─── Flux des tours en direct (SSE) ───────────────────────────────────────────
+# battle_stream_view ne sert un flux que sous un serveur ASGI (PokemonApp/asgi.py,
+# uvicorn / daphne…) : sous WSGI, la réponse en continu occuperait un thread par
+# page de combat sans jamais rien livrer.  Clé optionnelle `asgi` de secrets.yaml.
+
+BATTLE_STREAM_ENABLED = bool(_secrets.get('asgi', False))
+
+
 # ─── Divers ───────────────────────────────────────────────────────────────────
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -54,6 +54,7 @@ urlpatterns = [
     path('battle/<int:pk>/play/',       views.BattleGameView.as_view(), name='BattleGameView'),
     path('battle/<int:pk>/action/',     views.battle_action_view,       name='BattleActionView'),
     path('battle/<int:pk>/learn-move/', views.battle_learn_move_view,   name='BattleLearnMoveView'),
+    path('battle/<int:pk>/stream/',     views.battle_stream_view,       name='BattleStreamView'),
 
     # Créations de combats
     path('battle/create/',                              views.battle_create_view,         name='BattleCreateView'),
@@ -105,6 +106,7 @@ urlpatterns = [
     path('map/',                                             views.map_view,               name='map_view'),
     path('map/zone/<int:zone_id>/',                          views.zone_detail_view,       name='zone_detail'),
     path('map/travel/<int:zone_id>/',                        views.travel_to_zone_view,    name='travel_to_zone'),
+    path('map/route/<int:zone_id>/',                         views.travel_route_view,      name='travel_route'),
     path('map/encounter/<int:zone_id>/',                     views.wild_encounter_view,    name='wild_encounter'),
     path('map/zone/<int:zone_id>/building/',                 views.building_redirect_view, name='building_view'),
     path('map/zone/<int:zone_id>/floor/<int:floor_number>/', views.floor_detail_view,      name='floor_detail'),
@@ -124,4 +126,7 @@ urlpatterns = [
     # Achievements
     path('achievements/',        views.achievements_list_view,   name='achievements_list'),
     path('achievements/widget/', views.achievements_widget_view, name='achievements_widget'),
+
+    # Profilage (staff)
+    path('api/debug/profiling/', views.profiling_view, name='profiling'),
 ]
\ No newline at end of file
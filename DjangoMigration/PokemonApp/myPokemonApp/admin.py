@@ -9,6 +9,8 @@ from django.contrib import messages
 from django.utils.html import format_html
 from .models.Achievements import Achievement, TrainerAchievement
 from .models.Battle import Battle
+from .models.BattleEvent import BattleEvent
+from .models.BattleArchive import BattleArchive
 from .models.CaptureSystem import CaptureAttempt, CaptureJournal, PokeballItem
 from .models.GameSave import GameSave, TrainerBattleHistory
 from myPokemonApp.models.DefeatedTrainer import DefeatedTrainer
@@ -84,6 +86,18 @@ class PokemonMoveInstanceInline(admin.TabularInline):
     max_pp_display.short_description = 'PP Max'
 
 
+class BattleEventInline(admin.TabularInline):
+    model           = BattleEvent
+    extra           = 0
+    fields          = ('seq', 'turn', 'message')
+    readonly_fields = ('seq', 'turn', 'message')
+    ordering        = ('seq',)
+    can_delete      = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class TrainerInventoryInline(admin.TabularInline):
     model  = TrainerInventory
     extra  = 0
@@ -380,13 +394,14 @@ class BattleAdmin(QuietModelAdmin):
     list_display    = ('id', 'battle_type', 'player_trainer', 'opponent_trainer', 'is_active', 'current_turn', 'winner', 'created_at')
     list_filter     = ('battle_type', 'is_active', 'created_at')
     search_fields   = ('player_trainer__username', 'opponent_trainer__username')
-    readonly_fields = ('created_at', 'ended_at', 'battle_log')
+    readonly_fields = ('created_at', 'ended_at', 'battle_log', 'wild_pokemon')
 
     fieldsets = (
-        ('Participants', {'fields': ('battle_type', 'player_trainer', 'opponent_trainer', 'player_pokemon', 'opponent_pokemon')}),
+        ('Participants', {'fields': ('battle_type', 'player_trainer', 'opponent_trainer', 'player_pokemon', 'opponent_pokemon', 'wild_pokemon')}),
         ('État',         {'fields': ('is_active', 'current_turn', 'winner', 'weather', 'terrain')}),
         ('Journal',      {'fields': ('battle_log', 'battle_snapshot', 'created_at', 'ended_at'), 'classes': ('collapse',)}),
     )
+    inlines = [BattleEventInline]
 
     actions = ['end_battles']
 
@@ -399,6 +414,15 @@ class BattleAdmin(QuietModelAdmin):
     end_battles.short_description = "Terminer les combats actifs"
 
 
+@admin.register(BattleArchive)
+class BattleArchiveAdmin(QuietModelAdmin):
+    list_display    = ('id', 'battle_type', 'player_trainer', 'opponent_trainer', 'turns', 'winner', 'duration', 'created_at')
+    list_filter     = ('battle_type', 'created_at')
+    search_fields   = ('player_trainer__username', 'opponent_trainer__username')
+    exclude         = ('payload',)
+    readonly_fields = ('archived_at', 'battle_log')
+
+
 # ============================================================================
 # CAPTURE
 # ============================================================================
@@ -409,7 +433,8 @@ class CaptureAttemptAdmin(QuietModelAdmin):
     list_filter     = ('success',)
     search_fields   = ('trainer__username', 'pokemon_species__name')
     readonly_fields = ('trainer', 'pokemon_species', 'ball_used', 'pokemon_level',
-                       'pokemon_hp_percent', 'pokemon_status', 'success', 'capture_rate', 'shakes')
+                       'pokemon_hp_percent', 'pokemon_status', 'success', 'capture_rate', 'shakes',
+                       'archive')
 
 
 @admin.register(CaptureJournal)
@@ -444,10 +469,10 @@ class DefeatedTrainerAdmin(QuietModelAdmin):
 
 @admin.register(TrainerBattleHistory)
 class TrainerBattleHistoryAdmin(QuietModelAdmin):
-    list_display    = ('player', 'opponent', 'player_won', 'money_earned', 'battle')
+    list_display    = ('player', 'opponent', 'player_won', 'money_earned', 'battle', 'archive')
     list_filter     = ('player_won',)
     search_fields   = ('player__username', 'opponent__username')
-    readonly_fields = ('player', 'opponent', 'player_won', 'battle', 'money_earned')
+    readonly_fields = ('player', 'opponent', 'player_won', 'battle', 'archive', 'money_earned')
 
 
 # ============================================================================
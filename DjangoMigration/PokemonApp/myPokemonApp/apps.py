@@ -9,6 +9,13 @@ class MypokemonappConfig(AppConfig):
         """
         Point d'entrée Django pour connecter les signaux au démarrage.
 
+        Signaux connectés :
+          - connection_created → PRAGMAs SQLite
+          - post_save / post_delete / m2m_changed → invalidation des caches du
+            processus (models/ProcessCache.py), depuis la table process_caches :
+            table des types, catalogue des capacités, graphe des zones, tables
+            de rencontres sauvages, index des quêtes
+
         Le signal connection_created est utilisé ici pour appliquer les PRAGMAs
         d'optimisation SQLite dès l'ouverture de chaque connexion.
         C'est le seul endroit garanti d'être exécuté après l'initialisation
@@ -41,4 +48,38 @@ class MypokemonappConfig(AppConfig):
                 cursor.execute('PRAGMA temp_store=MEMORY;')
                 cursor.execute('PRAGMA mmap_size=268435456;')
 
-        connection_created.connect(_apply_sqlite_pragmas)
\ No newline at end of file
+        connection_created.connect(_apply_sqlite_pragmas)
+
+        # ── Caches du processus : reconstruits après toute modification ──────
+        # (admin, init_db, shell…) — voir models/ProcessCache.py
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from .models.EncounterTable import encounter_tables
+        from .models.Item import Item
+        from .models.MoveCatalogue import move_catalogue
+        from .models.Pokemon import Pokemon
+        from .models.PokemonMove import PokemonMove
+        from .models.PokemonType import PokemonType
+        from .models.Quest import Quest
+        from .models.QuestIndex import quest_index
+        from .models.TypeChart import type_chart
+        from .models.Zone import WildPokemonSpawn, Zone, ZoneConnection
+        from .models.ZoneGraph import zone_graph
+
+        # cache → (modèles : post_save / post_delete, relations : m2m_changed)
+        process_caches = (
+            (type_chart,       (PokemonType,),              (PokemonType.strong_against.through,)),
+            (move_catalogue,   (PokemonMove, PokemonType),  ()),   # type dénormalisé
+            (zone_graph,       (Zone, ZoneConnection),      ()),
+            (encounter_tables, (WildPokemonSpawn, Pokemon), ()),   # espèces dénormalisées
+            (quest_index,      (Quest, Item),               (Quest.prerequisite_quests.through,)),
+        )
+        for cache, senders, relations in process_caches:
+            for sender in senders:
+                label = sender._meta.model_name
+                post_save.connect(cache.invalidate, sender=sender,
+                                  dispatch_uid=f'{cache.name}_save_{label}')
+                post_delete.connect(cache.invalidate, sender=sender,
+                                    dispatch_uid=f'{cache.name}_delete_{label}')
+            for through in relations:
+                m2m_changed.connect(cache.invalidate, sender=through,
+                                    dispatch_uid=f'{cache.name}_m2m_{through._meta.model_name}')
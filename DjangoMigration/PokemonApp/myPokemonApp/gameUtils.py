@@ -55,6 +55,7 @@ from myPokemonApp.services.capture_service import (
     calculate_shake_count,
     attempt_pokemon_capture,
     get_random_wild_pokemon,
+    sample_encounters,
     get_encounter_chance,
 )
 
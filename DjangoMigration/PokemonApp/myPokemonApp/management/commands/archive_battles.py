@@ -0,0 +1,47 @@
+"""
+Commande de management Django : archive_battles
+===============================================
+
+Déplace les combats terminés depuis plus de N jours vers la table compacte
+BattleArchive : résumé en colonnes, journal et replay compressés zlib.
+Les lignes Battle, leurs BattleEvent et les Pokémon sauvages qu'elles
+référencent sont supprimés ; l'historique (TrainerBattleHistory) et les
+tentatives de capture pointent alors vers l'archive (champ `archive`) au lieu
+du Battle.  Voir services/battle_archive.py.
+
+Usage :
+    python manage.py archive_battles
+    python manage.py archive_battles --days 90 --chunk-size 500
+    python manage.py archive_battles --dry-run
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myPokemonApp.services.battle_archive import (
+    DEFAULT_ARCHIVE_DAYS, DEFAULT_CHUNK_SIZE, archivable_battles, archive_battles,
+)
+
+
+class Command(BaseCommand):
+    help = "Archive les combats terminés depuis plus de N jours (table BattleArchive)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=DEFAULT_ARCHIVE_DAYS,
+                            help=f"Âge minimal des combats terminés (défaut : {DEFAULT_ARCHIVE_DAYS})")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Combats par transaction (défaut : {DEFAULT_CHUNK_SIZE})")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Compte les combats archivables sans rien modifier")
+
+    def handle(self, *args, **options):
+        days, chunk_size = options['days'], options['chunk_size']
+        if days < 0 or chunk_size < 1:
+            raise CommandError("--days doit être ≥ 0 et --chunk-size ≥ 1.")
+
+        if options['dry_run']:
+            count = archivable_battles(days).count()
+            self.stdout.write(f"{count} combat(s) terminé(s) depuis plus de {days} jours à archiver.")
+            return
+
+        count = archive_battles(days=days, chunk_size=chunk_size)
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} combat(s) archivé(s)."))
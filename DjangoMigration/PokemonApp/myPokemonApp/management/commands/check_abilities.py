@@ -0,0 +1,33 @@
+"""
+Commande de management Django : check_abilities
+================================================
+
+Liste les effect_tag présents en base qui n'ont aucune résolution dans
+Ability (registre HOOKS_BY_TAG) : ces talents n'ont aucun effet en combat.
+
+Usage :
+    python manage.py check_abilities
+"""
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Liste les effect_tag de talents présents en base sans implémentation"
+
+    def handle(self, *args, **options):
+        from myPokemonApp.models.Ability import HOOKS_BY_TAG, unimplemented_effect_tags
+
+        missing = unimplemented_effect_tags()
+        if not missing:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅  Tous les effect_tag en base sont implémentés ({len(HOOKS_BY_TAG)} connus)."
+            ))
+            return
+
+        self.stdout.write(self.style.WARNING(
+            f"\n⚠️  {len(missing)} effect_tag sans implémentation :\n"
+        ))
+        for tag, names in missing.items():
+            self.stdout.write(f"  {tag:<24} {', '.join(names)}")
+        self.stdout.write("")
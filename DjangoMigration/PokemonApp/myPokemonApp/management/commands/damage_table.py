@@ -0,0 +1,73 @@
+"""
+Commande de management Django : damage_table
+=============================================
+
+Affiche, pour l'équilibrage, la fourchette de dégâts de chaque move de
+l'équipe A contre chaque Pokémon de l'équipe B (et inversement avec
+--both) : min–max, dégâts espérés et probabilité de K.O. depuis les PV max.
+
+Tous les triplets (attaquant, défenseur, move) sont évalués en un seul lot
+par services/damage_calc, sans combat ni écriture en base.
+
+Usage :
+    python manage.py damage_table --a "Pierre" --b "Ondine"
+    python manage.py damage_table --a 12 --b 7 --both
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Fourchettes de dégâts des moves d'un dresseur contre l'équipe d'un autre"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--a', dest='trainer_a', required=True, metavar='DRESSEUR',
+                            help="Dresseur attaquant (id ou username)")
+        parser.add_argument('--b', dest='trainer_b', required=True, metavar='DRESSEUR',
+                            help="Dresseur défenseur (id ou username)")
+        parser.add_argument('--both', action='store_true',
+                            help="Affiche aussi la table de B contre A")
+
+    def _load(self, ref):
+        from myPokemonApp.models.Trainer import Trainer
+        from myPokemonApp.services.battle_simulator import load_trainer_team
+
+        trainers = Trainer.objects.filter(pk=ref) if ref.isdigit() else \
+                   Trainer.objects.filter(username=ref)
+        trainer = trainers.order_by('pk').first()
+        if trainer is None:
+            raise CommandError(f"Dresseur introuvable : {ref}")
+        loaded = load_trainer_team(trainer)
+        if not loaded['members']:
+            raise CommandError(f"{trainer.username} n'a aucun Pokémon dans son équipe.")
+        return loaded
+
+    def _table(self, side_a, side_b):
+        from myPokemonApp.services.damage_calc import damage_inputs, damage_ranges
+
+        rows, inputs, target_hp = [], [], []
+        for attacker, move_instances in side_a['members']:
+            for mi in move_instances:
+                if not mi.move.power:
+                    continue
+                for defender, _ in side_b['members']:
+                    rows.append((attacker, mi.move, defender))
+                    inputs.append(damage_inputs(attacker, defender, mi.move))
+                    target_hp.append(defender.max_hp)
+
+        self.stdout.write(self.style.HTTP_INFO(
+            f"\n⚔️  {side_a['label']} → {side_b['label']}\n"
+        ))
+        for (attacker, move, defender), r in zip(rows, damage_ranges(inputs, target_hp)):
+            self.stdout.write(
+                f"  {str(attacker):<14} {move.name:<16} → {str(defender):<14} "
+                f"{r.min:>4}–{r.max:<4} ~{r.expected:>6.1f} / {defender.max_hp:<4} "
+                f"K.O. {r.ko_chance:>4.0%}"
+            )
+
+    def handle(self, *args, **options):
+        side_a = self._load(options['trainer_a'])
+        side_b = self._load(options['trainer_b'])
+        self._table(side_a, side_b)
+        if options['both']:
+            self._table(side_b, side_a)
@@ -84,5 +84,16 @@ class Command(BaseCommand):
             )
         except RuntimeError as e:
             raise CommandError(str(e))
+        finally:
+            # Les signaux couvrent déjà .add()/.set() ; filet de sécurité pour
+            # les écritures en masse (bulk_create sur la table through…)
+            from myPokemonApp.models.TypeChart import invalidate_type_chart
+            invalidate_type_chart()
 
-        self.stdout.write(self.style.SUCCESS("\n✅  Terminé !\n"))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS("\n✅  Terminé !\n"))
+        # Les caches du processus (types, capacités, zones…) d'un serveur déjà
+        # lancé ne voient pas ces écritures : voir models/ProcessCache.py
+        self.stdout.write(self.style.WARNING(
+            "⚠️  Redémarrer le serveur s'il tourne déjà : ses tables en mémoire "
+            "(types, capacités, zones, rencontres, quêtes) ne sont pas rechargées.\n"
+        ))
\ No newline at end of file
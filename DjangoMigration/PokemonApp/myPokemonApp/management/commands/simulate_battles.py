@@ -0,0 +1,130 @@
+"""
+Commande de management Django : simulate_battles
+=================================================
+
+Joue N combats IA contre IA entre deux équipes, sans rien écrire en base,
+pour équilibrer les équipes des Champions et dresseurs NPC.
+
+Chaque camp est soit un dresseur (id ou username), soit une équipe sauvage
+aléatoire tirée des WildPokemonSpawn d'une zone.
+
+Usage :
+    python manage.py simulate_battles --a "Pierre" --b "Ondine" -n 1000
+    python manage.py simulate_battles --a 12 --zone-b "Route 1" --team-size 3
+    python manage.py simulate_battles --a "Pierre" --b 7 --workers 1 --seed 42
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Simule N combats IA contre IA (dresseurs ou équipes sauvages) sans écriture en base"
+
+    def add_arguments(self, parser):
+        for side in ('a', 'b'):
+            group = parser.add_mutually_exclusive_group(required=True)
+            group.add_argument(
+                f'--{side}',
+                dest=f'trainer_{side}',
+                metavar='DRESSEUR',
+                help=f"Dresseur du camp {side.upper()} (id ou username)",
+            )
+            group.add_argument(
+                f'--zone-{side}',
+                dest=f'zone_{side}',
+                metavar='ZONE',
+                help=f"Camp {side.upper()} : équipe sauvage tirée des spawns de cette zone",
+            )
+        parser.add_argument(
+            '-n', '--battles',
+            type=int,
+            default=100,
+            help="Nombre de combats à simuler (défaut : 100)",
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help="Nombre de processus (défaut : nombre de CPU ; 1 = sans pool)",
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help="Graine pour des résultats reproductibles",
+        )
+        parser.add_argument(
+            '--max-turns',
+            type=int,
+            default=None,
+            dest='max_turns',
+            help="Tours max par combat avant égalité",
+        )
+        parser.add_argument(
+            '--team-size',
+            type=int,
+            default=6,
+            dest='team_size',
+            help="Taille des équipes sauvages (défaut : 6)",
+        )
+        parser.add_argument(
+            '--encounter-type',
+            default='grass',
+            dest='encounter_type',
+            help="Type de rencontre des spawns sauvages (défaut : grass)",
+        )
+
+    def _load_side(self, options, side):
+        from myPokemonApp.models.Trainer import Trainer
+        from myPokemonApp.models.Zone import Zone
+        from myPokemonApp.services.battle_simulator import load_trainer_team, load_zone_pool
+
+        ref = options[f'trainer_{side}']
+        if ref is not None:
+            trainers = Trainer.objects.filter(pk=ref) if ref.isdigit() else \
+                       Trainer.objects.filter(username=ref)
+            trainer = trainers.order_by('pk').first()
+            if trainer is None:
+                raise CommandError(f"Dresseur introuvable : {ref}")
+            loaded = load_trainer_team(trainer)
+            if not loaded['members']:
+                raise CommandError(f"{trainer.username} n'a aucun Pokémon dans son équipe.")
+            return loaded
+
+        zone = Zone.objects.filter(name=options[f'zone_{side}']).first()
+        if zone is None:
+            raise CommandError(f"Zone introuvable : {options[f'zone_{side}']}")
+        try:
+            return load_zone_pool(zone, options['encounter_type'], options['team_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def handle(self, *args, **options):
+        from myPokemonApp.services.battle_simulator import DEFAULT_MAX_TURNS, run_simulations
+
+        if options['battles'] < 1:
+            raise CommandError("--battles doit être ≥ 1.")
+
+        side_a = self._load_side(options, 'a')
+        side_b = self._load_side(options, 'b')
+
+        self.stdout.write(self.style.HTTP_INFO(
+            f"\n⚔️  {side_a['label']} vs {side_b['label']} — {options['battles']} combats\n"
+        ))
+
+        stats = run_simulations(
+            side_a, side_b,
+            battles=options['battles'],
+            workers=options['workers'],
+            seed=options['seed'],
+            max_turns=options['max_turns'] or DEFAULT_MAX_TURNS,
+        )
+
+        self.stdout.write(f"  {side_a['label']:<30} {stats['wins_a']:>6} victoires  ({stats['win_rate_a']:.1%})")
+        self.stdout.write(f"  {side_b['label']:<30} {stats['wins_b']:>6} victoires  ({stats['win_rate_b']:.1%})")
+        self.stdout.write(f"  {'Égalités':<30} {stats['draws']:>6}")
+        self.stdout.write(f"  Tours moyens : {stats['avg_turns']:.1f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅  {stats['battles']} combats en {stats['elapsed']:.2f} s "
+            f"({stats['battles_per_second']:.1f} combats/s)\n"
+        ))
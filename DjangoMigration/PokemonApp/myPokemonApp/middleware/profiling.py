@@ -0,0 +1,51 @@
+"""
+Middleware de profilage des endpoints chauds.
+
+ProfilingMiddleware clôt les profils posés par @profiled_view
+(services/profiling.py) : durée totale, taille de la réponse, ajout au
+buffer circulaire, warning si un seuil est dépassé et, en option, une ligne
+JSON par requête.
+"""
+
+import json
+import logging
+import time
+
+from myPokemonApp.services.profiling import get_config, record_profile
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """Clôture les profils posés par @profiled_view et les publie."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        profile  = getattr(request, '_profile', None)
+        if profile is not None:
+            self._finish(profile, response)
+        return response
+
+    def _finish(self, profile, response):
+        config = get_config()
+        profile.total_ms = (time.perf_counter() - profile.started) * 1000
+        profile.status   = response.status_code
+        if not response.streaming:
+            profile.response_bytes = len(response.content)
+        record_profile(profile)
+
+        data = profile.as_dict()
+        if config['log_json']:
+            logger.info(json.dumps(data, separators=(',', ':')))
+
+        exceeded = [
+            f"{key}={data[key]} (> {limit})"
+            for key, limit in config['thresholds'].items()
+            if limit is not None and data.get(key, 0) > limit
+        ]
+        if exceeded:
+            logger.warning("Budget dépassé sur %s %s : %s",
+                           profile.method, profile.path, ', '.join(exceeded))
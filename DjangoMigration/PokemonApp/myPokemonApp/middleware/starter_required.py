@@ -18,6 +18,7 @@ EXEMPT_PATH_PREFIXES = (
     "/admin/",
     "/static/",
     "/media/",
+    "/api/debug/",    # outils staff (profilage)
 )
 
 
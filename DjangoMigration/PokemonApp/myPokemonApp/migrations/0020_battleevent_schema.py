@@ -0,0 +1,39 @@
+"""
+0020_battleevent_schema
+
+Étape 1/2 de la migration battle_log JSON → table BattleEvent.
+
+Crée la table BattleEvent. Le champ Battle.battle_log (JSONField) est
+conservé : il reste lisible pour l'historique et sert de source à l'étape 2
+(0021_battleevent_data).
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0019_playablepokemon_gender_pokemon_gender_ratio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BattleEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('turn', models.IntegerField()),
+                ('seq', models.PositiveIntegerField(help_text='Rang du message dans le combat (0, 1, 2…)')),
+                ('message', models.TextField()),
+                ('battle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='myPokemonApp.battle')),
+            ],
+            options={
+                'verbose_name': 'Événement de combat',
+                'verbose_name_plural': 'Événements de combat',
+                'ordering': ['battle', 'seq'],
+                'indexes': [models.Index(fields=['battle', 'turn', 'seq'], name='idx_battle_event_turn')],
+                'constraints': [models.UniqueConstraint(fields=('battle', 'seq'), name='unique_battle_event_seq')],
+            },
+        ),
+    ]
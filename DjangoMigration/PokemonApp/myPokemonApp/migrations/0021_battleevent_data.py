@@ -0,0 +1,71 @@
+"""
+0021_battleevent_data
+
+Étape 2/2 de la migration battle_log JSON → table BattleEvent.
+
+Recopie Battle.battle_log (list[{'turn', 'message'}]) de chaque combat
+existant en rows BattleEvent (seq = position dans la liste). Le JSON n'est
+pas vidé : les pages d'historique peuvent toujours le lire.
+
+Idempotente : ignore_conflicts=True (contrainte unique battle + seq) évite
+les doublons si la migration est rejouée.
+"""
+
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+
+def populate_battle_events(apps, schema_editor):
+    Battle      = apps.get_model('myPokemonApp', 'Battle')
+    BattleEvent = apps.get_model('myPokemonApp', 'BattleEvent')
+
+    rows = []
+    for battle_id, log in Battle.objects.exclude(battle_log=[]).values_list('id', 'battle_log').iterator():
+        if not isinstance(log, list):
+            continue
+        for seq, entry in enumerate(log):
+            if isinstance(entry, dict):
+                turn, message = entry.get('turn') or 0, entry.get('message', '')
+            else:
+                turn, message = 0, str(entry)
+            rows.append(BattleEvent(battle_id=battle_id, turn=turn, seq=seq, message=message))
+        if len(rows) >= BATCH_SIZE:
+            BattleEvent.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+
+    if rows:
+        BattleEvent.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def reverse_populate(apps, schema_editor):
+    """
+    Reverse : recopie les rows BattleEvent dans battle_log pour pouvoir
+    revenir à la migration 0020 sans perdre le journal des combats récents.
+    """
+    Battle      = apps.get_model('myPokemonApp', 'Battle')
+    BattleEvent = apps.get_model('myPokemonApp', 'BattleEvent')
+
+    logs = {}
+    for battle_id, turn, message in (BattleEvent.objects
+                                     .order_by('battle_id', 'seq')
+                                     .values_list('battle_id', 'turn', 'message')
+                                     .iterator()):
+        logs.setdefault(battle_id, []).append({'turn': turn, 'message': message})
+
+    for battle in Battle.objects.filter(id__in=logs):
+        battle.battle_log = logs[battle.id]
+        battle.save(update_fields=['battle_log'])
+    BattleEvent.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0020_battleevent_schema'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_battle_events, reverse_code=reverse_populate),
+    ]
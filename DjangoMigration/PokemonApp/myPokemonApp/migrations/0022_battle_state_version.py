@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0021_battleevent_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='battle',
+            name='state_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0022_battle_state_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BattleArchive',
+            fields=[
+                ('id', models.BigIntegerField(help_text="pk du Battle d'origine", primary_key=True, serialize=False)),
+                ('battle_type', models.CharField(choices=[('wild', 'Pokémon sauvage'), ('trainer', 'Dresseur'), ('gym', 'Arène'), ('elite_four', 'Conseil des 4')], max_length=20)),
+                ('turns', models.PositiveIntegerField(default=0)),
+                ('weather', models.CharField(blank=True, max_length=20, null=True)),
+                ('money_earned', models.IntegerField(default=0)),
+                ('player_pokemon_id', models.BigIntegerField(blank=True, null=True)),
+                ('opponent_pokemon_id', models.BigIntegerField(blank=True, null=True)),
+                ('teams', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.DurationField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+                ('opponent_trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_battles_as_opponent', to='myPokemonApp.trainer')),
+                ('player_trainer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_battles_as_player', to='myPokemonApp.trainer')),
+                ('winner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_won_battles', to='myPokemonApp.trainer')),
+            ],
+            options={
+                'verbose_name': 'Combat archivé',
+                'verbose_name_plural': 'Combats archivés',
+                'indexes': [models.Index(fields=['player_trainer', '-created_at'], name='idx_archive_player_date'), models.Index(fields=['opponent_trainer', '-created_at'], name='idx_archive_opp_date'), models.Index(fields=['winner'], name='idx_archive_winner')],
+            },
+        ),
+    ]
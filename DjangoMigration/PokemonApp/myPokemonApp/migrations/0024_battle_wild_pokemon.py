@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0023_battle_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='battle',
+            name='wild_pokemon',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0024_battle_wild_pokemon'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BattleActionReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('battle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='action_receipts', to='myPokemonApp.battle')),
+            ],
+            options={
+                'verbose_name': "Reçu d'action de combat",
+                'verbose_name_plural': "Reçus d'actions de combat",
+                'constraints': [models.UniqueConstraint(fields=('battle', 'key'), name='unique_battle_action_key')],
+            },
+        ),
+    ]
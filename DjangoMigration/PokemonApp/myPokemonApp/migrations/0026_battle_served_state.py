@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0025_battle_action_receipt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='battle',
+            name='served_state',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
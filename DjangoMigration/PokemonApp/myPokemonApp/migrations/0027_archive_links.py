@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0026_battle_served_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='captureattempt',
+            name='archive',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='capture_attempts', to='myPokemonApp.battlearchive'),
+        ),
+        migrations.AddField(
+            model_name='trainerbattlehistory',
+            name='archive',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='history_entries', to='myPokemonApp.battlearchive'),
+        ),
+    ]
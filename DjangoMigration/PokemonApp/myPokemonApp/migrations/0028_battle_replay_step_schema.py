@@ -0,0 +1,36 @@
+"""
+0028_battle_replay_step_schema
+
+Étape 1/2 de la migration battle_state['replay'] → table BattleReplayStep.
+
+Crée la table BattleReplayStep ; l'étape 2 (0029_battle_replay_step_data)
+y recopie les flux des combats existants.
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0027_archive_links'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BattleReplayStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField(help_text="Rang de l'événement dans le flux (0, 1, 2…)")),
+                ('event', models.JSONField()),
+                ('battle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='replay_steps', to='myPokemonApp.battle')),
+            ],
+            options={
+                'verbose_name': 'Étape de replay',
+                'verbose_name_plural': 'Étapes de replay',
+                'ordering': ['battle', 'seq'],
+                'constraints': [models.UniqueConstraint(fields=('battle', 'seq'), name='unique_battle_replay_seq')],
+            },
+        ),
+    ]
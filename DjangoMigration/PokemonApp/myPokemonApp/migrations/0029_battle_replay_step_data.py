@@ -0,0 +1,67 @@
+"""
+0029_battle_replay_step_data
+
+Étape 2/2 de la migration battle_state['replay'] → table BattleReplayStep.
+
+Recopie la liste battle_state['replay'] de chaque combat en rows
+BattleReplayStep (seq = position dans la liste) et ne laisse dans
+battle_state que l'indicateur d'enregistrement ('replay': 1).
+
+Idempotente : ignore_conflicts=True (contrainte unique battle + seq) évite
+les doublons si la migration est rejouée.
+"""
+
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+
+def populate_replay_steps(apps, schema_editor):
+    Battle           = apps.get_model('myPokemonApp', 'Battle')
+    BattleReplayStep = apps.get_model('myPokemonApp', 'BattleReplayStep')
+
+    rows = []
+    for battle in Battle.objects.filter(battle_state__has_key='replay').only('id', 'battle_state').iterator():
+        stream = battle.battle_state['replay']
+        if not isinstance(stream, list):
+            continue
+        rows.extend(BattleReplayStep(battle_id=battle.id, seq=seq, event=event)
+                    for seq, event in enumerate(stream))
+        battle.battle_state['replay'] = 1
+        battle.save(update_fields=['battle_state'])
+        if len(rows) >= BATCH_SIZE:
+            BattleReplayStep.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+
+    if rows:
+        BattleReplayStep.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def reverse_populate(apps, schema_editor):
+    """Reverse : remet les rows BattleReplayStep dans battle_state['replay']."""
+    Battle           = apps.get_model('myPokemonApp', 'Battle')
+    BattleReplayStep = apps.get_model('myPokemonApp', 'BattleReplayStep')
+
+    streams = {}
+    for battle_id, event in (BattleReplayStep.objects
+                             .order_by('battle_id', 'seq')
+                             .values_list('battle_id', 'event')
+                             .iterator()):
+        streams.setdefault(battle_id, []).append(event)
+
+    for battle in Battle.objects.filter(id__in=streams):
+        battle.battle_state['replay'] = streams[battle.id]
+        battle.save(update_fields=['battle_state'])
+    BattleReplayStep.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myPokemonApp', '0028_battle_replay_step_schema'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_replay_steps, reverse_code=reverse_populate),
+    ]
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""! @brief AIContext.py — Contexte de scoring IA, construit une fois par décision.
+
+choose_enemy_move appliquait chaque flag (basic, evaluate_attack, expert,
+setup_first_turn) move par move, et chaque flag recalculait ses entrées :
+_ai_flag_evaluate_attack réestimait les dégâts de TOUS les moves pour chaque
+candidat (16 estimations pour 4 moves), les types du défenseur étaient relus
+via species.primary_type / secondary_type (FK), etc.
+
+AIContext.build() calcule tout en une passe, en O(moves) et sans requête
+(types par id via la TypeChart, stats effectives lues une fois) :
+
+  - ranges[move.id]     : fourchette de dégâts (services/damage_calc)
+  - damage[move.id]     : dégâts espérés (aléa 85–100 %, branche critique)
+  - type_mult[move.id]  : multiplicateur de type contre le défenseur
+  - max_damage          : meilleur dégât estimé de la sélection
+  - ko_threshold        : PV du défenseur (damage ≥ seuil → K.O. potentiel)
+  - stats / stages      : stats effectives et stages des deux Pokémon
+  - hp_ratio            : ratios de PV, état volatil (battle_state) et tours
+"""
+
+from dataclasses import dataclass, field
+
+from .TypeChart import get_type_chart
+
+
+STAT_NAMES = ('attack', 'defense', 'special_attack', 'special_defense', 'speed',
+              'accuracy', 'evasion')
+
+
+def _stages(pokemon):
+    return {stat: getattr(pokemon, f'{stat}_stage', 0) for stat in STAT_NAMES}
+
+
+def _effective_stats(pokemon):
+    return {
+        'attack':          pokemon.get_effective_attack(),
+        'defense':         pokemon.get_effective_defense(),
+        'special_attack':  pokemon.get_effective_special_attack(),
+        'special_defense': pokemon.get_effective_special_defense(),
+        'speed':           pokemon.get_effective_speed(),
+    }
+
+
+@dataclass(slots=True)
+class AIContext:
+    """Entrées partagées par tous les flags IA pour une décision."""
+
+    attacker:          object
+    defender:          object
+    moves:             list
+    state:             object            # BattleVolatileState du combat
+    attacker_stats:    dict
+    defender_stats:    dict
+    attacker_stages:   dict
+    defender_stages:   dict
+    attacker_hp_ratio: float
+    defender_hp_ratio: float
+    ko_threshold:      int
+    defender_type_ids: tuple
+    ranges:            dict = field(default_factory=dict)
+    damage:            dict = field(default_factory=dict)
+    type_mult:         dict = field(default_factory=dict)
+    max_damage:        int  = 0
+
+    @classmethod
+    def build(cls, battle, attacker, defender, moves):
+        """Calcule le contexte d'une décision (aucune requête)."""
+        from myPokemonApp.services.damage_calc import damage_inputs, damage_ranges
+
+        d_types  = (defender.species.primary_type_id, defender.species.secondary_type_id)
+        a_stats  = _effective_stats(attacker)
+        d_stats  = _effective_stats(defender)
+
+        ctx = cls(
+            attacker=attacker,
+            defender=defender,
+            moves=moves,
+            state=battle._bstate(),
+            attacker_stats=a_stats,
+            defender_stats=d_stats,
+            attacker_stages=_stages(attacker),
+            defender_stages=_stages(defender),
+            attacker_hp_ratio=attacker.current_hp / max(attacker.max_hp, 1),
+            defender_hp_ratio=defender.current_hp / max(defender.max_hp, 1),
+            ko_threshold=defender.current_hp,
+            defender_type_ids=d_types,
+        )
+
+        inputs = [damage_inputs(attacker, defender, move, battle) for move in moves]
+        ranges = damage_ranges(inputs, [defender.current_hp] * len(inputs))
+        for move, inp, rng in zip(moves, inputs, ranges):
+            ctx.type_mult[move.id] = inp.type_mult
+            ctx.ranges[move.id]    = rng
+            ctx.damage[move.id]    = int(rng.expected)
+
+        ctx.max_damage = max(ctx.damage.values(), default=0)
+        return ctx
+
+    def defender_has_type(self, type_name):
+        """True si le défenseur a ce type (par nom, insensible à la casse)."""
+        type_id = get_type_chart().type_id(type_name)
+        return type_id is not None and type_id in self.defender_type_ids
+
+    def can_ko(self, move):
+        """K.O. potentiel d'après l'estimation de dégâts."""
+        return self.damage.get(move.id, 0) >= self.ko_threshold
@@ -54,7 +54,6 @@ Retours standardisés :
 """
 
 from django.db import models
-import random
 
 
 TRIGGER_CHOICES = [
@@ -89,6 +88,122 @@ SOUND_MOVES = frozenset({
 RECOIL_EFFECTS = frozenset({'recoil', 'recoil_25', 'recoil_33', 'recoil_half'})
 
 
+# =============================================================================
+# TABLES DE DISPATCH DES HOOKS
+# =============================================================================
+#
+# hook → effect_tag → nom de la méthode de résolution.  Les tables de fonctions
+# (ABILITY_HOOKS, HOOKS_BY_TAG) sont construites une seule fois, après la
+# définition de la classe, au lieu d'un dict de méthodes liées recréé à chaque
+# appel.  None : talent reconnu mais sans résolution dans ce hook.
+
+_HOOK_METHODS = {
+    'on_switch_in': {
+        'intimidate':   '_resolve_intimidate',
+        'drought':      '_resolve_drought',
+        'drizzle':      '_resolve_drizzle',
+        'sand_stream':  '_resolve_sand_stream',
+        'snow_warning': '_resolve_snow_warning',
+        'trace':        '_resolve_trace',
+        'download':     '_resolve_download',
+        'forewarn':     '_resolve_forewarn',
+        'anticipation': '_resolve_anticipation',
+        'frisk':        '_resolve_frisk',
+    },
+    'on_switch_out': {
+        'natural_cure': '_resolve_natural_cure',
+        'regenerator':  '_resolve_regenerator',
+    },
+    'on_damage_taken': {
+        'sturdy':       '_resolve_sturdy',
+        'levitate':     '_resolve_levitate',
+        'flash_fire':   '_resolve_flash_fire',
+        'volt_absorb':  '_resolve_volt_absorb',
+        'water_absorb': '_resolve_water_absorb',
+        'dry_skin':     '_resolve_dry_skin',
+        'marvel_scale': '_resolve_marvel_scale',
+        'thick_fat':    '_resolve_thick_fat',
+        'static':       '_resolve_static',
+        'flame_body':   '_resolve_flame_body',
+        'poison_point': '_resolve_poison_point',
+        'effect_spore': '_resolve_effect_spore',
+        'cute_charm':   '_resolve_cute_charm',
+        'rough_skin':   '_resolve_rough_skin',
+        'iron_barbs':   '_resolve_rough_skin',   # même effet
+        'liquid_ooze':  '_resolve_liquid_ooze',
+        'shell_armor':  '_resolve_shell_armor',
+        'battle_armor': '_resolve_shell_armor',
+        'soundproof':   '_resolve_soundproof',
+        'filter':       '_resolve_filter',
+        'solid_rock':   '_resolve_filter',
+        'damp':         '_resolve_damp',
+        'rock_head':    '_resolve_rock_head',
+        'magic_guard':  '_resolve_magic_guard',
+        'sand_veil':    None,   # evasion boost, géré dans calcul précision
+        'snow_cloak':   None,
+        'clear_body':   '_resolve_clear_body',
+        'white_smoke':  '_resolve_clear_body',
+        'hyper_cutter': '_resolve_hyper_cutter',
+        'keen_eye':     '_resolve_keen_eye',
+    },
+    'on_attack': {
+        'blaze':        '_resolve_blaze',
+        'torrent':      '_resolve_torrent',
+        'overgrow':     '_resolve_overgrow',
+        'swarm':        '_resolve_swarm',
+        'technician':   '_resolve_technician',
+        'hustle':       '_resolve_hustle',
+        'iron_fist':    '_resolve_iron_fist',
+        'reckless':     '_resolve_reckless',
+        'sheer_force':  '_resolve_sheer_force',
+        'serene_grace': '_resolve_serene_grace',
+        'solar_power':  '_resolve_solar_power',
+        'tinted_lens':  '_resolve_tinted_lens',
+        'adaptability': '_resolve_adaptability',
+        'mold_breaker': '_resolve_mold_breaker',
+        'analytic':     '_resolve_analytic',
+        'stench':       '_resolve_stench',
+    },
+    'on_status': {
+        'immunity':     '_resolve_immunity',
+        'insomnia':     '_resolve_insomnia',
+        'vital_spirit': '_resolve_insomnia',
+        'limber':       '_resolve_limber',
+        'own_tempo':    '_resolve_own_tempo',
+        'oblivious':    '_resolve_oblivious',
+        'inner_focus':  '_resolve_inner_focus',
+        'synchronize':  '_resolve_synchronize',
+        'water_veil':   '_resolve_water_veil',
+        'magma_armor':  '_resolve_magma_armor',
+    },
+    'modify_stat': {
+        'guts':        '_modify_guts',
+        'huge_power':  '_modify_huge_power',
+        'pure_power':  '_modify_huge_power',
+        'swift_swim':  '_modify_swift_swim',
+        'chlorophyll': '_modify_chlorophyll',
+        'sand_rush':   '_modify_sand_rush',
+        'slush_rush':  '_modify_slush_rush',
+        'hustle':      '_modify_hustle_stat',
+        'defiant':     '_modify_defiant',
+        'competitive': '_modify_competitive',
+    },
+    'end_of_turn': {
+        'speed_boost': '_resolve_speed_boost',
+        'rain_dish':   '_resolve_rain_dish',
+        'poison_heal': '_resolve_poison_heal',
+        'shed_skin':   '_resolve_shed_skin',
+        'dry_skin':    '_resolve_dry_skin_eot',
+        'solar_power': '_resolve_solar_power_eot',
+        'ice_body':    '_resolve_ice_body',
+        'hydration':   '_resolve_hydration',
+    },
+    'on_capture': {
+        'illuminate': '_resolve_illuminate',
+    },
+}
+
+
 class Ability(models.Model):
     """Talent Pokémon — template partagé entre toutes les espèces qui le possèdent."""
 
@@ -107,7 +222,15 @@ class Ability(models.Model):
 
     @property
     def is_implemented(self):
-        return bool(self.effect_tag)
+        return self.effect_tag in HOOKS_BY_TAG
+
+    @property
+    def hooks(self):
+        """Hooks réellement implémentés pour cet effect_tag (frozenset)."""
+        return HOOKS_BY_TAG.get(self.effect_tag, frozenset())
+
+    def has_hook(self, hook):
+        return hook in HOOKS_BY_TAG.get(self.effect_tag, ())
 
     def get_trigger_label(self):
         return dict(TRIGGER_CHOICES).get(self.trigger, self.trigger)
@@ -117,140 +240,37 @@ class Ability(models.Model):
     # =========================================================================
 
     def on_switch_in(self, battle, pokemon):
-        handlers = {
-            'intimidate':   self._resolve_intimidate,
-            'drought':      self._resolve_drought,
-            'drizzle':      self._resolve_drizzle,
-            'sand_stream':  self._resolve_sand_stream,
-            'snow_warning': self._resolve_snow_warning,
-            'trace':        self._resolve_trace,
-            'download':     self._resolve_download,
-            'forewarn':     self._resolve_forewarn,
-            'anticipation': self._resolve_anticipation,
-            'frisk':        self._resolve_frisk,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(battle, pokemon) if handler else None
+        handler = _HOOKS['on_switch_in'].get(self.effect_tag)
+        return handler(self, battle, pokemon) if handler else None
 
     def on_switch_out(self, battle, pokemon):
-        handlers = {
-            'natural_cure': self._resolve_natural_cure,
-            'regenerator':  self._resolve_regenerator,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(battle, pokemon) if handler else None
+        handler = _HOOKS['on_switch_out'].get(self.effect_tag)
+        return handler(self, battle, pokemon) if handler else None
 
     def on_damage_taken(self, battle, pokemon, damage, move):
         """move peut être None pour les dégâts indirects (météo, poison…)."""
-        handlers = {
-            'sturdy':       self._resolve_sturdy,
-            'levitate':     self._resolve_levitate,
-            'flash_fire':   self._resolve_flash_fire,
-            'volt_absorb':  self._resolve_volt_absorb,
-            'water_absorb': self._resolve_water_absorb,
-            'dry_skin':     self._resolve_dry_skin,
-            'marvel_scale': self._resolve_marvel_scale,
-            'thick_fat':    self._resolve_thick_fat,
-            'static':       self._resolve_static,
-            'flame_body':   self._resolve_flame_body,
-            'poison_point': self._resolve_poison_point,
-            'effect_spore': self._resolve_effect_spore,
-            'cute_charm':   self._resolve_cute_charm,
-            'rough_skin':   self._resolve_rough_skin,
-            'iron_barbs':   self._resolve_rough_skin,   # même effet
-            'liquid_ooze':  self._resolve_liquid_ooze,
-            'shell_armor':  self._resolve_shell_armor,
-            'battle_armor': self._resolve_shell_armor,
-            'soundproof':   self._resolve_soundproof,
-            'filter':       self._resolve_filter,
-            'solid_rock':   self._resolve_filter,
-            'damp':         self._resolve_damp,
-            'rock_head':    self._resolve_rock_head,
-            'magic_guard':  self._resolve_magic_guard,
-            'sand_veil':    None,    # evasion boost, géré dans calcul précision
-            'snow_cloak':   None,
-            'clear_body':   self._resolve_clear_body,
-            'white_smoke':  self._resolve_clear_body,
-            'hyper_cutter': self._resolve_hyper_cutter,
-            'keen_eye':     self._resolve_keen_eye,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(battle, pokemon, damage, move) if handler else None
+        handler = _HOOKS['on_damage_taken'].get(self.effect_tag)
+        return handler(self, battle, pokemon, damage, move) if handler else None
 
     def on_attack(self, battle, pokemon, move, base_power):
-        handlers = {
-            'blaze':        self._resolve_blaze,
-            'torrent':      self._resolve_torrent,
-            'overgrow':     self._resolve_overgrow,
-            'swarm':        self._resolve_swarm,
-            'technician':   self._resolve_technician,
-            'hustle':       self._resolve_hustle,
-            'iron_fist':    self._resolve_iron_fist,
-            'reckless':     self._resolve_reckless,
-            'sheer_force':  self._resolve_sheer_force,
-            'serene_grace': self._resolve_serene_grace,
-            'solar_power':  self._resolve_solar_power,
-            'tinted_lens':  self._resolve_tinted_lens,
-            'adaptability': self._resolve_adaptability,
-            'mold_breaker': self._resolve_mold_breaker,
-            'analytic':     self._resolve_analytic,
-            'stench':       self._resolve_stench,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(battle, pokemon, move, base_power) if handler else None
+        handler = _HOOKS['on_attack'].get(self.effect_tag)
+        return handler(self, battle, pokemon, move, base_power) if handler else None
 
     def on_status(self, battle, pokemon, status):
-        handlers = {
-            'immunity':     self._resolve_immunity,
-            'insomnia':     self._resolve_insomnia,
-            'vital_spirit': self._resolve_insomnia,
-            'limber':       self._resolve_limber,
-            'own_tempo':    self._resolve_own_tempo,
-            'oblivious':    self._resolve_oblivious,
-            'inner_focus':  self._resolve_inner_focus,
-            'synchronize':  self._resolve_synchronize,
-            'water_veil':   self._resolve_water_veil,
-            'magma_armor':  self._resolve_magma_armor,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(battle, pokemon, status) if handler else None
+        handler = _HOOKS['on_status'].get(self.effect_tag)
+        return handler(self, battle, pokemon, status) if handler else None
 
     def modify_stat(self, stat_name, pokemon, battle=None):
-        handlers = {
-            'guts':        self._modify_guts,
-            'huge_power':  self._modify_huge_power,
-            'pure_power':  self._modify_huge_power,
-            'swift_swim':  self._modify_swift_swim,
-            'chlorophyll': self._modify_chlorophyll,
-            'sand_rush':   self._modify_sand_rush,
-            'slush_rush':  self._modify_slush_rush,
-            'hustle':      self._modify_hustle_stat,
-            'defiant':     self._modify_defiant,
-            'competitive': self._modify_competitive,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(stat_name, pokemon, battle) if handler else 1.0
+        handler = _HOOKS['modify_stat'].get(self.effect_tag)
+        return handler(self, stat_name, pokemon, battle) if handler else 1.0
 
     def end_of_turn(self, battle, pokemon):
-        handlers = {
-            'speed_boost': self._resolve_speed_boost,
-            'rain_dish':   self._resolve_rain_dish,
-            'poison_heal': self._resolve_poison_heal,
-            'shed_skin':   self._resolve_shed_skin,
-            'dry_skin':    self._resolve_dry_skin_eot,
-            'solar_power': self._resolve_solar_power_eot,
-            'ice_body':    self._resolve_ice_body,
-            'hydration':   self._resolve_hydration,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(battle, pokemon) if handler else None
+        handler = _HOOKS['end_of_turn'].get(self.effect_tag)
+        return handler(self, battle, pokemon) if handler else None
 
     def on_capture(self, wild_pokemon):
-        handlers = {
-            'illuminate': self._resolve_illuminate,
-        }
-        handler = handlers.get(self.effect_tag)
-        return handler(wild_pokemon) if handler else None
+        handler = _HOOKS['on_capture'].get(self.effect_tag)
+        return handler(self, wild_pokemon) if handler else None
 
     # =========================================================================
     # RÉSOLUTIONS — on_switch_in
@@ -314,7 +334,7 @@ class Ability(models.Model):
         opp = self._get_opponent(battle, pokemon)
         if opp:
             strongest = max(
-                opp.pokemonmoveinstance_set.select_related('move').all(),
+                opp.move_instances(),
                 key=lambda mi: mi.move.power or 0,
                 default=None,
             )
@@ -333,7 +353,7 @@ class Ability(models.Model):
             p_types = {pokemon.species.primary_type.name}
             if pokemon.species.secondary_type:
                 p_types.add(pokemon.species.secondary_type.name)
-            for mi in opp.pokemonmoveinstance_set.select_related('move__type').all():
+            for mi in opp.move_instances():
                 # Simplification : on vérifie les types super efficaces connus
                 SE_MAP = {
                     'fire': {'grass', 'ice', 'bug', 'steel'},
@@ -468,7 +488,7 @@ class Ability(models.Model):
         return None
 
     def _resolve_static(self, battle, pokemon, damage, move):
-        if move and move.category == 'physical' and random.random() < 0.30:
+        if move and move.category == 'physical' and battle.rng.random() < 0.30:
             return {
                 'inflict_status_on_attacker': 'paralysis',
                 'message': f"Le talent Statik de {pokemon} paralyse l'attaquant !",
@@ -476,7 +496,7 @@ class Ability(models.Model):
         return None
 
     def _resolve_flame_body(self, battle, pokemon, damage, move):
-        if move and move.category == 'physical' and random.random() < 0.30:
+        if move and move.category == 'physical' and battle.rng.random() < 0.30:
             return {
                 'inflict_status_on_attacker': 'burn',
                 'message': f"Corps Ardent de {pokemon} brûle l'attaquant !",
@@ -484,7 +504,7 @@ class Ability(models.Model):
         return None
 
     def _resolve_poison_point(self, battle, pokemon, damage, move):
-        if move and move.category == 'physical' and random.random() < 0.30:
+        if move and move.category == 'physical' and battle.rng.random() < 0.30:
             return {
                 'inflict_status_on_attacker': 'poison',
                 'message': f"Point Poison de {pokemon} empoisonne l'attaquant !",
@@ -492,8 +512,8 @@ class Ability(models.Model):
         return None
 
     def _resolve_effect_spore(self, battle, pokemon, damage, move):
-        if move and move.category == 'physical' and random.random() < 0.30:
-            status = random.choice(['paralysis', 'poison', 'sleep'])
+        if move and move.category == 'physical' and battle.rng.random() < 0.30:
+            status = battle.rng.choice(['paralysis', 'poison', 'sleep'])
             labels = {'paralysis': 'paralysé', 'poison': 'empoisonné', 'sleep': 'endormi'}
             return {
                 'inflict_status_on_attacker': status,
@@ -502,7 +522,7 @@ class Ability(models.Model):
         return None
 
     def _resolve_cute_charm(self, battle, pokemon, damage, move):
-        if move and move.category == 'physical' and random.random() < 0.30:
+        if move and move.category == 'physical' and battle.rng.random() < 0.30:
             return {
                 'confuse_attacker': True,
                 'message': f"Joli Sourire de {pokemon} fascine l'attaquant !",
@@ -693,7 +713,7 @@ class Ability(models.Model):
 
     def _resolve_stench(self, battle, pokemon, move, base_power):
         """10 % de chance de faire reculer l'adversaire."""
-        if random.random() < 0.10:
+        if battle.rng.random() < 0.10:
             return {'flinch_opponent': True}
         return None
 
@@ -834,7 +854,7 @@ class Ability(models.Model):
         return None
 
     def _resolve_shed_skin(self, battle, pokemon):
-        if pokemon.status_condition and random.random() < 0.30:
+        if pokemon.status_condition and battle.rng.random() < 0.30:
             return {
                 'clear_status': True,
                 'message': f"Mue libère {pokemon} de son statut !",
@@ -892,4 +912,40 @@ class Ability(models.Model):
             return None
         if getattr(battle, 'player_pokemon', None) == pokemon:
             return getattr(battle, 'opponent_pokemon', None)
-        return getattr(battle, 'player_pokemon', None)
\ No newline at end of file
+        return getattr(battle, 'player_pokemon', None)
+
+
+# =============================================================================
+# REGISTRE DES HOOKS (construit une fois, après la classe)
+# =============================================================================
+
+#: hook → {effect_tag: fonction de résolution (appelée avec l'Ability en 1er argument)}
+ABILITY_HOOKS = {
+    hook: {tag: getattr(Ability, name) for tag, name in table.items() if name}
+    for hook, table in _HOOK_METHODS.items()
+}
+_HOOKS = ABILITY_HOOKS
+
+#: effect_tag → frozenset des hooks qu'il implémente
+HOOKS_BY_TAG = {}
+for _hook, _table in ABILITY_HOOKS.items():
+    for _tag in _table:
+        HOOKS_BY_TAG[_tag] = HOOKS_BY_TAG.get(_tag, frozenset()) | {_hook}
+del _hook, _table, _tag
+
+
+def unimplemented_effect_tags():
+    """
+    effect_tag présents en base sans aucune résolution → {effect_tag: [noms]}.
+
+    Un tag listé n'a d'effet dans aucun hook : le talent est purement décoratif.
+    """
+    missing = {}
+    rows = (Ability.objects
+            .exclude(effect_tag__isnull=True).exclude(effect_tag='')
+            .order_by('effect_tag', 'name')
+            .values_list('effect_tag', 'name'))
+    for tag, name in rows:
+        if tag not in HOOKS_BY_TAG:
+            missing.setdefault(tag, []).append(name)
+    return missing
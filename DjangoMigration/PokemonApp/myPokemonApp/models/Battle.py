@@ -16,17 +16,32 @@ Système d'effets implémentés :
   - Divers : rampage, rollout, metronome, force_switch, tri_attack, protect, endure,
     drain_sleep (Dream Eater), remove_item, pain_split, future_sight, charge_turn variants
   - Fin de tour : Leech Seed, brûlure, poison, poison sévère, Ingrain, météo
+
+Persistance : execute_turn() s'exécute dans une TurnSession — toutes les
+écritures du tour (log, battle_state, PV, stages, PP) sont différées puis
+persistées en une seule transaction à la fin du tour.
+
+Pokémon sauvage : éphémère (models/WildPokemon.py), sérialisé dans
+wild_pokemon au lieu d'une ligne PlayablePokemon ; battle.opponent_pokemon
+le retourne comme s'il s'agissait de la FK.
 """
 
 from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
 import random
+import time
 
 from .PlayablePokemon import PokemonMoveInstance
-from .PokemonMove import PokemonMove
 from .Trainer import Trainer
 from .PlayablePokemon import PlayablePokemon
 from .Trainer import TrainerInventory
-from .MoveEffects import EFFECT_REGISTRY, SECONDARY_STAT_EFFECTS
+from .TurnSession import TurnSession
+from .AIContext import AIContext
+from .DamageResult import DamageResult
+from .BattleVolatileState import BattleVolatileState
+from .TypeChart import get_type_chart
+from .MoveCatalogue import get_move_catalogue
+from myPokemonApp.services.profiling import current_profile, profile_phase
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -46,6 +61,47 @@ CHARGE_MOVES = {
     'Ice Burn',
 }
 
+# Graphe d'un Pokémon au combat (select_related) : espèce + types, talent, objet
+POKEMON_GRAPH = (
+    'species__primary_type',
+    'species__secondary_type',
+    'ability',
+    'held_item',
+)
+BATTLE_POKEMON_SLOTS = ('player_pokemon', 'opponent_pokemon')
+
+
+def move_instances_prefetch(lookup='pokemonmoveinstance_set'):
+    """Prefetch des PokemonMoveInstance avec move + type (une requête par lookup)."""
+    return models.Prefetch(
+        lookup,
+        queryset=PokemonMoveInstance.objects.select_related('move', 'move__type'),
+    )
+
+
+def hydrated_pokemon():
+    """QuerySet de PlayablePokemon chargés avec leur graphe de combat complet."""
+    return (PlayablePokemon.objects
+            .select_related(*POKEMON_GRAPH)
+            .prefetch_related(move_instances_prefetch()))
+
+
+class BattleQuerySet(models.QuerySet):
+
+    def hydrated(self):
+        """
+        Combat + graphe complet d'un tour en un nombre fixe de requêtes (3) :
+        dresseurs, Pokémon actifs (espèce, types, talent, objet tenu) par
+        jointures, puis leurs moves (move + type) en un prefetch par côté.
+        """
+        related = ['player_trainer', 'opponent_trainer']
+        for slot in BATTLE_POKEMON_SLOTS:
+            related += [f'{slot}__{path}' for path in POKEMON_GRAPH]
+        return self.select_related(*related).prefetch_related(*(
+            move_instances_prefetch(f'{slot}__pokemonmoveinstance_set')
+            for slot in BATTLE_POKEMON_SLOTS
+        ))
+
 
 class Battle(models.Model):
     """Représente un combat Pokémon avec effets spéciaux complets."""
@@ -77,10 +133,19 @@ class Battle(models.Model):
         PlayablePokemon, on_delete=models.SET_NULL, null=True,
         related_name='battles_as_opponent_pokemon'
     )
+    # Pokémon sauvage éphémère (opponent_pokemon NULL) — voir models/WildPokemon.py
+    wild_pokemon = models.JSONField(null=True, blank=True)
 
     # État du combat
     is_active       = models.BooleanField(default=True)
     current_turn    = models.IntegerField(default=1)
+    # Version de l'état envoyé au client (réponses delta) : incrémentée à
+    # chaque action validée (services/battle_service.battle_action_lock) —
+    # voir services/serializers.apply_state_version.
+    state_version   = models.PositiveIntegerField(default=0)
+    # Dernier état servi et sa version, base du delta suivant
+    # ({'version': n, 'state': {...}}) — partagé par tous les workers.
+    served_state    = models.JSONField(null=True, blank=True)
     winner          = models.ForeignKey(
         Trainer, on_delete=models.SET_NULL, null=True, blank=True,
         related_name='won_battles'
@@ -91,6 +156,7 @@ class Battle(models.Model):
     terrain = models.CharField(max_length=20, blank=True, null=True)
 
     # Historique et état de combat volatile (JSONField)
+    # battle_log : journal des combats antérieurs à BattleEvent (lecture seule)
     battle_log   = models.JSONField(default=list)
     battle_state = models.JSONField(default=dict)   # ← état volatile du combat
 
@@ -100,6 +166,8 @@ class Battle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     ended_at   = models.DateTimeField(null=True, blank=True)
 
+    objects = BattleQuerySet.as_manager()
+
     class Meta:
         verbose_name          = "Combat"
         verbose_name_plural   = "Combats"
@@ -109,40 +177,285 @@ class Battle(models.Model):
             models.Index(fields=['player_trainer', 'is_active'], name='idx_battle_trainer_active'),
         ]
 
+    # TurnSession active pendant execute_turn() (écritures différées).
+    _turn_session = None
+
+    # Cache du sous-flux RNG courant : ((seed, step), random.Random)
+    _rng_cache = None
+
+    # Journal : entrées (turn, message) pas encore insérées dans BattleEvent,
+    # et seq du prochain événement en base (lu une fois par instance).
+    _pending_events = None
+    _next_event_seq = None
+
+    # Flux de replay : événements pas encore insérés dans BattleReplayStep,
+    # et seq de la prochaine étape en base (lu une fois par instance).
+    _pending_steps = None
+    _next_step_seq = None
+
+    # État volatil typé (BattleVolatileState) décodé depuis battle_state, et
+    # dict source du décodage : si battle_state est réaffecté, on redécode.
+    _volatile     = None
+    _volatile_raw = None
+
+    # Identity map des PlayablePokemon de la requête : pk → instance unique
+    _identity = None
+
+    # Pokémon sauvage éphémère matérialisé depuis wild_pokemon (ou assigné)
+    _wild = None
+
+    # Flux en direct (services/turn_stream) : dernier état publié par côté,
+    # {side: (pk, current_hp, status_condition)}
+    _stream_state = None
+
     def __str__(self):
         opp = self.opponent_trainer.username if self.opponent_trainer else 'Sauvage'
         return f"Combat: {self.player_trainer.username} vs {opp}"
 
+    def save(self, *args, **kwargs):
+        if self._turn_session is not None and self._turn_session.defers(self):
+            return  # persisté par TurnSession.commit()
+        if self._volatile is not None and self.battle_state is self._volatile_raw:
+            # Encodage compact, une seule fois par sauvegarde
+            self.battle_state = self._volatile_raw = self._volatile.encode()
+        if self._wild is not None:
+            self._store_wild(kwargs)
+        super().save(*args, **kwargs)
+
+    def _store_wild(self, save_kwargs):
+        """Sérialise le Pokémon sauvage éphémère (ajouté à update_fields s'il a changé)."""
+        from .WildPokemon import encode_wild_pokemon
+        encoded = encode_wild_pokemon(self._wild)
+        if encoded == self.wild_pokemon:
+            return
+        self.wild_pokemon = encoded
+        update_fields = save_kwargs.get('update_fields')
+        if update_fields is not None and 'wild_pokemon' not in update_fields:
+            save_kwargs['update_fields'] = [*update_fields, 'wild_pokemon']
+
+    # =========================================================================
+    # GRAPHE HYDRATÉ & IDENTITY MAP
+    # =========================================================================
+
+    def _identity_map(self):
+        if self._identity is None:
+            self._identity = {}
+            for slot in BATTLE_POKEMON_SLOTS:
+                field = self._meta.get_field(slot)
+                if field.is_cached(self) and getattr(self, slot) is not None:
+                    pokemon = getattr(self, slot)
+                    self._identity[pokemon.pk] = pokemon
+            if self._wild is not None:
+                self._identity[self._wild.pk] = self._wild
+        return self._identity
+
+    def _wild_opponent(self):
+        """Pokémon sauvage éphémère du combat (matérialisé une fois), ou None."""
+        if self._wild is None and self.opponent_pokemon_id is None and self.wild_pokemon:
+            from .WildPokemon import hydrate_wild_opponents
+            hydrate_wild_opponents([self])
+        return self._wild
+
+    def adopt(self, pokemon):
+        """
+        Instance unique de ce PlayablePokemon pour ce combat : si un objet de
+        même pk est déjà connu, c'est lui qui est retourné (et réutilisé par
+        la TurnSession, le sérialiseur, l'IA…).
+        """
+        if pokemon is None or pokemon.pk is None:
+            return pokemon
+        return self._identity_map().setdefault(pokemon.pk, pokemon)
+
+    def _merge_fresh(self, fresh):
+        """Recopie un Pokémon relu en base dans l'instance connue de même pk."""
+        known = self._identity_map().setdefault(fresh.pk, fresh)
+        if known is not fresh:
+            for field in fresh._meta.concrete_fields:
+                setattr(known, field.attname, getattr(fresh, field.attname))
+            known._state.fields_cache.update(fresh._state.fields_cache)
+            known._prefetched_objects_cache = getattr(
+                fresh, '_prefetched_objects_cache', {}
+            )
+        return known
+
+    def refresh_hydrated(self):
+        """
+        refresh_from_db() qui recharge le graphe complet (Battle.objects.hydrated())
+        sans casser l'identité des Pokémon : les instances actives déjà connues
+        sont mises à jour en place au lieu d'être remplacées.
+        """
+        fresh = type(self).objects.hydrated().get(pk=self.pk)
+        for field in self._meta.concrete_fields:
+            setattr(self, field.attname, getattr(fresh, field.attname))
+        self.player_trainer   = fresh.player_trainer
+        self.opponent_trainer = fresh.opponent_trainer
+        for slot in BATTLE_POKEMON_SLOTS:
+            if slot == 'opponent_pokemon' and self._wild is not None and fresh.wild_pokemon:
+                # Pokémon sauvage éphémère : même instance, état relu sans requête
+                from .WildPokemon import load_wild_state
+                load_wild_state(self._wild, fresh.wild_pokemon)
+                continue
+            pokemon = getattr(fresh, slot)
+            setattr(self, slot, self._merge_fresh(pokemon) if pokemon else None)
+
     # =========================================================================
     # HELPERS ÉTAT VOLATIL (battle_state)
     # =========================================================================
 
     def _bstate(self):
-        """Retourne battle_state initialisé."""
-        if not isinstance(self.battle_state, dict):
-            self.battle_state = {}
-        return self.battle_state
+        """Retourne l'état volatil typé (décodé une fois par instance)."""
+        if self._volatile is None or self.battle_state is not self._volatile_raw:
+            if not isinstance(self.battle_state, dict):
+                self.battle_state = {}
+            self._volatile     = BattleVolatileState.decode(self.battle_state)
+            self._volatile_raw = self.battle_state
+        return self._volatile
+
+    @property
+    def volatile(self):
+        """État volatil typé du combat (voir models/BattleVolatileState.py)."""
+        return self._bstate()
 
     def _pstate(self, pokemon):
-        """Retourne le sous-dict d'état pour un Pokémon donné."""
-        key = str(pokemon.pk)
-        s   = self._bstate()
-        if key not in s:
-            s[key] = {}
-        return s[key]
+        """Retourne l'état volatil (PokemonVolatile) d'un Pokémon donné."""
+        return self._bstate().pokemon(pokemon.pk)
 
     def _save_state(self):
         self.save(update_fields=['battle_state'])
 
+    # =========================================================================
+    # RNG DÉTERMINISTE + FLUX DE REPLAY
+    # =========================================================================
+    #
+    # battle_state['rng']    = {'seed': int, 'step': int}
+    # battle_state['replay'] = 1 si le combat est enregistré ; les événements
+    #                          (models/BattleReplay.py) sont des lignes
+    #                          BattleReplayStep, insérées comme le journal.
+    #
+    # Chaque étape enregistrée (tour, fuite) ouvre un sous-flux
+    # Random(f"{seed}:{step}") : le tirage d'une étape ne dépend que de la graine
+    # et de son rang, pas des tirages faits hors étape (IA, capture…).
+
+    @property
+    def rng(self):
+        """Générateur aléatoire du combat (module random si aucune graine)."""
+        state = self._bstate().rng
+        if state is None:
+            return random
+        key = (state['seed'], state['step'])
+        if self._rng_cache is None or self._rng_cache[0] != key:
+            self._rng_cache = (key, random.Random(f"{key[0]}:{key[1]}"))
+        return self._rng_cache[1]
+
+    def seed_rng(self, seed=None):
+        """Fixe la graine du combat (tirée au hasard si None)."""
+        if seed is None:
+            seed = random.getrandbits(32)
+        self._bstate().rng = {'seed': seed, 'step': 0}
+        return seed
+
+    def record_step(self, *event):
+        """Enregistre une étape du flux de replay et passe au sous-flux RNG suivant."""
+        bs = self._bstate()
+        self.record_event(*event)
+        if bs.rng is not None:
+            bs.rng['step'] += 1
+        self._save_state()
+
+    def record_event(self, *event):
+        """
+        Enregistre un événement hors RNG (switch après K.O., synchro…).
+
+        Hors tour, l'événement est inséré immédiatement ; pendant une
+        TurnSession, il l'est au commit avec les messages du tour.
+        """
+        if not self._bstate().replay:
+            return
+        if self._pending_steps is None:
+            self._pending_steps = []
+        self._pending_steps.append(list(event))
+        if self._turn_session is None:
+            self.flush_replay()
+
+    def record_sync(self, pokemon):
+        """
+        Enregistre l'état d'un Pokémon modifié hors moteur de combat
+        (XP / level-up, évolution, nouveau move) pour que le replay le suive.
+        """
+        if not self._bstate().replay:
+            return
+        from .BattleReplay import encode_pokemon
+        self.record_event('=', *encode_pokemon(pokemon, self._replay_moves(pokemon)))
+
+    def start_replay_recording(self, team):
+        """
+        Ouvre le flux de replay : état initial de tous les Pokémon engagés,
+        puis marqueur de départ (Pokémon actifs + taille du log d'intro).
+        """
+        from .BattleReplay import encode_pokemon
+
+        moves = {p.pk: p.move_instances() for p in team if p.is_ephemeral}
+        for mi in (PokemonMoveInstance.objects
+                   .filter(pokemon__in=[p.pk for p in team if not p.is_ephemeral])
+                   .select_related('move')):
+            moves.setdefault(mi.pokemon_id, []).append(mi)
+
+        self._bstate().replay = True
+        self._save_state()
+        self._pending_steps = [
+            ['=', *encode_pokemon(p, moves.get(p.pk, []))] for p in team
+        ]
+        self.record_event(
+            'S', self.player_pokemon_id, self.opponent_pokemon.pk, self.log_length()
+        )
+
+    def _step_seq(self):
+        """seq de la prochaine BattleReplayStep en base (une requête par instance)."""
+        if self._next_step_seq is None:
+            from .BattleReplayStep import BattleReplayStep
+            last = (BattleReplayStep.objects.filter(battle_id=self.pk)
+                    .order_by('-seq').values_list('seq', flat=True).first())
+            self._next_step_seq = 0 if last is None else last + 1
+        return self._next_step_seq
+
+    def flush_replay(self):
+        """Insère les événements de replay en attente en un seul bulk_create."""
+        if self.pk is None or not self._pending_steps:
+            return
+        from .BattleReplayStep import BattleReplayStep
+
+        seq = self._step_seq()
+        BattleReplayStep.objects.bulk_create([
+            BattleReplayStep(battle_id=self.pk, seq=seq + i, event=event)
+            for i, event in enumerate(self._pending_steps)
+        ])
+        self._next_step_seq = seq + len(self._pending_steps)
+        self._pending_steps = []
+
+    def replay_events(self):
+        """Flux de replay complet (en base + en attente), dans l'ordre."""
+        events = []
+        if self.pk is not None:
+            events = list(self.replay_steps.order_by('seq').values_list('event', flat=True))
+        events.extend(self._pending_steps or ())
+        return events
+
+    def _replay_moves(self, pokemon):
+        if self._turn_session is not None:
+            return self._turn_session.move_instances(pokemon)
+        if pokemon.is_ephemeral:
+            return pokemon.move_instances()
+        return list(PokemonMoveInstance.objects.filter(pokemon=pokemon))
+
     # ─── Confuse ──────────────────────────────────────────────────────────────
 
     def is_confused(self, pokemon):
-        return bool(self._pstate(pokemon).get('confusion_turns', 0) > 0)
+        return bool(self._pstate(pokemon).confusion_turns > 0)
 
     def confuse(self, pokemon):
         pst = self._pstate(pokemon)
-        if not pst.get('confusion_turns', 0):
-            pst['confusion_turns'] = random.randint(2, 5)
+        if not pst.confusion_turns:
+            pst.confusion_turns = self.rng.randint(2, 5)
             self._save_state()
             return True
         return False
@@ -150,17 +463,17 @@ class Battle(models.Model):
     def tick_confusion(self, pokemon):
         """Décrémente le compteur et retourne True si le Pokémon se blesse."""
         pst = self._pstate(pokemon)
-        turns = pst.get('confusion_turns', 0)
+        turns = pst.confusion_turns
         if turns <= 0:
             return False
         if turns == 1:
-            pst['confusion_turns'] = 0
+            pst.confusion_turns = 0
             self._save_state()
             self.add_to_log(f"{pokemon} n'est plus confus !")
             return False
-        pst['confusion_turns'] = turns - 1
+        pst.confusion_turns = turns - 1
         self._save_state()
-        if random.random() < 0.33:
+        if self.rng.random() < 0.33:
             # Se blesse lui-même
             damage = max(1, int(((2 * pokemon.level / 5 + 2) * 40 * pokemon.attack / pokemon.defense) / 50 + 2))
             pokemon.current_hp = max(0, pokemon.current_hp - damage)
@@ -172,12 +485,12 @@ class Battle(models.Model):
     # ─── Leech Seed ──────────────────────────────────────────────────────────
 
     def has_leech_seed(self, pokemon):
-        return bool(self._pstate(pokemon).get('leech_seed'))
+        return bool(self._pstate(pokemon).leech_seed)
 
     def apply_leech_seed(self, pokemon):
         pst = self._pstate(pokemon)
-        if not pst.get('leech_seed'):
-            pst['leech_seed'] = True
+        if not pst.leech_seed:
+            pst.leech_seed = True
             self._save_state()
             return True
         return False
@@ -185,13 +498,13 @@ class Battle(models.Model):
     # ─── Trap (Bind, Clamp, Fire Spin…) ─────────────────────────────────────
 
     def is_trapped(self, pokemon):
-        return bool(self._pstate(pokemon).get('trap_turns', 0) > 0)
+        return bool(self._pstate(pokemon).trap_turns > 0)
 
     def trap_pokemon(self, pokemon, move_name):
         pst = self._pstate(pokemon)
-        if not pst.get('trap_turns', 0):
-            pst['trap_turns']  = random.randint(2, 5)
-            pst['trap_move']   = move_name
+        if not pst.trap_turns:
+            pst.trap_turns  = self.rng.randint(2, 5)
+            pst.trap_move   = move_name
             self._save_state()
 
     # ─── Disable ─────────────────────────────────────────────────────────────
@@ -199,80 +512,85 @@ class Battle(models.Model):
     def disable_move(self, pokemon):
         """Désactive aléatoirement un move du Pokémon pour 4 tours."""
         pst   = self._pstate(pokemon)
-        moves = PokemonMoveInstance.objects.filter(pokemon=pokemon, current_pp__gt=0)
-        if not moves.exists():
+        if self._turn_session is not None:
+            moves = [mi for mi in self._turn_session.move_instances(pokemon)
+                     if mi.current_pp > 0]
+        else:
+            moves = list(PokemonMoveInstance.objects.filter(pokemon=pokemon, current_pp__gt=0))
+        if not moves:
             return False
-        chosen = random.choice(list(moves))
-        pst['disabled_move_id'] = chosen.move.pk
-        pst['disable_turns']    = 4
+        chosen = self.rng.choice(moves)
+        pst.disabled_move_id = chosen.move.pk
+        pst.disable_turns    = 4
         self._save_state()
         self.add_to_log(f"{chosen.move.name} de {pokemon} est neutralisé !")
         return True
 
     def is_move_disabled(self, pokemon, move):
         pst = self._pstate(pokemon)
-        return (pst.get('disabled_move_id') == move.pk and
-                pst.get('disable_turns', 0) > 0)
+        return (pst.disabled_move_id == move.pk and
+                pst.disable_turns > 0)
 
     # ─── Recharge (Hyper Beam, Giga Impact…) ─────────────────────────────────
 
     def set_recharge(self, pokemon):
-        self._pstate(pokemon)['recharge'] = True
+        self._pstate(pokemon).recharge = True
         self._save_state()
 
     def needs_recharge(self, pokemon):
-        return bool(self._pstate(pokemon).get('recharge'))
+        return bool(self._pstate(pokemon).recharge)
 
     def clear_recharge(self, pokemon):
-        self._pstate(pokemon).pop('recharge', None)
+        self._pstate(pokemon).recharge = False
         self._save_state()
 
     # ─── Charge (SolarBeam, Fly, Dig…) ───────────────────────────────────────
 
     def set_charging(self, pokemon, move_name):
-        self._pstate(pokemon)['charging'] = move_name
+        self._pstate(pokemon).charging = move_name
         self._save_state()
 
     def get_charging_move(self, pokemon):
-        return self._pstate(pokemon).get('charging')
+        return self._pstate(pokemon).charging
 
     def clear_charging(self, pokemon):
-        self._pstate(pokemon).pop('charging', None)
+        self._pstate(pokemon).charging = None
         self._save_state()
 
     # ─── Protect / Endure ─────────────────────────────────────────────────────
 
     def set_protected(self, pokemon):
-        self._pstate(pokemon)['protected'] = True
+        self._pstate(pokemon).protected = True
         self._save_state()
 
     def is_protected(self, pokemon):
-        return bool(self._pstate(pokemon).get('protected'))
+        return bool(self._pstate(pokemon).protected)
 
     def clear_protected(self, pokemon):
-        self._pstate(pokemon).pop('protected', None)
+        self._pstate(pokemon).protected = False
         self._save_state()
 
     def set_enduring(self, pokemon):
-        self._pstate(pokemon)['enduring'] = True
+        self._pstate(pokemon).enduring = True
         self._save_state()
 
     def is_enduring(self, pokemon):
-        return bool(self._pstate(pokemon).get('enduring'))
+        return bool(self._pstate(pokemon).enduring)
 
     def clear_enduring(self, pokemon):
-        self._pstate(pokemon).pop('enduring', None)
+        self._pstate(pokemon).enduring = False
         self._save_state()
 
     # ─── Flinch ──────────────────────────────────────────────────────────────
 
     def set_flinched(self, pokemon):
-        self._pstate(pokemon)['flinched'] = True
+        self._pstate(pokemon).flinched = True
         self._save_state()
 
     def check_and_clear_flinch(self, pokemon):
         pst = self._pstate(pokemon)
-        if pst.pop('flinched', False):
+        if pst.flinched:
+            pst.flinched = False
             self._save_state()
             return True
         return False
@@ -280,121 +598,121 @@ class Battle(models.Model):
     # ─── Focus Energy (taux de critique élevé) ───────────────────────────────
 
     def set_focus_energy(self, pokemon):
-        self._pstate(pokemon)['focus_energy'] = True
+        self._pstate(pokemon).focus_energy = True
         self._save_state()
 
     def has_focus_energy(self, pokemon):
-        return bool(self._pstate(pokemon).get('focus_energy'))
+        return bool(self._pstate(pokemon).focus_energy)
 
     # ─── Destiny Bond ────────────────────────────────────────────────────────
 
     def set_destiny_bond(self, pokemon):
-        self._pstate(pokemon)['destiny_bond'] = True
+        self._pstate(pokemon).destiny_bond = True
         self._save_state()
 
     def check_destiny_bond(self, pokemon):
-        return bool(self._pstate(pokemon).get('destiny_bond'))
+        return bool(self._pstate(pokemon).destiny_bond)
 
     # ─── Ingrain ─────────────────────────────────────────────────────────────
 
     def set_ingrain(self, pokemon):
-        self._pstate(pokemon)['ingrain'] = True
+        self._pstate(pokemon).ingrain = True
         self._save_state()
 
     def has_ingrain(self, pokemon):
-        return bool(self._pstate(pokemon).get('ingrain'))
+        return bool(self._pstate(pokemon).ingrain)
 
     # ─── Toxic counter ────────────────────────────────────────────────────────
 
     def get_toxic_counter(self, pokemon):
-        return self._pstate(pokemon).get('toxic_counter', 0)
+        return self._pstate(pokemon).toxic_counter
 
     def increment_toxic_counter(self, pokemon):
         pst = self._pstate(pokemon)
-        pst['toxic_counter'] = pst.get('toxic_counter', 0) + 1
+        pst.toxic_counter = pst.toxic_counter + 1
         self._save_state()
 
     def set_badly_poisoned(self, pokemon):
         pst = self._pstate(pokemon)
-        pst['badly_poisoned'] = True
-        pst['toxic_counter']  = 1
+        pst.badly_poisoned = True
+        pst.toxic_counter  = 1
         self._save_state()
 
     def is_badly_poisoned(self, pokemon):
-        return bool(self._pstate(pokemon).get('badly_poisoned'))
+        return bool(self._pstate(pokemon).badly_poisoned)
 
     # ─── Weather ─────────────────────────────────────────────────────────────
 
     def set_weather(self, weather_name):
         self.weather = weather_name
-        self._bstate()['weather_turns'] = WEATHER_DURATIONS
+        self._bstate().weather_turns = WEATHER_DURATIONS
         self.save(update_fields=['weather', 'battle_state'])
 
     def get_weather_turns(self):
-        return self._bstate().get('weather_turns', 0)
+        return self._bstate().weather_turns
 
     # ─── Future Sight ────────────────────────────────────────────────────────
 
     def set_future_sight(self, target_pokemon, damage):
-        self._pstate(target_pokemon)['future_sight_damage'] = damage
-        self._pstate(target_pokemon)['future_sight_turns']  = 2
+        self._pstate(target_pokemon).future_sight_damage = damage
+        self._pstate(target_pokemon).future_sight_turns  = 2
         self._save_state()
 
     # ─── Nightmare ────────────────────────────────────────────────────────────
 
     def set_nightmare(self, pokemon):
-        self._pstate(pokemon)['nightmare'] = True
+        self._pstate(pokemon).nightmare = True
         self._save_state()
 
     def has_nightmare(self, pokemon):
-        return bool(self._pstate(pokemon).get('nightmare'))
+        return bool(self._pstate(pokemon).nightmare)
 
     # ─── Light Screen / Reflect ──────────────────────────────────────────────
 
     def set_screen(self, side, screen_type):
         """side = 'player' | 'opponent'"""
-        key = f"{side}_{screen_type}"
-        self._bstate()[key] = 5  # 5 tours
+        self._bstate().side(side)[screen_type] = 5  # 5 tours
         self._save_state()
 
     def get_screen_multiplier(self, side, category):
-        key = f"{side}_{'light_screen' if category == 'special' else 'reflect'}"
-        return 0.5 if self._bstate().get(key, 0) > 0 else 1.0
+        side_state = self._bstate().side(side)
+        screen     = side_state.light_screen if category == 'special' else side_state.reflect
+        return 0.5 if screen > 0 else 1.0
 
     # ─── Rampage / Rollout ────────────────────────────────────────────────────
 
     def set_rampage(self, pokemon, move_name, turns=None):
         pst = self._pstate(pokemon)
-        pst['rampage_move']  = move_name
-        pst['rampage_turns'] = turns if turns is not None else random.randint(2, 3)
+        pst.rampage_move  = move_name
+        pst.rampage_turns = turns if turns is not None else self.rng.randint(2, 3)
         self._save_state()
 
     def is_rampaging(self, pokemon):
         pst = self._pstate(pokemon)
-        return pst.get('rampage_turns', 0) > 0
+        return pst.rampage_turns > 0
 
     def tick_rampage(self, pokemon):
         pst = self._pstate(pokemon)
-        turns = pst.get('rampage_turns', 0)
+        turns = pst.rampage_turns
         if turns > 0:
-            pst['rampage_turns'] = turns - 1
+            pst.rampage_turns = turns - 1
             self._save_state()
-            if pst['rampage_turns'] == 0:
-                pst.pop('rampage_move', None)
+            if pst.rampage_turns == 0:
+                pst.rampage_move = None
                 self._save_state()
                 self.confuse(pokemon)
                 self.add_to_log(f"{pokemon} est confus après son emballement !")
 
     def get_rollout_count(self, pokemon):
-        return self._pstate(pokemon).get('rollout_count', 0)
+        return self._pstate(pokemon).rollout_count
 
     def increment_rollout(self, pokemon):
         pst = self._pstate(pokemon)
-        pst['rollout_count'] = pst.get('rollout_count', 0) + 1
+        pst.rollout_count = pst.rollout_count + 1
         self._save_state()
 
     def reset_rollout(self, pokemon):
-        self._pstate(pokemon).pop('rollout_count', None)
+        self._pstate(pokemon).rollout_count = 0
         self._save_state()
 
     # =========================================================================
@@ -402,19 +720,146 @@ class Battle(models.Model):
     # =========================================================================
 
     def add_to_log(self, message):
-        if not isinstance(self.battle_log, list):
-            self.battle_log = []
-        self.battle_log.append({'turn': self.current_turn, 'message': message})
-        self.save(update_fields=['battle_log'])
+        """
+        Ajoute un message au journal (table BattleEvent).
+
+        Hors tour, le message est inséré immédiatement ; pendant une
+        TurnSession, tous les messages du tour sont insérés au commit.
+        Les combats en mémoire (simulation, replay) ne l'écrivent jamais.
+        """
+        if self._pending_events is None:
+            self._pending_events = []
+        self._pending_events.append((self.current_turn, message))
+        self.emit('log', message=message)
+        if self._turn_session is None:
+            self.flush_log()
+
+    def _event_seq(self):
+        """seq du prochain BattleEvent en base (une requête par instance)."""
+        if self._next_event_seq is None:
+            from .BattleEvent import BattleEvent
+            last = (BattleEvent.objects.filter(battle_id=self.pk)
+                    .order_by('-seq').values_list('seq', flat=True).first())
+            self._next_event_seq = 0 if last is None else last + 1
+        return self._next_event_seq
+
+    def flush_log(self):
+        """Insère les messages en attente en un seul bulk_create."""
+        if self.pk is None or not self._pending_events:
+            return
+        from .BattleEvent import BattleEvent
+
+        seq = self._event_seq()
+        BattleEvent.objects.bulk_create([
+            BattleEvent(battle_id=self.pk, turn=turn, seq=seq + i, message=message)
+            for i, (turn, message) in enumerate(self._pending_events)
+        ])
+        self._next_event_seq = seq + len(self._pending_events)
+        self._pending_events = []
+
+    def log_length(self):
+        """Nombre de messages du journal (en base + en attente)."""
+        stored = self._event_seq() if self.pk is not None else 0
+        return stored + len(self._pending_events or ())
+
+    def get_log(self):
+        """
+        Journal complet [{'turn', 'message'}] dans l'ordre.
+
+        Combats antérieurs à BattleEvent et non migrés : battle_log (JSON).
+        """
+        entries = []
+        if self.pk is not None:
+            entries = [
+                {'turn': turn, 'message': message}
+                for turn, message in self.events.order_by('seq').values_list('turn', 'message')
+            ]
+            if not entries and isinstance(self.battle_log, list):
+                entries = list(self.battle_log)
+        entries.extend(
+            {'turn': turn, 'message': message} for turn, message in self._pending_events or ()
+        )
+        return entries
+
+    def turn_log(self, *turns):
+        """Messages des tours donnés, sans charger le reste du journal."""
+        return list(self.events.filter(turn__in=turns)
+                    .order_by('seq').values_list('message', flat=True))
+
+    def recent_log(self, count=5):
+        """Les `count` derniers messages du journal."""
+        messages = list(self.events.order_by('-seq').values_list('message', flat=True)[:count])
+        messages.reverse()
+        return messages
+
+    # =========================================================================
+    # FLUX EN DIRECT (services/turn_stream)
+    # =========================================================================
+
+    def _streaming(self):
+        """True si un client suit ce combat (jamais pour les simulations)."""
+        if self.pk is None:
+            return False
+        if self._turn_session is not None and not self._turn_session.persist:
+            return False
+        from myPokemonApp.services import turn_stream
+        return turn_stream.has_subscribers(self.pk)
+
+    def emit(self, kind, **data):
+        """Publie un événement du tour aux clients abonnés (sans abonné : rien)."""
+        if self._streaming():
+            from myPokemonApp.services import turn_stream
+            turn_stream.publish(self.pk, kind, self.current_turn, **data)
+
+    def side_of(self, pokemon):
+        """'player' ou 'opponent' selon le côté du Pokémon actif."""
+        player = self.player_pokemon
+        return 'player' if pokemon is player or (
+            player is not None and pokemon.pk is not None and pokemon.pk == player.pk
+        ) else 'opponent'
+
+    def _emit_state(self):
+        """
+        Publie les changements des Pokémon actifs depuis le dernier envoi :
+        'hp' (PV, ou nouveau Pokémon), 'status', puis 'faint' au K.O.
+        """
+        if not self._streaming():
+            return
+        last = self._stream_state if self._stream_state is not None else {}
+        for side, pokemon in (('player', self.player_pokemon),
+                              ('opponent', self.opponent_pokemon)):
+            if pokemon is None:
+                continue
+            state = (pokemon.pk, pokemon.current_hp, pokemon.status_condition)
+            prev  = last.get(side)
+            if prev == state:
+                continue
+            same = prev is not None and prev[0] == pokemon.pk
+            if not same or prev[1] != pokemon.current_hp:
+                self.emit('hp', side=side, pokemon=pokemon.pk,
+                          hp=pokemon.current_hp, max_hp=pokemon.max_hp)
+            if same and prev[2] != pokemon.status_condition:
+                self.emit('status', side=side, status=pokemon.status_condition or '')
+            if pokemon.current_hp == 0 and (not same or prev[1] != 0):
+                self.emit('faint', side=side, pokemon=pokemon.pk, name=str(pokemon))
+            last[side] = state
+        self._stream_state = last
 
     # =========================================================================
     # HELPERS — ABILITY SYSTEM
     # =========================================================================
 
-    def _get_ability(self, pokemon):
-        """Retourne l'ability du Pokémon si elle est implémentée (effect_tag présent)."""
+    def _get_ability(self, pokemon, hook=None):
+        """
+        Retourne l'ability du Pokémon si elle est implémentée (effect_tag présent).
+
+        Avec `hook` : None si le talent n'a aucune résolution pour ce hook
+        (Ability.hooks), ce qui évite l'appel pour la phase en cours.
+        """
         ability = getattr(pokemon, 'ability', None)
         if ability and ability.effect_tag:
+            if hook is not None and not ability.has_hook(hook):
+                return None
             return ability
         return None
 
@@ -445,7 +890,7 @@ class Battle(models.Model):
         Tente d'appliquer un statut en vérifiant d'abord le talent du Pokémon cible.
         Retourne True si le statut a bien été appliqué.
         """
-        ability = self._get_ability(target)
+        ability = self._get_ability(target, 'on_status')
         if ability:
             result = ability.on_status(self, target, status)
             if result:
@@ -455,13 +900,13 @@ class Battle(models.Model):
                     return False
                 if result.get('transmit_status_to_opponent') and attacker:
                     transmitted = result['transmit_status_to_opponent']
-                    if attacker.apply_status(transmitted):
+                    if attacker.apply_status(transmitted, rng=self.rng):
                         self.add_to_log(f"{attacker} est aussi touché ({transmitted}) !")
-        return target.apply_status(status)
+        return target.apply_status(status, rng=self.rng)
 
     def _fire_switch_in_ability(self, pokemon):
         """Active le talent on_switch_in du Pokémon entrant en combat."""
-        ability = self._get_ability(pokemon)
+        ability = self._get_ability(pokemon, 'on_switch_in')
         if not ability:
             return
         result = ability.on_switch_in(self, pokemon)
@@ -488,7 +933,7 @@ class Battle(models.Model):
 
     def _fire_switch_out_ability(self, pokemon):
         """Active le talent on_switch_out du Pokémon qui sort du combat."""
-        ability = self._get_ability(pokemon)
+        ability = self._get_ability(pokemon, 'on_switch_out')
         if not ability:
             return
         result = ability.on_switch_out(self, pokemon)
@@ -510,8 +955,36 @@ class Battle(models.Model):
     # TOUR DE COMBAT PRINCIPAL
     # =========================================================================
 
+    @profile_phase('execute_turn')
     def execute_turn(self, player_action, opponent_action):
-        """Exécute un tour complet de combat."""
+        """
+        Exécute un tour complet de combat.
+
+        Le tour tourne sur les instances déjà chargées (Battle, Pokémon actifs,
+        PokemonMoveInstance) ; aucune écriture n'a lieu avant la fin du tour,
+        où TurnSession.commit() persiste tout en une transaction.
+        """
+        if self._turn_session is not None:
+            return self._execute_turn(player_action, opponent_action)
+
+        session = TurnSession(self)
+        try:
+            self._execute_turn(player_action, opponent_action)
+        except Exception:
+            session.discard()
+            self.emit('resync')   # tour annulé : le client se recale sur la réponse
+            raise
+        session.commit()
+        self.emit('turn_end')
+
+    def _execute_turn(self, player_action, opponent_action):
+        """Corps du tour (appelé dans une TurnSession par execute_turn)."""
+        from .BattleReplay import encode_action
+        self.record_step('T', encode_action(player_action), encode_action(opponent_action))
+        if self._streaming():
+            self._stream_state = None
+            self.emit('turn_start')
+            self._emit_state()
 
         # ── Réinitialiser Protect/Endure (valable 1 seul tour) ───────────────
         self.clear_protected(self.player_pokemon)
@@ -535,6 +1008,8 @@ class Battle(models.Model):
             self.switch_pokemon(self.player_pokemon, player_action.get('pokemon'))
         if opponent_is_switching:
             self.switch_pokemon(self.opponent_pokemon, opponent_action.get('pokemon'))
+        if player_is_switching or opponent_is_switching:
+            self._emit_state()
 
         if player_is_switching and opponent_is_switching:
             self.current_turn += 1
@@ -572,6 +1047,8 @@ class Battle(models.Model):
             result = item.use_on_pokemon(target)
             msg = result.get('message', str(result)) if isinstance(result, dict) else result
             self.add_to_log(msg)
+        if player_using_item or opponent_using_item:
+            self._emit_state()
 
         if player_using_item and opponent_using_item:
             self.current_turn += 1
@@ -584,7 +1061,7 @@ class Battle(models.Model):
             # l'animation/mise à jour HP de l'attaque adverse.
             opp_move = opponent_action.get('move')
             bs = self._bstate()
-            bs['last_turn_info'] = {
+            bs.last_turn_info = {
                 'player_first':   False,   # l'adversaire agit côté "attaquant" ce tour
                 'second_skipped': False,
                 'player_move': {'name': '', 'type': '', 'category': ''},
@@ -627,13 +1104,13 @@ class Battle(models.Model):
             player_first = False
         else:
             # ── Salle Bizarre : inverser la comparaison de vitesse ──────────
-            trick_room = self._bstate().get('trick_room_turns', 0) > 0
+            trick_room = self._bstate().trick_room_turns > 0
             p_speed    = self.player_pokemon.get_effective_speed()
             o_speed    = self.opponent_pokemon.get_effective_speed()
             # Tailwind : ×2 sur la vitesse effective du côté concerné
-            if self._bstate().get('player_tailwind', 0) > 0:
+            if self._bstate().side('player').tailwind > 0:
                 p_speed *= 2
-            if self._bstate().get('opponent_tailwind', 0) > 0:
+            if self._bstate().side('opponent').tailwind > 0:
                 o_speed *= 2
 
             player_faster = (p_speed < o_speed) if trick_room else (p_speed > o_speed)
@@ -648,7 +1125,7 @@ class Battle(models.Model):
                 second = (self.player_pokemon, player_action, self.opponent_pokemon)
                 player_first = False
             else:
-                player_first = random.choice([True, False])
+                player_first = self.rng.choice([True, False])
                 if player_first:
                     first  = (self.player_pokemon, player_action, self.opponent_pokemon)
                     second = (self.opponent_pokemon, opponent_action, self.player_pokemon)
@@ -682,7 +1159,7 @@ class Battle(models.Model):
             self.add_to_log(f"{defender} est K.O.!")
             # Store turn info: second attacker was skipped (defender KO'd first)
             bs = self._bstate()
-            bs['last_turn_info'] = {
+            bs.last_turn_info = {
                 'player_first':    player_first,
                 'second_skipped':  True,
                 'player_move':     player_move_info,
@@ -705,7 +1182,7 @@ class Battle(models.Model):
 
         # Store turn info: both attackers acted
         bs = self._bstate()
-        bs['last_turn_info'] = {
+        bs.last_turn_info = {
             'player_first':   player_first,
             'second_skipped': False,
             'player_move':    player_move_info,
@@ -713,9 +1190,8 @@ class Battle(models.Model):
         }
 
         # Capturer les HP AVANT les effets de fin de tour (pour calculer les dégâts EOT côté frontend)
-        self.player_pokemon.refresh_from_db(fields=['current_hp'])
-        self.opponent_pokemon.refresh_from_db(fields=['current_hp'])
-        bs['hp_before_eot'] = {
+        # Les instances en mémoire font foi : la base n'est écrite qu'au commit du tour.
+        bs.hp_before_eot = {
             'player':   self.player_pokemon.current_hp,
             'opponent': self.opponent_pokemon.current_hp,
         }
@@ -739,6 +1215,7 @@ class Battle(models.Model):
             self.switch_pokemon(attacker, action.get('pokemon'))
         elif action_type == 'flee':
             self.attempt_flee()
+        self._emit_state()
 
     # =========================================================================
     # UTILISATION D'UN MOVE
@@ -747,22 +1224,15 @@ class Battle(models.Model):
     def use_move(self, attacker, defender, move):
         """Utilise une capacité avec tous ses effets spéciaux."""
 
-        # ── Struggle ─────────────────────────────────────────────────────────
-        if move.name == "Struggle":
-            move_instance, _ = PokemonMoveInstance.objects.get_or_create(
-                pokemon=attacker, move=move, defaults={'current_pp': 99999}
-            )
-        else:
-            try:
-                move_instance = PokemonMoveInstance.objects.get(pokemon=attacker, move=move)
-            except PokemonMoveInstance.DoesNotExist:
-                self.add_to_log(f"{attacker} ne connaît pas {move.name} !")
-                return
+        move_instance = self._get_move_instance(attacker, move)
+        if move_instance is None:
+            self.add_to_log(f"{attacker} ne connaît pas {move.name} !")
+            return
 
         if not move_instance.can_use():
             self.add_to_log(f"{attacker} n'a plus de PP pour {move.name} !")
             # Utiliser Struggle
-            struggle = PokemonMove.objects.filter(name__iexact='Struggle').first()
+            struggle = get_move_catalogue().struggle
             if struggle:
                 self.use_move(attacker, defender, struggle)
             return
@@ -774,21 +1244,18 @@ class Battle(models.Model):
 
         # ── Encore : forcer le move encored ──────────────────────────────────
         pst_attacker = self._pstate(attacker)
-        encore_turns = pst_attacker.get('encore_turns', 0)
+        encore_turns = pst_attacker.encore_turns
         if encore_turns > 0:
-            encored_name = pst_attacker.get('encore_move')
+            encored_name = pst_attacker.encore_move
             if encored_name and move.name != encored_name:
-                try:
-                    move = PokemonMove.objects.get(name=encored_name)
-                    move_instance = PokemonMoveInstance.objects.get(
-                        pokemon=attacker, move=move
-                    )
+                encored = get_move_catalogue().by_name(encored_name)
+                encored_instance = self._get_move_instance(attacker, encored) if encored else None
+                if encored_instance is not None:
+                    move, move_instance = encored, encored_instance
                     self.add_to_log(f"{attacker} est forcé d'utiliser {move.name} (Encore) !")
-                except (PokemonMove.DoesNotExist, PokemonMoveInstance.DoesNotExist):
-                    pass
 
         # ── Raillerie (Taunt) : interdit les moves de statut ─────────────────
-        if pst_attacker.get('taunt_turns', 0) > 0:
+        if pst_attacker.taunt_turns > 0:
             if not move.power or move.power == 0:
                 self.add_to_log(
                     f"{attacker} est raillé et ne peut pas utiliser {move.name} !"
@@ -796,8 +1263,8 @@ class Battle(models.Model):
                 return
 
         # ── Tourment (Torment) : interdit de répéter le même move ────────────
-        if pst_attacker.get('torment'):
-            last = pst_attacker.get('last_move_used')
+        if pst_attacker.torment:
+            last = pst_attacker.last_move_used
             if last and last == move.name:
                 self.add_to_log(
                     f"{attacker} est sous Tourment et ne peut pas répéter {move.name} !"
@@ -855,12 +1322,12 @@ class Battle(models.Model):
             return
 
         # ── Effets de statut qui bloquent l'action ────────────────────────────
-        if attacker.status_condition == 'paralysis' and random.random() < 0.25:
+        if attacker.status_condition == 'paralysis' and self.rng.random() < 0.25:
             self.add_to_log(f"{attacker} est paralysé et ne peut pas attaquer !")
             return
 
         if attacker.status_condition == 'freeze':
-            if random.random() < 0.8:
+            if self.rng.random() < 0.8:
                 self.add_to_log(f"{attacker} est gelé et ne peut pas attaquer !")
                 return
             else:
@@ -890,14 +1357,10 @@ class Battle(models.Model):
 
         # ── Rampage forcé ─────────────────────────────────────────────────────
         if self.is_rampaging(attacker):
-            rampage_move_name = self._pstate(attacker).get('rampage_move')
+            rampage_move_name = self._pstate(attacker).rampage_move
             if rampage_move_name and move.name != rampage_move_name:
                 # Forcer le move du rampage
-                try:
-                    forced = PokemonMove.objects.get(name=rampage_move_name)
-                    move   = forced
-                except PokemonMove.DoesNotExist:
-                    pass
+                move = get_move_catalogue().by_name(rampage_move_name) or move
 
         # ── Flinch ────────────────────────────────────────────────────────────
         if self.check_and_clear_flinch(attacker):
@@ -917,21 +1380,23 @@ class Battle(models.Model):
         # ── Consommation des PP ───────────────────────────────────────────────
         move_instance.use()
         self.add_to_log(f"{attacker} utilise {move.name} !")
+        self.emit('move', side=self.side_of(attacker), move=move.name,
+                  type=move.type.name if move.type_id else '', category=move.category)
 
         # ── Tracker le dernier move utilisé (pour Encore / Tourment) ─────────
-        self._pstate(attacker)['last_move_used'] = move.name
+        self._pstate(attacker).last_move_used = move.name
         if encore_turns > 0:
-            self._pstate(attacker)['encore_turns'] = encore_turns - 1
-            if self._pstate(attacker)['encore_turns'] == 0:
-                self._pstate(attacker).pop('encore_move', None)
+            self._pstate(attacker).encore_turns = encore_turns - 1
+            if self._pstate(attacker).encore_turns == 0:
+                self._pstate(attacker).encore_move = None
                 self.add_to_log(f"{attacker} n'est plus sous l'effet d'Encore !")
         self._save_state()
 
         # ── Métronome ─────────────────────────────────────────────────────────
         if move.effect == 'metronome' or move.effect == 'random_move':
-            all_moves = list(PokemonMove.objects.exclude(name__in=['Metronome', 'Struggle']))
+            all_moves = get_move_catalogue().metronome_pool
             if all_moves:
-                move = random.choice(all_moves)
+                move = self.rng.choice(all_moves)
                 self.add_to_log(f"Métronome choisit {move.name} !")
                 self._apply_move_effect(attacker, defender, move, move_instance)
             return
@@ -948,7 +1413,7 @@ class Battle(models.Model):
             acc_mod  = attacker.get_stat_multiplier(attacker.accuracy_stage)
             eva_mod  = attacker.get_stat_multiplier(-defender.evasion_stage)
             hit_pct  = accuracy * acc_mod * eva_mod
-            if random.randint(1, 100) > hit_pct:
+            if self.rng.randint(1, 100) > hit_pct:
                 self.add_to_log(f"L'attaque a raté !")
                 # Crash (High Jump Kick…)
                 if move.effect in ('crash', 'high_jump_kick'):
@@ -961,388 +1426,63 @@ class Battle(models.Model):
         # ── Appliquer l'effet du move ─────────────────────────────────────────
         self._apply_move_effect(attacker, defender, move, move_instance)
 
+    def _get_move_instance(self, pokemon, move):
+        """
+        PokemonMoveInstance de (pokemon, move), ou None si le move n'est pas connu.
+
+        Dans une TurnSession, l'instance chargée en début de tour est réutilisée
+        (ses PP ne sont écrits qu'au commit).  Struggle (catalogue des
+        capacités) n'a qu'une instance en mémoire, jamais écrite en base.
+        """
+        session = self._turn_session
+        if session is not None:
+            move_instance = session.get_move_instance(pokemon, move)
+            if move_instance is not None:
+                return move_instance
+
+        if move.name == "Struggle":
+            move_instance = PokemonMoveInstance(
+                pokemon=pokemon, move=get_move_catalogue().struggle or move, current_pp=99999
+            )
+            move_instance.is_ephemeral = True
+        elif (session is not None and not session.persist) or pokemon.is_ephemeral:
+            # Simulation ou Pokémon sauvage éphémère : seules les instances
+            # en mémoire existent
+            return None
+        else:
+            try:
+                move_instance = PokemonMoveInstance.objects.get(pokemon=pokemon, move=move)
+            except PokemonMoveInstance.DoesNotExist:
+                return None
+
+        if session is not None:
+            session.register_move_instance(move_instance)
+        return move_instance
+
     # =========================================================================
     # DISPATCH DES EFFETS
     # =========================================================================
 
     def _apply_move_effect(self, attacker, defender, move, move_instance=None):
-        """Dispatcher central : délègue à EFFECT_REGISTRY, puis gère les effets de dégâts."""
-
-        effect = move.effect or ''
+        """
+        Dispatcher central : exécute la chaîne de handlers résolue pour le move
+        (MoveEffects.resolve_move_effect, mise en cache sur PokemonMove) jusqu'au
+        premier qui traite entièrement l'effet.
 
-        # ═════════════════════════════════════════════════════════════════════
-        # 1. REGISTRE — effets purs et pré-traitements (protect, météo, etc.)
-        # ═════════════════════════════════════════════════════════════════════
-        handler = EFFECT_REGISTRY.get(effect)
-        if handler is not None:
-            # Pour les StatBoostEffect : ne s'applique qu'en move pur (power==0)
-            from .MoveEffects import StatBoostEffect
-            if isinstance(handler, StatBoostEffect) and (move.power or 0) > 0:
-                pass   # Effet secondaire → géré plus bas avec effect_chance
-            else:
+        Sous une vue profilée, chaque handler est compté et chronométré
+        (phases 'effect:<Classe>').
+        """
+        profile = current_profile()
+        for handler in move.effect_chain:
+            if profile is None:
                 handled = handler.apply(self, attacker, defender, move)
-                if handled:
-                    return
-                # handled=False → pré-traitement fait (break_barrier…), on continue
-
-        # ═════════════════════════════════════════════════════════════════════
-        # 2. EFFETS DE DÉGÂTS SPÉCIAUX
-        # ═════════════════════════════════════════════════════════════════════
-
-        # ─── Superpower (lower_attack_defense sur soi + dégâts) ─────────────
-        if effect == 'lower_attack_defense' and (move.power or 0) > 0:
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            self.modify_stat(attacker, 'attack', -1)
-            self.modify_stat(attacker, 'defense', -1)
-            return
-
-        # ─── Close Combat (lower_defense_special_defense + dégâts) ──────────
-        if effect == 'lower_defense_special_defense' and (move.power or 0) > 0:
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            self.modify_stat(attacker, 'defense', -1)
-            self.modify_stat(attacker, 'special_defense', -1)
-            return
-
-        # ─── OHKO (Fissure, Guillotine, Horn Drill) ──────────────────────────
-        if effect == 'ohko':
-            if attacker.level < defender.level:
-                self.add_to_log("L'attaque a raté !")
-                return
-            ohko_acc = 30 + (attacker.level - defender.level)
-            if random.randint(1, 100) <= ohko_acc:
-                defender.current_hp = 0
-                defender.save()
-                self.add_to_log("Victoire par KO instantané !")
             else:
-                self.add_to_log("L'attaque a raté !")
-            return
-
-        # ─── Dégâts fixes ────────────────────────────────────────────────────
-        if effect == 'fixed_damage_20':
-            self._apply_fixed_damage(defender, 20)
-            return
-
-        if effect == 'fixed_40':
-            self._apply_fixed_damage(defender, 40)
-            return
-
-        if effect == 'level_damage':
-            self._apply_fixed_damage(defender, attacker.level)
-            return
-
-        if effect == 'half_hp':
-            self._apply_fixed_damage(defender, max(1, defender.current_hp // 2))
-            return
-
-        # ─── Puissance variable (Eruption, Magnitude) ────────────────────────
-        if effect == 'more_damage_if_hp':
-            power  = max(1, int(move.power * attacker.current_hp / attacker.max_hp))
-            damage = self._calculate_damage_with_power(attacker, defender, move, power)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            return
-
-        if effect == 'random_power':
-            magnitudes = [
-                (10, 4), (20, 8), (30, 14), (50, 19), (70, 24),
-                (90, 29), (110, 34), (150, 39), (80, 44), (120, 49),
-            ]
-            r = random.randint(0, 50)
-            power, mag_level = 70, 7
-            for idx, (p, threshold) in enumerate(magnitudes, 1):
-                if r <= threshold:
-                    power, mag_level = p, idx
-                    break
-            self.add_to_log(f"Magnitude {mag_level} !")
-            damage = self._calculate_damage_with_power(attacker, defender, move, power)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            return
-
-        # ─── Prescience (Future Sight) ───────────────────────────────────────
-        if effect == 'future_sight':
-            damage = self.calculate_damage(attacker, defender, move)
-            self.set_future_sight(defender, damage)
-            self.add_to_log(f"{attacker} prédit l'avenir…")
-            return
-
-        # ─── Tri-Attaque ──────────────────────────────────────────────────────
-        if effect == 'tri_attack':
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            if not defender.is_fainted() and random.randint(1, 100) <= 20:
-                status = random.choice(['paralysis', 'burn', 'freeze'])
-                if self._try_apply_status(defender, status, attacker):
-                    self.add_to_log(f"{defender} est {status} !")
-            return
-
-        # ─── Drain (Absorb, Giga Drain, Drain Punch…) ───────────────────────
-        if effect == 'drain':
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            if damage > 0:
-                healed = max(1, damage // 2)
-                attacker.current_hp = min(attacker.max_hp, attacker.current_hp + healed)
-                attacker.save()
-                self.add_to_log(f"{attacker} récupère {healed} PV !")
-            return
-
-        if effect == 'drain_sleep':   # Dream Eater
-            if defender.status_condition != 'sleep':
-                self.add_to_log(f"{defender} ne dort pas !")
+                start   = time.perf_counter()
+                handled = handler.apply(self, attacker, defender, move)
+                profile.add_phase(f'effect:{type(handler).__name__}',
+                                  (time.perf_counter() - start) * 1000)
+            if handled:
                 return
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            if damage > 0:
-                healed = max(1, damage // 2)
-                attacker.current_hp = min(attacker.max_hp, attacker.current_hp + healed)
-                attacker.save()
-                self.add_to_log(f"{attacker} récupère {healed} PV !")
-            return
-
-        # ─── Recoil (Double-Edge, Flare Blitz…) ─────────────────────────────
-        if effect == 'recoil':
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            if damage > 0:
-                attk_ability = self._get_ability(attacker)
-                rock_head = (
-                    attk_ability and
-                    attk_ability.effect_tag in ('rock_head', 'magic_guard')
-                )
-                if not rock_head:
-                    recoil = max(1, damage // 3)
-                    attacker.current_hp = max(0, attacker.current_hp - recoil)
-                    attacker.save()
-                    self.add_to_log(
-                        f"{attacker} est blessé par le contrecoup ! (-{recoil} PV)"
-                    )
-            return
-
-        # ─── Self-Destruct / Explosion ────────────────────────────────────────
-        if effect in ('faint_user', 'self_destruct'):
-            if effect == 'self_destruct':
-                orig_def = defender.defense
-                defender.defense = max(1, defender.defense // 2)
-                damage = self.calculate_damage(attacker, defender, move)
-                defender.defense = orig_def
-            else:
-                damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            attacker.current_hp = 0
-            attacker.save()
-            self.add_to_log(f"{attacker} s'est sacrifié !")
-            return
-
-        # ─── Rampage (Outrage, Thrash, Petal Dance) ──────────────────────────
-        if effect in ('rampage', 'confusion_after'):
-            if not self.is_rampaging(attacker):
-                self.set_rampage(attacker, move.name)
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            self.tick_rampage(attacker)
-            return
-
-        # ─── Rollout ──────────────────────────────────────────────────────────
-        if effect == 'rollout':
-            count  = self.get_rollout_count(attacker)
-            power  = move.power * (2 ** count)
-            damage = self._calculate_damage_with_power(attacker, defender, move, power)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            if not defender.is_fainted():
-                self.increment_rollout(attacker)
-                if count >= 4:
-                    self.reset_rollout(attacker)
-            else:
-                self.reset_rollout(attacker)
-            return
-
-        # ─── Multi-hit ────────────────────────────────────────────────────────
-        if effect == 'multi_hit':
-            r = random.random()
-            if   r < 0.35: hits = 2
-            elif r < 0.70: hits = 3
-            elif r < 0.85: hits = 4
-            else:           hits = 5
-            total = 0
-            for _ in range(hits):
-                if defender.is_fainted():
-                    break
-                dmg = self.calculate_damage(attacker, defender, move)
-                defender.current_hp = max(0, defender.current_hp - dmg)
-                total += dmg
-            defender.save()
-            self.add_to_log(f"Touche {hits} fois pour {total} dégâts totaux !")
-            return
-
-        if effect == 'two_hit':    # Double Kick, Twineedle
-            total = 0
-            for _ in range(2):
-                if defender.is_fainted():
-                    break
-                dmg = self.calculate_damage(attacker, defender, move)
-                defender.current_hp = max(0, defender.current_hp - dmg)
-                total += dmg
-            defender.save()
-            self.add_to_log(f"Touche 2 fois pour {total} dégâts !")
-            if (move.inflicts_status and
-                    random.randint(1, 100) <= move.effect_chance):
-                if self._try_apply_status(defender, move.inflicts_status, attacker):
-                    self.add_to_log(f"{defender} est {move.inflicts_status} !")
-            return
-
-        # ─── Trap ────────────────────────────────────────────────────────────
-        if effect == 'trap':
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            if not self.is_trapped(defender):
-                self.trap_pokemon(defender, move.name)
-                self.add_to_log(f"{defender} est pris au piège !")
-            return
-
-        # ─── Recharge (Hyper Beam, Giga Impact…) ────────────────────────────
-        if effect == 'recharge':
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            self.set_recharge(attacker)
-            self.add_to_log(f"{attacker} doit se recharger au prochain tour !")
-            return
-
-        # ─── Smelling Salts (double si paralysé) ────────────────────────────
-        if effect == 'double_if_paralyzed':
-            power  = move.power * (2 if defender.status_condition == 'paralysis' else 1)
-            damage = self._calculate_damage_with_power(attacker, defender, move, power)
-            if defender.status_condition == 'paralysis':
-                defender.status_condition = None
-                defender.save()
-                self.add_to_log(f"{defender} est guéri de sa paralysie !")
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            return
-
-        # ─── Façade (double si statut) ───────────────────────────────────────
-        if effect == 'double_power_if_statused':
-            power  = move.power * (2 if attacker.status_condition else 1)
-            damage = self._calculate_damage_with_power(attacker, defender, move, power)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            return
-
-        # ─── Assurance / Revanche ────────────────────────────────────────────
-        if effect in ('double_if_hit', 'double_power_if_hit'):
-            was_hit = self._pstate(attacker).get('was_hit_this_turn', False)
-            power   = move.power * (2 if was_hit else 1)
-            damage  = self._calculate_damage_with_power(attacker, defender, move, power)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            return
-
-        # ─── Poison sévère (Toxic pur ou secondaire comme Poison Fang) ───────
-        if effect == 'badly_poison':
-            if (move.power or 0) == 0:
-                if random.randint(1, 100) <= (move.effect_chance or 100):
-                    if not defender.status_condition:
-                        defender.status_condition = 'poison'
-                        defender.save()
-                        self.set_badly_poisoned(defender)
-                        self.add_to_log(f"{defender} est gravement empoisonné !")
-            else:
-                damage = self.calculate_damage(attacker, defender, move)
-                self._apply_damage_to_defender(attacker, defender, move, damage)
-                if (not defender.is_fainted() and
-                        random.randint(1, 100) <= (move.effect_chance or 100) and
-                        not defender.status_condition):
-                    defender.status_condition = 'poison'
-                    defender.save()
-                    self.set_badly_poisoned(defender)
-                    self.add_to_log(f"{defender} est gravement empoisonné !")
-            return
-
-        # ─── Knock Off ────────────────────────────────────────────────────────
-        if effect == 'remove_item':
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            if getattr(defender, 'held_item', None):
-                item_name = defender.held_item.name
-                defender.held_item = None
-                defender.save()
-                self.add_to_log(f"{defender} perd son {item_name} !")
-            return
-
-        # ─── Struggle ─────────────────────────────────────────────────────────
-        if move.name == 'Struggle':
-            damage = self.calculate_damage(attacker, defender, move)
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-            recoil = max(1, attacker.max_hp // 4)
-            attacker.current_hp = max(0, attacker.current_hp - recoil)
-            attacker.save()
-            self.add_to_log(f"{attacker} souffre du contrecoup ! (-{recoil} PV)")
-            return
-
-        # ═════════════════════════════════════════════════════════════════════
-        # 3. ATTAQUE GÉNÉRIQUE (power > 0) + effets secondaires
-        # ═════════════════════════════════════════════════════════════════════
-        if (move.power or 0) > 0:
-            damage = self.calculate_damage(attacker, defender, move)
-
-            # Modificateurs météo
-            if self.weather == 'sunny':
-                if hasattr(move.type, 'name'):
-                    if move.type.name == 'fire':    damage = int(damage * 1.5)
-                    elif move.type.name == 'water': damage = int(damage * 0.5)
-            elif self.weather == 'rain':
-                if hasattr(move.type, 'name'):
-                    if move.type.name == 'water':   damage = int(damage * 1.5)
-                    elif move.type.name == 'fire':  damage = int(damage * 0.5)
-
-            self._apply_damage_to_defender(attacker, defender, move, damage)
-
-            if not defender.is_fainted():
-                sheer_force  = self._pstate(attacker).get('sheer_force_active', False)
-                serene_grace = self._pstate(attacker).get('serene_grace_active', False)
-
-                if not sheer_force:
-                    # Statut secondaire
-                    if move.inflicts_status:
-                        eff_chance = (move.effect_chance or 0) * (2 if serene_grace else 1)
-                        if random.randint(1, 100) <= eff_chance:
-                            if self._try_apply_status(
-                                defender, move.inflicts_status, attacker
-                            ):
-                                self.add_to_log(f"{defender} est {move.inflicts_status} !")
-
-                    # Flinch secondaire
-                    if effect == 'flinch':
-                        flinch_chance = (move.effect_chance or 0) * (2 if serene_grace else 1)
-                        if random.randint(1, 100) <= flinch_chance:
-                            def_ability = self._get_ability(defender)
-                            if not (def_ability and
-                                    def_ability.effect_tag == 'inner_focus'):
-                                self.set_flinched(defender)
-
-                    # Effets de stat secondaires (via move.stat_changes JSON)
-                    if move.stat_changes:
-                        for stat, change in move.stat_changes.items():
-                            self.modify_stat(
-                                attacker if change > 0 else defender, stat, change
-                            )
-
-                    # Effets de stat secondaires via le champ effect
-                    if effect in SECONDARY_STAT_EFFECTS:
-                        for stat_name, stages, who in SECONDARY_STAT_EFFECTS[effect]:
-                            chance = (move.effect_chance or 0) * (2 if serene_grace else 1)
-                            if random.randint(1, 100) <= chance:
-                                target = attacker if who == 'self' else defender
-                                self.modify_stat(target, stat_name, stages)
-
-        else:
-            # ── Move de statut sans handler reconnu (fallback) ────────────────
-            if move.inflicts_status:
-                if random.randint(1, 100) <= (move.effect_chance or 100):
-                    if self._try_apply_status(defender, move.inflicts_status, attacker):
-                        self.add_to_log(f"{defender} est {move.inflicts_status} !")
-            if move.stat_changes:
-                for stat, change in move.stat_changes.items():
-                    self.modify_stat(
-                        attacker if change > 0 else defender, stat, change
-                    )
 
     # =========================================================================
     # HELPERS DÉGÂTS
@@ -1358,23 +1498,27 @@ class Battle(models.Model):
     def _apply_damage_to_defender(self, attacker, defender, move, damage):
         """Applique les dégâts au défenseur avec gestion Substitut, Endure, talent et efficacité."""
         if damage <= 0:
-            damage = 1 if (move.power or 0) > 0 else 0
-        if damage == 0:
-            return
+            if (move.power or 0) <= 0:
+                return
+            # Immunité de type (Normal → Spectre, Sol → Vol…) : pas de dégât minimum
+            if self.get_type_effectiveness(move.type, defender) == 0:
+                self.add_to_log("Ça n'a aucun effet !")
+                return
+            damage = 1
 
         # ── Substitut : encaisse les dégâts à la place du Pokémon ───────────
-        sub_hp = self._pstate(defender).get('substitute_hp', 0)
+        sub_hp = self._pstate(defender).substitute_hp
         if sub_hp > 0:
             remaining = sub_hp - damage
             if remaining <= 0:
-                self._pstate(defender)['substitute_hp'] = 0
+                self._pstate(defender).substitute_hp = 0
                 self._save_state()
                 self.add_to_log(
                     f"Le Substitut de {defender} est détruit ! "
                     f"({damage} dégâts absorbés)"
                 )
             else:
-                self._pstate(defender)['substitute_hp'] = remaining
+                self._pstate(defender).substitute_hp = remaining
                 self._save_state()
                 self.add_to_log(
                     f"Le Substitut de {defender} absorbe {damage} dégâts ! "
@@ -1384,8 +1528,8 @@ class Battle(models.Model):
             return
 
         # ── Ability: on_damage_taken (pré-dégâts) ────────────────────────────
-        ignore_ability = self._pstate(attacker).get('ignore_opponent_ability', False)
-        def_ability    = self._get_ability(defender) if not ignore_ability else None
+        ignore_ability = self._pstate(attacker).ignore_opponent_ability
+        def_ability    = self._get_ability(defender, 'on_damage_taken') if not ignore_ability else None
         ab_result      = None
 
         if def_ability:
@@ -1403,7 +1547,7 @@ class Battle(models.Model):
                             defender.save()
                             self.add_to_log(f"{defender} récupère {healed} PV !")
                     if ab_result.get('boost_fire'):
-                        self._pstate(defender)['flash_fire_active'] = True
+                        self._pstate(defender).flash_fire_active = True
                         self._save_state()
                     return  # dégâts bloqués
 
@@ -1459,7 +1603,7 @@ class Battle(models.Model):
             self.add_to_log("Ça n'a aucun effet !")
 
         # ── Marquer que le défenseur a été touché ce tour ───────────────────
-        self._pstate(defender)['was_hit_this_turn'] = True
+        self._pstate(defender).was_hit_this_turn = True
         self._save_state()
 
         # ── Ability: effets de contact post-dégâts ───────────────────────────
@@ -1494,15 +1638,48 @@ class Battle(models.Model):
     # CALCUL DE DÉGÂTS
     # =========================================================================
 
+    @profile_phase('calculate_damage')
     def calculate_damage(self, attacker, defender, move):
+        """Calcule les dégâts d'une attaque et applique les événements déclenchés."""
+        return self.apply_damage_result(
+            attacker, defender, self.compute_damage(attacker, defender, move)
+        )
+
+    def apply_damage_result(self, attacker, defender, result):
+        """
+        Applique les événements d'un DamageResult : log, drapeaux de talent
+        (en mémoire, persistés avec le tour) et objet consommé.
+        """
+        for message in result.messages:
+            self.add_to_log(message)
+        self.last_effectiveness = result.effectiveness  # pour Tinted Lens / Filter
+        if result.ability_flags is not None:
+            pst = self._pstate(attacker)
+            pst.sheer_force_active      = result.ability_flags['sheer_force_active']
+            pst.serene_grace_active     = result.ability_flags['serene_grace_active']
+            pst.ignore_opponent_ability = result.ability_flags['ignore_opponent_ability']
+        if result.consumed_item:
+            self._consume_held_item(defender)
+        if result.damage:
+            self.emit('damage', side=self.side_of(defender), damage=result.damage,
+                      critical=result.critical, effectiveness=result.effectiveness)
+        return result.damage
+
+    def compute_damage(self, attacker, defender, move):
         """
-        Calcule les dégâts d'une attaque.
+        Calcule les dégâts d'une attaque, sans effet de bord → DamageResult.
 
         Formule Gen 3+ :
             damage = floor( floor( floor(2*L/5 + 2) * Power * A/D ) / 50 + 2 )
                      × STAB × type_eff × crit × random × burn × screen
+
+        Seuls les tirages RNG du coup (critique, aléa, talents) sont consommés ;
+        les messages, drapeaux de talent et l'objet consommé sont portés par le
+        résultat (voir apply_damage_result).
         """
-        level = attacker.level
+        result = DamageResult(damage=0)
+        log    = result.messages.append
+        level  = attacker.level
 
         if move.category == 'physical':
             attack_stat  = attacker.get_effective_attack()
@@ -1513,7 +1690,7 @@ class Battle(models.Model):
 
         # ── Ability: modify_stat (Guts, Huge Power, Swift Swim, Marvel Scale…) ──
         attk_ability = self._get_ability(attacker)
-        if attk_ability:
+        if attk_ability and attk_ability.has_hook('modify_stat'):
             stat_name = 'attack' if move.category == 'physical' else 'special_attack'
             atk_mult  = attk_ability.modify_stat(stat_name, attacker, self)
             if atk_mult != 1.0:
@@ -1521,10 +1698,11 @@ class Battle(models.Model):
 
         def_ability = self._get_ability(defender)
         if def_ability:
-            stat_name = 'defense' if move.category == 'physical' else 'special_defense'
-            def_mult  = def_ability.modify_stat(stat_name, defender, self)
-            if def_mult != 1.0:
-                defense_stat = int(defense_stat * def_mult)
+            if def_ability.has_hook('modify_stat'):
+                stat_name = 'defense' if move.category == 'physical' else 'special_defense'
+                def_mult  = def_ability.modify_stat(stat_name, defender, self)
+                if def_mult != 1.0:
+                    defense_stat = int(defense_stat * def_mult)
             # Marvel Scale: boost défense si statut
             if def_ability.effect_tag == 'marvel_scale' and defender.status_condition:
                 defense_stat = int(defense_stat * 1.5)
@@ -1540,21 +1718,22 @@ class Battle(models.Model):
         double_eff_ch   = False
 
         if attk_ability:
-            atk_result = attk_ability.on_attack(self, attacker, move, move.power)
+            atk_result = (attk_ability.on_attack(self, attacker, move, move.power)
+                          if attk_ability.has_hook('on_attack') else None)
             if atk_result:
                 if atk_result.get('message'):
-                    self.add_to_log(atk_result['message'])
+                    log(atk_result['message'])
                 power_mult      = atk_result.get('power_multiplier', 1.0)
                 stab_override   = atk_result.get('stab_override')
                 ignore_opp_ab   = atk_result.get('ignore_opponent_ability', False)
                 suppress_second = atk_result.get('suppress_secondary_effect', False)
                 double_eff_ch   = atk_result.get('double_effect_chance', False)
-                # Store flags for _apply_move_effect
-                pst = self._pstate(attacker)
-                pst['sheer_force_active']     = suppress_second
-                pst['serene_grace_active']    = double_eff_ch
-                pst['ignore_opponent_ability'] = ignore_opp_ab
-                self._save_state()
+            # Drapeaux lus par _apply_move_effect (remis à zéro à chaque coup)
+            result.ability_flags = {
+                'sheer_force_active':      suppress_second,
+                'serene_grace_active':     double_eff_ch,
+                'ignore_opponent_ability': ignore_opp_ab,
+            }
 
         if power_mult != 1.0:
             damage *= power_mult
@@ -1562,9 +1741,9 @@ class Battle(models.Model):
         # ── Flash Fire: boost attaque Feu si actif ────────────────────────────
         if (attk_ability and attk_ability.effect_tag == 'flash_fire' and
                 hasattr(move.type, 'name') and move.type.name == 'fire' and
-                self._pstate(attacker).get('flash_fire_active')):
+                self._pstate(attacker).flash_fire_active):
             damage *= 1.5
-            self.add_to_log(f"Le talent Feu Intérieur de {attacker} enflamme l'attaque !")
+            log(f"Le talent Feu Intérieur de {attacker} enflamme l'attaque !")
 
         # ── Solar Power: boost Atq Spé au soleil ──────────────────────────────
         if (attk_ability and attk_ability.effect_tag == 'solar_power' and
@@ -1584,10 +1763,10 @@ class Battle(models.Model):
         # ── Efficacité des types ───────────────────────────────────────────────
         effectiveness = self.get_type_effectiveness(move.type, defender)
         damage       *= effectiveness
-        self.last_effectiveness = effectiveness  # pour Tinted Lens / Filter
+        result.effectiveness = effectiveness
 
         if effectiveness == 0:
-            return 0
+            return result
 
         # ── Coup critique ─────────────────────────────────────────────────────
         crit_blocked = (def_ability and def_ability.effect_tag in ('shell_armor', 'battle_armor'))
@@ -1600,13 +1779,13 @@ class Battle(models.Model):
             if getattr(move, 'effect', '') == 'always_crit':
                 crit_rate = 1.0
 
-        is_critical = random.random() < crit_rate
-        if is_critical:
+        result.critical = self.rng.random() < crit_rate
+        if result.critical:
             damage *= 1.5
-            self.add_to_log("Coup critique !")
+            log("Coup critique !")
 
         # ── Variation aléatoire 85–100% ────────────────────────────────────────
-        damage *= random.uniform(0.85, 1.0)
+        damage *= self.rng.uniform(0.85, 1.0)
 
         # ── Brûlure : ×0.5 sur physique ───────────────────────────────────────
         if attacker.status_condition == 'burn' and move.category == 'physical':
@@ -1649,32 +1828,28 @@ class Battle(models.Model):
         _def_held = self._get_held_effect(defender)
         if _def_held and move.power:
             _mtype = getattr(move.type, 'name', '').lower() if move.type else ''
-            _eff   = getattr(self, 'last_effectiveness', 1.0)
             _RESIST = {
                 'resist_berry_ice':   'ice',
                 'resist_berry_fight': 'fighting',
             }
-            if _def_held in _RESIST and _mtype == _RESIST[_def_held] and _eff >= 2.0:
+            if _def_held in _RESIST and _mtype == _RESIST[_def_held] and effectiveness >= 2.0:
                 damage *= 0.5
-                self.add_to_log(
-                    f"La {defender.held_item.name} de {defender} atténue le coup !"
-                )
-                self._consume_held_item(defender)
+                log(f"La {defender.held_item.name} de {defender} atténue le coup !")
+                result.consumed_item = True
 
         # ── Plancher à 1 ─────────────────────────────────────────────────────
-        result = int(damage)
-        return max(1, result) if move.power > 0 else 0
+        result.damage = max(1, int(damage)) if move.power > 0 else 0
+        return result
 
     # =========================================================================
     # EFFICACITÉ DES TYPES
     # =========================================================================
 
     def get_type_effectiveness(self, attack_type, defender):
-        effectiveness = 1.0
-        effectiveness *= attack_type.get_effectiveness(defender.species.primary_type)
-        if defender.species.secondary_type:
-            effectiveness *= attack_type.get_effectiveness(defender.species.secondary_type)
-        return effectiveness
+        species = defender.species
+        return get_type_chart().multiplier(
+            attack_type.pk, species.primary_type_id, species.secondary_type_id
+        )
 
     # =========================================================================
     # MODIFICATION DE STATS
@@ -1684,7 +1859,7 @@ class Battle(models.Model):
         # ── Brume : bloque les baisses de stats ──────────────────────────────
         if stages < 0:
             side = 'player' if pokemon == self.player_pokemon else 'opponent'
-            if self._bstate().get(f'{side}_mist', 0) > 0:
+            if self._bstate().side(side).mist > 0:
                 self.add_to_log(
                     f"La Brume protège {pokemon} contre la baisse de {stat_name} !"
                 )
@@ -1713,6 +1888,9 @@ class Battle(models.Model):
         self._fire_switch_out_ability(trainer_pokemon)
 
         # ── Effectuer le changement ─────────────────────────────────────────────
+        new_pokemon = self.adopt(new_pokemon)
+        if self._turn_session is not None:
+            self._turn_session.track(new_pokemon)
         if trainer_pokemon == self.player_pokemon:
             self.player_pokemon = new_pokemon
         else:
@@ -1722,18 +1900,18 @@ class Battle(models.Model):
 
         # ── Dégâts d'entrée (Picots, Toxipics, Roc Furtif) ─────────────────────
         entering_side = 'player' if new_pokemon == self.player_pokemon else 'opponent'
+        hazards       = self._bstate().side(entering_side)
+        used_ids      = hazards.used_ids             # switch volontaire de l'IA compris
+        if new_pokemon.pk not in used_ids:
+            used_ids.append(new_pokemon.pk)
 
         # Roc Furtif (Stealth Rock)
-        if self._bstate().get(f'{entering_side}_stealth_rock'):
-            rock_type_name = 'rock'
-            from .PokemonType import PokemonType
-            rock_type = PokemonType.objects.filter(name__iexact=rock_type_name).first()
-            if rock_type:
-                eff = rock_type.get_effectiveness(new_pokemon.species.primary_type)
-                if new_pokemon.species.secondary_type:
-                    eff *= rock_type.get_effectiveness(new_pokemon.species.secondary_type)
-            else:
-                eff = 1.0
+        if hazards.stealth_rock:
+            chart   = get_type_chart()
+            species = new_pokemon.species
+            eff = chart.multiplier(
+                chart.type_id('rock'), species.primary_type_id, species.secondary_type_id
+            )
             sr_dmg = max(1, int(new_pokemon.max_hp * eff / 8))
             new_pokemon.current_hp = max(0, new_pokemon.current_hp - sr_dmg)
             new_pokemon.save()
@@ -1742,7 +1920,7 @@ class Battle(models.Model):
             )
 
         # Picots (Spikes) — pas d'effet sur les types Vol ou Lévitation
-        spikes = self._bstate().get(f'{entering_side}_spikes', 0)
+        spikes = hazards.spikes
         if spikes > 0:
             ptype = getattr(new_pokemon.species.primary_type, 'name', '')
             stype = getattr(new_pokemon.species.secondary_type, 'name', '') \
@@ -1758,7 +1936,7 @@ class Battle(models.Model):
                 )
 
         # Toxipics (Toxic Spikes)
-        tspikes = self._bstate().get(f'{entering_side}_toxic_spikes', 0)
+        tspikes = hazards.toxic_spikes
         if tspikes > 0:
             ptype = getattr(new_pokemon.species.primary_type, 'name', '')
             stype = getattr(new_pokemon.species.secondary_type, 'name', '') \
@@ -1784,6 +1962,12 @@ class Battle(models.Model):
     # =========================================================================
 
     def _apply_end_of_turn_effects(self):
+        """Effets de fin de tour, encadrés par leurs événements de flux ('eot' puis PV)."""
+        self.emit('eot')
+        self._end_of_turn_effects()
+        self._emit_state()
+
+    def _end_of_turn_effects(self):
         """Applique tous les effets de fin de tour (météo, statuts, Vampigraine, talents…)."""
         for pkmn in [self.player_pokemon, self.opponent_pokemon]:
             if not pkmn or pkmn.is_fainted():
@@ -1798,7 +1982,7 @@ class Battle(models.Model):
             has_poison_heal = (pkmn_ability and pkmn_ability.effect_tag == 'poison_heal')
             block_poison    = False
 
-            if pkmn_ability:
+            if pkmn_ability and pkmn_ability.has_hook('end_of_turn'):
                 eot_result = pkmn_ability.end_of_turn(self, pkmn)
                 if eot_result:
                     if eot_result.get('message'):
@@ -1830,15 +2014,15 @@ class Battle(models.Model):
 
             # ── Trap ──────────────────────────────────────────────────────────
             pst = self._pstate(pkmn)
-            trap_turns = pst.get('trap_turns', 0)
+            trap_turns = pst.trap_turns
             if trap_turns > 0 and not has_magic_guard:
                 trap_dmg = max(1, pkmn.max_hp // 8)
                 pkmn.current_hp = max(0, pkmn.current_hp - trap_dmg)
                 pkmn.save()
-                self.add_to_log(f"{pkmn} souffre de {pst.get('trap_move', 'Piège')} ! (-{trap_dmg} PV)")
-                pst['trap_turns'] -= 1
-                if pst['trap_turns'] == 0:
-                    pst.pop('trap_move', None)
+                self.add_to_log(f"{pkmn} souffre de {pst.trap_move or 'Piège'} ! (-{trap_dmg} PV)")
+                pst.trap_turns -= 1
+                if pst.trap_turns == 0:
+                    pst.trap_move = None
                     self.add_to_log(f"{pkmn} est libéré du piège !")
                 self._save_state()
 
@@ -1869,37 +2053,37 @@ class Battle(models.Model):
                 self.add_to_log(f"{pkmn} récupère {heal_ingrain} PV grâce à ses racines !")
 
             # ── Disable countdown ─────────────────────────────────────────────
-            dis_turns = pst.get('disable_turns', 0)
+            dis_turns = pst.disable_turns
             if dis_turns > 0:
-                pst['disable_turns'] -= 1
-                if pst['disable_turns'] == 0:
-                    pst.pop('disabled_move_id', None)
+                pst.disable_turns -= 1
+                if pst.disable_turns == 0:
+                    pst.disabled_move_id = None
                     self.add_to_log(f"{pkmn} peut à nouveau utiliser tous ses moves !")
                 self._save_state()
 
             # ── Encore countdown ──────────────────────────────────────────────
-            enc_turns = pst.get('encore_turns', 0)
+            enc_turns = pst.encore_turns
             if enc_turns > 0:
-                pst['encore_turns'] = enc_turns - 1
-                if pst['encore_turns'] == 0:
-                    pst.pop('encore_move', None)
+                pst.encore_turns = enc_turns - 1
+                if pst.encore_turns == 0:
+                    pst.encore_move = None
                     self.add_to_log(f"{pkmn} n'est plus sous l'effet d'Encore !")
                 self._save_state()
 
             # ── Taunt countdown ───────────────────────────────────────────────
-            tnt_turns = pst.get('taunt_turns', 0)
+            tnt_turns = pst.taunt_turns
             if tnt_turns > 0:
-                pst['taunt_turns'] = tnt_turns - 1
-                if pst['taunt_turns'] == 0:
+                pst.taunt_turns = tnt_turns - 1
+                if pst.taunt_turns == 0:
                     self.add_to_log(f"{pkmn} n'est plus sous l'effet de Raillerie !")
                 self._save_state()
 
             # ── Vœu (Wish) ────────────────────────────────────────────────────
-            wish_turns = pst.get('wish_turns', 0)
+            wish_turns = pst.wish_turns
             if wish_turns > 0:
-                pst['wish_turns'] = wish_turns - 1
-                if pst['wish_turns'] == 0:
-                    wish_hp = pst.pop('wish_amount', 0)
+                pst.wish_turns = wish_turns - 1
+                if pst.wish_turns == 0:
+                    wish_hp, pst.wish_amount = pst.wish_amount, 0
                     if wish_hp > 0 and not pkmn.is_fainted():
                         healed = min(pkmn.max_hp - pkmn.current_hp, wish_hp)
                         if healed > 0:
@@ -1911,49 +2095,47 @@ class Battle(models.Model):
                 self._save_state()
 
             # ── Chant du Destin (Perish Song) ─────────────────────────────────
-            perish = pst.get('perish_turns', 0)
+            perish = pst.perish_turns
             if perish > 0:
-                pst['perish_turns'] = perish - 1
+                pst.perish_turns = perish - 1
                 self.add_to_log(
-                    f"Chant du Destin : {pkmn} a encore {pst['perish_turns']} tour(s) !"
+                    f"Chant du Destin : {pkmn} a encore {pst.perish_turns} tour(s) !"
                 )
-                if pst['perish_turns'] == 0:
+                if pst.perish_turns == 0:
                     pkmn.current_hp = 0
                     pkmn.save()
                     self.add_to_log(f"{pkmn} tombe sous l'effet du Chant du Destin !")
                 self._save_state()
 
             # ── Décranement screens ───────────────────────────────────────────
-            side = 'player' if pkmn == self.player_pokemon else 'opponent'
+            side       = 'player' if pkmn == self.player_pokemon else 'opponent'
+            side_state = self._bstate().side(side)
             for screen in ('light_screen', 'reflect'):
-                key = f'{side}_{screen}'
-                if self._bstate().get(key, 0) > 0:
-                    self._bstate()[key] -= 1
-                    if self._bstate()[key] == 0:
+                if side_state[screen] > 0:
+                    side_state[screen] -= 1
+                    if side_state[screen] == 0:
                         self.add_to_log(
                             f"L'{'Écran Lumière' if screen == 'light_screen' else 'Mur'} "
                             f"se dissipe !"
                         )
             # ── Brume countdown ───────────────────────────────────────────────
-            mist_key = f'{side}_mist'
-            if self._bstate().get(mist_key, 0) > 0:
-                self._bstate()[mist_key] -= 1
-                if self._bstate()[mist_key] == 0:
+            if side_state.mist > 0:
+                side_state.mist -= 1
+                if side_state.mist == 0:
                     self.add_to_log(f"La Brume se dissipe du côté de {pkmn} !")
             # ── Vent Arrière countdown ────────────────────────────────────────
-            tw_key = f'{side}_tailwind'
-            if self._bstate().get(tw_key, 0) > 0:
-                self._bstate()[tw_key] -= 1
-                if self._bstate()[tw_key] == 0:
+            if side_state.tailwind > 0:
+                side_state.tailwind -= 1
+                if side_state.tailwind == 0:
                     self.add_to_log(f"Le Vent Arrière retombe du côté de {pkmn} !")
             self._save_state()
 
             # ── Future Sight ──────────────────────────────────────────────────
-            fs_turns = pst.get('future_sight_turns', 0)
+            fs_turns = pst.future_sight_turns
             if fs_turns > 0:
-                pst['future_sight_turns'] -= 1
-                if pst['future_sight_turns'] == 0:
-                    fs_dmg = pst.pop('future_sight_damage', 0)
+                pst.future_sight_turns -= 1
+                if pst.future_sight_turns == 0:
+                    fs_dmg, pst.future_sight_damage = pst.future_sight_damage, 0
                     if fs_dmg > 0:
                         pkmn.current_hp = max(0, pkmn.current_hp - fs_dmg)
                         pkmn.save()
@@ -1961,7 +2143,7 @@ class Battle(models.Model):
                 self._save_state()
 
             # ── Réinitialiser was_hit_this_turn ───────────────────────────────
-            pst.pop('was_hit_this_turn', None)
+            pst.was_hit_this_turn = False
             self._save_state()
 
         # ── Held items — effets de fin de tour ───────────────────────────────
@@ -2032,7 +2214,7 @@ class Battle(models.Model):
 
             # Casque Rocheux : 1/6 PV max en retour si touché ce tour
             elif _held == 'rocky_helmet':
-                if self._pstate(_pk).get('was_hit_this_turn') and _opp and not _opp.is_fainted():
+                if self._pstate(_pk).was_hit_this_turn and _opp and not _opp.is_fainted():
                     _d = max(1, _opp.max_hp // 6)
                     _opp.current_hp = max(0, _opp.current_hp - _d)
                     _opp.save(update_fields=['current_hp'])
@@ -2043,8 +2225,8 @@ class Battle(models.Model):
         # ── Météo ─────────────────────────────────────────────────────────────
         weather_turns = self.get_weather_turns()
         if self.weather and weather_turns > 0:
-            self._bstate()['weather_turns'] = weather_turns - 1
-            remaining = self._bstate()['weather_turns']
+            self._bstate().weather_turns = weather_turns - 1
+            remaining = self._bstate().weather_turns
 
             if self.weather == 'sandstorm':
                 for pkmn in [self.player_pokemon, self.opponent_pokemon]:
@@ -2085,10 +2267,10 @@ class Battle(models.Model):
             self.save()
 
         # ── Salle Bizarre countdown ────────────────────────────────────────────
-        tr = self._bstate().get('trick_room_turns', 0)
+        tr = self._bstate().trick_room_turns
         if tr > 0:
-            self._bstate()['trick_room_turns'] = tr - 1
-            if self._bstate()['trick_room_turns'] == 0:
+            self._bstate().trick_room_turns = tr - 1
+            if self._bstate().trick_room_turns == 0:
                 self.add_to_log("La Salle Bizarre retrouve son état normal !")
             self._save_state()
 
@@ -2109,7 +2291,7 @@ class Battle(models.Model):
             player_speed   = self.player_pokemon.get_effective_speed()
             opponent_speed = self.opponent_pokemon.get_effective_speed()
             odds = (player_speed * 32) / max(1, opponent_speed % 256) + 30 * self.current_turn
-            if random.randint(0, 255) < odds:
+            if self.rng.randint(0, 255) < odds:
                 self.add_to_log("Fuite réussie !")
                 self.is_active = False
                 self.save()
@@ -2140,7 +2322,8 @@ class Battle(models.Model):
     # IA ADVERSAIRE
     # =========================================================================
 
-    def choose_enemy_move(self, attacker, defender):
+    @profile_phase('choose_enemy_move')
+    def choose_enemy_move(self, attacker, defender, ai_flags=None):
         """
         Sélectionne le move de l'ennemi via le système de scoring Gen 4 (pokeplatinum).
 
@@ -2150,13 +2333,16 @@ class Battle(models.Model):
           - Les flags se cumulent entre eux
           - En cas d'égalité, choix aléatoire parmi les ex-aequo
           - Les flags sont lus depuis opponent_trainer.get_ai_flags()
-            (défaut : basic + evaluate_attack pour NPC, + expert pour GymLeader/boss)
+            (défaut : basic + evaluate_attack pour NPC, + expert pour GymLeader/boss),
+            sauf si ai_flags est fourni (simulateur : IA des deux côtés)
+          - Flag 'lookahead' : recherche expectimax (services/ai_lookahead.py),
+            peut renvoyer un switch {'type': 'switch', 'pokemon': ...}
         """
-        from .PlayablePokemon import PokemonMoveInstance
-
-        move_instances = PokemonMoveInstance.objects.filter(
-            pokemon=attacker, current_pp__gt=0
-        ).select_related('move', 'move__type')
+        if self._turn_session is not None:
+            move_instances = [mi for mi in self._turn_session.move_instances(attacker)
+                              if mi.current_pp > 0]
+        else:
+            move_instances = [mi for mi in attacker.move_instances() if mi.current_pp > 0]
 
         available_moves = [
             mi.move for mi in move_instances
@@ -2164,17 +2350,20 @@ class Battle(models.Model):
         ]
 
         if not available_moves:
-            struggle = PokemonMove.objects.filter(name__iexact='Struggle').first()
+            struggle = get_move_catalogue().struggle
             if struggle:
                 return {'type': 'attack', 'move': struggle}
             return None
 
         # Récupérer les flags IA du dresseur adverse
-        ai_flags = set()
-        if self.opponent_trainer:
-            ai_flags = self.opponent_trainer.get_ai_flags()
-        else:
-            ai_flags = {'basic', 'evaluate_attack'}
+        if ai_flags is None:
+            if self.opponent_trainer:
+                ai_flags = self.opponent_trainer.get_ai_flags()
+            else:
+                ai_flags = {'basic', 'evaluate_attack'}
+
+        # Entrées communes à tous les flags, calculées une seule fois (O(moves))
+        ctx = AIContext.build(self, attacker, defender, available_moves)
 
         # Scorer chaque move
         scores = {}
@@ -2182,21 +2371,29 @@ class Battle(models.Model):
             scores[move.id] = 100.0  # Score de base Gen 4
 
             if 'basic' in ai_flags:
-                scores[move.id] += self._ai_flag_basic(move, attacker, defender)
+                scores[move.id] += self._ai_flag_basic(move, ctx)
 
             if 'evaluate_attack' in ai_flags:
-                scores[move.id] += self._ai_flag_evaluate_attack(move, attacker, defender, available_moves)
+                scores[move.id] += self._ai_flag_evaluate_attack(move, ctx)
 
             if 'expert' in ai_flags:
-                scores[move.id] += self._ai_flag_expert(move, attacker, defender)
+                scores[move.id] += self._ai_flag_expert(move, ctx)
 
             if 'setup_first_turn' in ai_flags:
-                scores[move.id] += self._ai_flag_setup_first_turn(move, attacker, defender)
+                scores[move.id] += self._ai_flag_setup_first_turn(move, ctx)
+
+        # Lookahead : expectimax sur les tours suivants (moves + switches),
+        # le score Gen 4 ne sert plus qu'à départager les actions équivalentes
+        if 'lookahead' in ai_flags:
+            from myPokemonApp.services.ai_lookahead import choose_lookahead_action
+            action = choose_lookahead_action(self, attacker, defender, available_moves, scores)
+            if action is not None:
+                return action
 
         # Choisir le move avec le score le plus élevé (aléatoire en cas d'égalité)
         best_score = max(scores.values())
         best_moves = [m for m in available_moves if scores[m.id] == best_score]
-        chosen = random.choice(best_moves)
+        chosen = self.rng.choice(best_moves)
 
         return {'type': 'attack', 'move': chosen}
 
@@ -2206,23 +2403,16 @@ class Battle(models.Model):
     # directement à l'adversaire.
     # ─────────────────────────────────────────────────────────────────────────
 
-    def _ai_flag_basic(self, move, attacker, defender):
+    def _ai_flag_basic(self, move, ctx):
         """Modificateurs du flag Basic (Gen 4 / pokeplatinum)."""
-        mod   = 0
-        effect = move.effect or ''
-
-        def get_stage(pokemon, stat):
-            return getattr(pokemon, f'{stat}_stage', 0)
-
-        def defender_has_type(type_name):
-            t1 = defender.species.primary_type
-            t2 = defender.species.secondary_type
-            n  = type_name.lower()
-            return (t1 and t1.name.lower() == n) or (t2 and t2.name.lower() == n)
+        mod      = 0
+        effect   = move.effect or ''
+        attacker = ctx.attacker
+        defender = ctx.defender
+        defender_has_type = ctx.defender_has_type
 
         # ── Étape 1 : Immunités de type ───────────────────────────────────────
-        type_mult = self.get_type_effectiveness(move.type, defender)
-        if type_mult == 0:
+        if ctx.type_mult[move.id] == 0:
             mod -= 10
 
         # ── Étape 2 : Scoring par effet ───────────────────────────────────────
@@ -2263,13 +2453,13 @@ class Battle(models.Model):
         if move.stat_changes:
             for stat, change in move.stat_changes.items():
                 if change > 0:
-                    current = get_stage(attacker, stat)
+                    current = ctx.attacker_stages.get(stat, 0)
                     if current >= 6:
                         mod -= 10
                         break
                 elif change < 0:
                     # Debuff sur la cible
-                    current = get_stage(defender, stat)
+                    current = ctx.defender_stages.get(stat, 0)
                     if current <= -6:
                         mod -= 10
                         break
@@ -2286,11 +2476,11 @@ class Battle(models.Model):
             stats = stat_map.get(effect, [])
             if stats:
                 first_stat = stats[0] if isinstance(stats[0], str) else stats[0][0]
-                if get_stage(attacker, first_stat) >= 6:
+                if ctx.attacker_stages.get(first_stat, 0) >= 6:
                     mod -= 10
                 elif len(stats) > 1:
                     second_stat = stats[1] if isinstance(stats[1], str) else stats[1][0]
-                    if get_stage(attacker, second_stat) >= 6:
+                    if ctx.attacker_stages.get(second_stat, 0) >= 6:
                         mod -= 8
 
         # Recovery — inutile si HP = 100 %
@@ -2300,7 +2490,7 @@ class Battle(models.Model):
 
         # Reflect / Light Screen / Safeguard — déjà actif
         # (on vérifie via battle_state si ces effets sont actifs côté opponent)
-        bs = self.battle_state if isinstance(self.battle_state, dict) else {}
+        bs = ctx.state
         opp_effects = bs.get('opponent_effects', {})
         if effect == 'reflect' and opp_effects.get('reflect'):
             mod -= 8
@@ -2389,7 +2579,7 @@ class Battle(models.Model):
     # Philosophie : maximiser les dégâts bruts.
     # ─────────────────────────────────────────────────────────────────────────
 
-    def _ai_flag_evaluate_attack(self, move, attacker, defender, all_moves):
+    def _ai_flag_evaluate_attack(self, move, ctx):
         """Modificateurs du flag Evaluate Attack (Gen 4)."""
         mod    = 0
         effect = move.effect or ''
@@ -2408,15 +2598,15 @@ class Battle(models.Model):
         if effect in EXCLUDED_EFFECTS:
             return 0
 
-        estimated = self._estimate_enemy_damage(move, attacker, defender)
-        type_mult  = self.get_type_effectiveness(move.type, defender)
+        estimated = ctx.damage[move.id]
+        type_mult = ctx.type_mult[move.id]
 
         # 1. KO potentiel
-        if estimated >= defender.current_hp:
+        if ctx.can_ko(move):
             if effect == 'self_destruct':
                 pass  # pas de bonus pour self-destruct
             elif effect in ('focus_punch', 'sucker_punch', 'future_sight'):
-                if random.random() < 0.336:
+                if self.rng.random() < 0.336:
                     mod += 4
             elif hasattr(move, 'priority') and move.priority and move.priority > 0:
                 mod += 6
@@ -2424,16 +2614,11 @@ class Battle(models.Model):
                 mod += 4
 
         # 2. Pas le move le plus puissant de la sélection → -1
-        max_damage = max(
-            (self._estimate_enemy_damage(m, attacker, defender)
-             for m in all_moves if m.power and m.power > 0),
-            default=0
-        )
-        if estimated < max_damage:
+        if estimated < ctx.max_damage:
             mod -= 1
 
         # 3. Quad-efficace → ~31% de chance de +2
-        if type_mult >= 4.0 and random.random() < 0.3125:
+        if type_mult >= 4.0 and self.rng.random() < 0.3125:
             mod += 2
 
         return mod
@@ -2443,47 +2628,45 @@ class Battle(models.Model):
     # Philosophie : logique contextuelle avancée pour les boss.
     # ─────────────────────────────────────────────────────────────────────────
 
-    def _ai_flag_expert(self, move, attacker, defender):
+    def _ai_flag_expert(self, move, ctx):
         """Modificateurs du flag Expert (Gen 4) — Champions d'Arène et bosses."""
-        mod    = 0
-        effect = move.effect or ''
+        mod      = 0
+        effect   = move.effect or ''
+        attacker = ctx.attacker
+        defender = ctx.defender
 
         # Paralysie : bonus si attaquant plus lent que défenseur (~92%)
         if move.inflicts_status == 'paralyzed':
-            if attacker.speed < defender.speed and random.random() < 0.922:
+            if attacker.speed < defender.speed and self.rng.random() < 0.922:
                 mod += 3
-            if attacker.current_hp / max(attacker.max_hp, 1) <= 0.70:
+            if ctx.attacker_hp_ratio <= 0.70:
                 mod -= 1
 
         # Poison : malus si HP bas
         elif move.inflicts_status in ('poisoned', 'badly_poisoned'):
-            hp_ratio_a = attacker.current_hp / max(attacker.max_hp, 1)
-            hp_ratio_d = defender.current_hp / max(defender.max_hp, 1)
-            if hp_ratio_a < 0.5 or hp_ratio_d <= 0.5:
+            if ctx.attacker_hp_ratio < 0.5 or ctx.defender_hp_ratio <= 0.5:
                 mod -= 1
 
         # Moves de soin — malus si HP > 70%
         if effect in ('heal_half', 'heal_sleep', 'morning_sun', 'synthesis', 'moonlight'):
-            hp_ratio = attacker.current_hp / max(attacker.max_hp, 1)
+            hp_ratio = ctx.attacker_hp_ratio
             if hp_ratio > 0.70:
                 mod -= 1
             # Bonus si vraiment critique
-            if hp_ratio <= 0.30 and random.random() < 0.5:
+            if hp_ratio <= 0.30 and self.rng.random() < 0.5:
                 mod += 1
 
         # Draining attacks (giga drain, absorb…) — malus si résistée/immune
         if effect in ('drain', 'leech'):
-            type_mult = self.get_type_effectiveness(move.type, defender)
-            if type_mult < 1.0 and random.random() < 0.805:
+            if ctx.type_mult[move.id] < 1.0 and self.rng.random() < 0.805:
                 mod -= 3
 
         # Stat-boost : bonus si HP > 50% et stage pas encore au max
         if move.stat_changes:
             for stat, change in move.stat_changes.items():
                 if change > 0:
-                    current = getattr(attacker, f'{stat}_stage', 0)
-                    hp_ratio = attacker.current_hp / max(attacker.max_hp, 1)
-                    if current < 4 and hp_ratio > 0.5:
+                    current = ctx.attacker_stages.get(stat, 0)
+                    if current < 4 and ctx.attacker_hp_ratio > 0.5:
                         mod += 1
                         break
 
@@ -2494,10 +2677,9 @@ class Battle(models.Model):
     # Philosophie : prioriser les stat-boosts au premier tour.
     # ─────────────────────────────────────────────────────────────────────────
 
-    def _ai_flag_setup_first_turn(self, move, attacker, defender):
+    def _ai_flag_setup_first_turn(self, move, ctx):
         """Modificateurs du flag Setup First Turn (Gen 4)."""
-        bs = self.battle_state if isinstance(self.battle_state, dict) else {}
-        turns = bs.get('opponent_turns_in_battle', 0)
+        turns = ctx.state.get('opponent_turns_in_battle', 0)
 
         if turns > 0:
             return 0  # Flag actif seulement au premier tour
@@ -2505,29 +2687,11 @@ class Battle(models.Model):
         if move.stat_changes:
             for stat, change in move.stat_changes.items():
                 if change > 0:
-                    current = getattr(attacker, f'{stat}_stage', 0)
+                    current = ctx.attacker_stages.get(stat, 0)
                     if current < 6:
                         return 2  # Boost disponible → fort bonus premier tour
         return 0
 
-    def _estimate_enemy_damage(self, move, attacker, defender):
-        if not move.power or move.power == 0:
-            return 0
-        if move.category == 'physical':
-            atk_stat = attacker.get_effective_attack()
-            def_stat = defender.get_effective_defense()
-        else:
-            atk_stat = attacker.get_effective_special_attack()
-            def_stat = defender.get_effective_special_defense()
-        if def_stat == 0:
-            def_stat = 1
-        base = ((2 * attacker.level / 5 + 2) * move.power * atk_stat / def_stat) / 50 + 2
-        mult = self.get_type_effectiveness(move.type, defender)
-        attacker_types = [attacker.species.primary_type, attacker.species.secondary_type]
-        if move.type in attacker_types:
-            base *= 1.5
-        return int(base * mult * 0.925)
-
     # =========================================================================
     # FIN DE COMBAT
     # =========================================================================
@@ -2537,4 +2701,33 @@ class Battle(models.Model):
         self.is_active  = False
         from django.utils import timezone
         self.ended_at   = timezone.now()
-        self.save()
\ No newline at end of file
+        self.save()
+
+
+class _OpponentPokemonDescriptor(ForwardManyToOneDescriptor):
+    """
+    battle.opponent_pokemon : le Pokémon sauvage éphémère s'il y en a un
+    (wild_pokemon, opponent_pokemon_id NULL), sinon la FK habituelle.
+    Assigner un Pokémon éphémère laisse la FK à NULL.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is not None:
+            wild = instance._wild_opponent()
+            if wild is not None:
+                return wild
+        return super().__get__(instance, cls)
+
+    def __set__(self, instance, value):
+        if value is not None and value.is_ephemeral:
+            instance._wild = value
+            if instance._identity is not None:
+                instance._identity[value.pk] = value
+            super().__set__(instance, None)
+            return
+        if value is not None:
+            instance._wild = instance.wild_pokemon = None
+        super().__set__(instance, value)
+
+
+Battle.opponent_pokemon = _OpponentPokemonDescriptor(Battle._meta.get_field('opponent_pokemon'))
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+"""! @brief BattleActionReceipt.py — Réponses rejouables des actions de combat.
+
+Une ligne par action validée portant une clé d'idempotence (générée par le
+client) : un POST rejoué avec la même clé — double clic, retry réseau, y
+compris sur un autre worker — reçoit la réponse déjà servie sans rejouer le
+tour.
+
+La ligne est insérée dans la transaction du tour (battle_action_lock) :
+si le tour est annulé, la réponse l'est aussi.  Les reçus plus anciens que
+IDEMPOTENCY_TIMEOUT (services/battle_service) sont purgés à l'insertion
+suivante du même combat, et supprimés avec le combat.
+"""
+
+from django.db import models
+
+
+class BattleActionReceipt(models.Model):
+    """Réponse servie pour une clé d'idempotence d'un combat."""
+
+    battle     = models.ForeignKey(
+        'myPokemonApp.Battle', on_delete=models.CASCADE, related_name='action_receipts'
+    )
+    key        = models.CharField(max_length=64)
+    response   = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name        = "Reçu d'action de combat"
+        verbose_name_plural = "Reçus d'actions de combat"
+        constraints = [
+            models.UniqueConstraint(fields=['battle', 'key'], name='unique_battle_action_key'),
+        ]
+
+    def __str__(self):
+        return f"[{self.battle_id}] {self.key}"
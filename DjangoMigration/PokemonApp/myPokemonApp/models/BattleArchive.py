@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""! @brief BattleArchive.py — Combats terminés archivés sous forme compacte.
+
+Une ligne Battle garde pour toujours battle_log, battle_state et
+battle_snapshot (JSON), plus ses lignes BattleEvent ; les pages d'historique
+parcourent ces lignes larges.  La commande archive_battles
+(services/battle_archive.py) déplace les combats terminés depuis N jours ici :
+
+  - résumé en colonnes (type, dresseurs, vainqueur, tours, durée, argent
+    gagné, Pokémon actifs) + équipes (snapshot de début / HP de fin) ;
+  - journal et flux de replay compressés zlib dans `payload`, décompressés
+    seulement à l'ouverture du détail.
+
+La clé primaire est celle du Battle d'origine : les URL de l'historique
+(battle/<pk>/) restent valides.  Les attributs lus par les templates de
+l'historique (is_active, current_turn, battle_log, battle_snapshot…) sont
+exposés sous les mêmes noms que sur Battle.
+"""
+
+from functools import cached_property
+
+from django.db import models
+
+from .Battle import Battle
+from .Trainer import Trainer
+
+
+class BattleArchive(models.Model):
+    """Résumé + journal compressé d'un combat terminé."""
+
+    id = models.BigIntegerField(primary_key=True, help_text="pk du Battle d'origine")
+
+    battle_type = models.CharField(max_length=20, choices=Battle.BATTLE_TYPES)
+
+    player_trainer = models.ForeignKey(
+        Trainer, on_delete=models.CASCADE, related_name='archived_battles_as_player'
+    )
+    opponent_trainer = models.ForeignKey(
+        Trainer, on_delete=models.CASCADE, related_name='archived_battles_as_opponent',
+        null=True, blank=True
+    )
+    winner = models.ForeignKey(
+        Trainer, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='archived_won_battles'
+    )
+
+    # Résumé
+    turns        = models.PositiveIntegerField(default=0)
+    weather      = models.CharField(max_length=20, blank=True, null=True)
+    money_earned = models.IntegerField(default=0)
+    # Pokémon actifs en fin de combat (ids seuls : les lignes peuvent disparaître)
+    player_pokemon_id   = models.BigIntegerField(null=True, blank=True)
+    opponent_pokemon_id = models.BigIntegerField(null=True, blank=True)
+    # battle_snapshot du combat : {'player_team': [...], 'opponent_team': [...]}
+    teams = models.JSONField(default=dict, blank=True)
+
+    created_at  = models.DateTimeField()
+    ended_at    = models.DateTimeField(null=True, blank=True)
+    duration    = models.DurationField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # zlib(JSON {'log': [{'turn', 'message'}], 'replay': [...]})
+    payload = models.BinaryField()
+
+    class Meta:
+        verbose_name        = "Combat archivé"
+        verbose_name_plural = "Combats archivés"
+        indexes = [
+            # Historique d'un joueur, du plus récent au plus ancien
+            models.Index(fields=['player_trainer', '-created_at'], name='idx_archive_player_date'),
+            models.Index(fields=['opponent_trainer', '-created_at'], name='idx_archive_opp_date'),
+            models.Index(fields=['winner'], name='idx_archive_winner'),
+        ]
+
+    # Pokémon affichés par les templates (mocks posés par les vues)
+    player_pokemon   = None
+    opponent_pokemon = None
+
+    is_active = False
+
+    def __str__(self):
+        opp = self.opponent_trainer.username if self.opponent_trainer else 'Sauvage'
+        return f"Combat archivé: {self.player_trainer.username} vs {opp}"
+
+    @cached_property
+    def data(self):
+        """Contenu décompressé de payload."""
+        from myPokemonApp.services.battle_archive import unpack_payload
+        return unpack_payload(self.payload)
+
+    @property
+    def battle_log(self):
+        return self.data.get('log', [])
+
+    def get_log(self):
+        return list(self.battle_log)
+
+    @property
+    def current_turn(self):
+        return self.turns
+
+    @property
+    def battle_snapshot(self):
+        return self.teams
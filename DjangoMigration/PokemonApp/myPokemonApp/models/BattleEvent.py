@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""! @brief BattleEvent.py — Journal de combat en table append-only.
+
+Remplace Battle.battle_log (JSONField) : chaque add_to_log() réécrivait la
+colonne entière, soit O(n²) octets sur la durée d'un long combat d'Arène
+ou du Conseil des 4.  Une ligne par message, indexée par
+(battle, turn, seq) : la vue d'action ne lit que les lignes du tour courant.
+
+Pendant un tour (TurnSession), les messages sont insérés en un seul
+bulk_create au commit.  battle_log reste en base, en lecture seule, pour
+l'historique des combats antérieurs à la migration 0020.
+"""
+
+from django.db import models
+
+
+class BattleEvent(models.Model):
+    """Un message du journal d'un combat."""
+
+    battle  = models.ForeignKey(
+        'myPokemonApp.Battle', on_delete=models.CASCADE, related_name='events'
+    )
+    turn    = models.IntegerField()
+    seq     = models.PositiveIntegerField(help_text="Rang du message dans le combat (0, 1, 2…)")
+    message = models.TextField()
+
+    class Meta:
+        verbose_name        = "Événement de combat"
+        verbose_name_plural = "Événements de combat"
+        ordering            = ['battle', 'seq']
+        constraints = [
+            models.UniqueConstraint(fields=['battle', 'seq'], name='unique_battle_event_seq'),
+        ]
+        indexes = [
+            # Logs du tour courant : filter(battle=X, turn__in=...).order_by('seq')
+            models.Index(fields=['battle', 'turn', 'seq'], name='idx_battle_event_turn'),
+        ]
+
+    def __str__(self):
+        return f"[{self.battle_id}#{self.seq} T{self.turn}] {self.message}"
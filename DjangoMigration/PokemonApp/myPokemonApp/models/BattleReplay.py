@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""! @brief BattleReplay.py — Encodage compact du flux de replay d'un combat.
+
+Le flux est stocké dans la table BattleReplayStep (une ligne par événement
+JSON court, voir models/BattleReplayStep.py), rejouée par
+services/battle_replay.replay_battle().
+
+Événements :
+    ['=', pk, [valeurs REPLAY_FIELDS], [[move_id, pp], ...]]
+        État d'un Pokémon (en-tête au démarrage, puis après XP / évolution).
+    ['S', player_pk, opponent_pk, log_start]
+        Départ : Pokémon actifs et taille du log d'intro.
+    ['T', action_joueur, action_adversaire]
+        Un tour (Battle.execute_turn).
+    ['F']
+        Tentative de fuite (hors tour).
+    ['O', pk]
+        Switch de l'adversaire après un K.O. (opponent_switch_pokemon).
+
+Actions :
+    ['a', move_id]  attaque          ['s', pk]              switch
+    ['i', item_id, target_pk]        ['b']  Poké Ball ratée
+    ['f']  fuite                     ['p']  passe           []  aucune action
+"""
+
+
+# Champs lus par le moteur de combat — les stages repartent de 0 au démarrage.
+REPLAY_FIELDS = (
+    'species_id', 'trainer_id', 'nickname', 'level',
+    'max_hp', 'current_hp', 'attack', 'defense',
+    'special_attack', 'special_defense', 'speed',
+    'nature', 'status_condition', 'sleep_turns',
+    'held_item_id', 'ability_id', 'friendship', 'gender',
+)
+
+_ACTION_CODES = {'attack': 'a', 'switch': 's', 'item': 'i', 'PokeBall': 'b',
+                 'flee': 'f', 'pass': 'p'}
+
+
+def encode_pokemon(pokemon, move_instances):
+    """(pk, valeurs, moves) d'un PlayablePokemon pour un événement '='."""
+    return (
+        pokemon.pk,
+        [getattr(pokemon, name) for name in REPLAY_FIELDS],
+        [[mi.move_id, mi.current_pp] for mi in move_instances],
+    )
+
+
+def encode_action(action):
+    """Action de tour (dict de execute_turn) → liste compacte."""
+    kind = (action or {}).get('type')
+    if kind is None:
+        return []
+    code = _ACTION_CODES.get(kind, 'p')
+    if code == 'a':
+        return [code, action['move'].pk]
+    if code == 's':
+        return [code, action['pokemon'].pk]
+    if code == 'i':
+        return [code, action['item'].pk, action['target'].pk]
+    return [code]
@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+"""! @brief BattleReplayStep.py — Flux de replay d'un combat en table append-only.
+
+Le flux était une liste dans battle_state['replay'] : chaque tour y ajoutait
+une étape puis réencodait tout battle_state, soit O(n²) octets sur la durée
+d'un combat.  Une ligne par événement (format de models/BattleReplay.py),
+dans l'ordre seq, à côté des BattleEvent du journal.
+
+Pendant un tour (TurnSession), les étapes sont insérées en un seul
+bulk_create au commit, avec les messages du tour.  battle_state['replay']
+ne garde qu'un indicateur : le combat est enregistré.
+"""
+
+from django.db import models
+
+
+class BattleReplayStep(models.Model):
+    """Un événement du flux de replay d'un combat."""
+
+    battle = models.ForeignKey(
+        'myPokemonApp.Battle', on_delete=models.CASCADE, related_name='replay_steps'
+    )
+    seq    = models.PositiveIntegerField(help_text="Rang de l'événement dans le flux (0, 1, 2…)")
+    event  = models.JSONField()
+
+    class Meta:
+        verbose_name        = "Étape de replay"
+        verbose_name_plural = "Étapes de replay"
+        ordering            = ['battle', 'seq']
+        constraints = [
+            models.UniqueConstraint(fields=['battle', 'seq'], name='unique_battle_replay_seq'),
+        ]
+
+    def __str__(self):
+        return f"[{self.battle_id}#{self.seq}] {self.event}"
@@ -0,0 +1,387 @@
+#!/usr/bin/python3
+"""! @brief BattleVolatileState.py — État volatil typé d'un combat.
+
+Battle.battle_state était un dict de dicts (un sous-dict par Pokémon, indexé
+par str(pk), plus des clés « player_reflect », « opponent_spikes »…) relu et
+réencodé en JSON à chaque _save_state().
+
+L'état est désormais décodé une seule fois par instance de Battle en objets
+à __slots__ :
+
+  - BattleVolatileState : compteurs globaux (météo, Salle Bizarre), infos du
+    dernier tour, RNG / enregistrement du replay ;
+  - SideVolatile        : un par côté (écrans, Brume, Vent Arrière, pièges
+    d'entrée, Pokémon déjà envoyés) ;
+  - PokemonVolatile     : un par Pokémon, indexé par pk entier.
+
+Il n'est réencodé qu'au save() du Battle (une fois par tour dans une
+TurnSession), au format compact versionné STATE_FORMAT :
+
+    {'v': 2, 'wt': 3, 'sd': {'p': {'rf': 5}}, 'pk': {'12': {'cf': 2, 'ls': 1}},
+     'rng': {...}, 'replay': 1}
+
+Seules les valeurs différentes du défaut sont écrites.  L'ancien format (sans
+'v') est toujours décodé : les combats en cours sont convertis au premier
+save().  Les trois classes gardent une interface de mapping (get / [] / pop /
+setdefault / in) avec les anciens noms de clés, pour le code qui manipule
+des clés dynamiques.
+"""
+
+from dataclasses import dataclass, field, fields
+
+
+# Version du format compact écrit dans battle_state.
+STATE_FORMAT = 2
+
+
+# =============================================================================
+# INTERFACE MAPPING (compatibilité avec les anciens dicts)
+# =============================================================================
+
+class _SlotMapping:
+    """
+    Accès par clé aux champs d'une dataclass à slots.
+
+    Un champ « absent » au sens de l'ancien dict est un champ à sa valeur par
+    défaut.  Les clés inconnues sont conservées telles quelles dans `extra`.
+    """
+
+    __slots__ = ()
+
+    # Remplis par _register() : {nom: défaut} et {nom: code compact}
+    _DEFAULTS = {}
+    _CODES    = {}
+
+    @classmethod
+    def _default(cls, name):
+        default = cls._DEFAULTS[name]
+        return [] if isinstance(default, list) else default
+
+    def get(self, key, default=None):
+        if key in self._DEFAULTS:
+            value = getattr(self, key)
+            if default is not None and value == self._DEFAULTS[key]:
+                return default
+            return value
+        return self.extra.get(key, default)
+
+    def __getitem__(self, key):
+        if key in self._DEFAULTS:
+            return getattr(self, key)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._DEFAULTS:
+            setattr(self, key, value)
+        else:
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        if key in self._DEFAULTS:
+            return getattr(self, key) != self._DEFAULTS[key]
+        return key in self.extra
+
+    def pop(self, key, default=None):
+        if key in self._DEFAULTS:
+            value = self.get(key, default)
+            setattr(self, key, self._default(key))
+            return value
+        return self.extra.pop(key, default)
+
+    def setdefault(self, key, default=None):
+        if key in self._DEFAULTS:
+            if key not in self:
+                setattr(self, key, default)
+            return getattr(self, key)
+        return self.extra.setdefault(key, default)
+
+    # ─── Format compact ──────────────────────────────────────────────────────
+
+    def encode(self):
+        """Champs non par défaut → {code: valeur} (+ 'x' pour les clés inconnues)."""
+        data = {}
+        for name, code in self._CODES.items():
+            value = getattr(self, name)
+            if value != self._DEFAULTS[name]:
+                data[code] = 1 if value is True else value
+        if self.extra:
+            data['x'] = self.extra
+        return data
+
+    @classmethod
+    def decode(cls, data):
+        obj = cls()
+        for code, value in data.items():
+            name = cls._NAMES.get(code)
+            if name is None:
+                if code == 'x':
+                    obj.extra.update(value)
+                continue
+            setattr(obj, name, bool(value) if cls._DEFAULTS[name] is False else value)
+        return obj
+
+    @classmethod
+    def from_legacy(cls, data):
+        """Sous-dict de l'ancien format (noms de clés complets)."""
+        obj = cls()
+        for key, value in data.items():
+            obj[key] = value
+        return obj
+
+
+def _register(cls, codes, skip=('extra',)):
+    """Associe à la dataclass ses défauts et ses codes compacts."""
+    own = [f for f in fields(cls) if f.name not in skip]
+    assert {f.name for f in own} == set(codes), cls
+    cls._DEFAULTS = {
+        f.name: ([] if f.default_factory is list else f.default) for f in own
+    }
+    cls._CODES = codes
+    cls._NAMES = {code: name for name, code in codes.items()}
+    return cls
+
+
+# =============================================================================
+# PAR POKÉMON
+# =============================================================================
+
+@dataclass(slots=True, eq=False)
+class PokemonVolatile(_SlotMapping):
+    """États volatils d'un Pokémon engagé (perdus au switch ou en fin de combat)."""
+
+    # Compteurs de tours
+    confusion_turns:    int = 0
+    trap_turns:         int = 0
+    encore_turns:       int = 0
+    rampage_turns:      int = 0
+    taunt_turns:        int = 0
+    perish_turns:       int = 0
+    wish_turns:         int = 0
+    disable_turns:      int = 0
+    future_sight_turns: int = 0
+    toxic_counter:      int = 0
+    rollout_count:      int = 0
+
+    # Quantités
+    substitute_hp:       int = 0
+    wish_amount:         int = 0
+    future_sight_damage: int = 0
+
+    # Drapeaux
+    leech_seed:              bool = False
+    badly_poisoned:          bool = False
+    recharge:                bool = False
+    protected:               bool = False
+    enduring:                bool = False
+    flinched:                bool = False
+    focus_energy:            bool = False
+    destiny_bond:            bool = False
+    ingrain:                 bool = False
+    nightmare:               bool = False
+    torment:                 bool = False
+    trapped_by_mean_look:    bool = False
+    was_hit_this_turn:       bool = False
+    flash_fire_active:       bool = False
+    sheer_force_active:      bool = False
+    serene_grace_active:     bool = False
+    ignore_opponent_ability: bool = False
+
+    # Références (noms de moves / types, id de move)
+    charging:         str = None
+    rampage_move:     str = None
+    trap_move:        str = None
+    encore_move:      str = None
+    last_move_used:   str = None
+    disabled_move_id: int = None
+    transformed_into: str = None
+    converted_type:   str = None
+
+    extra: dict = field(default_factory=dict)
+
+
+_register(PokemonVolatile, {
+    'confusion_turns': 'cf', 'trap_turns': 'tp', 'encore_turns': 'en',
+    'rampage_turns': 'rp', 'taunt_turns': 'ta', 'perish_turns': 'pe',
+    'wish_turns': 'wi', 'disable_turns': 'di', 'future_sight_turns': 'fs',
+    'toxic_counter': 'tc', 'rollout_count': 'ro',
+    'substitute_hp': 'su', 'wish_amount': 'wa', 'future_sight_damage': 'fd',
+    'leech_seed': 'ls', 'badly_poisoned': 'bp', 'recharge': 'rc',
+    'protected': 'pr', 'enduring': 'ed', 'flinched': 'fl',
+    'focus_energy': 'fe', 'destiny_bond': 'db', 'ingrain': 'ig',
+    'nightmare': 'nm', 'torment': 'tm', 'trapped_by_mean_look': 'ml',
+    'was_hit_this_turn': 'wh', 'flash_fire_active': 'ff',
+    'sheer_force_active': 'sf', 'serene_grace_active': 'sg',
+    'ignore_opponent_ability': 'ia',
+    'charging': 'ch', 'rampage_move': 'rm', 'trap_move': 'tv',
+    'encore_move': 'em', 'last_move_used': 'lm', 'disabled_move_id': 'dm',
+    'transformed_into': 'tf', 'converted_type': 'ct',
+})
+
+
+# =============================================================================
+# PAR CÔTÉ
+# =============================================================================
+
+@dataclass(slots=True, eq=False)
+class SideVolatile(_SlotMapping):
+    """Effets de terrain d'un côté ('player' ou 'opponent')."""
+
+    light_screen: int  = 0
+    reflect:      int  = 0
+    mist:         int  = 0
+    tailwind:     int  = 0
+    spikes:       int  = 0
+    toxic_spikes: int  = 0
+    stealth_rock: bool = False
+    used_ids:     list = field(default_factory=list)   # Pokémon déjà envoyés
+
+    extra: dict = field(default_factory=dict)
+
+
+_register(SideVolatile, {
+    'light_screen': 'ls', 'reflect': 'rf', 'mist': 'mi', 'tailwind': 'tw',
+    'spikes': 'sp', 'toxic_spikes': 'ts', 'stealth_rock': 'sr', 'used_ids': 'u',
+})
+
+
+SIDES = ('player', 'opponent')
+_SIDE_CODES = {'player': 'p', 'opponent': 'o'}
+
+
+# =============================================================================
+# COMBAT
+# =============================================================================
+
+@dataclass(slots=True, eq=False)
+class BattleVolatileState(_SlotMapping):
+    """
+    État volatil complet d'un combat.
+
+    Interface mapping : les anciennes clés restent valides —
+    '12' → pokemon(12), 'player_reflect' → side('player').reflect, etc.
+    """
+
+    weather_turns:    int  = 0
+    trick_room_turns: int  = 0
+    last_turn_info:   dict = None    # ordre du tour (animations frontend)
+    hp_before_eot:    dict = None    # PV avant les effets de fin de tour
+    rng:              dict = None    # {'seed', 'step'} — voir Battle.rng
+    replay:           bool = False   # flux enregistré (models/BattleReplayStep.py)
+
+    sides:    dict = field(default_factory=dict)   # 'player' | 'opponent' → SideVolatile
+    pokemons: dict = field(default_factory=dict)   # pk (int) → PokemonVolatile
+    extra:    dict = field(default_factory=dict)
+
+    def side(self, name):
+        """SideVolatile du côté `name` (créé au besoin)."""
+        state = self.sides.get(name)
+        if state is None:
+            state = self.sides[name] = SideVolatile()
+        return state
+
+    def pokemon(self, pk):
+        """PokemonVolatile du Pokémon `pk` (créé au besoin)."""
+        state = self.pokemons.get(pk)
+        if state is None:
+            state = self.pokemons[pk] = PokemonVolatile()
+        return state
+
+    # ─── Anciennes clés ──────────────────────────────────────────────────────
+
+    def _route(self, key):
+        """Anciennes clés → (SideVolatile | PokemonVolatile, clé interne) ou None."""
+        if key.lstrip('-').isdigit():
+            return self.pokemon(int(key)), None
+        side, _, name = key.partition('_')
+        if side in SIDES and name in SideVolatile._DEFAULTS:
+            return self.side(side), name
+        return None
+
+    def get(self, key, default=None):
+        route = None if key in self._DEFAULTS else self._route(key)
+        if route is None:
+            return _SlotMapping.get(self, key, default)
+        target, name = route
+        return target if name is None else target.get(name, default)
+
+    def __getitem__(self, key):
+        route = None if key in self._DEFAULTS else self._route(key)
+        if route is None:
+            return _SlotMapping.__getitem__(self, key)
+        target, name = route
+        return target if name is None else target[name]
+
+    def __setitem__(self, key, value):
+        route = None if key in self._DEFAULTS else self._route(key)
+        if route is None:
+            return _SlotMapping.__setitem__(self, key, value)
+        target, name = route
+        if name is None:
+            self.pokemons[int(key)] = PokemonVolatile.from_legacy(value)
+        else:
+            target[name] = value
+
+    def __contains__(self, key):
+        route = None if key in self._DEFAULTS else self._route(key)
+        if route is None:
+            return _SlotMapping.__contains__(self, key)
+        target, name = route
+        return True if name is None else name in target
+
+    def pop(self, key, default=None):
+        route = None if key in self._DEFAULTS else self._route(key)
+        if route is None:
+            return _SlotMapping.pop(self, key, default)
+        target, name = route
+        if name is None:
+            return self.pokemons.pop(int(key), default)
+        return target.pop(name, default)
+
+    def setdefault(self, key, default=None):
+        route = None if key in self._DEFAULTS else self._route(key)
+        if route is None:
+            return _SlotMapping.setdefault(self, key, default)
+        target, name = route
+        return target if name is None else target.setdefault(name, default)
+
+    # ─── Sérialisation ───────────────────────────────────────────────────────
+
+    def encode(self):
+        """État → dict JSON compact (format STATE_FORMAT)."""
+        data = {'v': STATE_FORMAT}
+        data.update(_SlotMapping.encode(self))
+        sides = {_SIDE_CODES[name]: encoded for name, state in self.sides.items()
+                 if (encoded := state.encode())}
+        if sides:
+            data['sd'] = sides
+        pokemons = {str(pk): encoded for pk, state in self.pokemons.items()
+                    if (encoded := state.encode())}
+        if pokemons:
+            data['pk'] = pokemons
+        return data
+
+    @classmethod
+    def decode(cls, raw):
+        """battle_state (format compact ou ancien format) → BattleVolatileState."""
+        if not isinstance(raw, dict):
+            return cls()
+        if raw.get('v') != STATE_FORMAT:
+            return cls.from_legacy(raw)
+
+        state = super(BattleVolatileState, cls).decode(
+            {k: v for k, v in raw.items() if k not in ('v', 'sd', 'pk')}
+        )
+        for name, code in _SIDE_CODES.items():
+            if code in raw.get('sd', {}):
+                state.sides[name] = SideVolatile.decode(raw['sd'][code])
+        for pk, data in raw.get('pk', {}).items():
+            state.pokemons[int(pk)] = PokemonVolatile.decode(data)
+        return state
+
+
+# sides / pokemons sont encodés à part ('sd' / 'pk')
+_register(BattleVolatileState, {
+    'weather_turns': 'wt', 'trick_room_turns': 'tr',
+    'last_turn_info': 'lt', 'hp_before_eot': 'he',
+    'rng': 'rng', 'replay': 'replay',
+}, skip=('extra', 'sides', 'pokemons'))
@@ -30,6 +30,9 @@ class CaptureAttempt(models.Model):
     # Métadonnées
     attempted_at = models.DateTimeField(default=timezone.now)
     battle = models.ForeignKey('Battle', on_delete=models.SET_NULL, null=True, blank=True)
+    # Combat archivé (archive_battles) : repris de `battle` avant la suppression
+    archive = models.ForeignKey('BattleArchive', on_delete=models.SET_NULL, null=True,
+                                blank=True, related_name='capture_attempts')
     
     class Meta:
         ordering = ['-attempted_at']
@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+"""! @brief DamageResult.py — Résultat pur d'un calcul de dégâts.
+
+Battle.calculate_damage mêlait calcul et effets de bord : messages de log
+(critique, Feu Intérieur, baies de résistance, talents), drapeaux Sheer Force /
+Serene Grace / Mold Breaker écrits dans battle_state suivis d'un _save_state()
+à chaque coup, consommation de l'objet tenu.
+
+Le calcul est désormais scindé :
+
+  - Battle.compute_damage()      → DamageResult, sans écriture (seuls les
+                                   tirages RNG du coup sont consommés) ;
+  - Battle.apply_damage_result() → applique les événements du résultat en un
+                                   seul endroit (log, drapeaux de talent en
+                                   mémoire, objet consommé) ;
+  - Battle.calculate_damage()    = les deux, même signature qu'avant.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class DamageResult:
+    """Dégâts d'un coup et événements déclenchés, à appliquer par le Battle."""
+
+    damage:        int
+    critical:      bool  = False
+    effectiveness: float = 1.0
+    messages:      list  = field(default_factory=list)   # lignes de log, dans l'ordre
+    ability_flags: dict  = None    # drapeaux de talent pour _apply_move_effect
+    consumed_item: bool  = False   # baie de résistance du défenseur consommée
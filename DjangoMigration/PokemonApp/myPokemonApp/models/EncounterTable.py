@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""! @brief EncounterTable.py — Tables de rencontres sauvages précompilées.
+
+get_random_wild_pokemon lisait les WildPokemonSpawn de la zone à chaque
+rencontre : exists(), somme des spawn_rate, second parcours pour le tirage
+cumulé, éventuellement first() en secours — plusieurs requêtes par pas dans
+les hautes herbes.
+
+Les tables sont construites une seule fois par processus, en une requête
+(WildPokemonSpawn + espèce), une par couple (zone_id, encounter_type) :
+
+  - espèces, niveaux min / max et poids (spawn_rate) dans des tuples
+    parallèles ; les spawns à spawn_rate <= 0 sont ignorés ;
+  - tirage par la méthode des alias (Vose) : O(1) par rencontre, quel que
+    soit le nombre d'espèces de la zone, et sans requête.
+
+Les espèces (Pokemon) des tables sont partagées par tout le processus : elles
+ne doivent pas être modifiées.  Les tables sont invalidées par les signaux
+connectés dans apps.ready() (post_save / post_delete sur WildPokemonSpawn et
+Pokemon).
+
+Usage :
+    from myPokemonApp.models.EncounterTable import get_encounter_tables
+    table = get_encounter_tables().table(zone.id, 'grass')
+    species, level = table.sample()
+"""
+
+import random
+
+from .ProcessCache import ProcessCache
+
+
+class AliasSampler:
+    """Tirage pondéré en O(1) (méthode des alias, variante de Vose)."""
+
+    __slots__ = ('_prob', '_alias')
+
+    def __init__(self, weights):
+        """weights : poids strictement positifs (au moins un)."""
+        n     = len(weights)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        self._prob  = [1.0] * n
+        self._alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self._prob[low]  = scaled[low]
+            self._alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Restes (erreurs d'arrondi) : probabilité 1, déjà en place
+
+    def __len__(self):
+        return len(self._prob)
+
+    def sample(self, rng=random):
+        """Indice tiré selon les poids."""
+        column = rng.randrange(len(self._prob))
+        return column if rng.random() < self._prob[column] else self._alias[column]
+
+
+class EncounterTable:
+    """Spawns d'une zone pour un type de rencontre (immuable)."""
+
+    __slots__ = ('species', 'level_ranges', 'weights', '_sampler')
+
+    def __init__(self, entries):
+        """entries : [(Pokemon, level_min, level_max, spawn_rate)], spawn_rate > 0."""
+        self.species      = tuple(species for species, *_ in entries)
+        self.level_ranges = tuple((low, high) for _, low, high, _ in entries)
+        self.weights      = tuple(rate for *_, rate in entries)
+        self._sampler     = AliasSampler(self.weights)
+
+    def __len__(self):
+        return len(self.species)
+
+    @property
+    def species_ids(self):
+        return tuple(species.pk for species in self.species)
+
+    def sample(self, rng=random):
+        """(Pokemon espèce, niveau) tiré selon les spawn_rate."""
+        index = self._sampler.sample(rng)
+        low, high = self.level_ranges[index]
+        return self.species[index], rng.randint(low, high)
+
+    def sample_many(self, n, rng=random):
+        """n tirages indépendants : [(Pokemon espèce, niveau)]."""
+        return [self.sample(rng) for _ in range(n)]
+
+    def rates(self):
+        """{species_id: probabilité d'apparition} (somme = 1)."""
+        total = float(sum(self.weights))
+        rates = {}
+        for species, weight in zip(self.species, self.weights):
+            rates[species.pk] = rates.get(species.pk, 0.0) + weight / total
+        return rates
+
+
+class EncounterTables:
+    """Tables de rencontres indexées par (zone_id, encounter_type)."""
+
+    __slots__ = ('_tables',)
+
+    def __init__(self, spawns):
+        """spawns : itérable de WildPokemonSpawn avec leur espèce chargée."""
+        grouped = {}
+        for spawn in spawns:
+            if spawn.spawn_rate > 0:
+                grouped.setdefault((spawn.zone_id, spawn.encounter_type), []).append(
+                    (spawn.pokemon, spawn.level_min, spawn.level_max, spawn.spawn_rate))
+        self._tables = {key: EncounterTable(entries) for key, entries in grouped.items()}
+
+    @classmethod
+    def build(cls):
+        from .Zone import WildPokemonSpawn
+        return cls(WildPokemonSpawn.objects.select_related('pokemon').order_by('pk'))
+
+    def table(self, zone_id, encounter_type='grass'):
+        """EncounterTable de la zone pour ce type de rencontre, ou None."""
+        return self._tables.get((zone_id, encounter_type))
+
+
+# Instance du processus (voir models/ProcessCache.py)
+encounter_tables            = ProcessCache('encounter_tables', EncounterTables.build)
+get_encounter_tables        = encounter_tables.get
+invalidate_encounter_tables = encounter_tables.invalidate
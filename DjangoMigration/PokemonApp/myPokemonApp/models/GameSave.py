@@ -133,6 +133,9 @@ class TrainerBattleHistory(models.Model):
 
     player_won = models.BooleanField()
     battle     = models.ForeignKey(Battle, on_delete=models.SET_NULL, null=True, blank=True)
+    # Combat archivé (archive_battles) : repris de `battle` avant la suppression
+    archive    = models.ForeignKey('BattleArchive', on_delete=models.SET_NULL, null=True,
+                                   blank=True, related_name='history_entries')
 
     money_earned = models.IntegerField(default=0)
     fought_at    = models.DateTimeField(auto_now_add=True)
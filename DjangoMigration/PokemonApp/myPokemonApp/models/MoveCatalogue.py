@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""! @brief MoveCatalogue.py — Catalogue des capacités en lecture seule.
+
+Le moteur de combat retrouvait des capacités par nom en plein tour :
+Lutte quand il n'y a plus de PP (use_move, choose_enemy_move), le move
+d'Encore ou du rampage, le tirage de Métronome… soit une requête à chaque fois.
+
+Le catalogue est construit une seule fois par processus, en une requête
+(PokemonMove + type), et indexe chaque capacité :
+
+  - par id ;
+  - par nom exact ;
+  - par nom normalisé (casefold), français ou anglais : la BDD peut contenir
+    l'un ou l'autre selon la source des données, MOVE_NAME_ALIASES relie les
+    deux noms des capacités que le moteur cherche par leur nom.
+
+Le type et la catégorie sont dénormalisés (type_name / category) pour les
+consommateurs qui n'ont besoin que de ça.  Les PokemonMove retournés sont
+partagés par tout le processus : ils ne doivent pas être modifiés.
+
+Le catalogue est invalidé par les signaux connectés dans apps.ready()
+(post_save / post_delete sur PokemonMove et PokemonType).
+
+Usage :
+    from myPokemonApp.models.MoveCatalogue import get_move_catalogue
+    struggle = get_move_catalogue().struggle
+    move     = get_move_catalogue().by_name('lutte')
+"""
+
+from .ProcessCache import ProcessCache
+
+
+# Noms (français, anglais) des capacités que le moteur cherche par nom
+MOVE_NAME_ALIASES = (
+    ('Lutte',     'Struggle'),
+    ('Métronome', 'Metronome'),
+    ('Coupe',     'Cut'),
+    ('Force',     'Strength'),
+    ('Vol',       'Fly'),
+)
+
+STRUGGLE  = 'Struggle'
+METRONOME = 'Metronome'
+
+
+def fold_move_name(name):
+    """Clé de recherche d'un nom de capacité (insensible à la casse)."""
+    return name.strip().casefold()
+
+
+class MoveCatalogue:
+    """Index immuable des PokemonMove (id, nom exact, nom normalisé FR/EN)."""
+
+    __slots__ = ('_by_id', '_by_name', '_by_folded', '_types', '_categories',
+                 '_metronome_pool')
+
+    def __init__(self, moves):
+        """moves : itérable de PokemonMove avec leur type chargé (select_related)."""
+        moves = list(moves)
+        self._by_id       = {move.pk: move for move in moves}
+        self._by_name     = {}
+        self._by_folded   = {}
+        self._types       = {}
+        self._categories  = {}
+        for move in moves:
+            self._by_name.setdefault(move.name, move)
+            self._by_folded.setdefault(fold_move_name(move.name), move)
+            self._types[move.pk]      = move.type.name if move.type_id else ''
+            self._categories[move.pk] = move.category
+
+        # Un nom introuvable se rabat sur l'autre langue de la paire
+        for names in MOVE_NAME_ALIASES:
+            keys  = [fold_move_name(name) for name in names]
+            found = next((self._by_folded[k] for k in keys if k in self._by_folded), None)
+            if found is not None:
+                for key in keys:
+                    self._by_folded.setdefault(key, found)
+
+        excluded = {self.by_name(STRUGGLE), self.by_name(METRONOME)}
+        self._metronome_pool = tuple(m for m in moves if m not in excluded)
+
+    @classmethod
+    def build(cls):
+        """Construit le catalogue depuis la base (1 requête)."""
+        from .PokemonMove import PokemonMove
+
+        return cls(PokemonMove.objects.select_related('type').order_by('pk'))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def get(self, move_id):
+        """PokemonMove d'id move_id, ou None."""
+        return self._by_id.get(move_id)
+
+    def by_name(self, name):
+        """PokemonMove par nom exact, sinon casefold / autre langue, ou None."""
+        if not name:
+            return None
+        move = self._by_name.get(name)
+        if move is None:
+            move = self._by_folded.get(fold_move_name(name))
+        return move
+
+    def type_name(self, move_id):
+        """Nom du type de la capacité ('' si inconnu)."""
+        return self._types.get(move_id, '')
+
+    def category(self, move_id):
+        """Catégorie de la capacité (physical / special / status), ou None."""
+        return self._categories.get(move_id)
+
+    @property
+    def struggle(self):
+        """Lutte, ou None si absente de la base."""
+        return self.by_name(STRUGGLE)
+
+    @property
+    def metronome_pool(self):
+        """Capacités tirables par Métronome (tout sauf Métronome et Lutte), par id."""
+        return self._metronome_pool
+
+
+# Instance du processus (voir models/ProcessCache.py)
+move_catalogue            = ProcessCache('move_catalogue', MoveCatalogue.build)
+get_move_catalogue        = move_catalogue.get
+invalidate_move_catalogue = move_catalogue.invalidate
@@ -3,7 +3,9 @@
 MoveEffects.py — Architecture orientée objet pour les effets de moves.
 
 Chaque effet hérite de MoveEffect et implémente apply().
-Le registre EFFECT_REGISTRY mappe les chaînes d'effet à leur handler.
+Le registre EFFECT_REGISTRY mappe les chaînes d'effet à leur handler ;
+DAMAGE_EFFECT_REGISTRY couvre les effets de dégâts (drain, recul, multi-coups…)
+et resolve_move_effect() compile les deux en une chaîne par move.
 
 Retour de apply():
     True  → effet entièrement traité, _apply_move_effect doit return.
@@ -229,7 +231,7 @@ class TransformEffect(MoveEffect):
         attacker.special_defense_stage = defender.special_defense_stage
         attacker.speed_stage           = defender.speed_stage
         attacker.save()
-        battle._pstate(attacker)['transformed_into'] = defender.species.name
+        battle._pstate(attacker).transformed_into = defender.species.name
         battle._save_state()
         battle.add_to_log(f"{attacker} se transforme en {defender.species.name} !")
         return True
@@ -243,7 +245,7 @@ class PreventStatLowerEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         side = 'player' if attacker == battle.player_pokemon else 'opponent'
-        battle._bstate()[f'{side}_mist'] = 5
+        battle._bstate().side(side).mist = 5
         battle._save_state()
         battle.add_to_log(f"{attacker} est enveloppé de Brume !")
         return True
@@ -265,8 +267,15 @@ class CureTeamStatusEffect(MoveEffect):
     """Glas Soin / Aromathérapie : guérit tous les Pokémon de l'équipe."""
 
     def apply(self, battle, attacker, defender, move):
-        team = attacker.trainer.pokemon_team.filter(is_in_party=True)
+        team = attacker.trainer.pokemon_team.filter(is_in_party=True).exclude(pk=attacker.pk)
+        # L'attaquant est soigné sur l'instance du combat (et non une copie
+        # fraîche) pour que le commit du tour n'écrase pas la guérison.
+        # Le reste de l'équipe est suivi par la TurnSession : écrit au commit.
+        attacker.cure_status()
+        session = battle._turn_session
         for pkmn in team:
+            if session is not None:
+                session.track(pkmn, moves=False)
             pkmn.cure_status()
         battle.add_to_log("Tous les Pokémon de l'équipe sont guéris !")
         return True
@@ -346,8 +355,9 @@ class BreakBarrierEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         side = 'opponent' if attacker == battle.player_pokemon else 'player'
-        battle._bstate().pop(f'{side}_light_screen', None)
-        battle._bstate().pop(f'{side}_reflect', None)
+        side_state = battle._bstate().side(side)
+        side_state.light_screen = 0
+        side_state.reflect      = 0
         battle._save_state()
         battle.add_to_log("Les écrans adverses sont brisés !")
         return False   # ← continuer pour les dégâts normaux
@@ -401,7 +411,7 @@ class StatBoostEffect(MoveEffect):
 class SubstituteEffect(MoveEffect):
     """
     Substitut : crée un clone (25 % HP max) qui encaisse les dégâts à la place.
-    Le HP du substitut est stocké dans _pstate(pokemon)['substitute_hp'].
+    Le HP du substitut est stocké dans _pstate(pokemon).substitute_hp.
     _apply_damage_to_defender() le consulte en priorité.
     """
 
@@ -412,12 +422,12 @@ class SubstituteEffect(MoveEffect):
                 f"{attacker} n'a pas assez de PV pour créer un Substitut !"
             )
             return True
-        if battle._pstate(attacker).get('substitute_hp', 0) > 0:
+        if battle._pstate(attacker).substitute_hp > 0:
             battle.add_to_log(f"{attacker} a déjà un Substitut !")
             return True
         attacker.current_hp -= cost
         attacker.save()
-        battle._pstate(attacker)['substitute_hp'] = cost
+        battle._pstate(attacker).substitute_hp = cost
         battle._save_state()
         battle.add_to_log(f"{attacker} crée un Substitut ({cost} PV) !")
         return True
@@ -426,20 +436,20 @@ class SubstituteEffect(MoveEffect):
 class EncoreEffect(MoveEffect):
     """
     Encore : force l'adversaire à répéter son dernier move pendant 3 tours.
-    Le dernier move utilisé est tracké dans _pstate(pokemon)['last_move_used'].
+    Le dernier move utilisé est tracké dans _pstate(pokemon).last_move_used.
     """
 
     def apply(self, battle, attacker, defender, move):
         pst       = battle._pstate(defender)
-        last_move = pst.get('last_move_used')
+        last_move = pst.last_move_used
         if not last_move:
             battle.add_to_log(f"Ça n'a aucun effet sur {defender} !")
             return True
-        if pst.get('encore_turns', 0) > 0:
+        if pst.encore_turns > 0:
             battle.add_to_log(f"{defender} est déjà sous l'effet d'Encore !")
             return True
-        pst['encore_move']  = last_move
-        pst['encore_turns'] = 3
+        pst.encore_move  = last_move
+        pst.encore_turns = 3
         battle._save_state()
         battle.add_to_log(f"{defender} doit répéter {last_move} !")
         return True
@@ -453,10 +463,10 @@ class TauntEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         pst = battle._pstate(defender)
-        if pst.get('taunt_turns', 0) > 0:
+        if pst.taunt_turns > 0:
             battle.add_to_log(f"{defender} est déjà sous l'effet de Raillerie !")
             return True
-        pst['taunt_turns'] = 3
+        pst.taunt_turns = 3
         battle._save_state()
         battle.add_to_log(
             f"{defender} est provoqué ! Il ne peut plus utiliser de moves de statut !"
@@ -472,10 +482,10 @@ class TormentEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         pst = battle._pstate(defender)
-        if pst.get('torment'):
+        if pst.torment:
             battle.add_to_log(f"{defender} est déjà sous l'effet de Tourment !")
             return True
-        pst['torment'] = True
+        pst.torment = True
         battle._save_state()
         battle.add_to_log(
             f"{defender} est sous Tourment ! Il ne peut pas répéter le même move !"
@@ -512,11 +522,11 @@ class WishEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         pst = battle._pstate(attacker)
-        if pst.get('wish_turns', 0) > 0:
+        if pst.wish_turns > 0:
             battle.add_to_log("Un Vœu est déjà en cours !")
             return True
-        pst['wish_turns']  = 2
-        pst['wish_amount'] = attacker.max_hp // 2
+        pst.wish_turns  = 2
+        pst.wish_amount = attacker.max_hp // 2
         battle._save_state()
         battle.add_to_log(f"{attacker} fait un Vœu !")
         return True
@@ -530,10 +540,10 @@ class MeanLookEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         pst = battle._pstate(defender)
-        if pst.get('trapped_by_mean_look'):
+        if pst.trapped_by_mean_look:
             battle.add_to_log(f"{defender} ne peut déjà pas s'échapper !")
             return True
-        pst['trapped_by_mean_look'] = True
+        pst.trapped_by_mean_look = True
         battle._save_state()
         battle.add_to_log(f"{defender} ne peut plus s'échapper !")
         return True
@@ -547,12 +557,12 @@ class TrickRoomEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         bs = battle._bstate()
-        if bs.get('trick_room_turns', 0) > 0:
-            bs['trick_room_turns'] = 0
+        if bs.trick_room_turns > 0:
+            bs.trick_room_turns = 0
             battle._save_state()
             battle.add_to_log("La Salle Bizarre retrouve son état normal !")
         else:
-            bs['trick_room_turns'] = 5
+            bs.trick_room_turns = 5
             battle._save_state()
             battle.add_to_log(
                 "La Salle Bizarre est instaurée ! Les Pokémon lents passent en premier !"
@@ -568,7 +578,7 @@ class TailwindEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         side = 'player' if attacker == battle.player_pokemon else 'opponent'
-        battle._bstate()[f'{side}_tailwind'] = 4
+        battle._bstate().side(side).tailwind = 4
         battle._save_state()
         battle.add_to_log(
             f"Le Vent Arrière souffle pour le côté de {attacker} !"
@@ -585,8 +595,8 @@ class PerishSongEffect(MoveEffect):
     def apply(self, battle, attacker, defender, move):
         for pkmn in [attacker, defender]:
             pst = battle._pstate(pkmn)
-            if not pst.get('perish_turns'):
-                pst['perish_turns'] = 3
+            if not pst.perish_turns:
+                pst.perish_turns = 3
         battle._save_state()
         battle.add_to_log(
             "Tous ceux qui ont entendu le Chant du Destin tomberont dans 3 tours !"
@@ -602,12 +612,12 @@ class SpikesEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         side  = 'opponent' if attacker == battle.player_pokemon else 'player'
-        key   = f'{side}_spikes'
-        count = battle._bstate().get(key, 0)
+        side_state = battle._bstate().side(side)
+        count      = side_state.spikes
         if count >= 3:
             battle.add_to_log("Les Picots sont déjà au maximum (3 couches) !")
             return True
-        battle._bstate()[key] = count + 1
+        side_state.spikes = count + 1
         battle._save_state()
         who = "l'adversaire" if side == 'opponent' else "votre équipe"
         battle.add_to_log(
@@ -623,12 +633,12 @@ class ToxicSpikesEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         side  = 'opponent' if attacker == battle.player_pokemon else 'player'
-        key   = f'{side}_toxic_spikes'
-        count = battle._bstate().get(key, 0)
+        side_state = battle._bstate().side(side)
+        count      = side_state.toxic_spikes
         if count >= 2:
             battle.add_to_log("Les Toxipics sont déjà au maximum (2 couches) !")
             return True
-        battle._bstate()[key] = count + 1
+        side_state.toxic_spikes = count + 1
         battle._save_state()
         who = "l'adversaire" if side == 'opponent' else "votre équipe"
         battle.add_to_log(
@@ -644,11 +654,11 @@ class StealthRockEffect(MoveEffect):
 
     def apply(self, battle, attacker, defender, move):
         side = 'opponent' if attacker == battle.player_pokemon else 'player'
-        key  = f'{side}_stealth_rock'
-        if battle._bstate().get(key):
+        side_state = battle._bstate().side(side)
+        if side_state.stealth_rock:
             battle.add_to_log("Le Roc Furtif est déjà en place !")
             return True
-        battle._bstate()[key] = True
+        side_state.stealth_rock = True
         battle._save_state()
         who = "l'adversaire" if side == 'opponent' else "votre équipe"
         battle.add_to_log(f"Des pierres acérées sont posées du côté de {who} !")
@@ -671,7 +681,7 @@ class ConversionEffect(MoveEffect):
         )
         if first_mi and first_mi.move.type:
             new_type = first_mi.move.type
-            battle._pstate(attacker)['converted_type'] = new_type.name
+            battle._pstate(attacker).converted_type = new_type.name
             battle._save_state()
             battle.add_to_log(f"{attacker} devient de type {new_type.name} !")
         else:
@@ -730,6 +740,417 @@ SECONDARY_STAT_EFFECTS: dict[str, list] = {
 }
 
 
+# =============================================================================
+# EFFETS DE DÉGÂTS SPÉCIAUX (ex-chaîne de `if effect == ...` de
+#   Battle._apply_move_effect)
+# =============================================================================
+
+class SelfStatDropAttackEffect(MoveEffect):
+    """Dégâts puis baisse de stats du lanceur (Superpower, Close Combat)."""
+
+    def __init__(self, stats: tuple):
+        self.stats = stats
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        for stat_name in self.stats:
+            battle.modify_stat(attacker, stat_name, -1)
+        return True
+
+
+class OHKOEffect(MoveEffect):
+    """K.O. en un coup (Fissure, Guillotine, Horn Drill)."""
+
+    def apply(self, battle, attacker, defender, move):
+        if attacker.level < defender.level:
+            battle.add_to_log("L'attaque a raté !")
+            return True
+        ohko_acc = 30 + (attacker.level - defender.level)
+        if battle.rng.randint(1, 100) <= ohko_acc:
+            defender.current_hp = 0
+            defender.save()
+            battle.add_to_log("Victoire par KO instantané !")
+        else:
+            battle.add_to_log("L'attaque a raté !")
+        return True
+
+
+class FixedDamageEffect(MoveEffect):
+    """
+    Dégâts fixes (Sonic Boom, Dragon Rage, Night Shade, Super Fang).
+
+    amount : callable(attacker, defender) → dégâts
+    """
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def apply(self, battle, attacker, defender, move):
+        battle._apply_fixed_damage(defender, self.amount(attacker, defender))
+        return True
+
+
+class VariablePowerEffect(MoveEffect):
+    """
+    Puissance recalculée avant les dégâts (Eruption, Façade, Revanche…).
+
+    power : callable(battle, attacker, defender, move) → puissance
+    """
+
+    def __init__(self, power):
+        self.power = power
+
+    def apply(self, battle, attacker, defender, move):
+        power  = self.power(battle, attacker, defender, move)
+        damage = battle._calculate_damage_with_power(attacker, defender, move, power)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        return True
+
+
+class MagnitudeEffect(MoveEffect):
+    """Ampleur : puissance tirée selon la table de magnitude."""
+
+    MAGNITUDES = (
+        (10, 4), (20, 8), (30, 14), (50, 19), (70, 24),
+        (90, 29), (110, 34), (150, 39), (80, 44), (120, 49),
+    )
+
+    def apply(self, battle, attacker, defender, move):
+        r = battle.rng.randint(0, 50)
+        power, mag_level = 70, 7
+        for idx, (p, threshold) in enumerate(self.MAGNITUDES, 1):
+            if r <= threshold:
+                power, mag_level = p, idx
+                break
+        battle.add_to_log(f"Magnitude {mag_level} !")
+        damage = battle._calculate_damage_with_power(attacker, defender, move, power)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        return True
+
+
+class FutureSightEffect(MoveEffect):
+    """Prescience : dégâts calculés maintenant, infligés plus tard."""
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle.set_future_sight(defender, damage)
+        battle.add_to_log(f"{attacker} prédit l'avenir…")
+        return True
+
+
+class TriAttackEffect(MoveEffect):
+    """Tri-Attaque : 20 % de paralysie, brûlure ou gel."""
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        if not defender.is_fainted() and battle.rng.randint(1, 100) <= 20:
+            status = battle.rng.choice(['paralysis', 'burn', 'freeze'])
+            if battle._try_apply_status(defender, status, attacker):
+                battle.add_to_log(f"{defender} est {status} !")
+        return True
+
+
+class DrainEffect(MoveEffect):
+    """Vol de vie (Absorb, Giga Drain…) ; Dévorêve exige une cible endormie."""
+
+    def __init__(self, requires_sleep: bool = False):
+        self.requires_sleep = requires_sleep
+
+    def apply(self, battle, attacker, defender, move):
+        if self.requires_sleep and defender.status_condition != 'sleep':
+            battle.add_to_log(f"{defender} ne dort pas !")
+            return True
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        if damage > 0:
+            healed = max(1, damage // 2)
+            attacker.current_hp = min(attacker.max_hp, attacker.current_hp + healed)
+            attacker.save()
+            battle.add_to_log(f"{attacker} récupère {healed} PV !")
+        return True
+
+
+class RecoilEffect(MoveEffect):
+    """Contrecoup d'un tiers des dégâts (Double-Edge, Flare Blitz…)."""
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        if damage > 0:
+            attk_ability = battle._get_ability(attacker)
+            rock_head = (
+                attk_ability and
+                attk_ability.effect_tag in ('rock_head', 'magic_guard')
+            )
+            if not rock_head:
+                recoil = max(1, damage // 3)
+                attacker.current_hp = max(0, attacker.current_hp - recoil)
+                attacker.save()
+                battle.add_to_log(
+                    f"{attacker} est blessé par le contrecoup ! (-{recoil} PV)"
+                )
+        return True
+
+
+class SelfDestructEffect(MoveEffect):
+    """Destruction / Explosion : le lanceur tombe K.O."""
+
+    def __init__(self, halve_defense: bool = False):
+        self.halve_defense = halve_defense
+
+    def apply(self, battle, attacker, defender, move):
+        if self.halve_defense:
+            orig_def = defender.defense
+            defender.defense = max(1, defender.defense // 2)
+            damage = battle.calculate_damage(attacker, defender, move)
+            defender.defense = orig_def
+        else:
+            damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        attacker.current_hp = 0
+        attacker.save()
+        battle.add_to_log(f"{attacker} s'est sacrifié !")
+        return True
+
+
+class RampageEffect(MoveEffect):
+    """Mania, Colère, Danse-Fleur : 2-3 tours puis confusion."""
+
+    def apply(self, battle, attacker, defender, move):
+        if not battle.is_rampaging(attacker):
+            battle.set_rampage(attacker, move.name)
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        battle.tick_rampage(attacker)
+        return True
+
+
+class RolloutEffect(MoveEffect):
+    """Roulade : puissance doublée à chaque tour consécutif (5 max)."""
+
+    def apply(self, battle, attacker, defender, move):
+        count  = battle.get_rollout_count(attacker)
+        power  = move.power * (2 ** count)
+        damage = battle._calculate_damage_with_power(attacker, defender, move, power)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        if not defender.is_fainted():
+            battle.increment_rollout(attacker)
+            if count >= 4:
+                battle.reset_rollout(attacker)
+        else:
+            battle.reset_rollout(attacker)
+        return True
+
+
+class MultiHitEffect(MoveEffect):
+    """2 à 5 coups (35 / 35 / 15 / 15 %)."""
+
+    def apply(self, battle, attacker, defender, move):
+        r = battle.rng.random()
+        if   r < 0.35: hits = 2
+        elif r < 0.70: hits = 3
+        elif r < 0.85: hits = 4
+        else:           hits = 5
+        total = 0
+        for _ in range(hits):
+            if defender.is_fainted():
+                break
+            dmg = battle.calculate_damage(attacker, defender, move)
+            defender.current_hp = max(0, defender.current_hp - dmg)
+            total += dmg
+        defender.save()
+        battle.add_to_log(f"Touche {hits} fois pour {total} dégâts totaux !")
+        return True
+
+
+class TwoHitEffect(MoveEffect):
+    """Double Pied, Double-Dard : 2 coups + statut éventuel."""
+
+    def apply(self, battle, attacker, defender, move):
+        total = 0
+        for _ in range(2):
+            if defender.is_fainted():
+                break
+            dmg = battle.calculate_damage(attacker, defender, move)
+            defender.current_hp = max(0, defender.current_hp - dmg)
+            total += dmg
+        defender.save()
+        battle.add_to_log(f"Touche 2 fois pour {total} dégâts !")
+        if (move.inflicts_status and
+                battle.rng.randint(1, 100) <= move.effect_chance):
+            if battle._try_apply_status(defender, move.inflicts_status, attacker):
+                battle.add_to_log(f"{defender} est {move.inflicts_status} !")
+        return True
+
+
+class TrapAttackEffect(MoveEffect):
+    """Ligotage, Danse Flamme… : dégâts puis piège."""
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        if not battle.is_trapped(defender):
+            battle.trap_pokemon(defender, move.name)
+            battle.add_to_log(f"{defender} est pris au piège !")
+        return True
+
+
+class RechargeEffect(MoveEffect):
+    """Ultralaser, Giga Impact : recharge au tour suivant."""
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        battle.set_recharge(attacker)
+        battle.add_to_log(f"{attacker} doit se recharger au prochain tour !")
+        return True
+
+
+class SmellingSaltsEffect(MoveEffect):
+    """Stimulant : puissance doublée sur une cible paralysée, qui est guérie."""
+
+    def apply(self, battle, attacker, defender, move):
+        power  = move.power * (2 if defender.status_condition == 'paralysis' else 1)
+        damage = battle._calculate_damage_with_power(attacker, defender, move, power)
+        if defender.status_condition == 'paralysis':
+            defender.status_condition = None
+            defender.save()
+            battle.add_to_log(f"{defender} est guéri de sa paralysie !")
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        return True
+
+
+class BadlyPoisonEffect(MoveEffect):
+    """Poison sévère : Toxik pur ou secondaire (Crochet Venin)."""
+
+    def apply(self, battle, attacker, defender, move):
+        if (move.power or 0) == 0:
+            if battle.rng.randint(1, 100) <= (move.effect_chance or 100):
+                if not defender.status_condition:
+                    defender.status_condition = 'poison'
+                    defender.save()
+                    battle.set_badly_poisoned(defender)
+                    battle.add_to_log(f"{defender} est gravement empoisonné !")
+        else:
+            damage = battle.calculate_damage(attacker, defender, move)
+            battle._apply_damage_to_defender(attacker, defender, move, damage)
+            if (not defender.is_fainted() and
+                    battle.rng.randint(1, 100) <= (move.effect_chance or 100) and
+                    not defender.status_condition):
+                defender.status_condition = 'poison'
+                defender.save()
+                battle.set_badly_poisoned(defender)
+                battle.add_to_log(f"{defender} est gravement empoisonné !")
+        return True
+
+
+class KnockOffEffect(MoveEffect):
+    """Sabotage : dégâts puis retire l'objet tenu."""
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        if getattr(defender, 'held_item', None):
+            item_name = defender.held_item.name
+            defender.held_item = None
+            defender.save()
+            battle.add_to_log(f"{defender} perd son {item_name} !")
+        return True
+
+
+class StruggleEffect(MoveEffect):
+    """Lutte : contrecoup d'un quart des PV max."""
+
+    def apply(self, battle, attacker, defender, move):
+        damage = battle.calculate_damage(attacker, defender, move)
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+        recoil = max(1, attacker.max_hp // 4)
+        attacker.current_hp = max(0, attacker.current_hp - recoil)
+        attacker.save()
+        battle.add_to_log(f"{attacker} souffre du contrecoup ! (-{recoil} PV)")
+        return True
+
+
+# =============================================================================
+# ATTAQUE GÉNÉRIQUE + FALLBACK STATUT
+# =============================================================================
+
+class GenericAttackEffect(MoveEffect):
+    """
+    Attaque sans handler dédié (power > 0) : dégâts, météo, puis effets
+    secondaires (statut, recul, stats) soumis à effect_chance.
+    """
+
+    def apply(self, battle, attacker, defender, move):
+        effect = move.effect or ''
+        damage = battle.calculate_damage(attacker, defender, move)
+
+        # Modificateurs météo
+        if battle.weather == 'sunny':
+            if hasattr(move.type, 'name'):
+                if move.type.name == 'fire':    damage = int(damage * 1.5)
+                elif move.type.name == 'water': damage = int(damage * 0.5)
+        elif battle.weather == 'rain':
+            if hasattr(move.type, 'name'):
+                if move.type.name == 'water':   damage = int(damage * 1.5)
+                elif move.type.name == 'fire':  damage = int(damage * 0.5)
+
+        battle._apply_damage_to_defender(attacker, defender, move, damage)
+
+        if defender.is_fainted():
+            return True
+
+        sheer_force  = battle._pstate(attacker).sheer_force_active
+        serene_grace = battle._pstate(attacker).serene_grace_active
+        if sheer_force:
+            return True
+
+        # Statut secondaire
+        if move.inflicts_status:
+            eff_chance = (move.effect_chance or 0) * (2 if serene_grace else 1)
+            if battle.rng.randint(1, 100) <= eff_chance:
+                if battle._try_apply_status(defender, move.inflicts_status, attacker):
+                    battle.add_to_log(f"{defender} est {move.inflicts_status} !")
+
+        # Flinch secondaire
+        if effect == 'flinch':
+            flinch_chance = (move.effect_chance or 0) * (2 if serene_grace else 1)
+            if battle.rng.randint(1, 100) <= flinch_chance:
+                def_ability = battle._get_ability(defender)
+                if not (def_ability and def_ability.effect_tag == 'inner_focus'):
+                    battle.set_flinched(defender)
+
+        # Effets de stat secondaires (via move.stat_changes JSON)
+        if move.stat_changes:
+            for stat, change in move.stat_changes.items():
+                battle.modify_stat(attacker if change > 0 else defender, stat, change)
+
+        # Effets de stat secondaires via le champ effect
+        if effect in SECONDARY_STAT_EFFECTS:
+            for stat_name, stages, who in SECONDARY_STAT_EFFECTS[effect]:
+                chance = (move.effect_chance or 0) * (2 if serene_grace else 1)
+                if battle.rng.randint(1, 100) <= chance:
+                    target = attacker if who == 'self' else defender
+                    battle.modify_stat(target, stat_name, stages)
+        return True
+
+
+class StatusFallbackEffect(MoveEffect):
+    """Move de statut sans handler reconnu : statut et stat_changes du move."""
+
+    def apply(self, battle, attacker, defender, move):
+        if move.inflicts_status:
+            if battle.rng.randint(1, 100) <= (move.effect_chance or 100):
+                if battle._try_apply_status(defender, move.inflicts_status, attacker):
+                    battle.add_to_log(f"{defender} est {move.inflicts_status} !")
+        if move.stat_changes:
+            for stat, change in move.stat_changes.items():
+                battle.modify_stat(attacker if change > 0 else defender, stat, change)
+        return True
+
+
 # =============================================================================
 # REGISTRE CENTRAL
 # =============================================================================
@@ -845,4 +1266,121 @@ EFFECT_REGISTRY: dict[str, MoveEffect] = {
     'toxic_spikes':  ToxicSpikesEffect(),
     'stealth_rock':  StealthRockEffect(),
     'conversion':    ConversionEffect(),
-}
\ No newline at end of file
+}
+
+
+# Montants et puissances des effets paramétrés (fonctions nommées : les moves
+# gardent leur chaîne résolue et doivent rester picklables pour le simulateur)
+def _damage_20(attacker, defender):       return 20
+def _damage_40(attacker, defender):       return 40
+def _damage_level(attacker, defender):    return attacker.level
+def _damage_half_hp(attacker, defender):  return max(1, defender.current_hp // 2)
+
+
+def _power_hp_scaled(battle, attacker, defender, move):
+    return max(1, int(move.power * attacker.current_hp / attacker.max_hp))
+
+
+def _power_if_statused(battle, attacker, defender, move):
+    return move.power * (2 if attacker.status_condition else 1)
+
+
+def _power_if_hit(battle, attacker, defender, move):
+    return move.power * (2 if battle._pstate(attacker).was_hit_this_turn else 1)
+
+
+#: Effets de dégâts : consultés après EFFECT_REGISTRY (ou à sa place pour
+#: un StatBoostEffect porté par une attaque, voir resolve_move_effect).
+DAMAGE_EFFECT_REGISTRY: dict[str, MoveEffect] = {
+
+    # ── Dégâts + baisse de stats du lanceur ────────────────────────────────────
+    'lower_attack_defense':          SelfStatDropAttackEffect(('attack', 'defense')),
+    'lower_defense_special_defense': SelfStatDropAttackEffect(('defense', 'special_defense')),
+
+    # ── K.O. / dégâts fixes ────────────────────────────────────────────────────
+    'ohko':            OHKOEffect(),
+    'fixed_damage_20': FixedDamageEffect(_damage_20),
+    'fixed_40':        FixedDamageEffect(_damage_40),
+    'level_damage':    FixedDamageEffect(_damage_level),
+    'half_hp':         FixedDamageEffect(_damage_half_hp),
+
+    # ── Puissance variable ─────────────────────────────────────────────────────
+    'more_damage_if_hp':        VariablePowerEffect(_power_hp_scaled),
+    'double_power_if_statused': VariablePowerEffect(_power_if_statused),
+    'double_if_hit':            VariablePowerEffect(_power_if_hit),
+    'double_power_if_hit':      VariablePowerEffect(_power_if_hit),
+    'random_power':        MagnitudeEffect(),
+    'double_if_paralyzed': SmellingSaltsEffect(),
+    'rollout':             RolloutEffect(),
+
+    # ── Dégâts + effet ─────────────────────────────────────────────────────────
+    'future_sight':    FutureSightEffect(),
+    'tri_attack':      TriAttackEffect(),
+    'drain':           DrainEffect(),
+    'drain_sleep':     DrainEffect(requires_sleep=True),
+    'recoil':          RecoilEffect(),
+    'faint_user':      SelfDestructEffect(),
+    'self_destruct':   SelfDestructEffect(halve_defense=True),
+    'rampage':         RampageEffect(),
+    'confusion_after': RampageEffect(),
+    'multi_hit':       MultiHitEffect(),
+    'two_hit':         TwoHitEffect(),
+    'trap':            TrapAttackEffect(),
+    'recharge':        RechargeEffect(),
+    'badly_poison':    BadlyPoisonEffect(),
+    'remove_item':     KnockOffEffect(),
+}
+
+STRUGGLE_EFFECT        = StruggleEffect()
+GENERIC_ATTACK_EFFECT  = GenericAttackEffect()
+STATUS_FALLBACK_EFFECT = StatusFallbackEffect()
+
+
+# =============================================================================
+# DISPATCH COMPILÉ
+# =============================================================================
+#
+# Battle._apply_move_effect exécute la chaîne de handlers résolue pour le move
+# jusqu'au premier apply() qui renvoie True.  Une chaîne compte au plus deux
+# handlers : un pré-traitement éventuel (break_barrier…) puis le handler final
+# (effet de dégâts, Lutte, attaque générique ou fallback statut).
+#
+# Les chaînes sont précalculées pour tous les effets connus dans
+# EFFECT_DISPATCH, indexé par (effect, power > 0, est Lutte) ; un effet inconnu
+# est résolu une fois puis mémorisé.  PokemonMove.effect_chain garde la chaîne
+# résolue sur l'instance : un move utilisé ne coûte qu'une lecture d'attribut.
+
+def _compile_chain(effect: str, has_power: bool, is_struggle: bool) -> tuple:
+    chain = []
+    handler = EFFECT_REGISTRY.get(effect)
+    if handler is not None and not (isinstance(handler, StatBoostEffect) and has_power):
+        chain.append(handler)
+        if isinstance(handler, StatBoostEffect):
+            return tuple(chain)         # move de stat pur : toujours traité
+
+    final = DAMAGE_EFFECT_REGISTRY.get(effect)
+    if final is None:
+        if is_struggle:
+            final = STRUGGLE_EFFECT
+        elif has_power:
+            final = GENERIC_ATTACK_EFFECT
+        else:
+            final = STATUS_FALLBACK_EFFECT
+    chain.append(final)
+    return tuple(chain)
+
+
+EFFECT_DISPATCH: dict[tuple, tuple] = {
+    (effect, has_power, False): _compile_chain(effect, has_power, False)
+    for effect in {'', *EFFECT_REGISTRY, *DAMAGE_EFFECT_REGISTRY}
+    for has_power in (False, True)
+}
+
+
+def resolve_move_effect(move) -> tuple:
+    """Chaîne de handlers du move (voir DISPATCH COMPILÉ)."""
+    key = (move.effect or '', (move.power or 0) > 0, move.name == 'Struggle')
+    chain = EFFECT_DISPATCH.get(key)
+    if chain is None:
+        chain = EFFECT_DISPATCH[key] = _compile_chain(*key)
+    return chain
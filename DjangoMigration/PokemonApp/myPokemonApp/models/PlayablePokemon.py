@@ -202,8 +202,21 @@ class PlayablePokemon(models.Model):
         name = self.nickname or self.species.name
         return f"{name} (Niv. {self.level})"
     
+    # TurnSession active (Battle.execute_turn) : écritures différées au flush.
+    _turn_session = None
+
+    # Pokémon sauvage éphémère (models/WildPokemon.py) : jamais inséré, son
+    # état est sérialisé dans Battle.wild_pokemon ; moves en mémoire.
+    is_ephemeral     = False
+    _ephemeral_moves = None
+
     def save(self, *args, **kwargs):
         """Recalcule les stats avant de sauvegarder"""
+        if self.is_ephemeral:
+            return  # sérialisé avec son combat (Battle.save)
+        if self._turn_session is not None and self._turn_session.defers(self):
+            return  # persisté par TurnSession.commit()
+
         is_new = not self.pk  # Détecter si c'est un nouveau Pokémon
         
         if is_new:  # Nouveau Pokémon
@@ -539,6 +552,19 @@ class PlayablePokemon(models.Model):
         self.sleep_turns = 0
         self.save(update_fields=['status_condition', 'sleep_turns'])
 
+    def move_instances(self):
+        """
+        PokemonMoveInstance du Pokémon, move + type chargés.  Réutilise le
+        prefetch du graphe de combat (Battle.objects.hydrated()) s'il existe.
+        """
+        if self._ephemeral_moves is not None:
+            return list(self._ephemeral_moves)
+        if self.pk is None:
+            return []
+        if 'pokemonmoveinstance_set' in getattr(self, '_prefetched_objects_cache', {}):
+            return list(self.pokemonmoveinstance_set.all())
+        return list(self.pokemonmoveinstance_set.select_related('move', 'move__type'))
+
     def restore_all_pp(self):
         """
         Restaure tous les PP des capacités en une seule requête bulk_update.
@@ -550,12 +576,15 @@ class PlayablePokemon(models.Model):
         if instances:
             PokemonMoveInstance.objects.bulk_update(instances, ['current_pp'])
 
-    def apply_status(self, status):
-        """Applique un statut. N'écrit que les champs statut en base."""
+    def apply_status(self, status, rng=random):
+        """Applique un statut. N'écrit que les champs statut en base.
+
+        rng : générateur du combat (Battle.rng) pour des tirages rejouables.
+        """
         if not self.status_condition:
             self.status_condition = status
             if status == 'sleep':
-                self.sleep_turns = random.randint(1, 3)
+                self.sleep_turns = rng.randint(1, 3)
             self.save(update_fields=['status_condition', 'sleep_turns'])
             return True
         return False
@@ -636,9 +665,22 @@ class PokemonMoveInstance(models.Model):
 
     class Meta:
         unique_together = ['pokemon', 'move']
-    
+
+    # TurnSession active (Battle.execute_turn) : écritures différées au flush.
+    _turn_session = None
+
+    # Move d'un Pokémon sauvage éphémère : jamais sauvegardé (models/WildPokemon.py)
+    is_ephemeral = False
+
     def __str__(self):
         return f"{self.move.name} ({self.current_pp}/{self.move.pp} PP)"
+
+    def save(self, *args, **kwargs):
+        if self.is_ephemeral:
+            return  # sérialisé avec son combat (Battle.save)
+        if self._turn_session is not None and self._turn_session.defers(self):
+            return  # persisté par TurnSession.commit()
+        super().save(*args, **kwargs)
     
     def can_use(self):
         """Vérifie si la capacité peut être utilisée"""
@@ -2,8 +2,11 @@
 """! @brief Pokemon moves model
 """
 
+from functools import cached_property
+
 from django.db import models
 from .PokemonType import PokemonType
+from .MoveEffects import resolve_move_effect
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class PokemonMove(models.Model):
@@ -47,4 +50,16 @@ class PokemonMove(models.Model):
         verbose_name_plural = "Capacités"
     
     def __str__(self):
-        return f"{self.name} ({self.type})"
\ No newline at end of file
+        return f"{self.name} ({self.type})"
+
+    @cached_property
+    def effect_chain(self):
+        """Handlers de l'effet, résolus une fois (voir MoveEffects.resolve_move_effect)."""
+        return resolve_move_effect(self)
+
+    def __getstate__(self):
+        # La chaîne n'est pas picklée : elle est re-résolue vers les handlers
+        # partagés du processus qui dépickle (workers du simulateur)
+        state = super().__getstate__()
+        state.pop('effect_chain', None)
+        return state
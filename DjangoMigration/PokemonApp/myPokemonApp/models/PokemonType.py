@@ -25,9 +25,6 @@ class PokemonType(models.Model):
     
     def get_effectiveness(self, defending_type):
         """Retourne l'efficacité de ce type contre un type défenseur"""
-        if defending_type in self.strong_against.all():
-            return 2.0
-        elif self in defending_type.strong_against.all():
-            return 0.5
-        return 1.0
+        from .TypeChart import get_type_chart
+        return get_type_chart().effectiveness(self.pk, defending_type.pk)
         
\ No newline at end of file
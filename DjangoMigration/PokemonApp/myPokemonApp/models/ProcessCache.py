@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""! @brief ProcessCache.py — Structures de lecture construites une fois par processus.
+
+Table des types, catalogue des capacités, graphe des zones, tables de
+rencontres et index des quêtes suivent le même schéma : un objet immuable
+construit depuis la base au premier accès (double vérification sous verrou),
+partagé par tous les threads du processus et oublié par invalidate().
+
+Chaque module déclare son cache et ses deux fonctions publiques :
+
+    type_chart            = ProcessCache('type_chart', TypeChart.build)
+    get_type_chart        = type_chart.get
+    invalidate_type_chart = type_chart.invalidate
+
+invalidate() a la signature d'un récepteur de signaux Django ; les
+signaux de tous les caches sont connectés depuis une seule table
+dans apps.ready().
+
+Portée : un processus.  Un signal n'est reçu que par le processus qui écrit :
+une modification dans l'admin invalide le cache du worker qui a servi la
+requête, une commande (init_db, loaddata, shell…) seulement le sien.  Les
+autres processus — serveur déjà lancé, autres workers — gardent leur copie
+jusqu'au redémarrage : redémarrer le serveur après init_db, et après toute
+modification des données de référence si plusieurs workers tournent.
+"""
+
+import threading
+
+
+class ProcessCache:
+    """Valeur construite par `builder` au premier get(), oubliée par invalidate()."""
+
+    __slots__ = ('name', '_builder', '_value', '_lock', '__weakref__')   # récepteurs de signaux
+
+    def __init__(self, name, builder):
+        self.name     = name       # préfixe des dispatch_uid de ses signaux
+        self._builder = builder
+        self._value   = None
+        self._lock    = threading.Lock()
+
+    def get(self):
+        """Valeur du processus, construite au premier accès."""
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._builder()
+                value = self._value
+        return value
+
+    def invalidate(self, **kwargs):
+        """Oublie la valeur courante ; elle sera reconstruite au prochain get()."""
+        with self._lock:
+            self._value = None
+
+    def __repr__(self):
+        return f"<ProcessCache {self.name}>"
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""! @brief QuestIndex.py — Index des déclencheurs de quêtes en mémoire.
+
+trigger_quest_event chargeait toutes les quêtes du type d'événement (avec
+leurs prérequis) à chaque visite de zone, victoire ou objet reçu, puis, pour
+chacune : une requête PlayerRival pour les quêtes de rival, get_quest_progress
+(Quest.get + get_or_create) et _prerequisites_met — le tout même si aucune
+quête ne correspondait à l'événement.
+
+L'index est construit une seule fois par processus, en deux requêtes (Quest
+avec son objet de récompense, table des prérequis) :
+
+  - clé (événement, cible) → quêtes candidates, dans l'ordre narratif
+    (order, pk) :
+        ('visit_zone',     zone_id)
+        ('defeat_trainer', trainer_id)
+        ('defeat_gym',     trainer_id)   — None : quêtes génériques (toute arène)
+        ('have_item',      item_id)
+        ('give_item',      item_id)
+        ('story_flag',     flag)
+  - quêtes de rival sans trigger_trainer (résolues par joueur via
+    PlayerRival) à part : rival_quests ;
+  - prérequis et quêtes dépendantes par quête (ids).
+
+Un événement sans quête candidate ne coûte aucune requête.
+
+Les Quest de l'index sont partagées par tout le processus : elles ne doivent
+pas être modifiées.  L'index est invalidé par les signaux connectés dans
+apps.ready() (post_save / post_delete sur Quest et Item, m2m_changed sur les
+prérequis).
+
+Usage :
+    from myPokemonApp.models.QuestIndex import get_quest_index
+    index = get_quest_index()
+    index.candidates('visit_zone', zone.id)   → [Quest, ...]
+    index.prerequisite_ids(quest.pk)         → (quest_pk, ...)
+"""
+
+from .ProcessCache import ProcessCache
+
+
+def trigger_key(quest):
+    """Clé (événement, cible) d'une quête, ou None si elle n'est pas indexée."""
+    event = quest.trigger_type
+    if event == 'visit_zone':
+        return (event, quest.trigger_zone_id) if quest.trigger_zone_id else None
+    if event == 'defeat_trainer':
+        return (event, quest.trigger_trainer_id) if quest.trigger_trainer_id else None
+    if event == 'defeat_gym':
+        return (event, quest.trigger_trainer_id)
+    if event in ('have_item', 'give_item'):
+        return (event, quest.trigger_item_id) if quest.trigger_item_id else None
+    if event == 'story_flag':
+        return (event, quest.trigger_flag) if quest.trigger_flag else None
+    return None
+
+
+class QuestIndex:
+    """Quêtes indexées par déclencheur, prérequis et dépendantes par id."""
+
+    __slots__ = ('_quests', '_rank', '_triggers', '_rivals', '_prerequisites', '_dependents')
+
+    def __init__(self, quests, prerequisites):
+        """
+        quests        : itérable de Quest dans l'ordre narratif (reward_item chargé) ;
+        prerequisites : itérable de (quest_pk, prerequisite_pk).
+        """
+        quests = list(quests)
+        self._quests        = {quest.pk: quest for quest in quests}
+        self._rank          = {quest.pk: rank for rank, quest in enumerate(quests)}
+        self._triggers      = {}
+        self._prerequisites = {}
+        self._dependents    = {}
+
+        for quest in quests:
+            key = trigger_key(quest)
+            if key is not None:
+                self._triggers.setdefault(key, []).append(quest)
+        self._rivals = [quest for quest in quests
+                        if quest.trigger_type == 'defeat_trainer'
+                        and quest.quest_type == 'rival' and not quest.trigger_trainer_id]
+
+        for quest_pk, prerequisite_pk in prerequisites:
+            self._prerequisites.setdefault(quest_pk, []).append(prerequisite_pk)
+            self._dependents.setdefault(prerequisite_pk, []).append(quest_pk)
+
+    @classmethod
+    def build(cls):
+        from .Quest import Quest
+        return cls(
+            Quest.objects.select_related('reward_item').order_by('order', 'pk'),
+            Quest.prerequisite_quests.through.objects.values_list(
+                'from_quest_id', 'to_quest_id'),
+        )
+
+    # ── Lecture ──────────────────────────────────────────────────────────────
+
+    def quest(self, quest_pk):
+        """Quest d'id quest_pk, ou None."""
+        return self._quests.get(quest_pk)
+
+    def candidates(self, event, target):
+        """Quêtes déclenchées par `event` sur `target`, dans l'ordre narratif."""
+        return list(self._triggers.get((event, target), ()))
+
+    def sorted(self, quests):
+        """`quests` dans l'ordre narratif."""
+        return sorted(quests, key=lambda quest: self._rank[quest.pk])
+
+    @property
+    def rival_quests(self):
+        """Quêtes de rival sans trigger_trainer (résolues par joueur)."""
+        return self._rivals
+
+    def prerequisite_ids(self, quest_pk):
+        """Ids des quêtes à compléter avant quest_pk."""
+        return tuple(self._prerequisites.get(quest_pk, ()))
+
+    def dependents(self, quest_pk):
+        """Quêtes dont quest_pk est un prérequis."""
+        return [self._quests[pk] for pk in self._dependents.get(quest_pk, ())]
+
+
+# Instance du processus (voir models/ProcessCache.py)
+quest_index            = ProcessCache('quest_index', QuestIndex.build)
+get_quest_index        = quest_index.get
+invalidate_quest_index = quest_index.invalidate
@@ -60,13 +60,15 @@ class Trainer(models.Model):
 
     # ── IA adversaire — flags Gen 4 (pokeplatinum) ────────────────────────────
     # Valeurs possibles : "basic", "evaluate_attack", "expert", "setup_first_turn",
-    #                     "risky", "prioritize_damage"
+    #                     "risky", "prioritize_damage", "lookahead"
     # Par défaut : dresseur normal = basic + evaluate_attack
-    # Champion d'Arène / boss = basic + evaluate_attack + expert
+    # Rival = basic + evaluate_attack + expert
+    # Champion d'Arène / Conseil 4 / Maître = + lookahead (expectimax)
     AI_FLAG_BASIC            = 'basic'
     AI_FLAG_EVALUATE_ATTACK  = 'evaluate_attack'
     AI_FLAG_EXPERT           = 'expert'
     AI_FLAG_SETUP_FIRST_TURN = 'setup_first_turn'
+    AI_FLAG_LOOKAHEAD        = 'lookahead'   # expectimax (services/ai_lookahead.py)
 
     ai_flags = models.JSONField(
         default=list,
@@ -79,7 +81,9 @@ class Trainer(models.Model):
         flags = set(self.ai_flags or [])
         if not flags:
             # Defaults selon le type de dresseur
-            if self.trainer_type in ('gym_leader', 'elite_four', 'champion', 'rival'):
+            if self.trainer_type in ('gym_leader', 'elite_four', 'champion'):
+                flags = {'basic', 'evaluate_attack', 'expert', 'lookahead'}
+            elif self.trainer_type == 'rival':
                 flags = {'basic', 'evaluate_attack', 'expert'}
             else:
                 flags = {'basic', 'evaluate_attack'}
@@ -374,10 +378,13 @@ class PlayerRival(models.Model):
         if self.trainer_id:
             return self.trainer  # déjà matérialisé
 
-        from myPokemonApp.models import Pokemon, PokemonMove
+        from myPokemonApp.models import Pokemon
+        from myPokemonApp.models.MoveCatalogue import get_move_catalogue
         from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
         import random
 
+        catalogue = get_move_catalogue()
+
         tmpl = self.template
 
         # ── Nom unique par joueur ─────────────────────────────────────────────
@@ -449,16 +456,13 @@ class PlayerRival(models.Model):
             # Moves
             seen = set()
             for move_name in pdata.get('moves', []):
-                try:
-                    move = PokemonMove.objects.get(name=move_name)
-                    if move.id not in seen:
-                        seen.add(move.id)
-                        PokemonMoveInstance.objects.get_or_create(
-                            pokemon=pokemon, move=move,
-                            defaults={'current_pp': move.pp}
-                        )
-                except PokemonMove.DoesNotExist:
-                    pass
+                move = catalogue.by_name(move_name)
+                if move is not None and move.id not in seen:
+                    seen.add(move.id)
+                    PokemonMoveInstance.objects.get_or_create(
+                        pokemon=pokemon, move=move,
+                        defaults={'current_pp': move.pp}
+                    )
 
         # ── Lier et persister ─────────────────────────────────────────────────
         self.trainer = npc
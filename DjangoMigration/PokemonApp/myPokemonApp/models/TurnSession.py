@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+"""! @brief TurnSession.py — Écritures différées pendant un tour de combat.
+
+Un appel à Battle.execute_turn() déclenchait des dizaines d'écritures
+(add_to_log, _save_state, modify_stat, effets de fin de tour…), chacune
+prenant le verrou d'écriture SQLite.  Pendant une TurnSession :
+
+  - Battle.save(), PlayablePokemon.save() et PokemonMoveInstance.save()
+    n'écrivent plus en base pour les instances suivies ;
+  - le Battle, les deux Pokémon actifs et leurs PokemonMoveInstance sont
+    chargés une seule fois et le tour s'exécute sur ces objets Python ; les
+    Pokémon de l'équipe modifiés par un effet sont suivis de la même façon
+    (track(pokemon, moves=False)) et Struggle reste en mémoire ;
+  - commit() persiste tout dans un seul transaction.atomic :
+      1 UPDATE Battle + 1 bulk_create BattleEvent (messages du tour)
+      + 1 bulk_create BattleReplayStep (flux de replay du tour)
+      + 1 bulk_update Pokémon + 1 bulk_update PP.  Un Pokémon sauvage
+      éphémère (models/WildPokemon.py) est écrit avec le Battle.
+
+Avec persist=False (simulations), la session n'écrit jamais rien, y compris
+pour les instances sans pk.
+
+Seuls les champs réellement modifiés sont écrits (diff avec l'état initial
+capturé au moment du suivi).  En cas d'exception, discard() détache les
+instances sans rien écrire : un tour est persisté en entier ou pas du tout.
+
+Usage (géré par Battle.execute_turn) :
+    session = TurnSession(battle)
+    try:
+        ...                       # logique du tour
+    except Exception:
+        session.discard()
+        raise
+    session.commit()
+"""
+
+from django.db import transaction
+
+
+def _field_names(model):
+    """attnames des champs concrets (hors PK) d'un modèle."""
+    return [f.attname for f in model._meta.concrete_fields if not f.primary_key]
+
+
+class TurnSession:
+    """Suit les instances d'un tour et les persiste en une seule transaction."""
+
+    def __init__(self, battle, persist=True):
+        self.battle   = battle
+        self.persist  = persist      # False → simulation : rien n'est jamais écrit
+        self._pokemon = {}           # id(obj) → (obj, snapshot)
+        self._moves   = {}           # (pokemon_pk, move_id) → (mi, current_pp initial)
+
+        battle._turn_session = self
+        for pokemon in (battle.player_pokemon, battle.opponent_pokemon):
+            if pokemon is not None:
+                self.track(pokemon)
+
+    # =========================================================================
+    # SUIVI
+    # =========================================================================
+
+    def track(self, pokemon, moves=True):
+        """
+        Suit un PlayablePokemon (et ses moves) jusqu'à la fin du tour.
+        moves=False : Pokémon hors combat modifié par un effet (équipe soignée
+        par Glas Soin…), seuls ses champs sont suivis.
+        """
+        if pokemon is None or id(pokemon) in self._pokemon:
+            return
+
+        fields = _field_names(type(pokemon))
+        self._pokemon[id(pokemon)] = (
+            pokemon, {name: getattr(pokemon, name) for name in fields}
+        )
+        pokemon._turn_session = self
+
+        if moves:
+            for mi in self._load_move_instances(pokemon):
+                self._register_move_instance(mi)
+
+    def _load_move_instances(self, pokemon):
+        """
+        PokemonMoveInstance du Pokémon (surchargé par les simulations).
+        Aucune requête si le Pokémon vient de Battle.objects.hydrated().
+        """
+        return pokemon.move_instances()
+
+    def defers(self, instance):
+        """True si save() de cette instance doit être différé (ou ignoré)."""
+        return instance.pk is not None or not self.persist
+
+    def _register_move_instance(self, mi):
+        mi._turn_session = self
+        self._moves[(mi.pokemon_id, mi.move_id)] = (mi, mi.current_pp)
+
+    def register_move_instance(self, mi):
+        """Ajoute une PokemonMoveInstance chargée ou créée en cours de tour (Struggle)."""
+        if (mi.pokemon_id, mi.move_id) not in self._moves:
+            self._register_move_instance(mi)
+
+    def get_move_instance(self, pokemon, move):
+        """PokemonMoveInstance déjà chargée pour (pokemon, move), ou None."""
+        entry = self._moves.get((pokemon.pk, move.pk))
+        return entry[0] if entry else None
+
+    def move_instances(self, pokemon):
+        """Toutes les PokemonMoveInstance chargées pour ce Pokémon."""
+        return [mi for (pk, _), (mi, _) in self._moves.items() if pk == pokemon.pk]
+
+    def team(self, pokemon):
+        """Équipe en mémoire de ce Pokémon (simulations), None → lue en base."""
+        return None
+
+    # =========================================================================
+    # FIN DE SESSION
+    # =========================================================================
+
+    def _detach(self):
+        self.battle._turn_session = None
+        for pokemon, _ in self._pokemon.values():
+            pokemon._turn_session = None
+        for mi, _ in self._moves.values():
+            mi._turn_session = None
+
+    def discard(self):
+        """Termine la session sans rien écrire (exception ou simulation)."""
+        self._detach()
+        if self.persist:
+            self.battle._pending_events = None   # messages d'un tour avorté
+            self.battle._pending_steps  = None
+
+    def commit(self):
+        """Détache les instances puis écrit tous les changements du tour."""
+        self._detach()
+        if not self.persist:
+            return
+
+        from .PlayablePokemon import PlayablePokemon, PokemonMoveInstance
+
+        dirty_pokemon, changed_fields = [], set()
+        for pokemon, snapshot in self._pokemon.values():
+            if pokemon.pk is None or pokemon.is_ephemeral:
+                continue   # sauvage éphémère : sérialisé par battle.save()
+            changed = {name for name, old in snapshot.items()
+                       if getattr(pokemon, name) != old}
+            if changed:
+                dirty_pokemon.append(pokemon)
+                changed_fields |= changed
+
+        dirty_moves = [mi for mi, pp in self._moves.values()
+                       if mi.pk is not None and mi.current_pp != pp]
+
+        # battle_log (JSON historique) n'est jamais réécrit : le journal
+        # du tour part dans BattleEvent.  state_version n'avance que par
+        # l'UPDATE atomique de battle_action_lock ; served_state est écrit
+        # par apply_state_version.
+        battle_fields = [name for name in _field_names(type(self.battle))
+                         if name not in ('battle_log', 'state_version', 'served_state')]
+
+        with transaction.atomic():
+            self.battle.save(update_fields=battle_fields)
+            self.battle.flush_log()
+            self.battle.flush_replay()
+            if dirty_pokemon:
+                PlayablePokemon.objects.bulk_update(
+                    dirty_pokemon, sorted(changed_fields)
+                )
+            if dirty_moves:
+                PokemonMoveInstance.objects.bulk_update(dirty_moves, ['current_pp'])
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""! @brief TypeChart.py — Table des efficacités de types précalculée.
+
+PokemonType.get_effectiveness() interrogeait la relation strong_against à
+chaque appel (2 requêtes), et le moteur de combat l'appelle plusieurs fois
+par capacité et par tour (dégâts, logs, flags IA…).
+
+La table est désormais construite une seule fois par processus, en deux
+requêtes, sous forme d'un tableau plat N×N indexé par l'id des types :
+
+  - 2.0 si l'attaquant est strong_against le défenseur ;
+  - 0.5 si le défenseur est strong_against l'attaquant ;
+  - 0.0 pour les immunités (IMMUNITIES, par nom de type) ;
+  - 1.0 sinon.
+
+Les lookups sont purs (aucune requête).  La table est invalidée par les
+signaux connectés dans apps.ready() (m2m_changed sur strong_against,
+post_save / post_delete sur PokemonType), dans le seul processus qui modifie
+les types : init_db ne met pas à jour un serveur déjà lancé, qu'il faut
+redémarrer ensuite (voir models/ProcessCache.py).
+
+Usage :
+    from myPokemonApp.models.TypeChart import get_type_chart
+    mult = get_type_chart().multiplier(move.type_id, species.primary_type_id,
+                                       species.secondary_type_id)
+"""
+
+from array import array
+
+from .ProcessCache import ProcessCache
+
+
+# Immunités explicites (type attaquant → types défenseurs immunisés).
+# La relation strong_against ne sait pas représenter un multiplicateur 0.
+IMMUNITIES = {
+    'normal':   ('ghost',),
+    'fighting': ('ghost',),
+    'poison':   ('steel',),
+    'ground':   ('flying',),
+    'electric': ('ground',),
+    'psychic':  ('dark',),
+    'ghost':    ('normal',),
+    'dragon':   ('fairy',),
+}
+
+
+class TypeChart:
+    """Table immuable des multiplicateurs de type, indexée par id de type."""
+
+    __slots__ = ('_index', '_ids_by_name', '_size', '_matrix')
+
+    def __init__(self, type_rows, strong_pairs):
+        """
+        type_rows    : itérable de (id, name)
+        strong_pairs : itérable de (attacking_id, defending_id)
+        """
+        type_rows = list(type_rows)
+        self._index       = {type_id: i for i, (type_id, _) in enumerate(type_rows)}
+        self._ids_by_name = {name.lower(): type_id for type_id, name in type_rows}
+        self._size        = n = len(type_rows)
+        matrix            = array('f', [1.0]) * (n * n)
+
+        strong = list(strong_pairs)
+        for atk_id, def_id in strong:
+            matrix[self._index[def_id] * n + self._index[atk_id]] = 0.5
+        # L'avantage de l'attaquant prime (ex. Dragon → Dragon)
+        for atk_id, def_id in strong:
+            matrix[self._index[atk_id] * n + self._index[def_id]] = 2.0
+
+        for atk_name, immune_names in IMMUNITIES.items():
+            atk_id = self._ids_by_name.get(atk_name)
+            if atk_id is None:
+                continue
+            for def_name in immune_names:
+                def_id = self._ids_by_name.get(def_name)
+                if def_id is not None:
+                    matrix[self._index[atk_id] * n + self._index[def_id]] = 0.0
+
+        self._matrix = matrix
+
+    @classmethod
+    def build(cls):
+        """Construit la table depuis la base (2 requêtes)."""
+        from .PokemonType import PokemonType
+
+        through = PokemonType.strong_against.through
+        return cls(
+            PokemonType.objects.order_by('pk').values_list('pk', 'name'),
+            through.objects.values_list('from_pokemontype_id', 'to_pokemontype_id'),
+        )
+
+    def effectiveness(self, attacking_id, defending_id):
+        """Multiplicateur d'un type attaquant contre un type défenseur."""
+        i = self._index.get(attacking_id)
+        j = self._index.get(defending_id)
+        if i is None or j is None:
+            return 1.0
+        return self._matrix[i * self._size + j]
+
+    def multiplier(self, attacking_id, primary_id, secondary_id=None):
+        """Multiplicateur total contre un défenseur mono- ou double-type."""
+        mult = self.effectiveness(attacking_id, primary_id)
+        if secondary_id is not None:
+            mult *= self.effectiveness(attacking_id, secondary_id)
+        return mult
+
+    def type_id(self, name):
+        """Id du type portant ce nom (insensible à la casse), ou None."""
+        return self._ids_by_name.get(name.lower())
+
+
+# Instance du processus (voir models/ProcessCache.py)
+type_chart            = ProcessCache('type_chart', TypeChart.build)
+get_type_chart        = type_chart.get
+invalidate_type_chart = type_chart.invalidate
@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+"""! @brief WildPokemon.py — Pokémon sauvages éphémères, insérés seulement à la capture.
+
+Chaque rencontre sauvage insérait un PlayablePokemon (stats, learnset, un
+get_or_create par move, rattaché au dresseur « Wild ») puis, à la rencontre
+suivante, cleanup_orphan_wild_pokemon() le supprimait par un scan DELETE :
+presque toutes ces lignes ne vivaient que le temps d'un combat.
+
+Un Pokémon sauvage est désormais un PlayablePokemon en mémoire :
+
+  - is_ephemeral = True et pk = WILD_POKEMON_PK (négatif, comme les Pokémon
+    des simulations) : identity map, état volatil, TurnSession, IA et
+    sérialiseurs le traitent comme n'importe quel Pokémon ;
+  - ses PokemonMoveInstance sont en mémoire (PlayablePokemon.move_instances) ;
+  - save() n'écrit jamais : son état est sérialisé dans Battle.wild_pokemon à
+    chaque sauvegarde du combat.  Battle.opponent_pokemon_id reste NULL mais
+    battle.opponent_pokemon retourne le Pokémon sauvage ;
+  - la ligne PlayablePokemon n'est insérée qu'à la capture
+    (persist_wild_pokemon).
+
+Format de Battle.wild_pokemon :
+    {'fields': {attname: valeur, ...}, 'moves': [[move_id, pp, source], ...]}
+
+Usage :
+    wild = create_wild_pokemon(species, level)       # services/pokemon_factory
+    battle, msg = start_battle(trainer, wild_pokemon=wild)
+    captured = persist_wild_pokemon(battle.opponent_pokemon, trainer=trainer)
+"""
+
+# pk du Pokémon sauvage dans son combat (aucune ligne PlayablePokemon)
+WILD_POKEMON_PK = -1
+
+
+def _field_names():
+    """attnames des champs concrets (hors PK) de PlayablePokemon."""
+    from .PlayablePokemon import PlayablePokemon
+    return [f.attname for f in PlayablePokemon._meta.concrete_fields if not f.primary_key]
+
+
+def ephemeral_move(pokemon, move, current_pp, source='level'):
+    """PokemonMoveInstance en mémoire d'un Pokémon éphémère (jamais sauvegardée)."""
+    from .PlayablePokemon import PokemonMoveInstance
+    move_instance = PokemonMoveInstance(pokemon=pokemon, move=move,
+                                        current_pp=current_pp, source=source)
+    move_instance.is_ephemeral = True
+    return move_instance
+
+
+def make_ephemeral(pokemon, moves):
+    """
+    Fait d'un PlayablePokemon non sauvegardé un Pokémon sauvage éphémère.
+    moves : [(PokemonMove, pp)].
+    """
+    pokemon.pk           = WILD_POKEMON_PK
+    pokemon.is_ephemeral = True
+    pokemon._ephemeral_moves = [ephemeral_move(pokemon, move, pp) for move, pp in moves]
+    return pokemon
+
+
+# =============================================================================
+# SÉRIALISATION (Battle.wild_pokemon)
+# =============================================================================
+
+def encode_wild_pokemon(pokemon):
+    """État complet d'un Pokémon éphémère → dict JSON."""
+    return {
+        'fields': {name: getattr(pokemon, name) for name in _field_names()},
+        'moves':  [[mi.move_id, mi.current_pp, mi.source]
+                   for mi in pokemon.move_instances()],
+    }
+
+
+def load_wild_state(pokemon, data):
+    """Recopie un état sérialisé dans `pokemon` (moves via le catalogue, sans requête)."""
+    from .MoveCatalogue import get_move_catalogue
+
+    for name, value in data['fields'].items():
+        setattr(pokemon, name, value)
+    catalogue = get_move_catalogue()
+    pokemon._ephemeral_moves = [
+        ephemeral_move(pokemon, move, pp, source)
+        for move, pp, source in ((catalogue.get(move_id), pp, source)
+                                 for move_id, pp, source in data['moves'])
+        if move is not None
+    ]
+
+
+def hydrate_wild_opponents(battles):
+    """
+    Matérialise le Pokémon sauvage éphémère des combats qui en ont un :
+    espèces (+ types), talents et objets tenus en une requête chacun, quel
+    que soit le nombre de combats.
+    """
+    from .Ability import Ability
+    from .Item import Item
+    from .PlayablePokemon import PlayablePokemon
+    from .Pokemon import Pokemon
+
+    pending = [battle for battle in battles
+               if battle._wild is None and battle.opponent_pokemon_id is None
+               and battle.wild_pokemon]
+    if not pending:
+        return
+    fields = [battle.wild_pokemon['fields'] for battle in pending]
+
+    def related(queryset, attname):
+        ids = {f[attname] for f in fields if f.get(attname) is not None}
+        return queryset.in_bulk(ids) if ids else {}
+
+    species   = related(Pokemon.objects.select_related('primary_type', 'secondary_type'),
+                        'species_id')
+    abilities = related(Ability.objects, 'ability_id')
+    items     = related(Item.objects, 'held_item_id')
+
+    for battle, data in zip(pending, fields):
+        wild = PlayablePokemon(pk=WILD_POKEMON_PK)
+        wild.is_ephemeral = True
+        load_wild_state(wild, battle.wild_pokemon)
+        wild.species   = species[data['species_id']]
+        wild.ability   = abilities.get(data.get('ability_id'))
+        wild.held_item = items.get(data.get('held_item_id'))
+        battle._wild   = wild
+
+
+# =============================================================================
+# CAPTURE
+# =============================================================================
+
+def persist_wild_pokemon(pokemon, **changes):
+    """
+    Ligne PlayablePokemon du Pokémon sauvage capturé, `changes` appliqués
+    (dresseur, ball, place dans l'équipe…).
+
+    Pokémon éphémère : insertion d'une nouvelle ligne (IVs, EVs, nature,
+    talent et PP conservés) et de ses moves en un bulk_create ; `pokemon`
+    lui-même reste inchangé.  Pokémon sauvage déjà en base (combats créés
+    avant les Pokémon éphémères) : mis à jour en place.
+    """
+    from .PlayablePokemon import PlayablePokemon, PokemonMoveInstance
+
+    if not pokemon.is_ephemeral:
+        for name, value in changes.items():
+            setattr(pokemon, name, value)
+        pokemon.save()
+        return pokemon
+
+    row = PlayablePokemon(**{name: getattr(pokemon, name) for name in _field_names()})
+    row.species = pokemon.species
+    for name, value in changes.items():
+        setattr(row, name, value)
+    row._skip_learn_moves = True
+    row.save()
+    PokemonMoveInstance.objects.bulk_create([
+        PokemonMoveInstance(pokemon=row, move=mi.move,
+                            current_pp=mi.current_pp, source=mi.source)
+        for mi in pokemon.move_instances()
+    ])
+    return row
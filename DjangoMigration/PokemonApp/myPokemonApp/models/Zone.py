@@ -88,13 +88,14 @@ class Zone(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_zone_type_display()})"
     
-    def is_accessible_by(self, trainer):
+    def is_accessible_by(self, trainer, caps=None):
         """
         Vérifie si le trainer peut accéder à cette zone.
         Délègue au QuestEngine (badge + item + CS + flags + quête).
+        caps : TrainerCapabilities déjà construit (évaluation en lot, sans requête).
         """
         from myPokemonApp.questEngine import can_access_zone
-        return can_access_zone(trainer, self)
+        return can_access_zone(trainer, self, caps)
 
 
 class ZoneConnection(models.Model):
@@ -145,23 +146,10 @@ class ZoneConnection(models.Model):
         arrow = "↔" if self.is_bidirectional else "→"
         return f"{self.from_zone.name} {arrow} {self.to_zone.name}"
 
-    def is_passable_by(self, trainer) -> tuple:
-        """Retourne (bool, message)."""
-        from myPokemonApp.questEngine import trainer_has_hm, _get_save, HM_MOVE_NAMES
-
-        if self.required_hm:
-            if not trainer_has_hm(trainer, self.required_hm):
-                move_label = HM_MOVE_NAMES.get(self.required_hm, (self.required_hm,))[0]
-                msg = self.passage_message or f"CS {move_label} requise pour passer."
-                return False, msg
-
-        if self.required_flag:
-            save = _get_save(trainer)
-            if not (save and save.story_flags.get(self.required_flag)):
-                msg = self.passage_message or "Ce passage est bloqué."
-                return False, msg
-
-        return True, 'OK'
+    def is_passable_by(self, trainer, caps=None) -> tuple:
+        """Retourne (bool, message).  caps : voir Zone.is_accessible_by."""
+        from myPokemonApp.questEngine import can_pass_connection
+        return can_pass_connection(trainer, self, caps)
 
 
 class WildPokemonSpawn(models.Model):
@@ -242,23 +230,12 @@ class PlayerLocation(models.Model):
         return f"{self.trainer.username} @ {self.current_zone.name}"
     
     def can_travel_to(self, zone):
-        """Vérifie si le joueur peut voyager vers une zone"""
-        
-        # Vérifier connexion
-        connection = ZoneConnection.objects.filter(
-            from_zone=self.current_zone,
-            to_zone=zone
-        ).first()
+        """Vérifie si le joueur peut voyager vers une zone (graphe en mémoire)."""
+        from .ZoneGraph import get_zone_graph
 
+        connection = get_zone_graph().connection(self.current_zone_id, zone.pk)
         if not connection:
-            # Vérifier bidirectionnel
-            connection = ZoneConnection.objects.filter(
-                from_zone=zone,
-                to_zone=self.current_zone,
-                is_bidirectional=True
-            ).first()
-            if not connection:
-                return False, "Zone non connectée"
+            return False, "Zone non connectée"
 
         # Vérifier si le passage lui-même est praticable (CS, flag)
         passable, reason = connection.is_passable_by(self.trainer)
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""! @brief ZoneGraph.py — Graphe des zones (listes d'adjacence) en mémoire.
+
+Les vues de la carte interrogeaient ZoneConnection connexion par connexion :
+voisins de la zone courante (deux requêtes), can_travel_to (jusqu'à deux
+requêtes), ville parente d'une arène et arène d'une ville (même couple de
+requêtes répété dans map_view, zone_detail_view, battle_challenge_gym_view).
+
+Le graphe est construit une seule fois par processus, en deux requêtes
+(Zone avec ses FK d'accès, ZoneConnection) :
+
+  - une arête par sens praticable : une connexion bidirectionnelle A ↔ B
+    donne A → B et B → A.  Si les deux sens existent en base, la ligne
+    partant de la zone l'emporte (même priorité que can_travel_to) ;
+  - chaque arête porte sa ZoneConnection (required_hm, required_flag,
+    passage_message) ;
+  - route(caps, départ, arrivée) : plus court chemin (BFS, en nombre de
+    passages) n'empruntant que des passages praticables vers des zones
+    accessibles pour le dresseur (questEngine.TrainerCapabilities).
+
+Les Zone et ZoneConnection du graphe sont partagées par tout le processus :
+elles ne doivent pas être modifiées.  Le graphe est invalidé par les signaux
+connectés dans apps.ready() (post_save / post_delete sur Zone et
+ZoneConnection).
+
+Usage :
+    from myPokemonApp.models.ZoneGraph import get_zone_graph
+    graph = get_zone_graph()
+    graph.neighbour_ids(zone.id)
+    graph.route(caps, current_zone.id, target.id)   → [Zone, ...] | None
+"""
+
+from collections import deque
+
+from .ProcessCache import ProcessCache
+
+
+def is_arena(zone):
+    """Zone d'arène (bâtiment « Arène de … »)."""
+    return zone.zone_type == 'building' and zone.name.startswith('Arène')
+
+
+class ZoneGraph:
+    """Zones et connexions indexées par id (listes d'adjacence)."""
+
+    __slots__ = ('_zones', '_edges', '_linked')
+
+    def __init__(self, zones, connections):
+        """
+        zones       : itérable de Zone (required_badge / item / quest chargés) ;
+        connections : itérable de ZoneConnection.
+        """
+        self._zones  = {zone.pk: zone for zone in zones}
+        self._edges  = {zone_id: {} for zone_id in self._zones}   # from → {to: conn}
+        self._linked = {zone_id: [] for zone_id in self._zones}   # toutes lignes, 2 sens
+        connections  = list(connections)
+
+        for conn in connections:
+            self._edges[conn.from_zone_id][conn.to_zone_id] = conn
+            self._linked[conn.from_zone_id].append(conn.to_zone_id)
+            self._linked[conn.to_zone_id].append(conn.from_zone_id)
+        for conn in connections:
+            if conn.is_bidirectional:
+                self._edges[conn.to_zone_id].setdefault(conn.from_zone_id, conn)
+
+    @classmethod
+    def build(cls):
+        from .Zone import Zone, ZoneConnection
+        return cls(
+            Zone.objects.select_related('required_badge', 'required_item', 'required_quest'),
+            ZoneConnection.objects.order_by('pk'),
+        )
+
+    # ── Lecture ──────────────────────────────────────────────────────────────
+
+    def zone(self, zone_id):
+        """Zone d'id zone_id, ou None."""
+        return self._zones.get(zone_id)
+
+    def neighbours(self, zone_id):
+        """[(zone voisine, ZoneConnection)] atteignables depuis zone_id."""
+        return [(self._zones[to_id], conn)
+                for to_id, conn in self._edges.get(zone_id, {}).items()]
+
+    def neighbour_ids(self, zone_id):
+        """Ids des zones atteignables en un passage depuis zone_id."""
+        return set(self._edges.get(zone_id, ()))
+
+    def connection(self, from_id, to_id):
+        """ZoneConnection empruntée pour aller de from_id à to_id, ou None."""
+        return self._edges.get(from_id, {}).get(to_id)
+
+    def connections(self):
+        """Toutes les ZoneConnection (une fois chacune)."""
+        seen = {}
+        for edges in self._edges.values():
+            for conn in edges.values():
+                seen.setdefault(conn.pk, conn)
+        return list(seen.values())
+
+    def parent_city(self, zone_id):
+        """Ville reliée à une arène (dans un sens ou l'autre), ou None."""
+        return next((self._zones[other] for other in self._linked.get(zone_id, ())
+                     if self._zones[other].zone_type == 'city'), None)
+
+    def arena_of(self, city_id):
+        """Zone d'arène atteignable depuis une ville, ou None."""
+        return next((zone for zone, _ in self.neighbours(city_id) if is_arena(zone)), None)
+
+    # ── Itinéraire ───────────────────────────────────────────────────────────
+
+    def route(self, caps, from_id, to_id):
+        """
+        Plus court chemin de from_id à to_id pour un dresseur : liste des Zone
+        traversées (départ exclu, arrivée incluse), [] si déjà sur place,
+        None si aucun chemin praticable.
+
+        Un passage est emprunté si caps.connection_access(conn) l'autorise et
+        si la zone d'arrivée est accessible (caps.zone_access), comme pour un
+        voyage d'une zone à l'autre (PlayerLocation.can_travel_to).
+        """
+        if from_id == to_id:
+            return []
+        access = {}
+
+        def reachable(zone_id, conn):
+            if zone_id not in access:
+                access[zone_id] = caps.zone_access(self._zones[zone_id])[0]
+            return access[zone_id] and caps.connection_access(conn)[0]
+
+        previous = {from_id: None}
+        queue    = deque([from_id])
+        while queue:
+            current = queue.popleft()
+            for next_id, conn in self._edges.get(current, {}).items():
+                if next_id in previous or not reachable(next_id, conn):
+                    continue
+                previous[next_id] = current
+                if next_id == to_id:
+                    path = []
+                    while next_id != from_id:
+                        path.append(self._zones[next_id])
+                        next_id = previous[next_id]
+                    return path[::-1]
+                queue.append(next_id)
+        return None
+
+
+# Instance du processus (voir models/ProcessCache.py)
+zone_graph            = ProcessCache('zone_graph', ZoneGraph.build)
+get_zone_graph        = zone_graph.get
+invalidate_zone_graph = zone_graph.invalidate
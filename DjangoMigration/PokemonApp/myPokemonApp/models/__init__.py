@@ -15,6 +15,10 @@ from .PokemonLearnableMove import PokemonLearnableMove
 from .PokemonEvolution import PokemonEvolution
 from .Item import Item
 from .Battle import Battle
+from .BattleEvent import BattleEvent
+from .BattleReplayStep import BattleReplayStep
+from .BattleActionReceipt import BattleActionReceipt
+from .BattleArchive import BattleArchive
 from .ShopModel import Shop, ShopInventory, Transaction
 from .PokemonCenter import PokemonCenter, CenterVisit, NurseDialogue
 from .CaptureSystem import *
@@ -5,7 +5,10 @@ API publique :
     get_quest_progress(trainer, quest_id)   → QuestProgress (crée si absent)
     complete_quest(trainer, quest_id)       → dict résultat
     trigger_quest_event(trainer, event, **ctx) → list[dict] notifications
-    can_access_zone(trainer, zone)          → (bool, str)
+    can_access_zone(trainer, zone, caps=None) → (bool, str)
+    can_pass_connection(trainer, conn, caps=None) → (bool, str)
+    evaluate_zone_access(trainer, zones, caps=None) → {zone_id: (bool, str)}
+    TrainerCapabilities.build(trainer)      → snapshot (requêtes fixes)
     can_access_floor(trainer, floor)        → (bool, str)
     get_active_quests(trainer)              → QuerySet[QuestProgress]
     get_quest_log(trainer)                  → dict groupé par état
@@ -160,19 +163,20 @@ def complete_quest(trainer, quest_id: str) -> dict:
     Marque une quête comme complétée et applique les récompenses.
     Retourne un dict de notification (titre, récompenses, nouvelles quêtes).
     """
-    from myPokemonApp.models import Quest, QuestProgress
-
     progress = get_quest_progress(trainer, quest_id)
     if not progress or progress.state == 'completed':
         return {'already_done': True}
+    return _complete(trainer, progress.quest, progress)
+
 
-    quest = progress.quest
+def _complete(trainer, quest, progress) -> dict:
+    """Complétion d'une quête dont le QuestProgress est déjà chargé."""
     newly_done = progress.complete()
     if not newly_done:
         return {'error': 'impossible de compléter'}
 
     result = {
-        'quest_id':    quest_id,
+        'quest_id':    quest.quest_id,
         'title':       quest.title,
         'reward_money': 0,
         'reward_item':  None,
@@ -191,18 +195,19 @@ def complete_quest(trainer, quest_id: str) -> dict:
         result['reward_item'] = quest.reward_item.name
 
     # Story flag
-    save = _get_save(trainer)
-    if save and quest.reward_flag:
-        save.story_flags[quest.reward_flag] = True
-        save.save(update_fields=['story_flags'])
+    if quest.reward_flag:
+        save = _get_save(trainer)
+        if save:
+            save.story_flags[quest.reward_flag] = True
+            save.save(update_fields=['story_flags'])
 
     # Débloquer les quêtes suivantes
     _unlock_dependent_quests(trainer, quest)
 
     # ── Hooks post-complétion spécifiques ─────────────────────────────────────
-    _post_complete_hooks(trainer, quest_id, result)
+    _post_complete_hooks(trainer, quest.quest_id, result)
 
-    logger.info("Quest completed: %s for trainer %s", quest_id, trainer.username)
+    logger.info("Quest completed: %s for trainer %s", quest.quest_id, trainer.username)
     return result
 
 
@@ -237,15 +242,71 @@ def _post_complete_hooks(trainer, quest_id: str, result: dict):
 
 def _unlock_dependent_quests(trainer, completed_quest):
     """Passe en 'available' les quêtes qui attendaient cette quête."""
-    from myPokemonApp.models import Quest, QuestProgress
-    dependents = Quest.objects.filter(prerequisite_quests=completed_quest)
+    from myPokemonApp.models.QuestIndex import get_quest_index
+    index      = get_quest_index()
+    dependents = index.dependents(completed_quest.pk)
+    if not dependents:
+        return
+    progress_map = getattr(trainer, '_quest_progress', None) or _QuestProgressMap(trainer, index)
     for dep in dependents:
-        if _prerequisites_met(trainer, dep):
-            QuestProgress.objects.update_or_create(
-                trainer=trainer,
-                quest=dep,
-                defaults={'state': 'available'},
+        if progress_map.prerequisites_met(dep):
+            progress_map.make_available(dep)
+
+
+class _QuestProgressMap:
+    """
+    Progression d'un dresseur sur toutes les quêtes, chargée en une requête
+    ({quest_pk: QuestProgress}) ; prérequis lus dans l'index des quêtes.
+
+    Pendant trigger_quest_event, la carte est attachée au dresseur
+    (trainer._quest_progress) : les appels imbriqués (hooks post-complétion →
+    set_story_flag_and_trigger) la partagent et voient les mêmes états.
+    """
+
+    def __init__(self, trainer, index):
+        from myPokemonApp.models import QuestProgress
+        self.trainer   = trainer
+        self.index     = index
+        self._progress = {p.quest_id: p for p in QuestProgress.objects.filter(trainer=trainer)}
+
+    def _state(self, quest_pk):
+        progress = self._progress.get(quest_pk)
+        return progress.state if progress else None
+
+    def prerequisites_met(self, quest) -> bool:
+        """Tous les prérequis de la quête sont-ils complétés ?"""
+        return all(self._state(pk) == 'completed'
+                   for pk in self.index.prerequisite_ids(quest.pk))
+
+    def get(self, quest):
+        """
+        QuestProgress de la quête (créé si absent), état initial recalculé
+        comme dans get_quest_progress (locked vs available).
+        """
+        from myPokemonApp.models import QuestProgress
+        progress = self._progress.get(quest.pk)
+        if progress is None:
+            progress, _ = QuestProgress.objects.get_or_create(
+                trainer=self.trainer, quest=quest,
+                defaults={'state': 'available' if self.prerequisites_met(quest) else 'locked'},
             )
+            self._progress[quest.pk] = progress
+        elif progress.state == 'locked' and self.prerequisites_met(quest):
+            progress.state = 'available'
+            progress.save(update_fields=['state'])
+        progress.quest = quest
+        return progress
+
+    def make_available(self, quest):
+        """Équivalent de update_or_create(defaults={'state': 'available'})."""
+        from myPokemonApp.models import QuestProgress
+        progress = self._progress.get(quest.pk)
+        if progress is None:
+            self._progress[quest.pk] = QuestProgress.objects.create(
+                trainer=self.trainer, quest=quest, state='available')
+        elif progress.state != 'available':
+            progress.state = 'available'
+            progress.save(update_fields=['state'])
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -258,109 +319,232 @@ def trigger_quest_event(trainer, event: str, **ctx) -> list:
 
     event : 'visit_zone' | 'defeat_trainer' | 'defeat_gym' | 'have_item' | 'give_item'
     ctx   : données contextuelles (zone=, trainer_id=, gym_leader=, item=, …)
+            defeat_trainer : trainer_type= (type du dresseur battu) évite la
+            requête PlayerRival quand ce n'est pas un rival.
+
+    Les quêtes candidates viennent de l'index en mémoire (models/QuestIndex.py) :
+    aucune requête si l'événement ne déclenche rien ; sinon, une requête pour
+    la progression du dresseur puis les écritures des seules quêtes candidates.
 
     Retourne une liste de dicts de notifications pour les quêtes complétées.
     """
-    from myPokemonApp.models import Quest, QuestProgress
-
-    notifications = []
-
-    quests = Quest.objects.filter(trigger_type=event).prefetch_related('prerequisite_quests')
-
-    for quest in quests:
-        # Vérifier si cette quête est pertinente pour l'événement
-        if not _event_matches_quest(quest, event, ctx):
-            continue
-
-        progress = get_quest_progress(trainer, quest.quest_id)
-        if not progress or progress.state == 'completed':
-            continue
+    from myPokemonApp.models.QuestIndex import get_quest_index
 
-        # S'assurer que les prérequis sont OK
-        if not _prerequisites_met(trainer, quest):
-            continue
+    index  = get_quest_index()
+    quests = _candidate_quests(index, event, ctx)
+    if not quests:
+        return []
 
-        # Démarrer si pas encore active
-        if progress.state == 'available':
-            progress.start()
+    progress_map = getattr(trainer, '_quest_progress', None)
+    owner = progress_map is None
+    if owner:
+        progress_map = trainer._quest_progress = _QuestProgressMap(trainer, index)
 
-        # Compléter
-        result = complete_quest(trainer, quest.quest_id)
-        if result.get('newly_completed'):
-            notifications.append(result)
+    notifications = []
+    try:
+        for quest in quests:
+            progress = progress_map.get(quest)
+            if progress.state == 'completed':
+                continue
+
+            # S'assurer que les prérequis sont OK
+            if not progress_map.prerequisites_met(quest):
+                continue
+
+            # Démarrer si pas encore active
+            if progress.state == 'available':
+                progress.start()
+
+            # Compléter
+            result = _complete(trainer, quest, progress)
+            if result.get('newly_completed'):
+                notifications.append(result)
+    finally:
+        if owner:
+            del trainer._quest_progress
 
     return notifications
 
 
-def _event_matches_quest(quest, event: str, ctx: dict) -> bool:
-    """Vérifie si l'événement correspond aux critères de la quête."""
+def _candidate_quests(index, event: str, ctx: dict) -> list:
+    """Quêtes dont les critères correspondent à l'événement, dans l'ordre narratif."""
 
     if event == 'visit_zone':
         zone = ctx.get('zone')
-        return quest.trigger_zone_id and zone and quest.trigger_zone_id == zone.id
+        return index.candidates(event, zone.id) if zone else []
 
     if event == 'defeat_trainer':
         trainer_id = ctx.get('trainer_id')
+        if not trainer_id:
+            return []
         # Cas normal : quête avec trigger_trainer explicite (NPC, Elite 4…)
-        if quest.trigger_trainer_id:
-            return trainer_id and quest.trigger_trainer_id == trainer_id
-        # Cas rival : quête de type 'rival' sans trigger_trainer (résolu per-player).
-        # On vérifie si le Trainer NPC battu est bien le PlayerRival de ce joueur
-        # pour cette quête.
-        if quest.quest_type == 'rival' and trainer_id:
-            player_trainer = ctx.get('player_trainer')
-            if player_trainer is None:
-                return False
-            try:
-                from myPokemonApp.models import PlayerRival
-                pr = PlayerRival.objects.filter(
-                    player=player_trainer,
-                    template__quest_id=quest.quest_id,
-                    trainer__id=trainer_id,
-                ).exists()
-                return pr
-            except Exception:
-                return False
-        return False
+        # Cas rival : quête de type 'rival' sans trigger_trainer (résolu per-player)
+        return index.sorted(index.candidates(event, trainer_id)
+                            + _rival_quests(index, trainer_id, ctx))
 
     if event == 'defeat_gym':
         gym_leader = ctx.get('gym_leader')   # objet GymLeader
         if not gym_leader:
-            return False
-        # Si la quête cible un trainer précis, vérifier l'ID
-        if quest.trigger_trainer_id:
-            return quest.trigger_trainer_id == gym_leader.trainer_id
-        # Si la quête n'a pas de trainer spécifique mais a un flag arène,
-        # on la déclenche pour tout gym win (cas quêtes génériques "defeat_gym")
-        if quest.trigger_type == 'defeat_gym' and not quest.trigger_trainer_id:
-            return True
-        return False
-
-    if event == 'have_item':
-        item = ctx.get('item')
-        return quest.trigger_item_id and item and quest.trigger_item_id == item.id
+            return []
+        # Quêtes ciblant ce champion + quêtes génériques (tout gym win)
+        specific = index.candidates(event, gym_leader.trainer_id) if gym_leader.trainer_id else []
+        return index.sorted(specific + index.candidates(event, None))
 
-    if event == 'give_item':
+    if event in ('have_item', 'give_item'):
         # give_item = le joueur remet un objet à quelqu'un (NPC, lab, etc.)
-        # Le trigger_item de la quête doit correspondre à l'item remis.
         item = ctx.get('item')
-        return quest.trigger_item_id and item and quest.trigger_item_id == item.id
+        return index.candidates(event, item.id) if item else []
 
     if event == 'story_flag':
         flag = ctx.get('flag')
-        return quest.trigger_flag and flag and quest.trigger_flag == flag
+        return index.candidates(event, flag) if flag else []
+
+    return []
+
+
+def _rival_quests(index, trainer_id, ctx: dict) -> list:
+    """
+    Quêtes de rival dont le Trainer NPC battu est le PlayerRival de ce joueur :
+    une requête pour toutes les quêtes de rival, aucune si le dresseur battu
+    n'est pas un rival (ctx trainer_type).
+    """
+    rivals         = index.rival_quests
+    player_trainer = ctx.get('player_trainer')
+    if not rivals or player_trainer is None or ctx.get('trainer_type', 'rival') != 'rival':
+        return []
+
+    from myPokemonApp.models import PlayerRival
+    matched = set(PlayerRival.objects.filter(
+        player=player_trainer,
+        trainer_id=trainer_id,
+        template__quest_id__in=[quest.quest_id for quest in rivals],
+    ).values_list('template__quest_id', flat=True))
+    return [quest for quest in rivals if quest.quest_id in matched]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CAPACITÉS DU DRESSEUR (badges, objets clés, CS, flags, quêtes, zones visitées)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _hm_names_q():
+    """Q : move dont le nom (FR ou EN, insensible à la casse) est une CS."""
+    from django.db.models import Q
+    q = Q()
+    for names in HM_MOVE_NAMES.values():
+        for name in names:
+            q |= Q(move__name__iexact=name)
+    return q
+
+
+class TrainerCapabilities:
+    """
+    Tout ce que les contrôles d'accès lisent d'un dresseur, chargé en une fois.
+
+    TrainerCapabilities.build(trainer) fait 5 requêtes, quel que soit le
+    nombre de zones ou de connexions évaluées ensuite (carte Kanto) :
+    inventaire, CS connues, GameSave active, quêtes complétées, zones visitées.
+    Les contrôles eux-mêmes (zone_access, connection_access) ne font aucune
+    requête : les FK des zones (required_badge, required_item,
+    required_quest) sont supposées chargées par select_related.
+    """
+
+    def __init__(self, trainer, item_ids, hms, story_flags,
+                 completed_quest_ids, visited_zone_ids):
+        self.trainer             = trainer
+        self.badges              = trainer.badges
+        self.item_ids            = frozenset(item_ids)
+        self.hms                 = frozenset(hms)
+        self.story_flags         = story_flags
+        self.completed_quest_ids = frozenset(completed_quest_ids)
+        self.visited_zone_ids    = frozenset(visited_zone_ids)
+
+    @classmethod
+    def build(cls, trainer):
+        from myPokemonApp.models import PokemonMoveInstance, QuestProgress
+        from myPokemonApp.models.Zone import PlayerLocation
+
+        item_ids = trainer.inventory.filter(quantity__gte=1).values_list('item_id', flat=True)
+
+        known = {name.casefold() for name in PokemonMoveInstance.objects.filter(
+            _hm_names_q(), pokemon__trainer=trainer, pokemon__is_in_party=True,
+        ).values_list('move__name', flat=True)}
+        hms = {hm for hm, names in HM_MOVE_NAMES.items()
+               if any(name.casefold() in known for name in names)}
+
+        save = _get_save(trainer)
+        completed = QuestProgress.objects.filter(
+            trainer=trainer, state='completed'
+        ).values_list('quest_id', flat=True)
+        visited = PlayerLocation.visited_zones.through.objects.filter(
+            playerlocation__trainer=trainer
+        ).values_list('zone_id', flat=True)
+
+        return cls(trainer, item_ids, hms, save.story_flags if save else {},
+                   completed, visited)
+
+    # ── Prédicats ────────────────────────────────────────────────────────────
+
+    def has_item(self, item):
+        return item.pk in self.item_ids
+
+    def has_hm(self, hm_name):
+        return hm_name.lower() in self.hms
+
+    def has_flag(self, flag):
+        return bool(self.story_flags.get(flag))
+
+    def has_completed(self, quest):
+        return quest.pk in self.completed_quest_ids
+
+    def has_visited(self, zone):
+        return zone.pk in self.visited_zone_ids
+
+    # ── Contrôles ────────────────────────────────────────────────────────────
+
+    def zone_access(self, zone):
+        return _zone_access(self, zone)
+
+    def connection_access(self, conn):
+        return _connection_access(self, conn)
+
+
+class _LiveCapabilities:
+    """
+    Mêmes prédicats que TrainerCapabilities, lus en base à la demande :
+    un contrôle isolé ne paie que les requêtes des conditions qu'il rencontre.
+    """
+
+    def __init__(self, trainer):
+        self.trainer = trainer
+        self.badges  = trainer.badges
+        self._save   = None
+        self._loaded = False
 
-    return False
+    def has_item(self, item):
+        return _has_item(self.trainer, item)
+
+    def has_hm(self, hm_name):
+        return trainer_has_hm(self.trainer, hm_name)
+
+    def has_flag(self, flag):
+        if not self._loaded:
+            self._save, self._loaded = _get_save(self.trainer), True
+        return bool(self._save and self._save.story_flags.get(flag))
+
+    def has_completed(self, quest):
+        from myPokemonApp.models import QuestProgress
+        return QuestProgress.objects.filter(
+            trainer=self.trainer, quest=quest, state='completed',
+        ).exists()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CONTRÔLE D'ACCÈS AUX ZONES
 # ─────────────────────────────────────────────────────────────────────────────
 
-def can_access_zone(trainer, zone) -> tuple:
+def _zone_access(caps, zone) -> tuple:
     """
-    Vérifie si le trainer peut accéder à une zone.
-    Chaîne de contrôle :
+    Chaîne de contrôle d'accès à une zone :
       1. Badge requis
       2. Item requis
       3. CS requise (HM) — un Pokémon doit la connaître
@@ -370,43 +554,72 @@ def can_access_zone(trainer, zone) -> tuple:
     """
     # 1. Badge
     if zone.required_badge:
-        if trainer.badges < zone.required_badge.badge_order:
+        if caps.badges < zone.required_badge.badge_order:
             return False, f"Badge « {zone.required_badge.badge_name} » requis"
 
     # 2. Item clé
     if zone.required_item:
-        if not _has_item(trainer, zone.required_item):
+        if not caps.has_item(zone.required_item):
             return False, f"Objet requis : {zone.required_item.name}"
 
     # 3. CS
-    if hasattr(zone, 'required_hm') and zone.required_hm:
+    if zone.required_hm:
         hm = zone.required_hm
         move_label = HM_MOVE_NAMES.get(hm, (hm.capitalize(),))[0]
-        if not trainer_has_hm(trainer, hm):
+        if not caps.has_hm(hm):
             return False, f"CS {move_label} requise (un Pokémon doit la connaître)"
 
     # 4. Story flags
-    if hasattr(zone, 'required_flags') and zone.required_flags:
-        save = _get_save(trainer)
-        for flag in zone.required_flags:
-            if not (save and save.story_flags.get(flag)):
-                label = flag.replace('_', ' ').capitalize()
-                return False, f"Condition manquante : {label}"
+    for flag in zone.required_flags or ():
+        if not caps.has_flag(flag):
+            label = flag.replace('_', ' ').capitalize()
+            return False, f"Condition manquante : {label}"
 
     # 5. Quête requise
-    if hasattr(zone, 'required_quest') and zone.required_quest:
-        from myPokemonApp.models import QuestProgress
-        done = QuestProgress.objects.filter(
-            trainer=trainer,
-            quest=zone.required_quest,
-            state='completed',
-        ).exists()
-        if not done:
+    if zone.required_quest_id:
+        if not caps.has_completed(zone.required_quest):
             return False, f"Quête requise : « {zone.required_quest.title} »"
 
     return True, 'OK'
 
 
+def _connection_access(caps, conn) -> tuple:
+    """Passage d'une ZoneConnection (CS puis flag).  Retourne (bool, message)."""
+    if conn.required_hm:
+        if not caps.has_hm(conn.required_hm):
+            move_label = HM_MOVE_NAMES.get(conn.required_hm, (conn.required_hm,))[0]
+            return False, conn.passage_message or f"CS {move_label} requise pour passer."
+
+    if conn.required_flag:
+        if not caps.has_flag(conn.required_flag):
+            return False, conn.passage_message or "Ce passage est bloqué."
+
+    return True, 'OK'
+
+
+def can_access_zone(trainer, zone, caps=None) -> tuple:
+    """
+    Vérifie si le trainer peut accéder à une zone (voir _zone_access).
+    `caps` : TrainerCapabilities déjà construit, sinon lectures à la demande.
+    Retourne (bool, str_raison).
+    """
+    return _zone_access(caps or _LiveCapabilities(trainer), zone)
+
+
+def can_pass_connection(trainer, conn, caps=None) -> tuple:
+    """Vérifie si le trainer peut emprunter une connexion.  Retourne (bool, str)."""
+    return _connection_access(caps or _LiveCapabilities(trainer), conn)
+
+
+def evaluate_zone_access(trainer, zones, caps=None) -> dict:
+    """
+    Accès à toutes les `zones` en une passe : {zone_id: (bool, raison)}.
+    Requêtes : celles de TrainerCapabilities.build (si `caps` absent), puis 0.
+    """
+    caps = caps or TrainerCapabilities.build(trainer)
+    return {zone.pk: caps.zone_access(zone) for zone in zones}
+
+
 def can_access_floor(trainer, floor) -> tuple:
     """Délègue à ZoneFloor.is_accessible_by + vérif HM si pertinent."""
     return floor.is_accessible_by(trainer)
@@ -9,7 +9,9 @@ On peut importer directement depuis services pour le nouveau code :
 
     from myPokemonApp.services import serialize_pokemon, get_player_trainer
 """
-from .serializers import serialize_pokemon, serialize_pokemon_moves, build_battle_response
+from .serializers import (
+    serialize_pokemon, serialize_pokemon_moves, build_battle_response, apply_state_version,
+)
 from .player_service import (
     get_player_trainer,
     get_or_create_player_trainer,
@@ -28,6 +30,7 @@ __all__ = [
     'serialize_pokemon',
     'serialize_pokemon_moves',
     'build_battle_response',
+    'apply_state_version',
     # player_service
     'get_player_trainer',
     'get_or_create_player_trainer',
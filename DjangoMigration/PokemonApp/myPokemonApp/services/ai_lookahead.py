@@ -0,0 +1,381 @@
+"""
+services/ai_lookahead.py
+========================
+Flag IA 'lookahead' : expectimax à profondeur limitée pour les dresseurs
+experts (Champions d'Arène, Conseil des 4…).
+
+Le scoring Gen 4 de Battle.choose_enemy_move évalue chaque move isolément.
+Avec 'lookahead' dans Trainer.ai_flags, l'IA anticipe plutôt les tours
+suivants, moves ET switches des deux camps :
+
+  - modèle figé en mémoire au début de la décision (3 requêtes au plus, zéro
+    en simulation) : stats effectives, types, moves utilisables ;
+  - cœur de transition pur : un état est un tuple
+        (actif_ia, actif_adverse, pv_ia, pv_adverse)
+    et les dégâts espérés (formule Gen 3, aléa et critique moyennés) sont
+    mémoïsés par (camp, attaquant, move, défenseur) ;
+  - nœuds de hasard : précision / paralysie / sommeil, ordre à vitesse
+    égale, et politique de l'adversaire (pondérée par les dégâts espérés) ;
+  - table de transposition (état, profondeur) ;
+  - approfondissement itératif sous budget de temps strict (30 ms par
+    défaut) : on garde la dernière profondeur entièrement explorée.
+
+Les talents, objets tenus, effets secondaires et états volatils ne sont pas
+modélisés : à valeur égale, le score heuristique Gen 4 départage.
+
+Exports publics :
+    choose_lookahead_action(battle, attacker, defender, available_moves, scores)
+        → dict action (attack / switch) | None
+"""
+
+import time
+from collections import namedtuple
+
+from myPokemonApp.models.TypeChart import get_type_chart
+
+
+# Budget de réflexion par décision (ms) et profondeur max (en tours)
+LOOKAHEAD_BUDGET_MS = 30
+MAX_DEPTH           = 4
+
+# Valeur d'une victoire / défaite, bonus par Pokémon encore debout
+WIN_VALUE   = 100.0
+ALIVE_BONUS = 0.5
+
+# Politique supposée de l'adversaire : poids plancher d'un move, poids d'un switch
+FOE_MOVE_FLOOR    = 0.05
+FOE_SWITCH_WEIGHT = 0.05
+
+# Écart de valeur sous lequel deux actions sont jugées équivalentes
+VALUE_EPSILON = 0.01
+
+# Espérances : aléa 85–100 % et critique (1/16, ×1.5)
+_RANDOM_FACTOR = 0.925
+_CRIT_FACTOR   = 1 + 0.5 / 16
+
+# Probabilité d'agir selon le statut
+_ACT_CHANCE = {'sleep': 1 / 3, 'freeze': 0.2, 'paralysis': 0.75}
+
+_PASS = -1   # aucune action possible (pas de move utilisable)
+
+_Move = namedtuple('_Move', 'obj power accuracy priority physical type_id')
+
+
+class _Mon:
+    """Pokémon figé pour la recherche (stats effectives au moment de la décision)."""
+
+    __slots__ = ('obj', 'level', 'max_hp', 'attack', 'defense', 'sp_attack',
+                 'sp_defense', 'speed', 'types', 'burned', 'act_chance', 'moves')
+
+    def __init__(self, pokemon, moves, active):
+        self.obj    = pokemon
+        self.level  = pokemon.level
+        self.max_hp = max(1, pokemon.max_hp)
+        if active:
+            # Stages en cours (remis à zéro au switch : stats brutes pour le banc)
+            self.attack     = pokemon.get_effective_attack()
+            self.defense    = pokemon.get_effective_defense()
+            self.sp_attack  = pokemon.get_effective_special_attack()
+            self.sp_defense = pokemon.get_effective_special_defense()
+            self.speed      = pokemon.get_effective_speed()
+        else:
+            self.attack     = pokemon.attack
+            self.defense    = pokemon.defense
+            self.sp_attack  = pokemon.special_attack
+            self.sp_defense = pokemon.special_defense
+            self.speed      = pokemon.speed // 4 if pokemon.status_condition == 'paralysis' \
+                else pokemon.speed
+        species         = pokemon.species
+        self.types      = (species.primary_type_id, species.secondary_type_id)
+        self.burned     = pokemon.status_condition == 'burn'
+        self.act_chance = _ACT_CHANCE.get(pokemon.status_condition, 1.0)
+        self.moves      = tuple(
+            _Move(m, m.power or 0, (m.accuracy or 100) / 100, m.priority or 0,
+                  m.category == 'physical', m.type_id)
+            for m in moves
+        )
+
+
+class _Timeout(Exception):
+    pass
+
+
+# =============================================================================
+# RECHERCHE (pure : aucun accès base)
+# =============================================================================
+
+class _Search:
+    """Expectimax sur un modèle figé ; camp 0 = IA, camp 1 = adversaire."""
+
+    def __init__(self, mine, foes, deadline):
+        self.teams    = (mine, foes)
+        self.chart    = get_type_chart()
+        self.deadline = deadline
+        self.nodes    = 0
+        self.depth    = 0
+        self._damage  = {}
+        self._policy  = {}
+        self._tt      = {}
+
+    # ── Dégâts espérés (mémoïsés) ─────────────────────────────────────────────
+
+    def damage(self, side, attacker_idx, move_idx, defender_idx):
+        key = (side, attacker_idx, move_idx, defender_idx)
+        value = self._damage.get(key)
+        if value is None:
+            value = self._damage[key] = self._compute_damage(*key)
+        return value
+
+    def _compute_damage(self, side, attacker_idx, move_idx, defender_idx):
+        attacker = self.teams[side][attacker_idx]
+        defender = self.teams[1 - side][defender_idx]
+        move     = attacker.moves[move_idx]
+        if not move.power:
+            return 0
+        if move.physical:
+            atk, dfn = attacker.attack, defender.defense
+        else:
+            atk, dfn = attacker.sp_attack, defender.sp_defense
+        damage = ((2 * attacker.level / 5 + 2) * move.power * atk / max(1, dfn)) / 50 + 2
+        if move.type_id in attacker.types:
+            damage *= 1.5
+        damage *= self.chart.multiplier(move.type_id, *defender.types)
+        if damage == 0:
+            return 0
+        if attacker.burned and move.physical:
+            damage *= 0.5
+        return max(1, int(damage * _RANDOM_FACTOR * _CRIT_FACTOR))
+
+    def best_damage(self, side, attacker_idx, defender_idx):
+        moves = self.teams[side][attacker_idx].moves
+        return max((self.damage(side, attacker_idx, i, defender_idx)
+                    for i in range(len(moves))), default=0)
+
+    # ── Actions ───────────────────────────────────────────────────────────────
+
+    def actions(self, state, side):
+        """Moves de l'actif (indices ≥ 0) puis switches (-2 - index du remplaçant)."""
+        active = state[side]
+        hps    = state[2 + side]
+        moves  = list(range(len(self.teams[side][active].moves))) or [_PASS]
+        return moves + [-2 - j for j, hp in enumerate(hps) if hp and j != active]
+
+    def foe_policy(self, state):
+        """Distribution supposée des actions de l'adversaire dans cet état."""
+        policy = self._policy.get(state)
+        if policy is not None:
+            return policy
+        my_active, foe_active, my_hp, _ = state
+        weights = []
+        for action in self.actions(state, 1):
+            if action >= 0:
+                dmg = self.damage(1, foe_active, action, my_active)
+                weights.append(FOE_MOVE_FLOOR + min(1.0, dmg / max(1, my_hp[my_active])))
+            else:
+                weights.append(FOE_SWITCH_WEIGHT)
+        total  = sum(weights)
+        policy = self._policy[state] = [
+            (w / total, a) for w, a in zip(weights, self.actions(state, 1))
+        ]
+        return policy
+
+    # ── Transition ────────────────────────────────────────────────────────────
+
+    def step(self, state, my_action, foe_action):
+        """Résultats possibles d'un tour : liste de (probabilité, état suivant)."""
+        actives = [state[0], state[1]]
+        if my_action <= -2:
+            actives[0] = -2 - my_action
+        if foe_action <= -2:
+            actives[1] = -2 - foe_action
+
+        attacks = [(side, action) for side, action in ((0, my_action), (1, foe_action))
+                   if action >= 0]
+        if len(attacks) == 2:
+            mine = self.teams[0][actives[0]].moves[my_action]
+            foes = self.teams[1][actives[1]].moves[foe_action]
+            if mine.priority != foes.priority:
+                first = 0 if mine.priority > foes.priority else 1
+            else:
+                my_speed  = self.teams[0][actives[0]].speed
+                foe_speed = self.teams[1][actives[1]].speed
+                first = None if my_speed == foe_speed else (0 if my_speed > foe_speed else 1)
+            if first is None:
+                orders = [(0.5, attacks), (0.5, attacks[::-1])]
+            else:
+                orders = [(1.0, attacks if first == 0 else attacks[::-1])]
+        else:
+            orders = [(1.0, attacks)]
+
+        outcomes = []
+        for p_order, order in orders:
+            branches = [(p_order, state[2], state[3])]
+            for side, move_idx in order:
+                attacker = actives[side]
+                defender = actives[1 - side]
+                mon      = self.teams[side][attacker]
+                dmg      = self.damage(side, attacker, move_idx, defender)
+                chance   = mon.moves[move_idx].accuracy * mon.act_chance
+                nxt = []
+                for p, my_hp, foe_hp in branches:
+                    hps = (my_hp, foe_hp)
+                    if not dmg or not hps[side][attacker] or not hps[1 - side][defender]:
+                        nxt.append((p, my_hp, foe_hp))
+                        continue
+                    target = hps[1 - side]
+                    hit    = target[:defender] + (max(0, target[defender] - dmg),) + target[defender + 1:]
+                    if chance < 1:
+                        nxt.append((p * (1 - chance), my_hp, foe_hp))
+                    if side == 0:
+                        nxt.append((p * chance, my_hp, hit))
+                    else:
+                        nxt.append((p * chance, hit, foe_hp))
+                branches = nxt
+            for p, my_hp, foe_hp in branches:
+                outcomes.append((p, self._replace_fainted(actives[0], actives[1], my_hp, foe_hp)))
+        return outcomes
+
+    def _replace_fainted(self, my_active, foe_active, my_hp, foe_hp):
+        """Remplaçant après K.O. : celui qui frappe le plus fort l'actif adverse."""
+        if not my_hp[my_active]:
+            alive = [j for j, hp in enumerate(my_hp) if hp]
+            if alive:
+                my_active = max(alive, key=lambda j: self.best_damage(0, j, foe_active))
+        if not foe_hp[foe_active]:
+            alive = [j for j, hp in enumerate(foe_hp) if hp]
+            if alive:
+                foe_active = max(alive, key=lambda j: self.best_damage(1, j, my_active))
+        return (my_active, foe_active, my_hp, foe_hp)
+
+    # ── Évaluation ────────────────────────────────────────────────────────────
+
+    def evaluate(self, state):
+        _, _, my_hp, foe_hp = state
+        mine, foes = self.teams
+        my_alive  = any(my_hp)
+        foe_alive = any(foe_hp)
+        if not (my_alive and foe_alive):
+            return 0.0 if my_alive == foe_alive else (WIN_VALUE if my_alive else -WIN_VALUE)
+        score = 0.0
+        for hp, mon in zip(my_hp, mine):
+            if hp:
+                score += ALIVE_BONUS + hp / mon.max_hp
+        for hp, mon in zip(foe_hp, foes):
+            if hp:
+                score -= ALIVE_BONUS + hp / mon.max_hp
+        return score
+
+    # ── Expectimax ────────────────────────────────────────────────────────────
+
+    def _tick(self):
+        self.nodes += 1
+        if not self.nodes & 63 and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+    def value(self, state, depth):
+        if depth == 0 or not (any(state[2]) and any(state[3])):
+            return self.evaluate(state)
+        key    = (state, depth)
+        cached = self._tt.get(key)
+        if cached is not None:
+            return cached
+        self._tick()
+        best = max(self.expect(state, action, depth) for action in self.actions(state, 0))
+        self._tt[key] = best
+        return best
+
+    def expect(self, state, my_action, depth):
+        total = 0.0
+        for p_foe, foe_action in self.foe_policy(state):
+            for p, nxt in self.step(state, my_action, foe_action):
+                total += p_foe * p * self.value(nxt, depth - 1)
+        return total
+
+    def run(self, root):
+        """Approfondissement itératif ; {action: valeur} de la dernière profondeur complète."""
+        actions = self.actions(root, 0)
+        best    = None
+        for depth in range(1, MAX_DEPTH + 1):
+            try:
+                values = {action: self.expect(root, action, depth) for action in actions}
+            except _Timeout:
+                break
+            best, self.depth = values, depth
+            if time.perf_counter() > self.deadline:
+                break
+        return best
+
+
+# =============================================================================
+# CONSTRUCTION DU MODÈLE (lectures base / session)
+# =============================================================================
+
+def _team(battle, pokemon):
+    """Équipe vivante de `pokemon`, actif en tête (instance en mémoire)."""
+    session = battle._turn_session
+    team    = session.team(pokemon) if session is not None else None
+    if team is None:
+        if pokemon.trainer_id is None:
+            return [pokemon]
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        team = (PlayablePokemon.objects
+                .filter(trainer_id=pokemon.trainer_id, is_in_party=True, current_hp__gt=0)
+                .exclude(pk=pokemon.pk)
+                .select_related('species')
+                .order_by('party_position'))
+    return [pokemon] + [p for p in team if p is not pokemon and p.pk != pokemon.pk
+                        and p.current_hp > 0]
+
+
+def _usable_moves(battle, pokemons):
+    """{pk: [PokemonMove]} des moves avec PP restants (session, sinon une requête)."""
+    session = battle._turn_session
+    if session is not None:
+        return {p.pk: [mi.move for mi in session.move_instances(p) if mi.current_pp > 0]
+                for p in pokemons}
+    from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+    moves = {p.pk: [] for p in pokemons}
+    for mi in (PokemonMoveInstance.objects
+               .filter(pokemon_id__in=list(moves), current_pp__gt=0)
+               .select_related('move')):
+        moves[mi.pokemon_id].append(mi.move)
+    return moves
+
+
+def choose_lookahead_action(battle, attacker, defender, available_moves, scores,
+                            budget_ms=LOOKAHEAD_BUDGET_MS):
+    """
+    Meilleure action de `attacker` selon l'expectimax, ou None si la recherche
+    n'a pas fini la profondeur 1 dans le budget (→ scoring Gen 4 seul).
+
+    available_moves : moves utilisables de l'actif (PP, Entrave déjà filtrés)
+    scores          : {move.id: score Gen 4}, départage des actions équivalentes
+    """
+    deadline = time.perf_counter() + budget_ms / 1000
+
+    my_team  = _team(battle, attacker)
+    foe_team = _team(battle, defender)
+    moves    = _usable_moves(battle, my_team[1:] + foe_team)
+    moves[attacker.pk] = available_moves
+
+    search = _Search(
+        [_Mon(p, moves.get(p.pk, ()), i == 0) for i, p in enumerate(my_team)],
+        [_Mon(p, moves.get(p.pk, ()), i == 0) for i, p in enumerate(foe_team)],
+        deadline,
+    )
+    root = (0, 0, tuple(p.current_hp for p in my_team), tuple(p.current_hp for p in foe_team))
+    values = search.run(root)
+    if not values:
+        return None
+
+    best       = max(values.values())
+    candidates = [a for a, v in values.items() if v >= best - VALUE_EPSILON]
+    # À valeur égale : les moves (score Gen 4) passent avant les switches
+    attacks = [a for a in candidates if a >= 0]
+    if attacks:
+        top    = max(scores.get(available_moves[a].id, 0) for a in attacks)
+        chosen = battle.rng.choice(
+            [available_moves[a] for a in attacks if scores.get(available_moves[a].id, 0) == top]
+        )
+        return {'type': 'attack', 'move': chosen}
+    return {'type': 'switch', 'pokemon': my_team[-2 - candidates[0]]}
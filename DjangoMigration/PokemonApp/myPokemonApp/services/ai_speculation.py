@@ -0,0 +1,210 @@
+"""
+services/ai_speculation.py
+==========================
+Décision de l'IA adverse calculée à l'avance, pendant que le joueur choisit.
+
+Le choix de l'IA (Battle.choose_enemy_move) ne dépend pas de l'action du
+joueur : seulement de l'état du combat.  Après chaque action validée, le
+tour N+1 est donc décidé dans un thread de fond (ThreadPoolExecutor) et mis
+en cache avec une empreinte de l'état lu par l'IA :
+
+  - combat : tour, météo / terrain, Pokémon actifs, battle_state — graine
+    et rang RNG compris ;
+  - Pokémon actifs : champs lus par le moteur (REPLAY_FIELDS), stages,
+    moves et PP ;
+  - flags IA du dresseur ; avec 'lookahead', PV / statut des deux équipes
+    (une requête).
+
+À l'action suivante, get_opponent_ai_action() recalcule l'empreinte (sans
+requête hors 'lookahead') : si elle est identique, la décision est reprise
+telle quelle, sinon l'IA est exécutée normalement.  Une décision ne sert
+qu'une fois.
+
+Le calcul spéculatif repart du début du sous-flux RNG courant, comme le fait
+une requête fraîche : une décision reprise est celle que la requête aurait
+calculée (au budget de temps de 'lookahead' près), et le replay reste exact
+puisqu'il enregistre les actions jouées.
+
+Le cache Django par défaut (LocMemCache) est local au processus, comme le
+pool de threads : avec plusieurs workers, une décision calculée dans un
+autre processus est simplement recalculée.
+
+Exports publics :
+    ai_fingerprint(battle)           → str
+    speculate_opponent_action(battle) → dict action | None (et mise en cache)
+    schedule_ai_speculation(battle)  → None (après le commit de la transaction)
+    take_speculated_action(battle)   → dict action | None
+"""
+
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from myPokemonApp.models.BattleReplay import REPLAY_FIELDS, encode_action
+
+logger = logging.getLogger(__name__)
+
+# Threads de calcul spéculatif par processus
+SPECULATION_WORKERS = 2
+# Durée de vie d'une décision en cache (joueur inactif)
+SPECULATION_TIMEOUT = 600
+
+_STAGE_FIELDS = (
+    'attack_stage', 'defense_stage', 'special_attack_stage',
+    'special_defense_stage', 'speed_stage', 'accuracy_stage', 'evasion_stage',
+)
+
+_executor = None
+
+
+def _cache_key(battle_id):
+    return f'battle_ai:{battle_id}'
+
+
+# =============================================================================
+# EMPREINTE DE L'ÉTAT LU PAR L'IA
+# =============================================================================
+
+def _ai_flags(battle):
+    if battle.opponent_trainer:
+        return battle.opponent_trainer.get_ai_flags()
+    return {'basic', 'evaluate_attack'}
+
+
+def _pokemon_print(pokemon):
+    if pokemon is None:
+        return None
+    return [
+        pokemon.pk,
+        [getattr(pokemon, name) for name in REPLAY_FIELDS + _STAGE_FIELDS],
+        sorted([mi.move_id, mi.current_pp] for mi in pokemon.move_instances()),
+    ]
+
+
+def _teams_print(battle):
+    """PV / statut des équipes (bench lu par l'IA 'lookahead')."""
+    from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+    trainers = [t for t in (battle.player_trainer_id, battle.opponent_trainer_id) if t]
+    return list(PlayablePokemon.objects
+                .filter(trainer_id__in=trainers, is_in_party=True)
+                .order_by('pk')
+                .values_list('pk', 'current_hp', 'status_condition'))
+
+
+def ai_fingerprint(battle):
+    """Empreinte (hex) de tout ce que choose_enemy_move lit pour décider."""
+    flags = _ai_flags(battle)
+    state = battle._bstate().encode()
+    parts = [
+        battle.pk, battle.current_turn, battle.weather, battle.terrain,
+        sorted(flags), state,
+        _pokemon_print(battle.opponent_pokemon),
+        _pokemon_print(battle.player_pokemon),
+    ]
+    if 'lookahead' in flags:
+        parts.append(_teams_print(battle))
+    raw = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# =============================================================================
+# CALCUL SPÉCULATIF
+# =============================================================================
+
+def _worth_speculating(battle):
+    """Le prochain POST demandera-t-il une décision à l'IA ?"""
+    opponent, player = battle.opponent_pokemon, battle.player_pokemon
+    return (battle.is_active and battle.opponent_trainer_id is not None
+            and opponent is not None and not opponent.is_fainted()
+            and player is not None and not player.is_fainted())
+
+
+def speculate_opponent_action(battle):
+    """
+    Calcule la décision de l'IA pour le prochain tour et la met en cache avec
+    son empreinte.  Retourne l'action (ou None si rien à décider).
+    """
+    if not _worth_speculating(battle):
+        return None
+    fingerprint = ai_fingerprint(battle)
+    # Début du sous-flux RNG courant, comme une instance fraîchement chargée
+    battle._rng_cache = None
+    action = battle.choose_enemy_move(battle.opponent_pokemon, battle.player_pokemon)
+    battle._rng_cache = None
+    if action:
+        cache.set(_cache_key(battle.pk),
+                  {'fp': fingerprint, 'action': encode_action(action)},
+                  SPECULATION_TIMEOUT)
+    return action
+
+
+def _speculation_job(battle):
+    """Tâche du pool : ne lève jamais, libère la connexion du thread."""
+    try:
+        speculate_opponent_action(battle)
+    except Exception:
+        logger.exception("Décision IA spéculative impossible (combat %s)", battle.pk)
+    finally:
+        connections.close_all()
+
+
+def _submit(battle):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=SPECULATION_WORKERS,
+                                       thread_name_prefix='ai-speculation')
+    _executor.submit(_speculation_job, battle)
+
+
+def schedule_ai_speculation(battle):
+    """
+    Lance le calcul spéculatif après le commit de l'action en cours.
+    `battle` est confié au thread : l'appelant ne doit plus le modifier.
+    """
+    cache.delete(_cache_key(battle.pk))
+    if _worth_speculating(battle):
+        transaction.on_commit(lambda: _submit(battle))
+
+
+# =============================================================================
+# REPRISE DE LA DÉCISION
+# =============================================================================
+
+def _decode_action(battle, code):
+    """Action encodée (encode_action) → dict d'action, ou None si introuvable."""
+    from myPokemonApp.models.Battle import hydrated_pokemon
+    from myPokemonApp.models.MoveCatalogue import get_move_catalogue
+
+    kind = code[0] if code else None
+    if kind == 'p':
+        return {'type': 'pass'}
+    if kind == 'a':
+        move = next((mi.move for mi in battle.opponent_pokemon.move_instances()
+                     if mi.move_id == code[1]), None)
+        move = move or get_move_catalogue().get(code[1])
+        return {'type': 'attack', 'move': move} if move else None
+    if kind == 's':
+        pokemon = hydrated_pokemon().filter(
+            pk=code[1], trainer_id=battle.opponent_trainer_id
+        ).first()
+        return {'type': 'switch', 'pokemon': battle.adopt(pokemon)} if pokemon else None
+    return None
+
+
+def take_speculated_action(battle):
+    """
+    Décision spéculative valide pour l'état actuel du combat, ou None.
+    L'entrée du cache est consommée dans tous les cas.
+    """
+    key   = _cache_key(battle.pk)
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    cache.delete(key)
+    if entry['fp'] != ai_fingerprint(battle):
+        return None
+    return _decode_action(battle, entry['action'])
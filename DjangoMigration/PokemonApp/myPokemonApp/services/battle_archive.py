@@ -0,0 +1,180 @@
+"""
+services/battle_archive.py
+==========================
+Archivage des combats terminés (commande archive_battles).
+
+Un combat terminé depuis plus de N jours est déplacé de Battle vers
+BattleArchive (models/BattleArchive.py) :
+
+  - résumé en colonnes indexées (vainqueur, tours, durée, équipes, argent) ;
+  - journal (BattleEvent ou battle_log historique) et flux de replay
+    (BattleReplayStep) compressés zlib dans BattleArchive.payload ;
+  - les TrainerBattleHistory et CaptureAttempt du combat sont rattachés à
+    l'archive (champ `archive`, même pk) : la suppression du Battle met leur
+    FK `battle` à NULL (SET_NULL) sans perdre le lien ;
+  - la ligne Battle est supprimée avec ses BattleEvent et BattleReplayStep
+    (CASCADE), ainsi que les Pokémon sauvages qu'elle référençait et
+    qu'aucun combat actif n'utilise.
+
+Le travail se fait par lots de `chunk_size` combats, un lot par transaction :
+un lot interrompu n'archive rien, les lots déjà validés restent archivés.
+
+Exports publics :
+    pack_payload(data)                 → bytes
+    unpack_payload(blob)               → dict
+    archivable_battles(days, now=None) → QuerySet[Battle]
+    archive_battles(days=30, chunk_size=200, now=None) → int (combats archivés)
+"""
+
+import json
+import logging
+import zlib
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DAYS = 30
+DEFAULT_CHUNK_SIZE   = 200
+
+
+# =============================================================================
+# PAYLOAD COMPRESSÉ
+# =============================================================================
+
+def pack_payload(data):
+    """dict JSON-safe → bytes (JSON compact compressé zlib)."""
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    return zlib.compress(raw.encode('utf-8'), 9)
+
+
+def unpack_payload(blob):
+    """Inverse de pack_payload ({} si vide)."""
+    if not blob:
+        return {}
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
+
+
+# =============================================================================
+# SÉLECTION ET ARCHIVAGE
+# =============================================================================
+
+def archivable_battles(days, now=None):
+    """Combats terminés depuis plus de `days` jours (date de création à défaut de fin)."""
+    from myPokemonApp.models.Battle import Battle
+
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Battle.objects.filter(is_active=False).filter(
+        Q(ended_at__lt=cutoff) | Q(ended_at__isnull=True, created_at__lt=cutoff)
+    )
+
+
+def _archive_row(battle, log, replay, money_earned):
+    """BattleArchive (non sauvegardé) équivalent à `battle`."""
+    from myPokemonApp.models.BattleArchive import BattleArchive
+    from myPokemonApp.models.WildPokemon import WILD_POKEMON_PK
+
+    snapshot = battle.battle_snapshot if isinstance(battle.battle_snapshot, dict) else {}
+    duration = battle.ended_at - battle.created_at if battle.ended_at else None
+    return BattleArchive(
+        id=battle.pk,
+        battle_type=battle.battle_type,
+        player_trainer_id=battle.player_trainer_id,
+        opponent_trainer_id=battle.opponent_trainer_id,
+        winner_id=battle.winner_id,
+        turns=battle.current_turn,
+        weather=battle.weather,
+        money_earned=money_earned,
+        player_pokemon_id=battle.player_pokemon_id,
+        opponent_pokemon_id=(WILD_POKEMON_PK if battle.wild_pokemon
+                             else battle.opponent_pokemon_id),
+        teams=snapshot,
+        created_at=battle.created_at,
+        ended_at=battle.ended_at,
+        duration=duration,
+        payload=pack_payload({'log': log, 'replay': replay}),
+    )
+
+
+def _archive_chunk(ids):
+    """Archive les combats `ids` dans une transaction.  Retourne leur nombre."""
+    from myPokemonApp.models.Battle import Battle
+    from myPokemonApp.models.BattleArchive import BattleArchive
+    from myPokemonApp.models.BattleEvent import BattleEvent
+    from myPokemonApp.models.BattleReplayStep import BattleReplayStep
+    from myPokemonApp.models.CaptureSystem import CaptureAttempt
+    from myPokemonApp.models.GameSave import TrainerBattleHistory
+    from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+    from myPokemonApp.services.trainer_service import WILD_TRAINER_NAMES
+
+    with transaction.atomic():
+        battles = list(Battle.objects.filter(pk__in=ids, is_active=False))
+
+        logs = {}
+        for battle_id, turn, message in (BattleEvent.objects
+                                         .filter(battle_id__in=ids)
+                                         .order_by('battle_id', 'seq')
+                                         .values_list('battle_id', 'turn', 'message')):
+            logs.setdefault(battle_id, []).append({'turn': turn, 'message': message})
+        replays = {}
+        for battle_id, event in (BattleReplayStep.objects
+                                 .filter(battle_id__in=ids)
+                                 .order_by('battle_id', 'seq')
+                                 .values_list('battle_id', 'event')):
+            replays.setdefault(battle_id, []).append(event)
+        money = dict(TrainerBattleHistory.objects
+                     .filter(battle_id__in=ids)
+                     .values_list('battle_id', 'money_earned'))
+
+        BattleArchive.objects.bulk_create([
+            _archive_row(
+                battle,
+                # Combats antérieurs à BattleEvent : battle_log (JSON)
+                logs.get(battle.pk) or list(battle.battle_log or []),
+                replays.get(battle.pk, []),
+                money.get(battle.pk, 0),
+            )
+            for battle in battles
+        ])
+
+        # Historique et captures : lien repris par l'archive (même pk) avant
+        # que la suppression ne mette leur FK battle à NULL
+        archived_ids = [b.pk for b in battles]
+        for model in (TrainerBattleHistory, CaptureAttempt):
+            model.objects.filter(battle_id__in=archived_ids).update(archive_id=F('battle_id'))
+
+        # Pokémon sauvages en base (combats antérieurs aux sauvages éphémères)
+        wild_ids = [b.opponent_pokemon_id for b in battles
+                    if b.battle_type == 'wild' and b.opponent_pokemon_id]
+        Battle.objects.filter(pk__in=archived_ids).delete()
+
+        if wild_ids:
+            # opponent_pokemon_id NULL (sauvage éphémère) exclu : NOT IN (…, NULL) ne retient rien
+            in_use = (Battle.objects.filter(is_active=True, opponent_pokemon__isnull=False)
+                      .values('opponent_pokemon_id'))
+            PlayablePokemon.objects.filter(
+                pk__in=wild_ids, trainer__username__in=WILD_TRAINER_NAMES
+            ).exclude(pk__in=in_use).delete()
+
+    return len(battles)
+
+
+def archive_battles(days=DEFAULT_ARCHIVE_DAYS, chunk_size=DEFAULT_CHUNK_SIZE, now=None):
+    """
+    Archive tous les combats terminés depuis plus de `days` jours.
+    Retourne le nombre de combats archivés.
+    """
+    queryset = archivable_battles(days, now=now).order_by('pk')
+    archived = 0
+    last_pk  = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+        archived += _archive_chunk(ids)
+        last_pk = ids[-1]
+        logger.info("archive_battles : %d combats archivés (jusqu'au pk %d)", archived, last_pk)
+    return archived
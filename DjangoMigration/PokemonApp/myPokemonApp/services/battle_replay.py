@@ -0,0 +1,149 @@
+"""
+services/battle_replay.py
+==========================
+Rejoue un combat depuis son flux compact (lignes BattleReplayStep).
+
+Le flux contient l'état initial des Pokémon engagés, les actions joueur / IA
+de chaque tour et les changements faits hors moteur (XP, évolution, moves).
+Avec la graine battle_state['rng'], chaque tour retire exactement les mêmes
+nombres : le log rejoué doit être identique au log d'origine.
+
+Le replay tourne sur des objets en mémoire (SimulationSession, comme le
+simulateur) dans une transaction annulée : rien n'est jamais écrit.
+
+Exports publics :
+    replay_battle(battle)
+        → {'log': [str], 'expected': [str], 'matches': bool}
+"""
+
+import logging
+
+from django.db import transaction
+
+from myPokemonApp.models.BattleReplay import REPLAY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+
+def _preload(events):
+    """Espèces et moves référencés par le flux, en deux requêtes."""
+    from myPokemonApp.models.Pokemon import Pokemon
+    from myPokemonApp.models.PokemonMove import PokemonMove
+
+    species_idx = REPLAY_FIELDS.index('species_id')
+    species_ids, move_ids = set(), set()
+    for event in events:
+        if event[0] == '=':
+            species_ids.add(event[2][species_idx])
+            move_ids.update(mid for mid, _ in event[3])
+        elif event[0] == 'T':
+            move_ids.update(a[1] for a in event[1:] if a and a[0] == 'a')
+
+    species = Pokemon.objects.select_related(
+        'primary_type', 'secondary_type').in_bulk(species_ids)
+    moves = PokemonMove.objects.select_related('type').in_bulk(move_ids)
+    return species, moves
+
+
+def _decode_action(code, pokemons, moves):
+    from myPokemonApp.models.Item import Item
+
+    if not code:
+        return {}
+    kind = code[0]
+    if kind == 'a':
+        return {'type': 'attack', 'move': moves[code[1]]}
+    if kind == 's':
+        return {'type': 'switch', 'pokemon': pokemons[code[1]]}
+    if kind == 'i':
+        return {'type': 'item', 'item': Item.objects.get(pk=code[1]),
+                'target': pokemons[code[2]]}
+    if kind == 'b':
+        return {'type': 'PokeBall'}
+    if kind == 'f':
+        return {'type': 'flee'}
+    return {'type': 'pass'}
+
+
+def _apply_sync(event, pokemons, species, moves, session):
+    """Crée ou met à jour un Pokémon en mémoire depuis un événement '='."""
+    from myPokemonApp.models.PlayablePokemon import PlayablePokemon, PokemonMoveInstance
+
+    _, pk, values, move_list = event
+    pokemon = pokemons.get(pk)
+    if pokemon is None:
+        pokemon = pokemons[pk] = PlayablePokemon(pk=pk)
+    for name, value in zip(REPLAY_FIELDS, values):
+        setattr(pokemon, name, value)
+    pokemon.species = species[pokemon.species_id]
+
+    move_instances = [
+        PokemonMoveInstance(pokemon=pokemon, move=moves[mid], current_pp=pp)
+        for mid, pp in move_list
+    ]
+    if session is not None:
+        session.track(pokemon)
+        session.replace_move_instances(pokemon, move_instances)
+    return pokemon, move_instances
+
+
+def replay_battle(battle):
+    """
+    Rejoue `battle` depuis son flux et compare au log d'origine.
+
+    Lève ValueError si le combat n'a pas été enregistré (combat antérieur à
+    l'enregistrement, ou créé sans start_battle).
+    """
+    from myPokemonApp.models.Battle import Battle
+    from myPokemonApp.services.battle_simulator import SimulationSession
+
+    bs     = battle._bstate()
+    events = battle.replay_events() if bs.replay else []
+    if not events or bs.rng is None:
+        raise ValueError(f"Le combat {battle.pk} n'a pas de flux de replay")
+
+    species, moves = _preload(events)
+    pokemons, move_instances = {}, {}
+    log_start = 0
+
+    replayed = Battle(
+        battle_type=battle.battle_type,
+        player_trainer=battle.player_trainer,
+        opponent_trainer=battle.opponent_trainer,
+        is_active=True,
+    )
+    replayed.seed_rng(bs.rng['seed'])
+    session = None
+
+    with transaction.atomic():
+        try:
+            for event in events:
+                kind = event[0]
+                if kind == '=':
+                    pokemon, mis = _apply_sync(event, pokemons, species, moves, session)
+                    move_instances[pokemon.pk] = mis
+                elif kind == 'S':
+                    _, player_pk, opponent_pk, log_start = event
+                    replayed.player_pokemon   = pokemons[player_pk]
+                    replayed.opponent_pokemon = pokemons[opponent_pk]
+                    session = SimulationSession(replayed, move_instances)
+                    for pokemon in pokemons.values():
+                        session.track(pokemon)
+                elif kind == 'T':
+                    replayed.execute_turn(_decode_action(event[1], pokemons, moves),
+                                          _decode_action(event[2], pokemons, moves))
+                elif kind == 'F':
+                    replayed.record_step('F')
+                    replayed.attempt_flee()
+                elif kind == 'O':
+                    replayed.opponent_pokemon = pokemons[event[1]]
+                else:
+                    logger.warning("Événement de replay inconnu : %r", event)
+        finally:
+            if session is not None:
+                session.discard()
+            transaction.set_rollback(True)
+
+    log      = [entry['message'] for entry in replayed.get_log()]
+    expected = [entry['message'] for entry in battle.get_log()[log_start:]]
+    return {'log': log, 'expected': expected, 'matches': log == expected}
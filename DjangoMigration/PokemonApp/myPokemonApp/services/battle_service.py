@@ -18,9 +18,17 @@ Exports publics :
         → (bool, Trainer|None, str)
     opponent_switch_pokemon(battle)
         → PlayablePokemon | None
+    battle_action_lock(battle)
+        → context manager → Battle (verrouillé, relu en base)
+    get_idempotent_response(battle_id, key) / store_idempotent_response(...)
 """
 
 import logging
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
@@ -69,10 +77,13 @@ def _snapshot_team(trainer, wild_pokemon=None):
 # =============================================================================
 
 def start_battle(player_trainer, opponent_trainer=None, wild_pokemon=None,
-                 battle_type='trainer'):
+                 battle_type='trainer', seed=None):
     """
     Démarre un nouveau combat et retourne (Battle, message_intro).
 
+    Le combat reçoit une graine RNG (aléatoire si seed=None) et enregistre
+    l'état initial des équipes pour replay_battle().
+
     Cas d'usage :
         battle, msg = start_battle(trainer, opponent_trainer=npc)
         battle, msg = start_battle(trainer, wild_pokemon=wild)
@@ -103,7 +114,7 @@ def start_battle(player_trainer, opponent_trainer=None, wild_pokemon=None,
     elif opponent_trainer:
         _reset_team_stages(opponent_trainer)
 
-    battle = Battle.objects.create(
+    battle = Battle(
         battle_type=battle_type,
         player_trainer=player_trainer,
         opponent_trainer=opponent_trainer,
@@ -122,6 +133,8 @@ def start_battle(player_trainer, opponent_trainer=None, wild_pokemon=None,
             ),
         },
     )
+    battle.seed_rng(seed)
+    battle.save()
 
     msg = (
         f"Un {opponent_pokemon.species.name} sauvage apparaît !"
@@ -135,6 +148,13 @@ def start_battle(player_trainer, opponent_trainer=None, wild_pokemon=None,
     opponent_label = opponent_trainer.username if opponent_trainer else 'Wild'
     battle.add_to_log(f"{opponent_label} envoie {opponent_pokemon} !")
 
+    team = list(player_trainer.pokemon_team.filter(is_in_party=True))
+    if wild_pokemon:
+        team.append(wild_pokemon)
+    else:
+        team += list(opponent_trainer.pokemon_team.filter(is_in_party=True))
+    battle.start_replay_recording(team)
+
     return battle, msg
 
 
@@ -153,6 +173,9 @@ def get_opponent_ai_action(battle):
       • Soin d'urgence si HP < 30 %
       • Infliger un statut si la cible n'en a pas
       • Légère dose d'aléatoire pour rester imprévisible
+
+    Contre un dresseur, la décision calculée à l'avance pendant que le joueur
+    choisissait (services/ai_speculation) est reprise si l'état n'a pas changé.
     """
     opponent = battle.opponent_pokemon
     player   = battle.player_pokemon
@@ -160,6 +183,12 @@ def get_opponent_ai_action(battle):
     if opponent is None or opponent.is_fainted():
         return {'type': 'pass'}
 
+    if battle.opponent_trainer_id is not None and battle.pk is not None:
+        from myPokemonApp.services.ai_speculation import take_speculated_action
+        speculated = take_speculated_action(battle)
+        if speculated is not None:
+            return speculated
+
     return battle.choose_enemy_move(opponent, player)
 
 
@@ -421,12 +450,90 @@ def opponent_switch_pokemon(battle):
     new_pokemon = bench.first()
     battle.opponent_pokemon = new_pokemon
 
-    bs   = battle.battle_state if isinstance(battle.battle_state, dict) else {}
-    used = bs.get('opponent_used_ids', [])
+    used = battle._bstate().side('opponent').used_ids
     if new_pokemon.id not in used:
         used.append(new_pokemon.id)
-    bs['opponent_used_ids'] = used
-    battle.battle_state = bs
+    battle.record_event('O', new_pokemon.pk)
     battle.save()
 
-    return new_pokemon
\ No newline at end of file
+    return new_pokemon
+
+
+# =============================================================================
+# VERROU PAR COMBAT + IDEMPOTENCE DES ACTIONS
+# =============================================================================
+
+# Durée de conservation d'une réponse rejouable (clé d'idempotence), en secondes.
+IDEMPOTENCY_TIMEOUT = 10 * 60
+
+
+class BattleBusy(Exception):
+    """Une autre action a modifié le combat entre sa lecture et son verrouillage."""
+
+
+@contextmanager
+def battle_action_lock(battle):
+    """
+    Exécute une action de combat sous verrou, dans une seule transaction.
+
+    - Backend avec SELECT … FOR UPDATE (PostgreSQL, MySQL) : la ligne Battle
+      est verrouillée ; une action concurrente attend la fin de celle-ci.
+    - SQLite : compare-and-swap optimiste sur state_version.  L'UPDATE
+      conditionnel prend le verrou d'écriture de la base jusqu'au commit ;
+      0 ligne → une autre action a été validée depuis la lecture de
+      `battle` → BattleBusy (la transaction est annulée).
+
+    Dans les deux cas, state_version est incrémenté par l'UPDATE qui prend
+    le verrou : chaque action validée avance la version, quelle que soit la
+    réponse servie, et une requête qui a lu l'ancienne version échoue au CAS.
+
+    Retourne une instance relue en base pendant le verrou, avec le graphe
+    complet du tour (Battle.objects.hydrated()).
+    """
+    from myPokemonApp.models.Battle import Battle
+
+    features = connection.features
+    bump     = {'state_version': F('state_version') + 1}
+    with transaction.atomic():
+        if features.has_select_for_update:
+            # OF self : PostgreSQL refuse FOR UPDATE sur le côté nullable
+            # des jointures externes (opponent_trainer, held_item…)
+            of = ('self',) if features.has_select_for_update_of else ()
+            locked = Battle.objects.hydrated().select_for_update(of=of).get(pk=battle.pk)
+            Battle.objects.filter(pk=battle.pk).update(**bump)
+            locked.state_version += 1
+        else:
+            claimed = Battle.objects.filter(
+                pk=battle.pk, state_version=battle.state_version
+            ).update(**bump)
+            if not claimed:
+                raise BattleBusy(battle.pk)
+            locked = Battle.objects.hydrated().get(pk=battle.pk)
+        yield locked
+
+
+def get_idempotent_response(battle_id, key):
+    """Réponse déjà servie pour cette clé d'idempotence, ou None."""
+    from myPokemonApp.models.BattleActionReceipt import BattleActionReceipt
+    if not key:
+        return None
+    cutoff = timezone.now() - timedelta(seconds=IDEMPOTENCY_TIMEOUT)
+    return BattleActionReceipt.objects.filter(
+        battle_id=battle_id, key=key, created_at__gte=cutoff,
+    ).values_list('response', flat=True).first()
+
+
+def store_idempotent_response(battle_id, key, response):
+    """
+    Mémorise la réponse d'une action pour qu'un POST rejoué la renvoie telle
+    quelle.  À appeler dans la transaction du tour (battle_action_lock) : la
+    réponse n'est visible que si le tour est validé.
+    """
+    from myPokemonApp.models.BattleActionReceipt import BattleActionReceipt
+    if not key:
+        return
+    cutoff = timezone.now() - timedelta(seconds=IDEMPOTENCY_TIMEOUT)
+    BattleActionReceipt.objects.filter(battle_id=battle_id, created_at__lt=cutoff).delete()
+    BattleActionReceipt.objects.update_or_create(
+        battle_id=battle_id, key=key, defaults={'response': response},
+    )
@@ -0,0 +1,365 @@
+"""
+services/battle_simulator.py
+=============================
+Simulateur de combats IA contre IA, sans écriture en base.
+
+Le moteur de combat (Battle.execute_turn, formule de dégâts, EFFECT_REGISTRY,
+talents, scoring choose_enemy_move) est réutilisé tel quel : une
+SimulationSession (TurnSession avec persist=False) reste attachée au Battle
+pendant tout le combat, si bien que tous les save() du moteur deviennent des
+no-op sur des objets en mémoire.
+
+  - Les équipes sont chargées UNE fois (load_trainer_team / load_zone_pool)
+    puis copiées pour chaque combat ; les copies sont picklables et envoyées
+    aux workers d'un ProcessPoolExecutor.
+  - Les Pokémon sauvages tirés d'une table de spawn n'existent qu'en mémoire
+    (pk négatifs synthétiques, jamais sauvegardés).
+  - Filet de sécurité : chaque combat tourne dans un transaction.atomic()
+    annulé en fin de combat (effets qui touchent des Pokémon hors combat,
+    ex. Glas Soin sur le banc).
+
+Exports publics :
+    load_trainer_team(trainer)                          → dict (side)
+    load_zone_pool(zone, encounter_type, team_size)     → dict (side)
+    simulate_battle(side_a, side_b, seed, max_turns)    → {'winner', 'turns'}
+    run_simulations(side_a, side_b, battles, workers, seed, max_turns)
+        → dict (win rates, tours moyens, combats/s)
+"""
+
+import copy
+import itertools
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+
+from myPokemonApp.models.TurnSession import TurnSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TURNS = 300
+
+
+# =============================================================================
+# SESSION DE SIMULATION
+# =============================================================================
+
+class SimulationSession(TurnSession):
+    """TurnSession sans persistance, alimentée par des moves préchargés."""
+
+    def __init__(self, battle, move_instances, teams=()):
+        self._preloaded = move_instances    # pokemon.pk → [PokemonMoveInstance]
+        self._teams     = teams             # équipes en mémoire (IA 'lookahead')
+        super().__init__(battle, persist=False)
+        for team in teams:
+            for pokemon in team:
+                self.track(pokemon)
+
+    def _load_move_instances(self, pokemon):
+        return self._preloaded.get(pokemon.pk, [])
+
+    def team(self, pokemon):
+        for team in self._teams:
+            if any(p is pokemon for p in team):
+                return team
+        return None
+
+    def replace_move_instances(self, pokemon, move_instances):
+        """Remplace les moves suivis d'un Pokémon (replay : move appris en combat)."""
+        self._preloaded[pokemon.pk] = move_instances
+        for key in [k for k in self._moves if k[0] == pokemon.pk]:
+            del self._moves[key]
+        for mi in move_instances:
+            self._register_move_instance(mi)
+
+
+# =============================================================================
+# CHARGEMENT DES ÉQUIPES
+# =============================================================================
+
+def _moves_by_pokemon(pokemon_ids):
+    """PokemonMoveInstance groupées par Pokémon, en une seule requête."""
+    from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+
+    grouped = {pk: [] for pk in pokemon_ids}
+    for mi in (PokemonMoveInstance.objects
+               .filter(pokemon_id__in=pokemon_ids)
+               .select_related('move', 'move__type')):
+        grouped[mi.pokemon_id].append(mi)
+    return grouped
+
+
+def load_trainer_team(trainer):
+    """
+    Charge l'équipe active d'un dresseur pour la simulation.
+
+    Retourne un « side » picklable :
+        {'label', 'trainer', 'ai_flags', 'members': [(PlayablePokemon, [moves])]}
+    """
+    team = list(
+        trainer.pokemon_team
+        .filter(is_in_party=True)
+        .order_by('party_position')
+        .select_related('species', 'species__primary_type', 'species__secondary_type',
+                        'ability', 'held_item')
+    )
+    moves = _moves_by_pokemon([p.pk for p in team])
+    return {
+        'label':    trainer.username,
+        'trainer':  trainer,
+        'ai_flags': trainer.get_ai_flags(),
+        'members':  [(p, moves[p.pk]) for p in team],
+    }
+
+
+def load_zone_pool(zone, encounter_type='grass', team_size=6):
+    """
+    Prépare une équipe sauvage aléatoire tirée des WildPokemonSpawn d'une zone.
+
+    Les Pokémon sont tirés à chaque combat (voir _roll_wild_members) à partir
+    des spawns et learnsets chargés ici une seule fois.
+    """
+    from myPokemonApp.models.PokemonLearnableMove import PokemonLearnableMove
+    from myPokemonApp.models.PokemonMove import PokemonMove
+    from myPokemonApp.models.Trainer import Trainer
+    from myPokemonApp.models.Zone import WildPokemonSpawn
+
+    spawns = list(
+        WildPokemonSpawn.objects
+        .filter(zone=zone, encounter_type=encounter_type, spawn_rate__gt=0)
+        .select_related('pokemon', 'pokemon__primary_type', 'pokemon__secondary_type',
+                        'pokemon__ability_1', 'pokemon__ability_2',
+                        'pokemon__hidden_ability')
+    )
+    if not spawns:
+        raise ValueError(f"Aucun spawn '{encounter_type}' dans la zone {zone}")
+
+    learnsets = {s.pokemon_id: [] for s in spawns}
+    for lm in (PokemonLearnableMove.objects
+               .filter(pokemon_id__in=learnsets, learn_method='level', level_learned__gt=0)
+               .order_by('level_learned')
+               .select_related('move', 'move__type')):
+        learnsets[lm.pokemon_id].append((lm.level_learned, lm.move))
+
+    fallback = (PokemonMove.objects.select_related('type')
+                .filter(name__icontains='Charge').first()
+                or PokemonMove.objects.select_related('type').first())
+
+    return {
+        'label':     f"Sauvages ({zone.name})",
+        'trainer':   Trainer(username=f"Sauvages ({zone.name})", trainer_type='wild'),
+        'ai_flags':  {'basic', 'evaluate_attack'},
+        'spawns':    [(s.pokemon, s.level_min, s.level_max, s.spawn_rate) for s in spawns],
+        'learnsets': learnsets,
+        'fallback':  fallback,
+        'team_size': team_size,
+    }
+
+
+def _roll_wild_members(side, ids, rng):
+    """Tire une équipe sauvage en mémoire (pk négatifs, jamais sauvegardée) avec `rng`."""
+    from myPokemonApp.models.PlayablePokemon import PlayablePokemon, PokemonMoveInstance
+    from myPokemonApp.services.pokemon_factory import (
+        _build_ivs, assign_ability, generate_gender, generate_random_nature,
+    )
+
+    spawns  = side['spawns']
+    weights = [rate for *_, rate in spawns]
+    members = []
+    for species, level_min, level_max, _ in rng.choices(spawns, weights, k=side['team_size']):
+        level   = rng.randint(level_min, level_max)
+        pokemon = PlayablePokemon(
+            species=species,
+            trainer=side['trainer'],
+            level=level,
+            original_trainer='Wild',
+            is_in_party=True,
+            nature=generate_random_nature(rng),
+            gender=generate_gender(species, rng),
+            **_build_ivs(0, 31, rng)
+        )
+        pokemon.pk = next(ids)
+        assign_ability(pokemon, allow_hidden=True, rng=rng)
+        pokemon.calculate_stats()
+        pokemon.current_hp = pokemon.max_hp
+
+        # Même règle que learn_moves_up_to_level : les 4 derniers moves appris
+        known = {}
+        for level_learned, move in side['learnsets'].get(species.pk, []):
+            if level_learned <= level:
+                known[move.pk] = move
+        moves = list(known.values())[-4:] or [side['fallback']]
+        members.append((pokemon, [
+            PokemonMoveInstance(pokemon=pokemon, move=m, current_pp=m.pp)
+            for m in moves if m is not None
+        ]))
+    return members
+
+
+# =============================================================================
+# SIMULATION D'UN COMBAT
+# =============================================================================
+
+def _instantiate(side, ids, rng):
+    """Copies fraîches (PV max, sans statut ni stage) des membres d'un side.
+
+    Les équipes sauvages sont tirées avec `rng` (random.Random du combat).
+    """
+    from myPokemonApp.services.trainer_service import _STAGE_FIELDS
+
+    members = side['members'] if 'members' in side else _roll_wild_members(side, ids, rng)
+    team, moves = [], {}
+    for pokemon, move_instances in members:
+        clone = copy.copy(pokemon)
+        clone.current_hp       = clone.max_hp
+        clone.status_condition = None
+        clone.sleep_turns      = 0
+        for field in _STAGE_FIELDS:
+            setattr(clone, field, 0)
+        team.append(clone)
+
+        moves[clone.pk] = []
+        for mi in move_instances:
+            mi_clone = copy.copy(mi)
+            mi_clone.pokemon    = clone
+            mi_clone.current_pp = mi.move.pp
+            moves[clone.pk].append(mi_clone)
+    return team, moves
+
+
+def _next_alive(team, current):
+    return next((p for p in team if p is not current and not p.is_fainted()), None)
+
+
+def simulate_battle(side_a, side_b, seed=None, max_turns=DEFAULT_MAX_TURNS):
+    """
+    Joue un combat complet IA contre IA et retourne {'winner', 'turns'}.
+
+    winner : 'a', 'b' ou None (égalité : double K.O. ou max_turns atteint).
+    Le side A occupe le côté « player » du Battle, le side B le côté « opponent ».
+    """
+    from myPokemonApp.models.Battle import Battle
+
+    # Générateur local : ne réinitialise pas le module random du processus
+    rng = random.Random(seed)
+    ids = itertools.count(-1, -1)
+    team_a, moves_a = _instantiate(side_a, ids, rng)
+    team_b, moves_b = _instantiate(side_b, ids, rng)
+    if not team_a or not team_b:
+        raise ValueError("Chaque camp doit avoir au moins un Pokémon")
+
+    battle = Battle(
+        battle_type='trainer',
+        player_trainer=side_a['trainer'],
+        opponent_trainer=side_b['trainer'],
+        player_pokemon=team_a[0],
+        opponent_pokemon=team_b[0],
+        is_active=True,
+        battle_state={
+            'player_used_ids':   [team_a[0].pk],
+            'opponent_used_ids': [team_b[0].pk],
+        },
+    )
+    if seed is not None:
+        battle.seed_rng(seed)
+
+    winner = None
+    with transaction.atomic():
+        session = SimulationSession(battle, {**moves_a, **moves_b}, (team_a, team_b))
+        try:
+            while battle.current_turn <= max_turns:
+                a_action = battle.choose_enemy_move(
+                    battle.player_pokemon, battle.opponent_pokemon, ai_flags=side_a['ai_flags']
+                ) or {'type': 'pass'}
+                b_action = battle.choose_enemy_move(
+                    battle.opponent_pokemon, battle.player_pokemon, ai_flags=side_b['ai_flags']
+                ) or {'type': 'pass'}
+                battle.execute_turn(a_action, b_action)
+
+                # Remplacement des K.O. (comme opponent_switch_pokemon : sans effets d'entrée)
+                a_next = b_next = None
+                if battle.player_pokemon.is_fainted():
+                    a_next = _next_alive(team_a, battle.player_pokemon)
+                if battle.opponent_pokemon.is_fainted():
+                    b_next = _next_alive(team_b, battle.opponent_pokemon)
+                a_out = battle.player_pokemon.is_fainted() and a_next is None
+                b_out = battle.opponent_pokemon.is_fainted() and b_next is None
+                if a_out or b_out:
+                    winner = None if (a_out and b_out) else ('b' if a_out else 'a')
+                    break
+                for new, side in ((a_next, 'player'), (b_next, 'opponent')):
+                    if new is not None:
+                        session.track(new)
+                        setattr(battle, f'{side}_pokemon', new)
+                        battle._bstate().side(side).used_ids.append(new.pk)
+        finally:
+            session.discard()
+            transaction.set_rollback(True)
+
+    return {'winner': winner, 'turns': battle.current_turn - 1}
+
+
+# =============================================================================
+# SIMULATIONS EN MASSE
+# =============================================================================
+
+def _init_worker():
+    """Initialise Django dans un worker (spawn) et ouvre des connexions neuves."""
+    import django
+    from django.db import connections
+
+    django.setup()
+    connections.close_all()
+
+
+def _run_chunk(side_a, side_b, seeds, max_turns):
+    return [simulate_battle(side_a, side_b, seed=s, max_turns=max_turns) for s in seeds]
+
+
+def run_simulations(side_a, side_b, battles=100, workers=None, seed=None,
+                    max_turns=DEFAULT_MAX_TURNS):
+    """
+    Joue `battles` combats entre side_a et side_b et agrège les résultats.
+
+    workers=1 exécute tout dans le processus courant (tests, debug) ;
+    sinon les combats sont répartis sur un ProcessPoolExecutor.
+    Avec `seed`, chaque combat reçoit une graine dérivée : les résultats
+    sont reproductibles quel que soit le nombre de workers.
+    """
+    from django.db import connections
+
+    rng   = random.Random(seed)
+    seeds = [rng.getrandbits(32) if seed is not None else None for _ in range(battles)]
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = _run_chunk(side_a, side_b, seeds, max_turns)
+    else:
+        workers  = workers or os.cpu_count() or 1
+        n_chunks = workers * 4
+        chunks   = [seeds[i::n_chunks] for i in range(n_chunks) if seeds[i::n_chunks]]
+        connections.close_all()   # ne pas partager la connexion avec les workers forkés
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results  = [r for chunk in pool.map(_run_chunk,
+                                                 itertools.repeat(side_a), itertools.repeat(side_b),
+                                                 chunks, itertools.repeat(max_turns))
+                        for r in chunk]
+
+    elapsed = time.perf_counter() - start
+    wins_a  = sum(1 for r in results if r['winner'] == 'a')
+    wins_b  = sum(1 for r in results if r['winner'] == 'b')
+    total   = len(results)
+    return {
+        'battles':            total,
+        'wins_a':             wins_a,
+        'wins_b':             wins_b,
+        'draws':              total - wins_a - wins_b,
+        'win_rate_a':         wins_a / total if total else 0.0,
+        'win_rate_b':         wins_b / total if total else 0.0,
+        'avg_turns':          sum(r['turns'] for r in results) / total if total else 0.0,
+        'elapsed':            elapsed,
+        'battles_per_second': total / elapsed if elapsed else 0.0,
+    }
@@ -5,9 +5,10 @@ Système de capture et rencontres sauvages.
 
 Exports publics :
     calculate_capture_rate(pokemon, ball, hp_percent, status)  → float 0-1
-    calculate_shake_count(capture_rate_0_1)                    → (shakes, success)
+    calculate_shake_count(capture_rate_0_1, rng)               → (shakes, success)
     attempt_pokemon_capture(battle, ball_item, trainer)        → dict
     get_random_wild_pokemon(zone, encounter_type)              → (Pokemon, int) | (None, None)
+    sample_encounters(zone, encounter_type, n, rng)            → [(Pokemon, int)]
     get_encounter_chance(encounter_type)                       → bool
 """
 
@@ -72,7 +73,7 @@ def calculate_capture_rate(pokemon, ball, pokemon_hp_percent, pokemon_status=Non
     return min(1.0, ((hp_mod * base_rate * ball_mult) / 255) * status_mod)
 
 
-def calculate_shake_count(capture_rate_0_1):
+def calculate_shake_count(capture_rate_0_1, rng=random):
     """
     Calcule le nombre de shakes selon la formule officielle Gen 3 (FireRed/LeafGreen).
 
@@ -86,6 +87,7 @@ def calculate_shake_count(capture_rate_0_1):
 
     Args:
         capture_rate_0_1: float 0.0-1.0 (sortie de calculate_capture_rate)
+        rng:              générateur à utiliser (Battle.rng pour un combat rejouable)
     Returns:
         tuple (shakes: int 0-3, success: bool)
     """
@@ -100,7 +102,7 @@ def calculate_shake_count(capture_rate_0_1):
 
     shakes = 0
     for _ in range(4):
-        if random.randint(0, 65535) < b:
+        if rng.randint(0, 65535) < b:
             shakes += 1
         else:
             break
@@ -150,7 +152,7 @@ def attempt_pokemon_capture(battle, ball_item, trainer):
     except PokeballItem.DoesNotExist:
         pass
 
-    shakes, success = calculate_shake_count(capture_rate)
+    shakes, success = calculate_shake_count(capture_rate, rng=battle.rng)
 
     if not success:
         attempt.shakes = shakes
@@ -169,6 +171,7 @@ def attempt_pokemon_capture(battle, ball_item, trainer):
 def _capture_success(battle, opponent, ball_item, trainer, attempt, shakes):
     """Gère la capture réussie d'un Pokémon (helper privé)."""
     from myPokemonApp.models.CaptureSystem import CaptureJournal
+    from myPokemonApp.models.WildPokemon import persist_wild_pokemon
     from myPokemonApp.views.AchievementViews import trigger_achievements_after_capture
 
     # Mettre à jour battle_snapshot avec les HP finaux AVANT le transfert
@@ -198,16 +201,17 @@ def _capture_success(battle, opponent, ball_item, trainer, attempt, shakes):
     except Exception as exc:
         logger.warning("battle_snapshot capture update: %s", exc)
 
-    # Transférer le Pokémon sauvage existant (conserve IVs/EVs/nature/moves)
+    # Insérer le Pokémon sauvage (éphémère jusqu'ici) : conserve IVs/EVs/nature/moves
     party_count = trainer.pokemon_team.filter(is_in_party=True).count()
-    opponent.trainer          = trainer
-    opponent.original_trainer = trainer.username
-    opponent.pokeball_used    = ball_item.name
-    opponent.friendship       = 70
-    opponent.is_in_party      = party_count < 6
-    opponent.party_position   = party_count + 1 if party_count < 6 else None
-    opponent.save()
-    captured = opponent
+    captured = persist_wild_pokemon(
+        opponent,
+        trainer=trainer,
+        original_trainer=trainer.username,
+        pokeball_used=ball_item.name,
+        friendship=70,
+        is_in_party=party_count < 6,
+        party_position=party_count + 1 if party_count < 6 else None,
+    )
 
     is_first = not trainer.pokemon_team.filter(
         species=opponent.species
@@ -297,28 +301,36 @@ def get_random_wild_pokemon(zone, encounter_type='grass'):
     """
     Génère un Pokémon sauvage aléatoire selon les spawn rates d'une zone.
 
+    Tirage en O(1) et sans requête dans la table précompilée de la zone
+    (models/EncounterTable.py).
+
     Returns:
         (Pokemon species, level) ou (None, None) si aucun spawn configuré.
     """
-    from myPokemonApp.models.Zone import WildPokemonSpawn
+    from myPokemonApp.models.EncounterTable import get_encounter_tables
 
-    spawns = WildPokemonSpawn.objects.filter(zone=zone, encounter_type=encounter_type)
-    if not spawns.exists():
+    table = get_encounter_tables().table(zone.pk, encounter_type)
+    if table is None:
         return None, None
+    return table.sample()
 
-    total = sum(s.spawn_rate for s in spawns)
-    if total == 0:
-        return None, None
 
-    roll, cumulative = random.uniform(0, total), 0
-    for spawn in spawns:
-        cumulative += spawn.spawn_rate
-        if roll <= cumulative:
-            return spawn.pokemon, random.randint(spawn.level_min, spawn.level_max)
+def sample_encounters(zone, encounter_type='grass', n=1, rng=None):
+    """
+    Tire n rencontres sauvages indépendantes (simulations, statistiques).
+
+    Args:
+        rng: random.Random optionnel (tirages reproductibles)
+
+    Returns:
+        [(Pokemon species, level)] — liste vide si aucun spawn configuré.
+    """
+    from myPokemonApp.models.EncounterTable import get_encounter_tables
 
-    # Fallback (ne devrait jamais arriver si total > 0)
-    first = spawns.first()
-    return first.pokemon, random.randint(first.level_min, first.level_max)
+    table = get_encounter_tables().table(zone.pk, encounter_type)
+    if table is None:
+        return []
+    return table.sample_many(n, rng or random)
 
 
 def get_encounter_chance(encounter_type='grass'):
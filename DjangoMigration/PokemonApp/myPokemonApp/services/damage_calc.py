@@ -0,0 +1,263 @@
+"""
+services/damage_calc.py
+=======================
+Calculateur de fourchettes de dégâts, pur et par lots.
+
+Battle.calculate_damage tire le critique et l'aléa, écrit dans le log et dans
+battle_state : il ne sert qu'à résoudre un coup.  Les consommateurs qui
+veulent seulement *estimer* (IA, aperçu des moves côté UI, commande
+damage_table pour l'équilibrage) passent par ce module :
+
+  1. damage_inputs(attacker, defender, move, battle=None)
+        → DamageInputs : les facteurs de la formule (niveau, puissance, A/D,
+          STAB, table des types, brûlure, écrans, objet tenu, taux de critique),
+          lus sans aucun effet de bord.
+  2. damage_ranges(inputs, target_hp)
+        → [DamageRange(min, max, expected, ko_chance)] : évalue la formule
+          pour tout le lot sur les 16 jets d'aléa (85 → 100 %) et les deux
+          branches critique / non critique.
+
+La formule est celle de calculate_damage (facteurs multipliés puis tronqués
+une seule fois, plancher à 1).  Le calcul est vectorisé avec NumPy s'il est
+installé, sinon une boucle Python produit exactement les mêmes valeurs.
+
+Exports publics :
+    DamageInputs, DamageRange
+    damage_inputs(attacker, defender, move, battle=None) → DamageInputs
+    damage_ranges(inputs, target_hp)                     → list[DamageRange]
+    estimate_moves(attacker, defender, moves, battle=None) → {move.id: DamageRange}
+"""
+
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:     # dépendance optionnelle : repli en Python pur
+    np = None
+
+from myPokemonApp.models.TypeChart import get_type_chart
+
+
+# Jets d'aléa 85 % → 100 % (16 valeurs équiprobables)
+ROLLS = tuple(r / 100 for r in range(85, 101))
+
+CRIT_MULTIPLIER = 1.5
+
+# Objets tenus qui boostent un type (held_effect → nom du type)
+TYPE_BOOST_ITEMS = {
+    'type_boost_fire':     'fire',
+    'type_boost_electric': 'electric',
+    'type_boost_water':    'water',
+    'type_boost_psychic':  'psychic',
+    'type_boost_grass':    'grass',
+    'type_boost_normal':   'normal',
+}
+
+# Baies de résistance (held_effect → type atténué si super efficace)
+RESIST_BERRIES = {
+    'resist_berry_ice':   'ice',
+    'resist_berry_fight': 'fighting',
+}
+
+
+class DamageInputs(NamedTuple):
+    """Facteurs de la formule de dégâts pour un triplet (attaquant, défenseur, move)."""
+    level:     int
+    power:     int
+    attack:    int
+    defense:   int
+    stab:      float
+    type_mult: float
+    burn:      float
+    screen:    float
+    item:      float
+    crit_rate: float
+
+    @property
+    def modifier(self):
+        """Produit des multiplicateurs hors critique et aléa."""
+        return self.stab * self.type_mult * self.burn * self.screen * self.item
+
+
+class DamageRange(NamedTuple):
+    """Fourchette de dégâts d'un triplet."""
+    min:       int      # jet 85 %, sans critique
+    max:       int      # jet 100 %, critique si possible
+    expected:  float    # espérance sur les jets et la branche critique
+    ko_chance: float    # P(dégâts ≥ PV de la cible)
+
+
+# =============================================================================
+# EXTRACTION DES FACTEURS (sans effet de bord)
+# =============================================================================
+
+def _held_effect(pokemon):
+    item = getattr(pokemon, 'held_item', None)
+    return item.held_effect if item and item.held_effect else None
+
+
+def _ability(pokemon):
+    ability = getattr(pokemon, 'ability', None)
+    return ability if ability and ability.effect_tag else None
+
+
+def damage_inputs(attacker, defender, move, battle=None):
+    """
+    Facteurs de la formule de calculate_damage pour un coup.
+
+    Sans `battle` : pas d'écrans ni de Puissance (Focus Energy), talents
+    modify_stat évalués hors combat (météo ignorée).
+    """
+    physical = move.category == 'physical'
+    if physical:
+        attack  = attacker.get_effective_attack()
+        defense = defender.get_effective_defense()
+    else:
+        attack  = attacker.get_effective_special_attack()
+        defense = defender.get_effective_special_defense()
+
+    attk_ability = _ability(attacker)
+    def_ability  = _ability(defender)
+    if attk_ability:
+        mult = attk_ability.modify_stat('attack' if physical else 'special_attack',
+                                        attacker, battle)
+        if mult != 1.0:
+            attack = int(attack * mult)
+    if def_ability:
+        mult = def_ability.modify_stat('defense' if physical else 'special_defense',
+                                       defender, battle)
+        if mult != 1.0:
+            defense = int(defense * mult)
+        if def_ability.effect_tag == 'marvel_scale' and defender.status_condition:
+            defense = int(defense * 1.5)
+
+    chart     = get_type_chart()
+    species   = defender.species
+    type_mult = chart.multiplier(
+        move.type_id, species.primary_type_id, species.secondary_type_id
+    )
+    stab = 1.5 if move.type_id in (attacker.species.primary_type_id,
+                                   attacker.species.secondary_type_id) else 1.0
+
+    burn = 1.0
+    if (attacker.status_condition == 'burn' and physical
+            and not (attk_ability and attk_ability.effect_tag == 'guts')):
+        burn = 0.5
+
+    screen = 1.0
+    if battle is not None:
+        side   = 'opponent' if attacker == battle.player_pokemon else 'player'
+        screen = battle.get_screen_multiplier(side, move.category)
+
+    item      = 1.0
+    attk_held = _held_effect(attacker)
+    if attk_held and move.power:
+        if attk_held == 'life_orb':
+            item *= 1.3
+        elif attk_held == 'choice_band' and physical:
+            item *= 1.5
+        elif attk_held == 'choice_specs' and move.category == 'special':
+            item *= 1.5
+        elif attk_held in TYPE_BOOST_ITEMS and \
+                chart.type_id(TYPE_BOOST_ITEMS[attk_held]) == move.type_id:
+            item *= 1.2
+    def_held = _held_effect(defender)
+    if (def_held in RESIST_BERRIES and move.power and type_mult >= 2.0
+            and chart.type_id(RESIST_BERRIES[def_held]) == move.type_id):
+        item *= 0.5
+
+    if def_ability and def_ability.effect_tag in ('shell_armor', 'battle_armor'):
+        crit_rate = 0.0
+    else:
+        crit_rate = 1 / 16
+        if battle is not None and battle.has_focus_energy(attacker):
+            crit_rate = 1 / 4
+        effect = getattr(move, 'effect', '') or ''
+        if effect == 'high_crit':
+            crit_rate = min(1.0, crit_rate * 4)
+        elif effect == 'always_crit':
+            crit_rate = 1.0
+
+    return DamageInputs(
+        level=attacker.level, power=move.power or 0, attack=attack, defense=defense,
+        stab=stab, type_mult=type_mult, burn=burn, screen=screen, item=item,
+        crit_rate=crit_rate,
+    )
+
+
+# =============================================================================
+# ÉVALUATION PAR LOTS
+# =============================================================================
+
+def _base(i):
+    return ((2 * i.level / 5 + 2) * i.power * i.attack / max(1, i.defense)) / 50 + 2
+
+
+def _ranges_python(inputs, target_hp):
+    results = []
+    n_rolls = len(ROLLS)
+    for i, hp in zip(inputs, target_hp):
+        if not i.power or i.type_mult == 0:
+            results.append(DamageRange(0, 0, 0.0, 0.0))
+            continue
+        scaled = _base(i) * i.modifier
+        normal = [max(1, int(scaled * r)) for r in ROLLS]
+        crit   = [max(1, int(scaled * CRIT_MULTIPLIER * r)) for r in ROLLS]
+        c      = i.crit_rate
+        results.append(DamageRange(
+            min=normal[0] if c < 1.0 else crit[0],
+            max=crit[-1] if c > 0.0 else normal[-1],
+            expected=((1 - c) * sum(normal) + c * sum(crit)) / n_rolls,
+            ko_chance=((1 - c) * sum(d >= hp for d in normal)
+                       + c * sum(d >= hp for d in crit)) / n_rolls,
+        ))
+    return results
+
+
+def _ranges_numpy(inputs, target_hp):
+    level, power, attack, defense, stab, type_mult, burn, screen, item, crit_rate = (
+        np.asarray(column, dtype=float) for column in zip(*inputs)
+    )
+    hp    = np.asarray(target_hp, dtype=float)[:, None]
+    rolls = np.asarray(ROLLS)[None, :]
+
+    base   = ((2 * level / 5 + 2) * power * attack / np.maximum(1, defense)) / 50 + 2
+    scaled = (base * (stab * type_mult * burn * screen * item))[:, None]
+    normal = np.maximum(1, np.floor(scaled * rolls))
+    crit   = np.maximum(1, np.floor(scaled * CRIT_MULTIPLIER * rolls))
+
+    c        = crit_rate
+    expected = (1 - c) * normal.mean(axis=1) + c * crit.mean(axis=1)
+    ko       = (1 - c) * (normal >= hp).mean(axis=1) + c * (crit >= hp).mean(axis=1)
+    low      = np.where(c < 1.0, normal[:, 0], crit[:, 0])
+    high     = np.where(c > 0.0, crit[:, -1], normal[:, -1])
+
+    zero = (power == 0) | (type_mult == 0)
+    return [
+        DamageRange(0, 0, 0.0, 0.0) if zero[k] else
+        DamageRange(int(low[k]), int(high[k]), float(expected[k]), float(ko[k]))
+        for k in range(len(inputs))
+    ]
+
+
+def damage_ranges(inputs, target_hp):
+    """
+    Fourchettes de dégâts d'un lot de triplets.
+
+    Args:
+        inputs:    séquence de DamageInputs
+        target_hp: PV de la cible pour chaque triplet (même longueur)
+    """
+    inputs = list(inputs)
+    if not inputs:
+        return []
+    if np is not None:
+        return _ranges_numpy(inputs, target_hp)
+    return _ranges_python(inputs, target_hp)
+
+
+def estimate_moves(attacker, defender, moves, battle=None):
+    """Fourchettes de chaque move d'attacker contre defender : {move.id: DamageRange}."""
+    inputs = [damage_inputs(attacker, defender, move, battle) for move in moves]
+    ranges = damage_ranges(inputs, [defender.current_hp] * len(inputs))
+    return {move.id: r for move, r in zip(moves, ranges)}
@@ -95,14 +95,18 @@ def _catch_pokemon_simple(wild_pokemon, trainer, pokeball_item):
                   else 1.0)
 
     if random.random() < (catch_rate * pokeball_item.catch_rate_modifier * hp_mod * status_mod) / 255:
+        from myPokemonApp.models.WildPokemon import persist_wild_pokemon
+
         party_count = trainer.pokemon_team.filter(is_in_party=True).count()
-        wild_pokemon.trainer          = trainer
-        wild_pokemon.original_trainer = trainer.username
-        wild_pokemon.pokeball_used    = pokeball_item.name
-        wild_pokemon.friendship       = 70
-        wild_pokemon.is_in_party      = party_count < 6
-        wild_pokemon.party_position   = party_count + 1 if party_count < 6 else None
-        wild_pokemon.save()
+        persist_wild_pokemon(
+            wild_pokemon,
+            trainer=trainer,
+            original_trainer=trainer.username,
+            pokeball_used=pokeball_item.name,
+            friendship=70,
+            is_in_party=party_count < 6,
+            party_position=party_count + 1 if party_count < 6 else None,
+        )
         return True, f"{wild_pokemon.species.name} a été capturé !"
 
     return False, f"{wild_pokemon.species.name} s'est libéré de la ball !"
\ No newline at end of file
@@ -19,7 +19,7 @@ Exports publics :
     assign_ability(pokemon, allow_hidden=True)       → None
 
     # Création Pokémon
-    create_wild_pokemon(species, level, location)    → PlayablePokemon
+    create_wild_pokemon(species, level, location)    → PlayablePokemon (éphémère)
     create_starter_pokemon(species, trainer, ...)    → PlayablePokemon
 
     # Création NPC
@@ -38,11 +38,12 @@ logger = logging.getLogger(__name__)
 # HELPERS INTERNES
 # =============================================================================
 
-def _build_ivs(iv_min=0, iv_max=31):
+def _build_ivs(iv_min=0, iv_max=31, rng=None):
     """Génère un dict d'IVs aléatoires entre iv_min et iv_max."""
+    rng = rng or random
     iv_stats = ('iv_hp', 'iv_attack', 'iv_defense',
                 'iv_special_attack', 'iv_special_defense', 'iv_speed')
-    return {stat: random.randint(iv_min, iv_max) for stat in iv_stats}
+    return {stat: rng.randint(iv_min, iv_max) for stat in iv_stats}
 
 
 def _finalize_pokemon(pokemon, level):
@@ -216,9 +217,9 @@ def exp_at_level_for_species(species, level):
         return n ** 3
 
 
-def generate_random_nature():
+def generate_random_nature(rng=None):
     """Génère une nature aléatoire parmi les 25 natures."""
-    return random.choice([
+    return (rng or random).choice([
         'Hardy', 'Lonely', 'Brave',   'Adamant', 'Naughty',
         'Bold',  'Docile', 'Relaxed', 'Impish',  'Lax',
         'Timid', 'Hasty',  'Serious', 'Jolly',   'Naive',
@@ -227,7 +228,7 @@ def generate_random_nature():
     ])
 
 
-def generate_gender(species):
+def generate_gender(species, rng=None):
     """
     Tire le genre d'un Pokémon selon le gender_ratio de son espèce.
 
@@ -237,14 +238,16 @@ def generate_gender(species):
          1.0 → toujours mâle   ('M')
          0.875 → starters / plupart des pseudo-légendaires
          0.5   → majorité des espèces
+
+    rng : random.Random optionnel (tirages reproductibles)
     """
     ratio = getattr(species, 'gender_ratio', 0.5)
     if ratio < 0:
         return 'N'
-    return 'M' if random.random() < ratio else 'F'
+    return 'M' if (rng or random).random() < ratio else 'F'
 
 
-def assign_ability(pokemon, allow_hidden=True):
+def assign_ability(pokemon, allow_hidden=True, rng=None):
     """
     Assigne un talent (Ability) à un PlayablePokemon en tirant au sort
     parmi les slots définis sur son espèce.
@@ -258,13 +261,14 @@ def assign_ability(pokemon, allow_hidden=True):
     Args:
         pokemon      : PlayablePokemon (non encore sauvegardé ou déjà en base)
         allow_hidden : False pour les starters / créations sans talent caché
+        rng          : random.Random optionnel (tirages reproductibles)
     """
     pool = pokemon.species.get_ability_pool(allow_hidden=allow_hidden)
     if not pool:
         return  # espèce sans talent défini
 
     total = sum(weight for _, weight in pool)
-    roll  = random.uniform(0, total)
+    roll  = (rng or random).uniform(0, total)
     cumul = 0
     for ability, weight in pool:
         cumul += weight
@@ -274,10 +278,40 @@ def assign_ability(pokemon, allow_hidden=True):
             return
 
 
+def _wild_moves(species, level):
+    """
+    [(PokemonMove, pp)] d'un Pokémon sauvage, sans écriture : même règle que
+    learn_moves_up_to_level (4 dernières capacités de niveau), Charge à défaut.
+    Les moves viennent du catalogue (une requête pour le learnset).
+    """
+    from myPokemonApp.models.MoveCatalogue import get_move_catalogue
+    from myPokemonApp.models.PokemonMove import PokemonMove
+
+    seen_moves = {}
+    for move_id in species.learnable_moves.filter(
+        learn_method='level',
+        level_learned__gt=0,
+        level_learned__lte=level,
+    ).order_by('level_learned').values_list('move_id', flat=True):
+        seen_moves[move_id] = True
+
+    catalogue = get_move_catalogue()
+    moves = [catalogue.get(move_id) for move_id in list(seen_moves)[-4:]]
+    moves = [move for move in moves if move is not None]
+    if not moves:
+        tackle = (
+            PokemonMove.objects.select_related('type').filter(name__icontains='Charge').first()
+            or PokemonMove.objects.select_related('type').first()
+        )
+        moves = [tackle] if tackle else []
+    return [(move, move.pp) for move in moves]
+
+
 def create_wild_pokemon(species, level, location=None):
     """
-    Crée un Pokémon sauvage avec des IVs aléatoires (0-31) et garantit
-    au moins un move via ensure_has_moves().
+    Crée un Pokémon sauvage éphémère avec des IVs aléatoires (0-31) et au
+    moins un move.  Rien n'est écrit en base : la ligne PlayablePokemon n'est
+    insérée qu'en cas de capture (voir models/WildPokemon.py).
 
     Args:
         species:  Pokemon (espèce)
@@ -285,9 +319,10 @@ def create_wild_pokemon(species, level, location=None):
         location: str optionnel (nom de la zone de capture)
 
     Returns:
-        PlayablePokemon sauvegardé avec stats et moves
+        PlayablePokemon en mémoire (is_ephemeral) avec stats et moves
     """
     from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+    from myPokemonApp.models.WildPokemon import make_ephemeral
     from myPokemonApp.services.trainer_service import get_or_create_wild_trainer
 
     is_shiny = random.randint(1, 8192) == 1  # Probabilité Gen 1 : 1/8192
@@ -306,9 +341,9 @@ def create_wild_pokemon(species, level, location=None):
         **_build_ivs(0, 31)
     )
     assign_ability(pokemon, allow_hidden=True)  # sauvages peuvent avoir le talent caché
-    _finalize_pokemon(pokemon, level)
-    ensure_has_moves(pokemon)
-    return pokemon
+    pokemon.calculate_stats()
+    pokemon.current_hp = pokemon.max_hp
+    return make_ephemeral(pokemon, _wild_moves(species, level))
 
 
 def create_starter_pokemon(species, trainer, nickname=None, is_shiny=False):
@@ -0,0 +1,211 @@
+"""
+services/profiling.py
+=====================
+Profilage par requête des endpoints chauds (combat, carte) : mesures, phases
+du moteur et buffer circulaire, sans dépendance à la couche HTTP — les
+modèles et services importent profile_phase d'ici.
+
+  - @profiled_view       : marque une vue ; pendant son exécution, chaque
+                           requête SQL est comptée et chronométrée.
+  - @profile_phase(nom)  : cumule le temps passé dans une fonction du moteur
+                           (execute_turn, calculate_damage…) pour la requête
+                           en cours.  Hors vue profilée : simple appel.
+                           Les handlers d'effets de moves sont comptés de la
+                           même façon (phases 'effect:<Classe>').
+  - current_profile()    : profil de la requête en cours (ContextVar).
+  - recent_profiles() / clear_profiles() / summarize() : buffer circulaire
+                           des profils clôturés, lu par ProfilingViews.
+
+Les profils sont clôturés et publiés par middleware.profiling.ProfilingMiddleware.
+
+Configuration : section `profiling` de secrets.yaml (voir
+secrets.yaml.example), exposée dans settings.PROFILING.
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+
+DEFAULTS = {
+    'enabled':     True,
+    'buffer_size': 200,     # profils conservés en mémoire (par processus)
+    'log_json':    False,   # une ligne JSON par requête profilée
+    'thresholds': {         # warning si dépassé (None = pas de seuil)
+        'queries':        50,
+        'db_ms':          200,
+        'total_ms':       500,
+        'response_bytes': 200_000,
+    },
+}
+
+
+def get_config():
+    """DEFAULTS complétés par settings.PROFILING."""
+    custom = getattr(settings, 'PROFILING', None) or {}
+    return {
+        **DEFAULTS,
+        **custom,
+        'thresholds': {**DEFAULTS['thresholds'], **(custom.get('thresholds') or {})},
+    }
+
+
+# =============================================================================
+# PROFIL D'UNE REQUÊTE
+# =============================================================================
+
+class RequestProfile:
+    """Mesures d'une requête profilée."""
+
+    __slots__ = ('view', 'path', 'method', 'started', 'queries', 'db_ms',
+                 'phases', 'total_ms', 'response_bytes', 'status')
+
+    def __init__(self, view, request):
+        self.view           = view
+        self.path           = request.path
+        self.method         = request.method
+        self.started        = time.perf_counter()
+        self.queries        = 0
+        self.db_ms          = 0.0
+        self.phases         = {}    # {nom: [appels, ms cumulées]}
+        self.total_ms       = 0.0
+        self.response_bytes = 0
+        self.status         = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Wrapper connection.execute_wrapper : compte et chronomètre le SQL."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms   += (time.perf_counter() - start) * 1000
+
+    def add_phase(self, name, elapsed_ms):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [1, elapsed_ms]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+
+    def as_dict(self):
+        return {
+            'view':           self.view,
+            'path':           self.path,
+            'method':         self.method,
+            'status':         self.status,
+            'queries':        self.queries,
+            'db_ms':          round(self.db_ms, 2),
+            'total_ms':       round(self.total_ms, 2),
+            'response_bytes': self.response_bytes,
+            'phases': {
+                name: {'calls': calls, 'ms': round(ms, 2)}
+                for name, (calls, ms) in self.phases.items()
+            },
+        }
+
+
+# Profil de la requête en cours (None hors vue profilée)
+_current = ContextVar('request_profile', default=None)
+
+# Buffer circulaire des derniers profils (tous threads confondus)
+_buffer_lock = threading.Lock()
+_buffer      = deque(maxlen=DEFAULTS['buffer_size'])
+
+
+def record_profile(profile):
+    """Ajoute un profil clôturé au buffer circulaire."""
+    global _buffer
+    size = get_config()['buffer_size']
+    with _buffer_lock:
+        if _buffer.maxlen != size:
+            _buffer = deque(_buffer, maxlen=size)
+        _buffer.append(profile.as_dict())
+
+
+def recent_profiles():
+    """Copie des profils du buffer, du plus ancien au plus récent."""
+    with _buffer_lock:
+        return list(_buffer)
+
+
+def clear_profiles():
+    with _buffer_lock:
+        _buffer.clear()
+
+
+def summarize(profiles):
+    """Agrégat par vue : nombre, moyennes, max et cumul par phase."""
+    summary = {}
+    for p in profiles:
+        s = summary.setdefault(p['view'], {
+            'count': 0, 'queries': 0, 'db_ms': 0.0, 'total_ms': 0.0,
+            'max_total_ms': 0.0, 'response_bytes': 0, 'phases': {},
+        })
+        s['count']          += 1
+        s['queries']        += p['queries']
+        s['db_ms']          += p['db_ms']
+        s['total_ms']       += p['total_ms']
+        s['response_bytes'] += p['response_bytes']
+        s['max_total_ms']    = max(s['max_total_ms'], p['total_ms'])
+        for name, phase in p['phases'].items():
+            s['phases'][name] = s['phases'].get(name, 0.0) + phase['ms']
+
+    for s in summary.values():
+        n = s['count']
+        for key in ('queries', 'db_ms', 'total_ms', 'response_bytes'):
+            s[f'avg_{key}'] = round(s.pop(key) / n, 2)
+        s['phases'] = {name: round(ms / n, 2) for name, ms in s['phases'].items()}
+    return summary
+
+
+# =============================================================================
+# DÉCORATEURS
+# =============================================================================
+
+def profiled_view(view_func):
+    """Profile la vue : SQL compté et chronométré, phases du moteur cumulées."""
+    name = view_func.__name__
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not get_config()['enabled']:
+            return view_func(request, *args, **kwargs)
+        profile = RequestProfile(name, request)
+        request._profile = profile   # clôturé par middleware.ProfilingMiddleware
+        token = _current.set(profile)
+        try:
+            with connection.execute_wrapper(profile):
+                return view_func(request, *args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+def current_profile():
+    """Profil de la requête en cours, ou None hors vue profilée."""
+    return _current.get()
+
+
+def profile_phase(name):
+    """Cumule le temps passé dans la fonction décorée pour la requête en cours."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add_phase(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
@@ -4,19 +4,37 @@ services/serializers.py
 Sérialisation JSON des objets de combat pour les réponses API.
 
 Fonctions publiques :
-    serialize_pokemon(pokemon, include_moves=False) → dict
+    serialize_pokemon(pokemon, include_moves=False, preview_against=None, battle=None) → dict
     serialize_pokemon_moves(pokemon)                → list[dict]
     build_battle_response(battle)                   → dict
+    diff_state(old, new)                            → dict
+    apply_state_version(battle, response, since_version=None) → dict
 """
 
+from myPokemonApp.services.profiling import profile_phase
+from myPokemonApp.services.damage_calc import estimate_moves
 
-def serialize_pokemon(pokemon, include_moves=False):
+
+# Clés de build_battle_response() qui décrivent l'état du combat (versionné) ;
+# les autres (log, battle_ended, result, pending_*…) sont propres à la réponse.
+STATE_KEYS = (
+    'player_pokemon', 'opponent_pokemon',
+    'player_hp', 'player_max_hp', 'opponent_hp', 'opponent_max_hp',
+    'battle_state', 'turn_info', 'hp_before_eot',
+)
+
+
+def serialize_pokemon(pokemon, include_moves=False, preview_against=None, battle=None):
     """
     Sérialise un PlayablePokemon en dict JSON prêt à être envoyé au client.
 
     Args:
-        pokemon:       PlayablePokemon
-        include_moves: bool — inclure la liste des moves avec PP courants
+        pokemon:         PlayablePokemon
+        include_moves:   bool — inclure la liste des moves avec PP courants
+        preview_against: PlayablePokemon — ajoute à chaque move un aperçu
+                         'damage_preview' {min, max, ko_chance} contre lui
+                         (services/damage_calc, sans effet de bord)
+        battle:          Battle — écrans / Puissance pris en compte dans l'aperçu
 
     Utilisé dans build_battle_response() et GetTrainerTeam().
     """
@@ -32,6 +50,7 @@ def serialize_pokemon(pokemon, include_moves=False):
     }
 
     if include_moves:
+        move_instances = pokemon.move_instances()
         data['moves'] = [
             {
                 'id':         mi.move.id,
@@ -42,9 +61,22 @@ def serialize_pokemon(pokemon, include_moves=False):
                 'current_pp': mi.current_pp,
                 'max_pp':     mi.move.pp,
             }
-            for mi in pokemon.pokemonmoveinstance_set.select_related('move', 'move__type').all()
+            for mi in move_instances
         ]
 
+        if preview_against is not None:
+            previews = estimate_moves(
+                pokemon, preview_against, [mi.move for mi in move_instances], battle
+            )
+            for entry in data['moves']:
+                r = previews[entry['id']]
+                if entry['power']:
+                    entry['damage_preview'] = {
+                        'min':       r.min,
+                        'max':       r.max,
+                        'ko_chance': round(r.ko_chance, 2),
+                    }
+
     return data
 
 
@@ -75,6 +107,7 @@ def serialize_pokemon_moves(pokemon):
     ]
 
 
+@profile_phase('build_battle_response')
 def build_battle_response(battle):
     """
     Construit le dict JSON complet renvoyé au client après chaque action.
@@ -98,39 +131,39 @@ def build_battle_response(battle):
     exp_needed   = max(1, exp_at_next - exp_at_current)
     exp_percent  = int(min(100, (exp_in_level / exp_needed) * 100))
 
-    player_data = serialize_pokemon(pp, include_moves=True)
+    opp = battle.opponent_pokemon
+
+    player_data = serialize_pokemon(pp, include_moves=True, preview_against=opp, battle=battle)
     player_data['current_exp']        = exp_in_level   # XP dans le niveau actuel
     player_data['exp_for_next_level'] = exp_needed     # XP requise pour passer au suivant
     player_data['exp_percent']        = exp_percent
 
-    opp = battle.opponent_pokemon
-    bs  = battle.battle_state if isinstance(battle.battle_state, dict) else {}
+    bs  = battle._bstate()
 
-    def pst(pokemon):
-        return bs.get(str(pokemon.pk), {})
-
-    p_pst = pst(pp)
-    o_pst = pst(opp)
+    p_pst = bs.pokemon(pp.pk)
+    o_pst = bs.pokemon(opp.pk)
+    p_side = bs.side('player')
+    o_side = bs.side('opponent')
 
     battle_state = {
         # ── Météo ──────────────────────────────────────────────────────────
-        'weather':       bs.get('weather'),
-        'weather_turns': bs.get('weather_turns', 0),
+        'weather':       battle.weather,
+        'weather_turns': bs.weather_turns,
 
         # ── États volatils joueur ──────────────────────────────────────────
-        'player_confused':       bool(p_pst.get('confusion_turns', 0)),
-        'player_leech_seed':     bool(p_pst.get('leech_seed')),
-        'player_trapped':        bool(p_pst.get('trap_turns', 0)),
-        'player_badly_poisoned': bool(p_pst.get('toxic')),
-        'player_charging':       p_pst.get('charging_move'),
-        'player_recharge':       bool(p_pst.get('recharge')),
-        'player_protected':      bool(p_pst.get('protect')),
-        'player_focus_energy':   bool(p_pst.get('focus_energy')),
-        'player_ingrain':        bool(p_pst.get('ingrain')),
-        'player_rampaging':      bool(p_pst.get('rampage_turns', 0)),
+        'player_confused':       bool(p_pst.confusion_turns),
+        'player_leech_seed':     p_pst.leech_seed,
+        'player_trapped':        bool(p_pst.trap_turns),
+        'player_badly_poisoned': p_pst.badly_poisoned,
+        'player_charging':       p_pst.charging,
+        'player_recharge':       p_pst.recharge,
+        'player_protected':      p_pst.protected,
+        'player_focus_energy':   p_pst.focus_energy,
+        'player_ingrain':        p_pst.ingrain,
+        'player_rampaging':      bool(p_pst.rampage_turns),
         'player_screens': {
-            'light_screen': bs.get('player_light_screen', 0),
-            'reflect':      bs.get('player_reflect', 0),
+            'light_screen': p_side.light_screen,
+            'reflect':      p_side.reflect,
         },
 
         # ── Stat stages joueur ─────────────────────────────────────────────
@@ -143,19 +176,19 @@ def build_battle_response(battle):
         'player_eva_stage':   pp.evasion_stage,
 
         # ── États volatils adversaire ──────────────────────────────────────
-        'opponent_confused':       bool(o_pst.get('confusion_turns', 0)),
-        'opponent_leech_seed':     bool(o_pst.get('leech_seed')),
-        'opponent_trapped':        bool(o_pst.get('trap_turns', 0)),
-        'opponent_badly_poisoned': bool(o_pst.get('toxic')),
-        'opponent_charging':       o_pst.get('charging_move'),
-        'opponent_recharge':       bool(o_pst.get('recharge')),
-        'opponent_protected':      bool(o_pst.get('protect')),
-        'opponent_focus_energy':   bool(o_pst.get('focus_energy')),
-        'opponent_ingrain':        bool(o_pst.get('ingrain')),
-        'opponent_rampaging':      bool(o_pst.get('rampage_turns', 0)),
+        'opponent_confused':       bool(o_pst.confusion_turns),
+        'opponent_leech_seed':     o_pst.leech_seed,
+        'opponent_trapped':        bool(o_pst.trap_turns),
+        'opponent_badly_poisoned': o_pst.badly_poisoned,
+        'opponent_charging':       o_pst.charging,
+        'opponent_recharge':       o_pst.recharge,
+        'opponent_protected':      o_pst.protected,
+        'opponent_focus_energy':   o_pst.focus_energy,
+        'opponent_ingrain':        o_pst.ingrain,
+        'opponent_rampaging':      bool(o_pst.rampage_turns),
         'opponent_screens': {
-            'light_screen': bs.get('opponent_light_screen', 0),
-            'reflect':      bs.get('opponent_reflect', 0),
+            'light_screen': o_side.light_screen,
+            'reflect':      o_side.reflect,
         },
 
         # ── Stat stages adversaire ─────────────────────────────────────────
@@ -183,10 +216,76 @@ def build_battle_response(battle):
         'battle_state':     battle_state,
         # Ordre du tour : le frontend l'utilise pour savoir si le second attaquant
         # a réellement agi (skip si K.O. avant son tour)
-        'turn_info':        bs.get('last_turn_info', {
+        'turn_info':        bs.last_turn_info or {
             'player_first':   True,
             'second_skipped': False,
-        }),
+        },
         # HP avant les effets de fin de tour (pour animations EOT côté frontend)
-        'hp_before_eot':    bs.get('hp_before_eot', None),
-    }
\ No newline at end of file
+        'hp_before_eot':    bs.hp_before_eot,
+    }
+
+
+# =============================================================================
+# RÉPONSES DELTA (state_version)
+# =============================================================================
+
+def diff_state(old, new):
+    """
+    Différence récursive entre deux états sérialisés.
+
+    Les dicts sont comparés clé par clé ; toute autre valeur (listes
+    comprises) est renvoyée entière si elle a changé.  Une clé disparue
+    vaut None.
+    """
+    delta = {}
+    for key, value in new.items():
+        before = old.get(key)
+        if value == before:
+            continue
+        if isinstance(value, dict) and isinstance(before, dict):
+            delta[key] = diff_state(before, value)
+        else:
+            delta[key] = value
+    for key in old.keys() - new.keys():
+        delta[key] = None
+    return delta
+
+
+def apply_state_version(battle, response, since_version=None):
+    """
+    Versionne l'état contenu dans `response` et le remplace par un delta
+    si le client possède déjà la version précédente.
+
+    - La version est Battle.state_version, incrémentée par chaque action
+      validée (battle_action_lock).
+    - La base des deltas est en base, pas dans le cache local du processus :
+      Battle.served_state garde le dernier état servi et sa version
+      ({'version': n, 'state': {...}}), écrit dans la transaction de
+      l'action — n'importe quel worker peut donc servir le delta suivant.
+    - since_version = version de served_state → les clés STATE_KEYS sont
+      retirées et remplacées par 'delta' (diff_state) + 'base_version'.
+    - since_version absente ou plus ancienne → réponse complète (resync).
+
+    Retourne `response` (modifié sur place) avec 'state_version'.
+    """
+    state = {key: response[key] for key in STATE_KEYS if key in response}
+    if not state:
+        return response  # réponse d'erreur sans état : rien à versionner
+
+    version = battle.state_version
+    served  = battle.served_state or {}
+    base    = served.get('state') if since_version is not None \
+        and served.get('version') == since_version else None
+
+    battle.served_state = {'version': version, 'state': state}
+    type(battle).objects.filter(pk=battle.pk).update(served_state=battle.served_state)
+    response['state_version'] = version
+
+    if base is None:
+        return response
+
+    for key in STATE_KEYS:
+        response.pop(key, None)
+    response['delta']        = diff_state(base, state)
+    response['base_version'] = since_version
+    return response
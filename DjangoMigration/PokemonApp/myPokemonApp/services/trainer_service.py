@@ -37,6 +37,9 @@ logger = logging.getLogger(__name__)
 # Reset possible via _reset_wild_trainer_cache() pour les tests.
 _wild_trainer_cache = None
 
+# Dresseurs porteurs des Pokémon sauvages (nom actuel + nom historique)
+WILD_TRAINER_NAMES = ('Wild', 'wild_pokemon')
+
 
 def get_or_create_wild_trainer():
     """
@@ -154,18 +157,21 @@ def cleanup_orphan_wild_pokemon():
     Supprime les PlayablePokemon sauvages orphelins (trainer 'Wild' ou 'wild_pokemon')
     qui ne sont plus liés à aucun combat actif.
 
-    À appeler avant de créer un nouveau combat sauvage pour éviter
-    l'accumulation de lignes inutiles en base.
+    Les Pokémon sauvages sont désormais éphémères (models/WildPokemon.py) et
+    ne créent plus de lignes : ne reste utile que pour purger celles des
+    combats créés auparavant (maintenance).
     """
     from myPokemonApp.models.Battle import Battle
     from myPokemonApp.models.PlayablePokemon import PlayablePokemon
 
+    # Combats sauvages éphémères : opponent_pokemon_id NULL, à écarter de la
+    # sous-requête (NOT IN (…, NULL) ne retient aucune ligne)
     active_wild_ids = Battle.objects.filter(
-        is_active=True
+        is_active=True, opponent_pokemon__isnull=False
     ).values_list('opponent_pokemon_id', flat=True)
 
     PlayablePokemon.objects.filter(
-        trainer__username__in=('Wild', 'wild_pokemon')
+        trainer__username__in=WILD_TRAINER_NAMES
     ).exclude(id__in=active_wild_ids).delete()
 
 
@@ -0,0 +1,52 @@
+"""
+services/travel_service.py
+==========================
+Déplacements sur la carte : itinéraires multi-zones et dresseurs bloquants.
+
+Les itinéraires sont calculés sur le graphe des zones en mémoire
+(models/ZoneGraph.py) avec les capacités du dresseur chargées une fois
+(questEngine.TrainerCapabilities) : un calcul de route coûte les requêtes de
+TrainerCapabilities.build, quel que soit le nombre de zones parcourues.
+
+Exports publics :
+    route(trainer, from_zone, to_zone, caps=None) → [Zone] | None
+    battle_blocker(trainer, zone)                 → Trainer | None
+"""
+
+from myPokemonApp.models.ZoneGraph import get_zone_graph
+
+
+def route(trainer, from_zone, to_zone, caps=None):
+    """
+    Plus court chemin praticable par `trainer` de from_zone à to_zone :
+    zones traversées (départ exclu, arrivée incluse), [] si déjà sur place,
+    None si aucun chemin (CS, flag, badge, objet, quête manquants).
+    """
+    from myPokemonApp.questEngine import TrainerCapabilities
+    caps = caps or TrainerCapabilities.build(trainer)
+    return get_zone_graph().route(caps, from_zone.pk, to_zone.pk)
+
+
+def battle_blocker(trainer, zone):
+    """
+    Dresseur obligatoire (is_battle_required) non vaincu qui empêche de quitter
+    `zone` — dans la zone ou l'un de ses étages accessibles —, ou None.
+    """
+    from myPokemonApp.models.Trainer import Trainer
+    from myPokemonApp.questEngine import can_access_floor
+    from myPokemonApp.services.player_service import get_defeated_trainer_ids
+
+    if zone.is_safe_zone:
+        return None
+
+    defeated_ids = get_defeated_trainer_ids(trainer)
+    locations    = [zone.name]
+    if zone.has_floors:
+        for floor in zone.floors.all():
+            accessible, _ = can_access_floor(trainer, floor)
+            if accessible:
+                locations.append(f"{zone.name}-{floor.floor_number}")
+
+    return Trainer.objects.filter(
+        is_npc=True, is_battle_required=True, location__in=locations,
+    ).exclude(id__in=defeated_ids).first()
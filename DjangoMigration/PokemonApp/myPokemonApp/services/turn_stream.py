@@ -0,0 +1,137 @@
+"""
+services/turn_stream.py
+=======================
+Flux des événements d'un tour, en direct, vers le client (Server-Sent Events).
+
+Le moteur (Battle.emit) publie chaque événement dès qu'il se produit :
+capacité utilisée, dégâts / critique, PV, statut, K.O., effets de fin de
+tour, EXP.  La vue asynchrone battle_stream_view (views/BattleStreamViews.py)
+s'abonne au combat et relaie ces événements : battle-game.js peut afficher le
+tour pendant sa résolution, sans attendre la réponse du POST.
+
+Le broker est local au processus (un dict de files asyncio) : suffisant pour
+un déploiement mono-nœud servi en ASGI (PokemonApp/asgi.py).  La publication
+vient du thread qui exécute la vue d'action (synchrone) : elle est remise à
+la boucle de chaque abonné par call_soon_threadsafe.  Sans abonné, publier ne
+coûte qu'une lecture de dict.
+
+Un abonné trop lent (file pleine) perd ses événements en attente et reçoit
+un événement 'resync' : le client se recale alors sur la réponse du POST.
+
+Exports publics :
+    TurnEvent                              (NamedTuple : seq, kind, turn, data)
+    TurnStreamBroker, broker
+    has_subscribers(battle_id)             → bool
+    publish(battle_id, kind, turn, **data) → None
+    format_sse(event)                      → str
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+from typing import NamedTuple
+
+# Événements en attente par abonné avant resync
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class TurnEvent(NamedTuple):
+    """Un événement du flux d'un combat."""
+    seq:  int     # ordre de publication (croissant pour tout le processus)
+    kind: str     # 'move', 'damage', 'hp', 'status', 'faint', 'eot', 'exp', 'log'…
+    turn: int
+    data: dict
+
+
+RESYNC = 'resync'
+
+
+class Subscription:
+    """File asyncio d'un abonné, alimentée depuis n'importe quel thread."""
+
+    def __init__(self, broker, battle_id, loop):
+        self._broker   = broker
+        self.battle_id = battle_id
+        self._loop     = loop
+        self._queue    = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _deliver(self, event):
+        # Exécuté dans la boucle de l'abonné
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(TurnEvent(event.seq, RESYNC, event.turn, {}))
+
+    def push(self, event):
+        """Remet un événement à l'abonné (thread-safe)."""
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:   # boucle fermée : l'abonné est parti
+            self.close()
+
+    async def get(self, timeout=None):
+        """Prochain événement, ou None après `timeout` secondes."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class TurnStreamBroker:
+    """Abonnés par combat : {battle_id: [Subscription]}."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock        = threading.Lock()
+        self._seq         = itertools.count(1)
+
+    def subscribe(self, battle_id):
+        """Nouvel abonné au combat (à appeler dans la boucle asyncio de l'abonné)."""
+        subscription = Subscription(self, battle_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(battle_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.battle_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.battle_id, None)
+
+    def has_subscribers(self, battle_id):
+        return battle_id in self._subscribers
+
+    def publish(self, battle_id, kind, turn, **data):
+        """Diffuse un événement à tous les abonnés du combat."""
+        subscribers = self._subscribers.get(battle_id)
+        if not subscribers:
+            return
+        event = TurnEvent(next(self._seq), kind, turn, data)
+        for subscription in list(subscribers):
+            subscription.push(event)
+
+
+broker = TurnStreamBroker()
+
+
+def has_subscribers(battle_id):
+    return broker.has_subscribers(battle_id)
+
+
+def publish(battle_id, kind, turn, **data):
+    broker.publish(battle_id, kind, turn, **data)
+
+
+def format_sse(event):
+    """Événement → bloc text/event-stream (id, event, data JSON)."""
+    payload = json.dumps({'turn': event.turn, **event.data},
+                         separators=(',', ':'), ensure_ascii=False)
+    return f"id: {event.seq}\nevent: {event.kind}\ndata: {payload}\n\n"
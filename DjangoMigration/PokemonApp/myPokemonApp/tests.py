@@ -14,16 +14,44 @@ Organisation :
   8. TestCalculateShakeCount   — calculate_shake_count (logique pure)
   9. TestHealTeamService       — heal_team bulk (integration légère)
  10. TestPokemonCenterHeal     — PokemonCenter.heal_trainer_team (integration légère)
+ 11. TestTurnSession           — execute_turn : écritures différées + commit unique
+ 12. TestTypeChart             — table des types précalculée (lookups sans requête)
+ 13. TestBattleSimulator       — simulate_battles : combats IA vs IA sans écriture
+ 14. TestBattleReplay          — RNG par combat + replay_battle depuis le flux d'actions
+ 15. TestBattleEvent           — journal en table append-only (BattleEvent)
+ 16. TestStateVersion          — réponses delta (state_version + diff_state)
+ 17. TestBattleVolatileState   — battle_state typé à slots (format compact v2)
+ 18. TestProfiling             — budget de requêtes / phases (middleware de profilage)
+ 19. TestBattleActionLock      — verrou par combat + idempotence des actions
+ 20. TestAILookahead           — flag IA 'lookahead' (expectimax borné)
+ 21. TestAIContext             — contexte de scoring IA précalculé (dégâts, types)
+ 22. TestDamageCalc            — fourchettes de dégâts par lots (services/damage_calc)
+ 23. TestDamageResult          — compute_damage pur + apply_damage_result
+ 24. TestMoveEffectDispatch    — chaînes de handlers d'effets précompilées
+ 25. TestAbilityDispatch       — tables de hooks des talents construites une fois
+ 26. TestBattleHydration       — Battle.objects.hydrated() + identity map des Pokémon
+ 27. TestMoveCatalogue         — catalogue des capacités (id, nom FR/EN) sans requête
+ 28. TestBattleArchive         — archive_battles : résumé en colonnes + journal compressé
+ 29. TestTurnStream           — événements de tour publiés en direct (SSE)
+ 30. TestAISpeculation        — décision IA précalculée + empreinte de validité
+ 31. TestZoneAccess           — TrainerCapabilities + accès aux zones évalué en lot
+ 32. TestZoneGraph            — graphe des zones en mémoire + itinéraires multi-zones
+ 33. TestEncounterTable       — tables de rencontres précompilées (méthode des alias)
+ 34. TestWildPokemon          — Pokémon sauvages éphémères, insérés seulement à la capture
+ 35. TestQuestIndex           — index des déclencheurs de quêtes + progression en une requête
 
 Lancer avec :
     python manage.py test myPokemonApp.tests
 """
 
+from unittest import skipUnless
 from unittest.mock import MagicMock, patch, PropertyMock
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
+from myPokemonApp.services.damage_calc import np
+
 User = get_user_model()
 
 
@@ -917,4 +945,2063 @@ class TestPokemonCenterHeal(TestCase):
         initial_money = self.trainer.money
         self.center.heal_trainer_team(self.trainer)
         self.trainer.refresh_from_db()
-        self.assertEqual(self.trainer.money, initial_money - 300)
\ No newline at end of file
+        self.assertEqual(self.trainer.money, initial_money - 300)
+
+
+# =============================================================================
+# 10. TURN SESSION — écritures différées de execute_turn (intégration)
+# =============================================================================
+
+class TestTurnSession(TestCase):
+    """execute_turn doit persister tout le tour en une seule transaction."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        self.player   = make_trainer(username='Red')
+        self.opponent = make_trainer(username='Blue', trainer_type='npc')
+        self.move     = make_move(name='Tackle', pp=35, power=40)
+        self.p_poke   = make_playable_pokemon(self.player)
+        self.o_poke   = make_playable_pokemon(self.opponent)
+        self.p_mi = PokemonMoveInstance.objects.create(
+            pokemon=self.p_poke, move=self.move, current_pp=35)
+        self.o_mi = PokemonMoveInstance.objects.create(
+            pokemon=self.o_poke, move=self.move, current_pp=35)
+        self.battle = Battle.objects.create(
+            battle_type='trainer',
+            player_trainer=self.player,
+            opponent_trainer=self.opponent,
+            player_pokemon=self.p_poke,
+            opponent_pokemon=self.o_poke,
+        )
+        self.attack = {'type': 'attack', 'move': self.move}
+        self.p_hp   = self.p_poke.current_hp
+        self.o_hp   = self.o_poke.current_hp
+
+    def _write_queries(self, ctx):
+        return [q['sql'] for q in ctx.captured_queries
+                if q['sql'].startswith(('UPDATE', 'INSERT', 'DELETE'))]
+
+    def test_turn_is_persisted(self):
+        """Après le tour : PV, PP, log et numéro de tour sont en base."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        with patch('myPokemonApp.models.Battle.random.random', return_value=0.99), \
+             patch('myPokemonApp.models.Battle.random.randint', return_value=1):
+            self.battle.execute_turn(self.attack, self.attack)
+
+        self.o_poke.refresh_from_db()
+        self.p_poke.refresh_from_db()
+        self.assertLess(self.o_poke.current_hp, self.o_hp)
+        self.assertLess(self.p_poke.current_hp, self.p_hp)
+        self.assertEqual(PokemonMoveInstance.objects.get(pk=self.p_mi.pk).current_pp, 34)
+        self.assertEqual(PokemonMoveInstance.objects.get(pk=self.o_mi.pk).current_pp, 34)
+
+        stored = Battle.objects.get(pk=self.battle.pk)
+        self.assertEqual(stored.current_turn, 2)
+        self.assertTrue(any('utilise Tackle' in m for m in stored.turn_log(1)))
+
+    def test_turn_writes_are_batched(self):
+        """Un tour d'attaque simple ne doit émettre qu'une poignée d'écritures."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with patch('myPokemonApp.models.Battle.random.random', return_value=0.99), \
+             patch('myPokemonApp.models.Battle.random.randint', return_value=1):
+            with CaptureQueriesContext(connection) as ctx:
+                self.battle.execute_turn(self.attack, self.attack)
+        # 1 UPDATE Battle + 1 INSERT BattleEvent + 1 bulk_update Pokémon + 1 bulk_update PP
+        self.assertLessEqual(len(self._write_queries(ctx)), 4)
+
+    def test_team_cure_and_struggle_are_deferred(self):
+        """Équipe soignée et Lutte passent par la session : aucune écriture avant le commit."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from myPokemonApp.models.MoveCatalogue import invalidate_move_catalogue
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        heal_bell = make_move(name='Glas Soin', power=0, category='status')
+        heal_bell.effect = 'cure_team_status'
+        heal_bell.save()
+        make_move(name='Struggle', pp=1, power=50)
+        invalidate_move_catalogue()
+        PokemonMoveInstance.objects.create(pokemon=self.p_poke, move=heal_bell, current_pp=5)
+        bench = make_playable_pokemon(self.player, status_condition='poison')
+        PokemonMoveInstance.objects.filter(pk=self.o_mi.pk).update(current_pp=0)
+        self.battle.refresh_hydrated()
+
+        with patch('myPokemonApp.models.Battle.random.random', return_value=0.99), \
+             patch('myPokemonApp.models.Battle.random.randint', return_value=1):
+            with CaptureQueriesContext(connection) as ctx:
+                self.battle.execute_turn({'type': 'attack', 'move': heal_bell}, self.attack)
+
+        self.assertLessEqual(len(self._write_queries(ctx)), 4)
+        bench.refresh_from_db()
+        self.assertIsNone(bench.status_condition)
+        self.assertTrue(any('utilise Struggle' in m for m in self.battle.turn_log(1)))
+        self.assertFalse(PokemonMoveInstance.objects.filter(move__name='Struggle').exists())
+
+    def test_exception_discards_turn(self):
+        """Une exception en cours de tour ne doit laisser aucune écriture partielle."""
+        from myPokemonApp.models.Battle import Battle
+        with patch.object(Battle, '_apply_end_of_turn_effects', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.battle.execute_turn(self.attack, self.attack)
+
+        self.o_poke.refresh_from_db()
+        self.assertEqual(self.o_poke.current_hp, self.o_hp)
+        self.assertEqual(Battle.objects.get(pk=self.battle.pk).current_turn, 1)
+        self.assertIsNone(self.battle._turn_session)
+        self.assertIsNone(self.o_poke._turn_session)
+
+
+# =============================================================================
+# 11. TYPE CHART — table des efficacités précalculée
+# =============================================================================
+
+class TestTypeChart(TestCase):
+    """get_type_chart : construite depuis strong_against, invalidée par signaux."""
+
+    def setUp(self):
+        from myPokemonApp.models.TypeChart import invalidate_type_chart
+        self.fire   = make_pokemon_type('fire')
+        self.water  = make_pokemon_type('water')
+        self.grass  = make_pokemon_type('grass')
+        self.normal = make_pokemon_type('normal')
+        self.ghost  = make_pokemon_type('ghost')
+        self.fire.strong_against.add(self.grass)
+        self.water.strong_against.add(self.fire)
+        invalidate_type_chart()
+
+    def test_multipliers(self):
+        """2.0 / 0.5 / 1.0 / 0.0 selon strong_against et les immunités."""
+        from myPokemonApp.models.TypeChart import get_type_chart
+        chart = get_type_chart()
+        self.assertEqual(chart.effectiveness(self.fire.pk, self.grass.pk), 2.0)
+        self.assertEqual(chart.effectiveness(self.grass.pk, self.fire.pk), 0.5)
+        self.assertEqual(chart.effectiveness(self.fire.pk, self.normal.pk), 1.0)
+        self.assertEqual(chart.effectiveness(self.normal.pk, self.ghost.pk), 0.0)
+        self.assertEqual(chart.multiplier(self.fire.pk, self.grass.pk, self.water.pk), 1.0)
+
+    def test_lookup_is_query_free(self):
+        """Une fois construite, la table ne fait plus aucune requête."""
+        from myPokemonApp.models.TypeChart import get_type_chart
+        get_type_chart()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.water.get_effectiveness(self.fire), 2.0)
+
+    def test_relation_change_rebuilds_chart(self):
+        """Modifier strong_against (admin, init_db) invalide la table."""
+        from myPokemonApp.models.TypeChart import get_type_chart
+        self.assertEqual(get_type_chart().effectiveness(self.grass.pk, self.water.pk), 1.0)
+        self.grass.strong_against.add(self.water)
+        self.assertEqual(get_type_chart().effectiveness(self.grass.pk, self.water.pk), 2.0)
+
+    def test_immune_defender_takes_no_damage(self):
+        """Sol contre Vol dans execute_turn : PV intacts, pas de dégât minimum."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        mud_shot = make_move(name='Mud Shot')
+        mud_shot.type = make_pokemon_type('ground')
+        mud_shot.save()
+        pidgey = make_species(name='Pidgey', pokedex_number=16)
+        pidgey.primary_type = make_pokemon_type('flying')
+        pidgey.save()
+
+        player, rival = make_trainer(username='Red'), make_trainer(username='Blue', trainer_type='npc')
+        mine   = make_playable_pokemon(player)
+        flyer  = make_playable_pokemon(rival, species=pidgey)
+        PokemonMoveInstance.objects.create(pokemon=mine, move=mud_shot, current_pp=35)
+        battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=player, opponent_trainer=rival,
+            player_pokemon=mine, opponent_pokemon=flyer,
+        )
+        hp_before = flyer.current_hp
+        battle.execute_turn({'type': 'attack', 'move': mud_shot}, {'type': 'pass'})
+
+        flyer.refresh_from_db()
+        self.assertEqual(flyer.current_hp, hp_before)
+        log = battle.turn_log(1)
+        self.assertIn("Ça n'a aucun effet !", log)
+        self.assertFalse(any('subit' in message for message in log))
+
+
+# =============================================================================
+# 12. BATTLE SIMULATOR — combats IA contre IA en mémoire
+# =============================================================================
+
+class TestBattleSimulator(TestCase):
+    """run_simulations / simulate_battle ne doivent jamais écrire en base."""
+
+    def setUp(self):
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        from myPokemonApp.services.battle_simulator import load_trainer_team
+        self.move = make_move(name='Tackle', pp=35, power=40)
+        sides = []
+        for username in ('Pierre', 'Ondine'):
+            trainer = make_trainer(username=username, trainer_type='gym_leader')
+            for position in (1, 2):
+                poke = make_playable_pokemon(trainer)
+                poke.party_position = position
+                poke.save()
+                PokemonMoveInstance.objects.create(pokemon=poke, move=self.move, current_pp=35)
+            sides.append(load_trainer_team(trainer))
+        self.side_a, self.side_b = sides
+
+    def test_run_simulations_report(self):
+        """Le rapport agrège victoires, égalités et tours moyens."""
+        from myPokemonApp.services.battle_simulator import run_simulations
+        stats = run_simulations(self.side_a, self.side_b, battles=6, workers=1, seed=7)
+        self.assertEqual(stats['battles'], 6)
+        self.assertEqual(stats['wins_a'] + stats['wins_b'] + stats['draws'], 6)
+        self.assertGreater(stats['avg_turns'], 1)
+
+    def test_same_seed_same_results(self):
+        """Une même graine rejoue exactement les mêmes combats."""
+        from myPokemonApp.services.battle_simulator import simulate_battle
+        first  = [simulate_battle(self.side_a, self.side_b, seed=s) for s in range(4)]
+        second = [simulate_battle(self.side_a, self.side_b, seed=s) for s in range(4)]
+        self.assertEqual(first, second)
+
+    def test_seed_leaves_global_random_untouched(self):
+        """La graine d'un combat ne réinitialise pas le module random du processus."""
+        import random
+        from myPokemonApp.services.battle_simulator import load_zone_pool, simulate_battle
+        from myPokemonApp.models.Zone import WildPokemonSpawn, Zone
+
+        zone = Zone.objects.create(name='Route 1', zone_type='route')
+        WildPokemonSpawn.objects.create(zone=zone, pokemon=self.side_a['members'][0][0].species,
+                                        level_min=3, level_max=5)
+        pool = load_zone_pool(zone, team_size=2)
+
+        state = random.getstate()
+        simulate_battle(self.side_a, pool, seed=5)
+        self.assertEqual(random.getstate(), state)
+        # Les équipes sauvages restent reproductibles
+        self.assertEqual(simulate_battle(self.side_a, pool, seed=5),
+                         simulate_battle(self.side_a, pool, seed=5))
+
+    def test_no_writes(self):
+        """Aucun INSERT/UPDATE/DELETE, aucun Battle créé, PV et PP intacts."""
+        from django.db import connection
+        from django.db.models import F
+        from django.test.utils import CaptureQueriesContext
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon, PokemonMoveInstance
+        from myPokemonApp.services.battle_simulator import simulate_battle
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = simulate_battle(self.side_a, self.side_b, seed=3)
+
+        self.assertIn(result['winner'], ('a', 'b', None))
+        writes = [q['sql'] for q in ctx.captured_queries
+                  if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(writes, [])
+        self.assertFalse(Battle.objects.exists())
+        self.assertFalse(PlayablePokemon.objects.filter(current_hp__lt=F('max_hp')).exists())
+        self.assertEqual(set(PokemonMoveInstance.objects.values_list('current_pp', flat=True)), {35})
+
+    def test_wild_zone_team(self):
+        """Une équipe sauvage tirée des spawns n'existe qu'en mémoire."""
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        from myPokemonApp.models.PokemonLearnableMove import PokemonLearnableMove
+        from myPokemonApp.models.Zone import WildPokemonSpawn, Zone
+        from myPokemonApp.services.battle_simulator import load_zone_pool, simulate_battle
+
+        species = make_species(name='Rattata', pokedex_number=19)
+        PokemonLearnableMove.objects.create(
+            pokemon=species, move=self.move, level_learned=1, learn_method='level')
+        zone = Zone.objects.create(name='Route 1', zone_type='route')
+        WildPokemonSpawn.objects.create(zone=zone, pokemon=species, level_min=3, level_max=5)
+
+        before = PlayablePokemon.objects.count()
+        result = simulate_battle(self.side_a, load_zone_pool(zone, team_size=3), seed=1)
+        self.assertIn(result['winner'], ('a', 'b', None))
+        self.assertEqual(PlayablePokemon.objects.count(), before)
+
+
+# =============================================================================
+# 13. BATTLE REPLAY — RNG par combat et flux d'actions rejouable
+# =============================================================================
+
+class TestBattleReplay(TestCase):
+    """start_battle(seed=…) + replay_battle doivent reproduire le même log."""
+
+    def setUp(self):
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        self.tackle = make_move(name='Tackle', pp=35, power=40)
+        self.growl  = make_move(name='Growl', pp=40, power=0, category='status')
+        self.player = make_trainer(username='Red')
+        self.rival  = make_trainer(username='Blue', trainer_type='rival')
+        for trainer in (self.player, self.rival):
+            for position in (1, 2):
+                poke = make_playable_pokemon(trainer, level=12)
+                poke.party_position = position
+                poke.save()
+                for move in (self.tackle, self.growl):
+                    PokemonMoveInstance.objects.create(
+                        pokemon=poke, move=move, current_pp=move.pp)
+        self._reset_teams()
+
+    def _play(self, seed, turns=6):
+        """Joue quelques tours comme la vue : un Battle rechargé par requête."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.services.battle_service import (
+            get_opponent_ai_action, opponent_switch_pokemon, start_battle,
+        )
+        battle, _ = start_battle(self.player, opponent_trainer=self.rival, seed=seed)
+        for _ in range(turns):
+            battle = Battle.objects.get(pk=battle.pk)
+            if battle.player_pokemon.is_fainted() or not battle.is_active:
+                break
+            battle.execute_turn({'type': 'attack', 'move': self.tackle},
+                                get_opponent_ai_action(battle))
+            if battle.opponent_pokemon.is_fainted() and not opponent_switch_pokemon(battle):
+                break
+        return Battle.objects.get(pk=battle.pk)
+
+    def _reset_teams(self):
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        for poke in PlayablePokemon.objects.all():
+            poke.current_hp = poke.max_hp
+            poke.status_condition = None
+            poke.save()
+            poke.restore_all_pp()
+
+    def test_seed_is_stored_not_exposed(self):
+        """La graine est dans battle_state mais pas dans la réponse JSON."""
+        from myPokemonApp.services import build_battle_response
+        battle = self._play(seed=1234, turns=0)
+        self.assertEqual(battle.battle_state['rng'], {'seed': 1234, 'step': 0})
+        self.assertNotIn('rng', build_battle_response(battle)['battle_state'])
+
+    def test_same_seed_same_log(self):
+        """Deux combats avec la même graine et les mêmes actions → même log."""
+        first = [e['message'] for e in self._play(seed=42).get_log()]
+        self._reset_teams()
+        second = [e['message'] for e in self._play(seed=42).get_log()]
+        self.assertEqual(first, second)
+
+    def test_replay_reproduces_log(self):
+        """replay_battle rejoue le flux et retrouve exactement le log d'origine."""
+        from myPokemonApp.services.battle_replay import replay_battle
+        battle = self._play(seed=7)
+        self.assertGreater(battle.battle_state['rng']['step'], 0)
+
+        result = replay_battle(battle)
+        self.assertTrue(result['expected'])
+        self.assertEqual(result['log'], result['expected'])
+        self.assertTrue(result['matches'])
+
+    def test_stream_is_stored_as_rows(self):
+        """Le flux est en lignes BattleReplayStep : battle_state ne garde que l'indicateur."""
+        from myPokemonApp.models.BattleReplayStep import BattleReplayStep
+        battle = self._play(seed=11, turns=3)
+        self.assertEqual(battle.battle_state['replay'], 1)
+
+        kinds = list(BattleReplayStep.objects.filter(battle=battle)
+                     .order_by('seq').values_list('event', flat=True))
+        self.assertEqual([e[0] for e in kinds].count('T'), battle.current_turn - 1)
+        self.assertEqual(battle.replay_events(), kinds)
+
+    def test_replay_writes_nothing(self):
+        """Le replay tourne en mémoire : la base n'est pas modifiée."""
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        from myPokemonApp.services.battle_replay import replay_battle
+        battle = self._play(seed=3)
+        hp_before = dict(PlayablePokemon.objects.values_list('pk', 'current_hp'))
+        replay_battle(battle)
+        self.assertEqual(dict(PlayablePokemon.objects.values_list('pk', 'current_hp')), hp_before)
+
+    def test_battle_without_stream(self):
+        """Un combat sans flux enregistré lève ValueError."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.services.battle_replay import replay_battle
+        battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player,
+            player_pokemon=self.player.pokemon_team.first(),
+            opponent_pokemon=self.rival.pokemon_team.first(),
+        )
+        with self.assertRaises(ValueError):
+            replay_battle(battle)
+
+
+# =============================================================================
+# 14. BATTLE EVENT — journal de combat en table append-only
+# =============================================================================
+
+class TestBattleEvent(TestCase):
+    """add_to_log → lignes BattleEvent ; un seul INSERT par tour."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        self.player = make_trainer(username='Red')
+        self.rival  = make_trainer(username='Blue', trainer_type='rival')
+        self.battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.rival,
+            player_pokemon=make_playable_pokemon(self.player),
+            opponent_pokemon=make_playable_pokemon(self.rival),
+        )
+
+    def test_add_to_log_appends_rows(self):
+        """Hors tour, chaque message est une ligne ; battle_log n'est plus touché."""
+        from myPokemonApp.models.BattleEvent import BattleEvent
+        self.battle.add_to_log("Un")
+        self.battle.add_to_log("Deux")
+        rows = list(BattleEvent.objects.filter(battle=self.battle).values_list('seq', 'turn', 'message'))
+        self.assertEqual(rows, [(0, 1, "Un"), (1, 1, "Deux")])
+        self.battle.refresh_from_db()
+        self.assertEqual(self.battle.battle_log, [])
+
+    def test_seq_continues_across_instances(self):
+        """Un Battle rechargé reprend la numérotation après le dernier événement."""
+        from myPokemonApp.models.Battle import Battle
+        self.battle.add_to_log("Un")
+        reloaded = Battle.objects.get(pk=self.battle.pk)
+        reloaded.add_to_log("Deux")
+        self.assertEqual([e['message'] for e in reloaded.get_log()], ["Un", "Deux"])
+        self.assertEqual(reloaded.log_length(), 2)
+
+    def test_turn_log_filters_by_turn(self):
+        """turn_log ne renvoie que les messages des tours demandés."""
+        self.battle.add_to_log("Tour 1")
+        self.battle.current_turn = 2
+        self.battle.add_to_log("Tour 2")
+        self.assertEqual(self.battle.turn_log(2), ["Tour 2"])
+        self.assertEqual(self.battle.recent_log(1), ["Tour 2"])
+
+    def test_turn_messages_are_one_insert(self):
+        """Pendant une TurnSession, les messages partent en un seul bulk_create."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from myPokemonApp.models.TurnSession import TurnSession
+        session = TurnSession(self.battle)
+        for i in range(5):
+            self.battle.add_to_log(f"Message {i}")
+        with CaptureQueriesContext(connection) as ctx:
+            session.commit()
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.battle.events.count(), 5)
+
+    def test_discarded_turn_logs_nothing(self):
+        """Un tour avorté n'écrit aucun message."""
+        from myPokemonApp.models.TurnSession import TurnSession
+        session = TurnSession(self.battle)
+        self.battle.add_to_log("Perdu")
+        session.discard()
+        self.assertFalse(self.battle.events.exists())
+
+    def test_legacy_json_log_still_readable(self):
+        """Un combat antérieur à BattleEvent se lit depuis battle_log."""
+        self.battle.battle_log = [{'turn': 1, 'message': "Ancien"}]
+        self.battle.save()
+        self.assertEqual(self.battle.get_log(), [{'turn': 1, 'message': "Ancien"}])
+
+
+# =============================================================================
+# 15. STATE VERSION — réponses delta de battle_action_view
+# =============================================================================
+
+class TestStateVersion(TestCase):
+    """apply_state_version : version incrémentée à chaque action, delta sinon resync."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        self.player = make_trainer(username='Red')
+        self.p_poke = make_playable_pokemon(self.player)
+        self.o_poke = make_playable_pokemon(make_trainer(username='Blue', trainer_type='rival'))
+        self.battle = Battle.objects.create(
+            battle_type='wild', player_trainer=self.player,
+            player_pokemon=self.p_poke, opponent_pokemon=self.o_poke,
+        )
+
+    def _respond(self, since_version=None):
+        """Une action (sous battle_action_lock) et sa réponse versionnée."""
+        from myPokemonApp.services.battle_service import battle_action_lock
+        from myPokemonApp.services.serializers import apply_state_version, build_battle_response
+        with battle_action_lock(self.battle) as locked:
+            data = apply_state_version(locked, build_battle_response(locked), since_version)
+        self.battle = locked
+        return data
+
+    def test_diff_state_is_recursive(self):
+        """Seules les feuilles modifiées remontent ; les listes sont entières."""
+        from myPokemonApp.services.serializers import diff_state
+        old = {'a': 1, 'b': {'x': 1, 'y': 2}, 'l': [1, 2]}
+        new = {'a': 1, 'b': {'x': 1, 'y': 3}, 'l': [1, 2, 3]}
+        self.assertEqual(diff_state(old, new), {'b': {'y': 3}, 'l': [1, 2, 3]})
+        self.assertEqual(diff_state(new, new), {})
+
+    def test_first_response_is_full(self):
+        """Sans since_version : état complet + state_version."""
+        data = self._respond()
+        self.assertEqual(data['state_version'], 1)
+        self.assertIn('player_pokemon', data)
+        self.assertNotIn('delta', data)
+
+    def test_unchanged_state_still_advances_version(self):
+        """Chaque action validée avance la version, même à état identique (delta vide)."""
+        first = self._respond()
+        second = self._respond(since_version=first['state_version'])
+        self.assertEqual(second['state_version'], first['state_version'] + 1)
+        self.assertEqual(second['delta'], {})
+        self.assertNotIn('player_pokemon', second)
+
+    def test_delta_contains_only_changes(self):
+        """Après un dégât, seuls les PV modifiés sont renvoyés."""
+        first = self._respond()
+        self.o_poke.current_hp -= 5
+        self.o_poke.save()
+        data = self._respond(since_version=first['state_version'])
+        self.assertEqual(data['state_version'], first['state_version'] + 1)
+        self.assertEqual(data['base_version'], first['state_version'])
+        self.assertEqual(data['delta'], {
+            'opponent_pokemon': {'current_hp': self.o_poke.current_hp},
+            'opponent_hp':      self.o_poke.current_hp,
+        })
+
+    def test_unknown_version_falls_back_to_full(self):
+        """Version expirée ou inconnue : resync complet."""
+        self._respond()
+        data = self._respond(since_version=999)
+        self.assertIn('player_pokemon', data)
+        self.assertNotIn('delta', data)
+
+    def test_version_and_base_are_persisted(self):
+        """state_version et l'état servi (base du delta) sont stockés sur le Battle."""
+        from myPokemonApp.models.Battle import Battle
+        first  = self._respond()
+        stored = Battle.objects.get(pk=self.battle.pk)
+        self.assertEqual(stored.state_version, 1)
+        self.assertEqual(stored.served_state['version'], 1)
+        self.assertEqual(stored.served_state['state']['player_hp'], first['player_hp'])
+
+
+# =============================================================================
+# 16. VOLATILE STATE — battle_state typé à slots, format compact
+# =============================================================================
+
+class TestBattleVolatileState(TestCase):
+    """BattleVolatileState : décodage legacy, encodage compact, conversion au save()."""
+
+    LEGACY = {
+        '12': {'confusion_turns': 2, 'leech_seed': True, 'charging': 'Lance-Soleil'},
+        'player_reflect':    5,
+        'opponent_spikes':   2,
+        'player_used_ids':   [12, 14],
+        'weather_turns':     3,
+        'rng':               {'seed': 7, 'step': 1},
+    }
+
+    def test_legacy_round_trip(self):
+        """Un ancien dict est décodé champ par champ et se ré-encode à l'identique."""
+        from myPokemonApp.models.BattleVolatileState import BattleVolatileState
+        state = BattleVolatileState.decode(self.LEGACY)
+        self.assertEqual(state.pokemon(12).confusion_turns, 2)
+        self.assertTrue(state.pokemon(12).leech_seed)
+        self.assertEqual(state.side('player').reflect, 5)
+        self.assertEqual(state.side('opponent').spikes, 2)
+        self.assertEqual(state.side('player').used_ids, [12, 14])
+        self.assertEqual(state.weather_turns, 3)
+        encoded = state.encode()
+        self.assertEqual(BattleVolatileState.decode(encoded).encode(), encoded)
+
+    def test_encoding_omits_defaults(self):
+        """Seules les valeurs non nulles sont écrites ; un état vide tient en {'v': 2}."""
+        from myPokemonApp.models.BattleVolatileState import BattleVolatileState, STATE_FORMAT
+        state = BattleVolatileState.decode({})
+        state.pokemon(3).flinched = False
+        state.side('opponent').mist = 0
+        self.assertEqual(state.encode(), {'v': STATE_FORMAT})
+        state.pokemon(3).toxic_counter = 1
+        self.assertEqual(set(state.encode()), {'v', 'pk'})
+
+    def test_mapping_shim_uses_legacy_keys(self):
+        """get / [] / pop / in acceptent encore les anciens noms de clés."""
+        from myPokemonApp.models.BattleVolatileState import BattleVolatileState
+        state = BattleVolatileState.decode(self.LEGACY)
+        self.assertEqual(state.get('player_reflect'), 5)
+        self.assertIn('12', state)
+        self.assertEqual(state['12']['confusion_turns'], 2)
+        self.assertEqual(state.pop('opponent_spikes'), 2)
+        self.assertNotIn('opponent_spikes', state)
+        state['custom_flag'] = 1
+        self.assertEqual(state.get('custom_flag'), 1)
+
+    def test_legacy_battle_converted_on_save(self):
+        """Un combat en cours au format legacy est réécrit en format compact au save()."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.BattleVolatileState import STATE_FORMAT
+        player = make_trainer(username='Red')
+        p_poke = make_playable_pokemon(player)
+        o_poke = make_playable_pokemon(make_trainer(username='Blue', trainer_type='rival'))
+        legacy = {str(p_poke.pk): {'confusion_turns': 2}, 'opponent_reflect': 4}
+        battle = Battle.objects.create(
+            battle_type='wild', player_trainer=player,
+            player_pokemon=p_poke, opponent_pokemon=o_poke, battle_state=legacy,
+        )
+        self.assertEqual(battle._pstate(p_poke).confusion_turns, 2)
+        battle._pstate(o_poke).flinched = True
+        battle._save_state()
+
+        reloaded = Battle.objects.get(pk=battle.pk)
+        self.assertEqual(reloaded.battle_state['v'], STATE_FORMAT)
+        self.assertEqual(reloaded._pstate(p_poke).confusion_turns, 2)
+        self.assertTrue(reloaded._pstate(o_poke).flinched)
+        self.assertEqual(reloaded.volatile.side('opponent').reflect, 4)
+
+    def test_state_decoded_once_per_instance(self):
+        """_bstate() renvoie le même objet tant que battle_state n'est pas réaffecté."""
+        from myPokemonApp.models.Battle import Battle
+        battle = Battle(battle_state={'weather_turns': 2})
+        self.assertIs(battle._bstate(), battle._bstate())
+        battle.battle_state = {'weather_turns': 4}
+        self.assertEqual(battle._bstate().weather_turns, 4)
+
+
+# =============================================================================
+# 17. PROFILING — budget de requêtes et phases des endpoints chauds
+# =============================================================================
+
+class TestProfiling(TestCase):
+    """@profiled_view + @profile_phase + ProfilingMiddleware → buffer circulaire."""
+
+    def setUp(self):
+        from myPokemonApp.services.profiling import clear_profiles
+        clear_profiles()
+
+    def _run(self, view):
+        from django.test import RequestFactory
+        from myPokemonApp.middleware.profiling import ProfilingMiddleware
+        request = RequestFactory().get('/battle/1/action/')
+        return ProfilingMiddleware(view)(request)
+
+    def _sample_view(self):
+        from django.http import JsonResponse
+        from myPokemonApp.services.profiling import profiled_view, profile_phase
+
+        @profile_phase('calculate_damage')
+        def damage():
+            return list(User.objects.all())
+
+        @profiled_view
+        def sample_view(request):
+            damage()
+            damage()
+            return JsonResponse({'ok': True})
+        return sample_view
+
+    def test_profile_records_queries_and_phases(self):
+        """Requêtes SQL, phases et taille de réponse sont enregistrées."""
+        from myPokemonApp.services.profiling import recent_profiles
+        response = self._run(self._sample_view())
+        [profile] = recent_profiles()
+        self.assertEqual(profile['view'], 'sample_view')
+        self.assertEqual(profile['queries'], 2)
+        self.assertEqual(profile['phases']['calculate_damage']['calls'], 2)
+        self.assertEqual(profile['response_bytes'], len(response.content))
+
+    def test_phase_is_noop_outside_profiled_view(self):
+        """Hors vue profilée, @profile_phase n'enregistre rien."""
+        from myPokemonApp.services.profiling import profile_phase, recent_profiles
+        self.assertEqual(profile_phase('x')(lambda: 42)(), 42)
+        self.assertEqual(recent_profiles(), [])
+
+    def test_threshold_logs_warning(self):
+        """Un seuil dépassé produit un warning."""
+        from django.test import override_settings
+        with override_settings(PROFILING={'thresholds': {'queries': 1}}):
+            with self.assertLogs('myPokemonApp.middleware.profiling', level='WARNING') as logs:
+                self._run(self._sample_view())
+        self.assertIn('queries=2', logs.output[0])
+
+    def test_disabled_profiling_records_nothing(self):
+        """enabled: false → la vue s'exécute sans profil."""
+        from django.test import override_settings
+        from myPokemonApp.services.profiling import recent_profiles
+        with override_settings(PROFILING={'enabled': False}):
+            self._run(self._sample_view())
+        self.assertEqual(recent_profiles(), [])
+
+    def test_endpoint_is_staff_only(self):
+        """/api/debug/profiling/ : redirection pour un joueur, JSON pour le staff."""
+        from django.urls import reverse
+        url  = reverse('profiling')
+        user = User.objects.create_user('joueur', password='x')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        user.is_staff = True
+        user.save()
+        self._run(self._sample_view())
+        data = self.client.get(url).json()
+        self.assertEqual(data['summary']['sample_view']['count'], 1)
+        self.assertEqual(len(data['profiles']), 1)
+
+
+# =============================================================================
+# 18. ACTION LOCK — verrou par combat + clés d'idempotence
+# =============================================================================
+
+class TestBattleActionLock(TestCase):
+    """battle_action_lock (CAS state_version sur SQLite) + réponses rejouables."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from myPokemonApp.models.Battle import Battle
+        cache.clear()
+        self.user   = User.objects.create_user('red', password='x')
+        self.player = make_trainer(username='Red')
+        self.player.user = self.user
+        self.player.save()
+        self.battle = Battle.objects.create(
+            battle_type='wild', player_trainer=self.player,
+            player_pokemon=make_playable_pokemon(self.player),
+            opponent_pokemon=make_playable_pokemon(make_trainer(username='Sauvage', trainer_type='wild')),
+        )
+
+    def test_lock_returns_fresh_instance(self):
+        """L'instance fournie sous verrou est relue en base."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.services.battle_service import battle_action_lock
+        Battle.objects.filter(pk=self.battle.pk).update(current_turn=7)
+        with battle_action_lock(self.battle) as locked:
+            self.assertEqual(locked.current_turn, 7)
+
+    def test_stale_version_is_busy(self):
+        """Une action validée entre la lecture et le verrou → BattleBusy, rien n'est écrit."""
+        from myPokemonApp.services.battle_service import BattleBusy, battle_action_lock
+        with battle_action_lock(self.battle):     # action concurrente validée,
+            pass                                  # sans changement d'état servi
+        with self.assertRaises(BattleBusy):
+            with battle_action_lock(self.battle) as locked:
+                locked.add_to_log("Jamais écrit")
+        self.assertFalse(self.battle.events.exists())
+
+    def test_replayed_post_returns_cached_response(self):
+        """Même clé d'idempotence : réponse identique, aucun second tour (même via un autre worker)."""
+        from django.core.cache import cache
+        from django.urls import reverse
+        self.client.force_login(self.user)
+        url  = reverse('BattleActionView', args=[self.battle.pk])
+        post = {'action': 'flee', 'idempotency_key': 'cle-1'}
+        first = self.client.post(url, post).json()
+        self.assertTrue(first['success'])
+        events = self.battle.events.count()
+        cache.clear()                               # cache local d'un autre processus
+        again = self.client.post(url, post).json()
+        self.assertEqual(again, first)
+        self.assertEqual(self.battle.events.count(), events)
+
+    def test_receipt_is_rolled_back_with_the_turn(self):
+        """Tour annulé : la réponse n'est pas mémorisée."""
+        from myPokemonApp.services.battle_service import (
+            battle_action_lock, get_idempotent_response, store_idempotent_response,
+        )
+        with self.assertRaises(RuntimeError):
+            with battle_action_lock(self.battle):
+                store_idempotent_response(self.battle.pk, 'cle-2', {'success': True})
+                raise RuntimeError('commit impossible')
+        self.assertIsNone(get_idempotent_response(self.battle.pk, 'cle-2'))
+
+    def test_no_cooldown_between_actions(self):
+        """Deux actions distinctes rapprochées sont toutes deux exécutées (plus de 429)."""
+        from django.urls import reverse
+        self.client.force_login(self.user)
+        url = reverse('BattleActionView', args=[self.battle.pk])
+        with patch('myPokemonApp.models.Battle.Battle.attempt_flee', return_value=False):
+            r1 = self.client.post(url, {'action': 'flee', 'idempotency_key': 'a'})
+            r2 = self.client.post(url, {'action': 'flee', 'idempotency_key': 'b'})
+        self.assertEqual((r1.status_code, r2.status_code), (200, 200))
+        self.assertTrue(r2.json()['success'])
+
+
+# =============================================================================
+# 19. AI LOOKAHEAD — expectimax borné pour les dresseurs experts
+# =============================================================================
+
+class TestAILookahead(TestCase):
+    """Flag 'lookahead' : recherche pure en mémoire, budget de temps strict."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        self.player = make_trainer(username='Red')
+        self.lance  = make_trainer(username='Lance', trainer_type='champion')
+        self.tackle = make_move(name='Tackle', power=120)
+        self.growl  = make_move(name='Growl', power=0, category='status')
+
+        self.p_poke = make_playable_pokemon(self.player)
+        self.o_poke = make_playable_pokemon(self.lance)
+        ghost = make_species(name='Gastly', pokedex_number=92)
+        ghost.primary_type = make_pokemon_type('ghost')
+        ghost.save()
+        self.o_bench = make_playable_pokemon(self.lance, species=ghost)
+
+        PokemonMoveInstance.objects.create(pokemon=self.p_poke, move=self.tackle, current_pp=35)
+        PokemonMoveInstance.objects.create(pokemon=self.o_poke, move=self.growl, current_pp=35)
+        PokemonMoveInstance.objects.create(pokemon=self.o_bench, move=self.tackle, current_pp=35)
+        self.battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.lance,
+            player_pokemon=self.p_poke, opponent_pokemon=self.o_poke,
+        )
+
+    def _choose(self, **kwargs):
+        from myPokemonApp.services.ai_lookahead import choose_lookahead_action
+        return choose_lookahead_action(
+            self.battle, self.o_poke, self.p_poke, [self.growl], {self.growl.id: 100}, **kwargs
+        )
+
+    def test_champion_defaults_include_lookahead(self):
+        """Champions / Conseil 4 / Maître : 'lookahead' par défaut."""
+        self.assertIn('lookahead', self.lance.get_ai_flags())
+        self.assertNotIn('lookahead', make_trainer(username='Gamin', trainer_type='npc').get_ai_flags())
+
+    def test_switches_to_immune_bench(self):
+        """Actif sans attaque face à un move Normal : switch vers le Spectre immunisé."""
+        action = self._choose(budget_ms=200)
+        self.assertEqual(action, {'type': 'switch', 'pokemon': self.o_bench})
+
+    def test_attacks_when_it_can_win(self):
+        """Move offensif disponible et adversaire seul : l'IA attaque."""
+        from myPokemonApp.services.ai_lookahead import choose_lookahead_action
+        action = choose_lookahead_action(
+            self.battle, self.p_poke, self.o_poke, [self.tackle], {self.tackle.id: 100}
+        )
+        self.assertEqual(action, {'type': 'attack', 'move': self.tackle})
+
+    def test_step_probabilities_sum_to_one(self):
+        """Transition pure : précision 50 % et vitesse égale → 2 ordres × touché/raté."""
+        from myPokemonApp.services.ai_lookahead import _Mon, _Search
+        self.tackle.accuracy = 50
+        mine = [_Mon(self.p_poke, [self.tackle], True)]
+        foes = [_Mon(self.o_poke, [self.growl], True)]
+        search = _Search(mine, foes, deadline=float('inf'))
+        state = (0, 0, (50,), (50,))
+        outcomes = search.step(state, 0, 0)
+        self.assertEqual(len(outcomes), 4)
+        self.assertAlmostEqual(sum(p for p, _ in outcomes), 1.0)
+        self.assertIn(state, [s for _, s in outcomes])   # branche « raté »
+
+    def test_budget_is_respected(self):
+        """Budget nul : la profondeur 1 est toujours finie, rien au-delà."""
+        import time
+        from myPokemonApp.services.ai_lookahead import _Mon, _Search
+        mine = [_Mon(self.o_poke, [self.growl], True), _Mon(self.o_bench, [self.tackle], False)]
+        foes = [_Mon(self.p_poke, [self.tackle], True)]
+        search = _Search(mine, foes, deadline=time.perf_counter())
+        self.assertIsNotNone(search.run((0, 0, (50, 50), (50,))))
+        self.assertEqual(search.depth, 1)
+
+    def test_choose_enemy_move_uses_lookahead(self):
+        """choose_enemy_move avec le flag 'lookahead' peut renvoyer un switch."""
+        action = self.battle.choose_enemy_move(self.o_poke, self.p_poke, ai_flags={'lookahead'})
+        self.assertEqual(action['type'], 'switch')
+
+
+# =============================================================================
+# 20. AI CONTEXT — entrées du scoring IA calculées une fois par décision
+# =============================================================================
+
+class TestAIContext(TestCase):
+    """AIContext.build : vecteur de dégâts, multiplicateurs et stats sans requête."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        self.player = make_trainer(username='Red')
+        self.rival  = make_trainer(username='Blue', trainer_type='npc')
+        self.tackle = make_move(name='Tackle', power=40)
+        self.slam   = make_move(name='Body Slam', power=85)
+        self.growl  = make_move(name='Growl', power=0, category='status')
+        ghost = make_species(name='Gastly', pokedex_number=92)
+        ghost.primary_type = make_pokemon_type('ghost')
+        ghost.save()
+        self.attacker = make_playable_pokemon(self.rival)
+        self.defender = make_playable_pokemon(self.player, species=ghost)
+        self.battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.rival,
+            player_pokemon=self.defender, opponent_pokemon=self.attacker,
+        )
+        self.moves = [self.tackle, self.slam, self.growl]
+
+    def _build(self):
+        from myPokemonApp.models.AIContext import AIContext
+        return AIContext.build(self.battle, self.attacker, self.defender, self.moves)
+
+    def test_damage_vector_and_max(self):
+        """Un dégât par move, max_damage = meilleur de la sélection."""
+        normal_target = make_playable_pokemon(self.player)
+        from myPokemonApp.models.AIContext import AIContext
+        ctx = AIContext.build(self.battle, self.attacker, normal_target, self.moves)
+        self.assertEqual(set(ctx.damage), {m.id for m in self.moves})
+        self.assertEqual(ctx.damage[self.growl.id], 0)
+        self.assertGreater(ctx.damage[self.slam.id], ctx.damage[self.tackle.id])
+        self.assertEqual(ctx.max_damage, ctx.damage[self.slam.id])
+
+    def test_type_immunity_and_has_type(self):
+        """Normal contre Spectre : multiplicateur 0, dégâts 0 ; types lus par id."""
+        ctx = self._build()
+        self.assertEqual(ctx.type_mult[self.tackle.id], 0)
+        self.assertEqual(ctx.damage[self.slam.id], 0)
+        self.assertTrue(ctx.defender_has_type('Ghost'))
+        self.assertFalse(ctx.defender_has_type('grass'))
+
+    def test_build_without_queries(self):
+        """Types, stats et dégâts : aucune requête une fois l'état chargé."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from myPokemonApp.models.TypeChart import get_type_chart
+        get_type_chart()
+        self.battle._bstate()
+        for poke in (self.attacker, self.defender):
+            poke.species.primary_type, poke.species.secondary_type
+        with CaptureQueriesContext(connection) as ctx_queries:
+            ctx = self._build()
+            ctx.defender_has_type('ghost')
+            ctx.can_ko(self.slam)
+        self.assertEqual(len(ctx_queries), 0)
+
+    def test_choose_enemy_move_uses_context(self):
+        """choose_enemy_move construit le contexte et renvoie un move disponible."""
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        for move in (self.tackle, self.slam):
+            PokemonMoveInstance.objects.create(pokemon=self.attacker, move=move, current_pp=10)
+        action = self.battle.choose_enemy_move(self.attacker, self.defender,
+                                               ai_flags={'basic', 'evaluate_attack'})
+        self.assertEqual(action['type'], 'attack')
+        self.assertIn(action['move'], (self.tackle, self.slam))
+
+
+# =============================================================================
+# 21. DAMAGE CALC — fourchettes de dégâts pures et par lots
+# =============================================================================
+
+class TestDamageCalc(TestCase):
+    """damage_inputs / damage_ranges : formule de calculate_damage sans effet de bord."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        self.player = make_trainer(username='Red')
+        self.rival  = make_trainer(username='Blue', trainer_type='npc')
+        self.tackle = make_move(name='Tackle', power=40)
+        self.attacker = make_playable_pokemon(self.player)
+        self.defender = make_playable_pokemon(self.rival)
+        self.battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.rival,
+            player_pokemon=self.attacker, opponent_pokemon=self.defender,
+        )
+
+    def _inputs(self, **overrides):
+        from myPokemonApp.services.damage_calc import DamageInputs
+        values = dict(level=50, power=80, attack=100, defense=100, stab=1.0, type_mult=1.0,
+                      burn=1.0, screen=1.0, item=1.0, crit_rate=1 / 16)
+        values.update(overrides)
+        return DamageInputs(**values)
+
+    def test_range_bounds_and_ko_chance(self):
+        """min = jet 85 % sans critique, max = jet 100 % critique ; K.O. borné par les PV."""
+        from myPokemonApp.services.damage_calc import damage_ranges
+        # base = (22 × 80 × 100 / 100) / 50 + 2 = 37.2
+        r, = damage_ranges([self._inputs()], [1000])
+        self.assertEqual(r.min, int(37.2 * 0.85))
+        self.assertEqual(r.max, int(37.2 * 1.5))
+        self.assertTrue(r.min <= r.expected <= r.max)
+        self.assertEqual(r.ko_chance, 0.0)
+        r, = damage_ranges([self._inputs()], [1])
+        self.assertEqual(r.ko_chance, 1.0)
+
+    def test_crit_branch_weights_ko_chance(self):
+        """Cible à 50 PV : seuls les critiques tuent → P(K.O.) ≤ taux de critique."""
+        from myPokemonApp.services.damage_calc import damage_ranges
+        r, = damage_ranges([self._inputs()], [50])
+        self.assertGreater(r.ko_chance, 0.0)
+        self.assertLessEqual(r.ko_chance, 1 / 16)
+
+    def test_immune_and_status_moves_deal_nothing(self):
+        from myPokemonApp.services.damage_calc import damage_ranges
+        results = damage_ranges([self._inputs(type_mult=0), self._inputs(power=0)], [10, 10])
+        self.assertEqual([(r.min, r.max, r.expected) for r in results], [(0, 0, 0.0)] * 2)
+
+    def test_inputs_are_side_effect_free(self):
+        """Écrans, brûlure et STAB (Normal / Normal) lus sans log ni requête."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from myPokemonApp.models.TypeChart import get_type_chart
+        from myPokemonApp.services.damage_calc import damage_inputs
+        get_type_chart()
+        self.battle._bstate().side('opponent').reflect = 5
+        self.attacker.status_condition = 'burn'
+        log_before = list(self.battle.battle_log or [])
+        with CaptureQueriesContext(connection) as queries:
+            inputs = damage_inputs(self.attacker, self.defender, self.tackle, self.battle)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual((inputs.screen, inputs.burn, inputs.stab), (0.5, 0.5, 1.5))
+        self.assertEqual(list(self.battle.battle_log or []), log_before)
+
+    def test_matches_calculate_damage(self):
+        """Jet 85 % sans critique : calculate_damage renvoie le min de la fourchette."""
+        from myPokemonApp.services.damage_calc import estimate_moves
+        r = estimate_moves(self.attacker, self.defender, [self.tackle], self.battle)[self.tackle.id]
+        self.battle.rng.random  = lambda: 0.99
+        self.battle.rng.uniform = lambda a, b: 0.85
+        self.assertEqual(self.battle.calculate_damage(self.attacker, self.defender, self.tackle), r.min)
+
+    def test_python_fallback_matches_numpy(self):
+        """Sans NumPy, la boucle Python donne exactement les mêmes fourchettes."""
+        from myPokemonApp.services import damage_calc
+        batch = [self._inputs(), self._inputs(level=7, power=35, attack=13, stab=1.5, item=1.3),
+                 self._inputs(crit_rate=1.0, burn=0.5), self._inputs(type_mult=0)]
+        hp = [40, 9, 30, 5]
+        python = damage_calc._ranges_python(batch, hp)
+        with patch.object(damage_calc, 'np', None):
+            self.assertEqual(damage_calc.damage_ranges(batch, hp), python)
+
+    @skipUnless(np, "NumPy non installé (dépendance optionnelle)")
+    def test_numpy_matches_python(self):
+        """Chemin vectorisé = boucle Python, y compris capacités de statut, immunités et critiques sûrs."""
+        from myPokemonApp.services import damage_calc
+        batch = [self._inputs(), self._inputs(level=7, power=35, attack=13, stab=1.5, item=1.3),
+                 self._inputs(power=0), self._inputs(type_mult=0),
+                 self._inputs(crit_rate=1.0), self._inputs(crit_rate=1.0, burn=0.5, screen=0.5),
+                 self._inputs(crit_rate=0.0, type_mult=0.25), self._inputs(level=100, power=150, defense=0)]
+        hp = [40, 9, 10, 5, 30, 1, 200, 300]
+        python     = damage_calc._ranges_python(batch, hp)
+        vectorized = damage_calc._ranges_numpy(batch, hp)
+        self.assertEqual(len(vectorized), len(python))
+        for a, b in zip(python, vectorized):
+            self.assertEqual((a.min, a.max), (b.min, b.max))
+            self.assertIsInstance(b.min, int)
+            self.assertAlmostEqual(a.expected, b.expected)
+            self.assertAlmostEqual(a.ko_chance, b.ko_chance)
+        self.assertEqual(damage_calc.damage_ranges(batch, hp), vectorized)
+
+
+# =============================================================================
+# 22. DAMAGE RESULT — calcul de dégâts pur, événements appliqués à part
+# =============================================================================
+
+class TestDamageResult(TestCase):
+    """compute_damage n'écrit rien ; apply_damage_result applique les événements."""
+
+    def setUp(self):
+        from myPokemonApp.models.Ability import Ability
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.TypeChart import get_type_chart
+        self.player = make_trainer(username='Red')
+        self.rival  = make_trainer(username='Blue', trainer_type='npc')
+        self.tackle = make_move(name='Tackle', power=40)
+        self.attacker = make_playable_pokemon(self.player)
+        self.attacker.ability = Ability.objects.create(name='Brise Moule', effect_tag='mold_breaker')
+        self.attacker.save()
+        self.defender = make_playable_pokemon(self.rival)
+        self.battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.rival,
+            player_pokemon=self.attacker, opponent_pokemon=self.defender,
+        )
+        self.battle.rng.uniform = lambda a, b: 1.0
+        get_type_chart()
+
+    def test_compute_is_side_effect_free(self):
+        """Critique : message et drapeaux portés par le résultat, rien d'écrit."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.battle.rng.random = lambda: 0.0
+        log_before = list(self.battle.battle_log or [])
+        with CaptureQueriesContext(connection) as queries:
+            result = self.battle.compute_damage(self.attacker, self.defender, self.tackle)
+        self.assertEqual(len(queries), 0)
+        self.assertTrue(result.critical)
+        self.assertIn("Coup critique !", result.messages)
+        self.assertTrue(result.ability_flags['ignore_opponent_ability'])
+        self.assertFalse(self.battle._pstate(self.attacker).ignore_opponent_ability)
+        self.assertEqual(list(self.battle.battle_log or []), log_before)
+
+    def test_calculate_damage_applies_events_without_state_write(self):
+        """calculate_damage = compute + apply : drapeaux posés, plus de _save_state par coup."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.battle.rng.random = lambda: 0.99
+        expected = self.battle.compute_damage(self.attacker, self.defender, self.tackle).damage
+        with CaptureQueriesContext(connection) as queries:
+            damage = self.battle.calculate_damage(self.attacker, self.defender, self.tackle)
+        self.assertEqual(damage, expected)
+        self.assertEqual(len(queries), 0)
+        self.assertTrue(self.battle._pstate(self.attacker).ignore_opponent_ability)
+        self.assertEqual(self.battle.last_effectiveness, 1.0)
+
+    def test_immune_target_returns_zero_result(self):
+        ghost = make_species(name='Gastly', pokedex_number=92)
+        ghost.primary_type = make_pokemon_type('ghost')
+        ghost.save()
+        target = make_playable_pokemon(self.rival, species=ghost)
+        result = self.battle.compute_damage(self.attacker, target, self.tackle)
+        self.assertEqual((result.damage, result.effectiveness, result.critical), (0, 0, False))
+
+
+# =============================================================================
+# 23. MOVE EFFECT DISPATCH — chaînes de handlers précompilées par move
+# =============================================================================
+
+class TestMoveEffectDispatch(TestCase):
+    """resolve_move_effect / PokemonMove.effect_chain : un dispatch par move."""
+
+    def _chain(self, effect, power=0, name='Move'):
+        from myPokemonApp.models.MoveEffects import resolve_move_effect
+        move = MagicMock(effect=effect, power=power)
+        move.name = name
+        return [type(h).__name__ for h in resolve_move_effect(move)]
+
+    def test_resolution_matches_former_branches(self):
+        self.assertEqual(self._chain('raise_attack'), ['StatBoostEffect'])
+        self.assertEqual(self._chain('raise_attack', power=70), ['GenericAttackEffect'])
+        self.assertEqual(self._chain('lower_attack_defense'), ['StatBoostEffect'])
+        self.assertEqual(self._chain('lower_attack_defense', power=120),
+                         ['SelfStatDropAttackEffect'])
+        self.assertEqual(self._chain('drain', power=60), ['DrainEffect'])
+        self.assertEqual(self._chain('break_barrier', power=75),
+                         ['BreakBarrierEffect', 'GenericAttackEffect'])
+        self.assertEqual(self._chain('', power=50, name='Struggle'), ['StruggleEffect'])
+        self.assertEqual(self._chain('inconnu'), ['StatusFallbackEffect'])
+
+    def test_known_effects_are_precompiled(self):
+        from myPokemonApp.models.MoveEffects import (
+            DAMAGE_EFFECT_REGISTRY, EFFECT_DISPATCH, EFFECT_REGISTRY,
+        )
+        for effect in (*EFFECT_REGISTRY, *DAMAGE_EFFECT_REGISTRY):
+            self.assertIn((effect, True, False), EFFECT_DISPATCH)
+            self.assertIn((effect, False, False), EFFECT_DISPATCH)
+
+    def test_chain_is_cached_and_picklable(self):
+        """Résolue une fois par instance ; le move reste picklable (simulateur)."""
+        import pickle
+        from myPokemonApp.models import MoveEffects
+        move = make_move(name='Giga Drain', power=60)
+        move.effect = 'drain'
+        with patch('myPokemonApp.models.PokemonMove.resolve_move_effect',
+                   wraps=MoveEffects.resolve_move_effect) as resolve:
+            first = move.effect_chain
+            self.assertIs(move.effect_chain, first)
+        self.assertEqual(resolve.call_count, 1)
+        self.assertIs(pickle.loads(pickle.dumps(move)).effect_chain, first)
+
+    def test_handlers_are_profiled(self):
+        """Sous une vue profilée, chaque handler est une phase 'effect:<Classe>'."""
+        from django.test import RequestFactory
+        from myPokemonApp.services.profiling import RequestProfile, _current
+        battle = MagicMock()
+        battle.calculate_damage.return_value = 0
+        defender = MagicMock()
+        defender.is_fainted.return_value = True
+        move = make_move(name='Tackle', power=40)
+        profile = RequestProfile('v', RequestFactory().get('/'))
+        token = _current.set(profile)
+        try:
+            from myPokemonApp.models.Battle import Battle
+            Battle._apply_move_effect(battle, MagicMock(), defender, move)
+        finally:
+            _current.reset(token)
+        self.assertEqual(profile.phases['effect:GenericAttackEffect'][0], 1)
+
+
+# =============================================================================
+# 24. ABILITY DISPATCH — tables de hooks construites une fois
+# =============================================================================
+
+class TestAbilityDispatch(TestCase):
+    """ABILITY_HOOKS / HOOKS_BY_TAG : dispatch par table, hooks sautés par Battle."""
+
+    def _ability(self, tag, name=None):
+        from myPokemonApp.models.Ability import Ability
+        return Ability.objects.create(name=name or tag, effect_tag=tag)
+
+    def test_tables_hold_resolution_functions(self):
+        from myPokemonApp.models.Ability import ABILITY_HOOKS, Ability
+        self.assertIs(ABILITY_HOOKS['on_attack']['blaze'], Ability._resolve_blaze)
+        self.assertIs(ABILITY_HOOKS['on_damage_taken']['iron_barbs'], Ability._resolve_rough_skin)
+        self.assertNotIn('sand_veil', ABILITY_HOOKS['on_damage_taken'])
+
+    def test_hooks_by_tag(self):
+        hustle = self._ability('hustle')
+        self.assertEqual(hustle.hooks, {'on_attack', 'modify_stat'})
+        self.assertTrue(hustle.has_hook('modify_stat'))
+        self.assertFalse(hustle.has_hook('end_of_turn'))
+        self.assertFalse(self._ability('sand_veil').is_implemented)
+
+    def test_hook_calls_dispatch_through_table(self):
+        self.assertEqual(self._ability('mold_breaker').on_attack(None, None, None, 0),
+                         {'ignore_opponent_ability': True})
+        self.assertIsNone(self._ability('inconnu').on_switch_in(None, None))
+        self.assertEqual(self._ability('blaze').modify_stat('attack', None), 1.0)
+
+    def test_battle_skips_abilities_without_hook(self):
+        """_get_ability(pokemon, hook) : None si le talent n'a rien pour ce hook."""
+        from myPokemonApp.models.Battle import Battle
+        pokemon = MagicMock(ability=self._ability('speed_boost'))
+        battle = Battle()
+        self.assertIsNotNone(battle._get_ability(pokemon, 'end_of_turn'))
+        self.assertIsNone(battle._get_ability(pokemon, 'on_switch_in'))
+        self.assertIsNotNone(battle._get_ability(pokemon))
+
+    def test_unimplemented_effect_tags(self):
+        from myPokemonApp.models.Ability import unimplemented_effect_tags
+        self._ability('intimidate', 'Intimidation')
+        self._ability('sand_veil', 'Voile Sable')
+        self._ability('pickup', 'Ramassage')
+        self.assertEqual(unimplemented_effect_tags(),
+                         {'pickup': ['Ramassage'], 'sand_veil': ['Voile Sable']})
+
+
+# =============================================================================
+# 25. BATTLE HYDRATION — graphe du tour en requêtes fixes + identity map
+# =============================================================================
+
+class TestBattleHydration(TestCase):
+    """Battle.objects.hydrated() / refresh_hydrated() / adopt()."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        self.player = make_trainer(username='Red')
+        self.rival  = make_trainer(username='Blue', trainer_type='npc')
+        self.mine   = make_playable_pokemon(self.player)
+        self.theirs = make_playable_pokemon(self.rival)
+        for pokemon, name in ((self.mine, 'Tackle'), (self.theirs, 'Scratch')):
+            PokemonMoveInstance.objects.create(
+                pokemon=pokemon, move=make_move(name=name), current_pp=35
+            )
+        self.battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.rival,
+            player_pokemon=self.mine, opponent_pokemon=self.theirs,
+        )
+
+    def _walk(self, battle):
+        """Accède à tout le graphe utilisé par un tour."""
+        for pokemon in (battle.player_pokemon, battle.opponent_pokemon):
+            pokemon.species.primary_type, pokemon.species.secondary_type
+            pokemon.ability, pokemon.held_item
+            for mi in pokemon.move_instances():
+                mi.move.type
+        return battle.player_trainer.username, battle.opponent_trainer.username
+
+    def test_fixed_query_count(self):
+        from myPokemonApp.models.Battle import Battle
+        with self.assertNumQueries(3):
+            battle = Battle.objects.hydrated().get(pk=self.battle.pk)
+            self._walk(battle)
+
+    def test_turn_session_reuses_prefetched_moves(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.TurnSession import TurnSession
+        battle = Battle.objects.hydrated().get(pk=self.battle.pk)
+        with self.assertNumQueries(0):
+            session = TurnSession(battle, persist=False)
+        prefetched = battle.player_pokemon.move_instances()[0]
+        self.assertIs(session.move_instances(battle.player_pokemon)[0], prefetched)
+        session.discard()
+
+    def test_refresh_keeps_pokemon_identity(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        battle  = Battle.objects.hydrated().get(pk=self.battle.pk)
+        pokemon = battle.player_pokemon
+        PlayablePokemon.objects.filter(pk=pokemon.pk).update(current_hp=7)
+        with self.assertNumQueries(3):
+            battle.refresh_hydrated()
+            self._walk(battle)
+        self.assertIs(battle.player_pokemon, pokemon)
+        self.assertEqual(pokemon.current_hp, 7)
+
+    def test_adopt_returns_known_instance(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        battle = Battle.objects.hydrated().get(pk=self.battle.pk)
+        copy   = PlayablePokemon.objects.get(pk=self.mine.pk)
+        self.assertIs(battle.adopt(copy), battle.player_pokemon)
+        other = make_playable_pokemon(self.player)
+        self.assertIs(battle.adopt(other), other)
+
+
+# =============================================================================
+# 26. MOVE CATALOGUE — capacités par id / nom, invalidé par signaux
+# =============================================================================
+
+class TestMoveCatalogue(TestCase):
+    """get_move_catalogue : une requête par processus, lookups par nom sans requête."""
+
+    def setUp(self):
+        from myPokemonApp.models.MoveCatalogue import invalidate_move_catalogue
+        self.tackle   = make_move(name='Tackle')
+        self.struggle = make_move(name='Lutte', pp=1, power=50)
+        self.metronome = make_move(name='Metronome', power=0, category='status')
+        invalidate_move_catalogue()
+
+    def test_lookups_are_query_free(self):
+        from myPokemonApp.models.MoveCatalogue import get_move_catalogue
+        with self.assertNumQueries(1):
+            catalogue = get_move_catalogue()
+        with self.assertNumQueries(0):
+            self.assertEqual(catalogue.get(self.tackle.pk), self.tackle)
+            self.assertEqual(catalogue.by_name('Tackle'), self.tackle)
+            self.assertEqual(catalogue.by_name('  tACKLE '), self.tackle)
+            self.assertEqual(catalogue.type_name(self.tackle.pk), 'Normal')
+            self.assertEqual(catalogue.category(self.metronome.pk), 'status')
+            self.assertIsNone(catalogue.by_name('Inconnu'))
+
+    def test_french_and_english_names(self):
+        """Lutte est en base sous son nom français : 'Struggle' la retrouve."""
+        from myPokemonApp.models.MoveCatalogue import get_move_catalogue
+        catalogue = get_move_catalogue()
+        self.assertEqual(catalogue.struggle, self.struggle)
+        self.assertEqual(catalogue.by_name('struggle'), self.struggle)
+        self.assertEqual(catalogue.by_name('Métronome'), self.metronome)
+        self.assertEqual(catalogue.metronome_pool, (self.tackle,))
+
+    def test_move_change_invalidates(self):
+        from myPokemonApp.models.MoveCatalogue import get_move_catalogue
+        get_move_catalogue()
+        ember = make_move(name='Ember')
+        self.assertEqual(get_move_catalogue().by_name('ember'), ember)
+        ember.delete()
+        self.assertIsNone(get_move_catalogue().by_name('ember'))
+
+    def test_enemy_struggles_without_query(self):
+        """choose_enemy_move sans PP : Lutte vient du catalogue."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.MoveCatalogue import get_move_catalogue
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        player, rival = make_trainer(username='Red'), make_trainer(username='Blue', trainer_type='npc')
+        theirs = make_playable_pokemon(rival)
+        PokemonMoveInstance.objects.create(pokemon=theirs, move=self.tackle, current_pp=0)
+        battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=player, opponent_trainer=rival,
+            player_pokemon=make_playable_pokemon(player), opponent_pokemon=theirs,
+        )
+        battle = Battle.objects.hydrated().get(pk=battle.pk)
+        get_move_catalogue()
+        with self.assertNumQueries(0):
+            action = battle.choose_enemy_move(battle.opponent_pokemon, battle.player_pokemon)
+        self.assertEqual(action, {'type': 'attack', 'move': self.struggle})
+
+
+# =============================================================================
+# 27. BATTLE ARCHIVE — combats terminés déplacés vers BattleArchive
+# =============================================================================
+
+class TestBattleArchive(TestCase):
+    """services/battle_archive + historique lisant les archives."""
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.services.battle_service import _snapshot_team
+        self.user   = User.objects.create_user(username='red', password='x')
+        self.player = make_trainer(username='red')
+        self.player.user = self.user
+        self.player.save()
+        wild_trainer = make_trainer(username='Wild', trainer_type='wild')
+        self.mine = make_playable_pokemon(self.player)
+        self.wild = make_playable_pokemon(wild_trainer)
+
+        self.old = Battle.objects.create(
+            battle_type='wild', player_trainer=self.player, winner=self.player,
+            player_pokemon=self.mine, opponent_pokemon=self.wild, is_active=False,
+            current_turn=4, battle_state={'replay': 1},
+            battle_snapshot={'player_team':   _snapshot_team(self.player),
+                             'opponent_team': _snapshot_team(None, wild_pokemon=self.wild)},
+        )
+        self.old.record_event('F')
+        self.old.add_to_log("Un Bulbasaur sauvage apparaît !")
+        self.old.add_to_log("Bulbasaur est K.O. !")
+        long_ago = timezone.now() - timedelta(days=60)
+        Battle.objects.filter(pk=self.old.pk).update(
+            created_at=long_ago, ended_at=long_ago + timedelta(minutes=3)
+        )
+        self.recent = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player,
+            opponent_trainer=make_trainer(username='Blue', trainer_type='npc'),
+            player_pokemon=self.mine, is_active=False, ended_at=timezone.now(),
+        )
+
+    def test_payload_round_trip(self):
+        from myPokemonApp.services.battle_archive import pack_payload, unpack_payload
+        data = {'log': [{'turn': 1, 'message': "Pikachu utilise Éclair !"}] * 50}
+        blob = pack_payload(data)
+        self.assertEqual(unpack_payload(blob), data)
+        self.assertLess(len(blob), len(str(data)) // 10)
+
+    def test_archive_moves_old_battles(self):
+        from datetime import timedelta
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.BattleArchive import BattleArchive
+        from myPokemonApp.models.BattleEvent import BattleEvent
+        from myPokemonApp.models.GameSave import TrainerBattleHistory
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        from myPokemonApp.services.battle_archive import archive_battles
+        history = TrainerBattleHistory.objects.create(
+            player=self.player, opponent=self.wild.trainer, player_won=True, battle=self.old)
+        self.assertEqual(archive_battles(days=30, chunk_size=1), 1)
+
+        history.refresh_from_db()
+        self.assertEqual((history.battle_id, history.archive_id), (None, self.old.pk))
+
+        self.assertFalse(Battle.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(BattleEvent.objects.filter(battle_id=self.old.pk).exists())
+        self.assertFalse(PlayablePokemon.objects.filter(pk=self.wild.pk).exists())
+        self.assertTrue(Battle.objects.filter(pk=self.recent.pk).exists())
+
+        archive = BattleArchive.objects.get(pk=self.old.pk)
+        self.assertEqual((archive.winner, archive.turns), (self.player, 4))
+        self.assertEqual(archive.duration, timedelta(minutes=3))
+        self.assertEqual(archive.opponent_pokemon_id, self.wild.pk)
+        self.assertEqual([e['message'] for e in archive.battle_log],
+                         ["Un Bulbasaur sauvage apparaît !", "Bulbasaur est K.O. !"])
+        self.assertEqual(archive.data['replay'], [['F']])
+        self.assertEqual(archive_battles(days=30), 0)
+
+    def test_orphan_wild_purged_despite_active_ephemeral_battle(self):
+        """Un combat sauvage éphémère actif (opponent_pokemon NULL) n'empêche pas la purge."""
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        from myPokemonApp.services.battle_archive import archive_battles
+        from myPokemonApp.services.trainer_service import cleanup_orphan_wild_pokemon
+        Battle.objects.create(
+            battle_type='wild', player_trainer=self.player, player_pokemon=self.mine,
+            opponent_pokemon=None, is_active=True,
+        )
+        stray = make_playable_pokemon(self.wild.trainer)
+
+        self.assertEqual(archive_battles(days=30), 1)
+        self.assertFalse(PlayablePokemon.objects.filter(pk=self.wild.pk).exists())
+
+        cleanup_orphan_wild_pokemon()
+        self.assertFalse(PlayablePokemon.objects.filter(pk=stray.pk).exists())
+
+    def test_history_reads_archives(self):
+        from django.urls import reverse
+        from myPokemonApp.services.battle_archive import archive_battles
+        archive_battles(days=30)
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('BattleListView'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([b.pk for b in response.context['battles']],
+                         [self.recent.pk, self.old.pk])
+        self.assertEqual((response.context['stat_total'], response.context['stat_win']), (2, 1))
+        self.assertEqual(response.context['battles'][1].snap_opponent_name,
+                         self.wild.species.name)
+
+        detail = self.client.get(reverse('BattleDetailView', args=[self.old.pk]))
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(len(detail.context['player_team']), 1)
+        self.assertTrue(detail.context['player_won'])
+
+    def test_command_dry_run(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from myPokemonApp.models.BattleArchive import BattleArchive
+        out = StringIO()
+        call_command('archive_battles', '--dry-run', stdout=out)
+        self.assertIn('1 combat', out.getvalue())
+        self.assertFalse(BattleArchive.objects.exists())
+
+
+# =============================================================================
+# 28. TURN STREAM — événements du tour publiés aux clients abonnés
+# =============================================================================
+
+class _Collector:
+    """Abonné synchrone au broker : accumule les événements reçus."""
+
+    def __init__(self, battle_id):
+        self.battle_id = battle_id
+        self.events    = []
+
+    def push(self, event):
+        self.events.append(event)
+
+    def kinds(self):
+        return [e.kind for e in self.events]
+
+
+class TestTurnStream(TestCase):
+    """services/turn_stream + Battle.emit + battle_stream_view."""
+
+    def setUp(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        self.user   = User.objects.create_user(username='red', password='x')
+        self.player = make_trainer(username='red')
+        self.player.user = self.user
+        self.player.save()
+        self.rival  = make_trainer(username='Blue', trainer_type='npc')
+        self.mine   = make_playable_pokemon(self.player)
+        self.theirs = make_playable_pokemon(self.rival, current_hp=1)
+        self.tackle = make_move(name='Tackle')
+        for pokemon in (self.mine, self.theirs):
+            PokemonMoveInstance.objects.create(pokemon=pokemon, move=self.tackle, current_pp=35)
+        self.battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.rival,
+            player_pokemon=self.mine, opponent_pokemon=self.theirs,
+        )
+
+    def _subscribe(self):
+        from myPokemonApp.services.turn_stream import broker
+        collector = _Collector(self.battle.pk)
+        with broker._lock:
+            broker._subscribers.setdefault(self.battle.pk, []).append(collector)
+        self.addCleanup(broker.unsubscribe, collector)
+        return collector
+
+    def _attack(self, battle):
+        attack = {'type': 'attack', 'move': self.tackle}
+        battle.execute_turn(attack, attack)
+
+    def test_broker_delivers_across_threads(self):
+        import asyncio
+        import threading
+        from myPokemonApp.services.turn_stream import TurnStreamBroker
+
+        async def scenario():
+            broker = TurnStreamBroker()
+            sub    = broker.subscribe(7)
+            thread = threading.Thread(target=broker.publish, args=(7, 'move', 3),
+                                      kwargs={'move': 'Tackle'})
+            thread.start()
+            thread.join()
+            event = await sub.get(timeout=1)
+            sub.close()
+            return event, broker.has_subscribers(7)
+
+        event, still_subscribed = asyncio.run(scenario())
+        self.assertEqual((event.kind, event.turn, event.data), ('move', 3, {'move': 'Tackle'}))
+        self.assertFalse(still_subscribed)
+
+    def test_format_sse(self):
+        from myPokemonApp.services.turn_stream import TurnEvent, format_sse
+        block = format_sse(TurnEvent(5, 'hp', 2, {'side': 'player', 'hp': 12}))
+        self.assertEqual(block, 'id: 5\nevent: hp\ndata: {"turn":2,"side":"player","hp":12}\n\n')
+
+    def test_turn_publishes_events(self):
+        collector = self._subscribe()
+        self._attack(self.battle)
+
+        kinds = collector.kinds()
+        self.assertEqual(kinds[0], 'turn_start')
+        self.assertEqual(kinds[-1], 'turn_end')
+        for kind in ('move', 'damage', 'hp', 'faint', 'log'):
+            self.assertIn(kind, kinds)
+        faint = next(e for e in collector.events if e.kind == 'faint')
+        self.assertEqual(faint.data['side'], 'opponent')
+        self.assertLess(kinds.index('move'), kinds.index('damage'))
+
+    def test_no_events_without_subscriber_or_for_simulations(self):
+        from myPokemonApp.services import turn_stream
+        from myPokemonApp.models.TurnSession import TurnSession
+        with patch.object(turn_stream.broker, 'publish') as publish:
+            self._attack(self.battle)
+        publish.assert_not_called()
+
+        collector = self._subscribe()
+        session = TurnSession(self.battle, persist=False)
+        self._attack(self.battle)
+        session.discard()
+        self.assertEqual(collector.events, [])
+
+    def test_stream_view_requires_owner(self):
+        from django.urls import reverse
+        url = reverse('BattleStreamView', args=[self.battle.pk])
+        stranger = User.objects.create_user(username='green', password='x')
+        green = make_trainer(username='green')
+        green.user = stranger
+        green.save()
+        make_playable_pokemon(green)
+        self.client.force_login(stranger)
+        with self.settings(BATTLE_STREAM_ENABLED=True):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_stream_view_without_asgi(self):
+        """Hors ASGI : 204 et aucune URL de flux dans la page de combat."""
+        from django.urls import reverse
+        url = reverse('BattleStreamView', args=[self.battle.pk])
+        self.assertEqual(self.client.get(url).status_code, 302)   # anonyme → login
+
+        self.client.force_login(self.user)
+        with self.settings(BATTLE_STREAM_ENABLED=False):
+            self.assertEqual(self.client.get(url).status_code, 204)
+            self.assertEqual(self.client.post(url).status_code, 405)
+
+
+# =============================================================================
+# 29. AI SPECULATION — décision du tour suivant calculée à l'avance
+# =============================================================================
+
+class TestAISpeculation(TestCase):
+    """services/ai_speculation + reprise par get_opponent_ai_action."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        cache.clear()
+        self.player = make_trainer(username='Red')
+        self.rival  = make_trainer(username='Blue', trainer_type='npc')
+        self.mine   = make_playable_pokemon(self.player)
+        self.theirs = make_playable_pokemon(self.rival)
+        for name in ('Tackle', 'Scratch', 'Pound'):
+            PokemonMoveInstance.objects.create(
+                pokemon=self.theirs, move=make_move(name=name), current_pp=35
+            )
+        PokemonMoveInstance.objects.create(
+            pokemon=self.mine, move=make_move(name='Tackle'), current_pp=35
+        )
+        battle = Battle.objects.create(
+            battle_type='trainer', player_trainer=self.player, opponent_trainer=self.rival,
+            player_pokemon=self.mine, opponent_pokemon=self.theirs,
+        )
+        battle.seed_rng(1234)
+        battle.save()
+        self.battle_id = battle.pk
+
+    def _load(self):
+        from myPokemonApp.models.Battle import Battle
+        return Battle.objects.hydrated().get(pk=self.battle_id)
+
+    def test_reused_decision_matches_synchronous_ai(self):
+        from myPokemonApp.services.ai_speculation import speculate_opponent_action
+        from myPokemonApp.services.battle_service import get_opponent_ai_action
+        fresh    = self._load()
+        expected = fresh.choose_enemy_move(fresh.opponent_pokemon, fresh.player_pokemon)
+
+        speculate_opponent_action(self._load())
+        battle = self._load()
+        with patch.object(type(battle), 'choose_enemy_move') as choose:
+            action = get_opponent_ai_action(battle)
+        choose.assert_not_called()
+        self.assertEqual((action['type'], action['move'].pk), ('attack', expected['move'].pk))
+
+    def test_state_change_invalidates_decision(self):
+        from django.core.cache import cache
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        from myPokemonApp.services.ai_speculation import (
+            speculate_opponent_action, take_speculated_action, _cache_key,
+        )
+        speculate_opponent_action(self._load())
+        PlayablePokemon.objects.filter(pk=self.mine.pk).update(current_hp=20)
+
+        self.assertIsNone(take_speculated_action(self._load()))
+        self.assertIsNone(cache.get(_cache_key(self.battle_id)))
+
+    def test_fingerprint_stable_across_loads(self):
+        from myPokemonApp.services.ai_speculation import ai_fingerprint
+        battle = self._load()
+        with self.assertNumQueries(0):
+            fingerprint = ai_fingerprint(battle)
+        self.assertEqual(fingerprint, ai_fingerprint(self._load()))
+
+    def test_scheduled_after_commit_for_trainer_battles_only(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.services import ai_speculation
+        battle = self._load()
+        with patch.object(ai_speculation, '_submit') as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                ai_speculation.schedule_ai_speculation(battle)
+        submit.assert_called_once_with(battle)
+
+        wild = Battle.objects.create(
+            battle_type='wild', player_trainer=self.player,
+            player_pokemon=self.mine, opponent_pokemon=make_playable_pokemon(self.player),
+        )
+        with patch.object(ai_speculation, '_submit') as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                ai_speculation.schedule_ai_speculation(wild)
+        submit.assert_not_called()
+
+
+# =============================================================================
+# 30. ZONE ACCESS — capacités du dresseur chargées une fois, zones en mémoire
+# =============================================================================
+
+class TestZoneAccess(TestCase):
+    """questEngine.TrainerCapabilities / evaluate_zone_access + map_view."""
+
+    def setUp(self):
+        from myPokemonApp.models import GameSave, PlayerLocation
+        from myPokemonApp.models.Item import Item
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        from myPokemonApp.models.Zone import Zone, ZoneConnection
+        self.user    = User.objects.create_user(username='red', password='x')
+        self.trainer = make_trainer(username='red')
+        self.trainer.user = self.user
+        self.trainer.save()
+        pokemon = make_playable_pokemon(self.trainer)
+        PokemonMoveInstance.objects.create(pokemon=pokemon, move=make_move(name='Coupe'),
+                                           current_pp=30)
+        GameSave.objects.create(trainer=self.trainer, story_flags={'ss_ticket': True})
+
+        self.bike = Item.objects.create(name='Bicyclette', description='', item_type='key_item')
+        self.town = Zone.objects.create(name='Bourg Palette', zone_type='city')
+        self.zones = [
+            self.town,
+            Zone.objects.create(name='Route Vélo', zone_type='route', required_item=self.bike),
+            Zone.objects.create(name='Forêt Coupe', zone_type='forest', required_hm='cut'),
+            Zone.objects.create(name='Mer', zone_type='water', required_hm='surf'),
+            Zone.objects.create(name='Carmin', zone_type='city', required_flags=['ss_ticket']),
+            Zone.objects.create(name='Tour', zone_type='building', required_flags=['silph_scope']),
+        ]
+        self.conns = [
+            ZoneConnection.objects.create(from_zone=self.town, to_zone=self.zones[2],
+                                          required_hm='cut'),
+            ZoneConnection.objects.create(from_zone=self.town, to_zone=self.zones[3],
+                                          required_hm='surf'),
+            ZoneConnection.objects.create(from_zone=self.town, to_zone=self.zones[4],
+                                          required_flag='ss_ticket'),
+        ]
+        location = PlayerLocation.objects.create(trainer=self.trainer, current_zone=self.town)
+        location.visited_zones.add(self.town)
+
+    def test_snapshot_matches_live_checks(self):
+        from myPokemonApp.questEngine import (
+            TrainerCapabilities, can_access_zone, can_pass_connection, evaluate_zone_access,
+        )
+        with self.assertNumQueries(5):
+            caps = TrainerCapabilities.build(self.trainer)
+        self.assertEqual(caps.hms, {'cut'})
+        self.assertTrue(caps.has_visited(self.town))
+
+        with self.assertNumQueries(0):
+            batch = evaluate_zone_access(self.trainer, self.zones, caps)
+            passes = [caps.connection_access(conn) for conn in self.conns]
+        for zone in self.zones:
+            self.assertEqual(batch[zone.pk], can_access_zone(self.trainer, zone), zone.name)
+        self.assertEqual(passes, [can_pass_connection(self.trainer, c) for c in self.conns])
+        self.assertEqual([ok for ok, _ in batch.values()],
+                         [True, False, True, False, True, False])
+
+    def test_map_queries_do_not_grow_with_zones(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from myPokemonApp.models.Zone import Zone
+        self.client.force_login(self.user)
+
+        def count():
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(reverse('map_view')).status_code, 200)
+            return len(ctx.captured_queries)
+
+        before = count()
+        for i in range(10):
+            Zone.objects.create(name=f'Route {i}', zone_type='route',
+                                required_item=self.bike, required_flags=['ss_ticket'])
+        self.assertEqual(count(), before)
+
+
+# =============================================================================
+# 31. ZONE GRAPH — listes d'adjacence en mémoire + itinéraires
+# =============================================================================
+
+class TestZoneGraph(TestCase):
+    """models/ZoneGraph + services/travel_service.route + travel_route_view."""
+
+    def setUp(self):
+        from myPokemonApp.models import PlayerLocation
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        from myPokemonApp.models.Zone import Zone, ZoneConnection
+        from myPokemonApp.models.ZoneGraph import invalidate_zone_graph
+        invalidate_zone_graph()
+        self.user    = User.objects.create_user(username='red', password='x')
+        self.trainer = make_trainer(username='red')
+        self.trainer.user = self.user
+        self.trainer.save()
+        pokemon = make_playable_pokemon(self.trainer)
+        PokemonMoveInstance.objects.create(pokemon=pokemon, move=make_move(name='Coupe'),
+                                           current_pp=30)
+
+        def zone(name, zone_type='route'):
+            return Zone.objects.create(name=name, zone_type=zone_type, is_safe_zone=True)
+
+        self.a, self.b, self.c = zone('Jadielle', 'city'), zone('Route 2'), zone('Argenta', 'city')
+        self.d, self.e         = zone('Mer', 'water'), zone('Cramois', 'city')
+        self.arena             = zone('Arène d\'Argenta', 'building')
+        # A ↔ B ↔ C (C ↔ arène) ; A → D (Surf) → E ; C → E (Coupe) ; E ↛ A
+        ZoneConnection.objects.create(from_zone=self.a, to_zone=self.b)
+        ZoneConnection.objects.create(from_zone=self.c, to_zone=self.b)
+        ZoneConnection.objects.create(from_zone=self.c, to_zone=self.arena)
+        ZoneConnection.objects.create(from_zone=self.a, to_zone=self.d, required_hm='surf')
+        ZoneConnection.objects.create(from_zone=self.d, to_zone=self.e)
+        ZoneConnection.objects.create(from_zone=self.c, to_zone=self.e, required_hm='cut',
+                                      is_bidirectional=False)
+        self.location = PlayerLocation.objects.create(trainer=self.trainer, current_zone=self.a)
+
+    def test_adjacency_expands_bidirectional_edges(self):
+        from myPokemonApp.models.ZoneGraph import get_zone_graph
+        graph = get_zone_graph()
+        with self.assertNumQueries(0):
+            self.assertEqual(graph.neighbour_ids(self.b.pk), {self.a.pk, self.c.pk})
+            self.assertEqual(graph.neighbour_ids(self.e.pk), {self.d.pk})
+            self.assertIsNone(graph.connection(self.e.pk, self.c.pk))
+            self.assertEqual(graph.parent_city(self.arena.pk), self.c)
+            self.assertEqual(graph.arena_of(self.c.pk), self.arena)
+
+    def test_route_respects_capabilities(self):
+        from myPokemonApp.models.ZoneGraph import get_zone_graph
+        from myPokemonApp.questEngine import TrainerCapabilities
+        from myPokemonApp.services.travel_service import route
+        caps = TrainerCapabilities.build(self.trainer)
+        get_zone_graph()
+        with self.assertNumQueries(0):
+            path = route(self.trainer, self.a, self.e, caps)
+        # A → D (Surf) est plus court mais bloqué : passage par B, C puis Coupe
+        self.assertEqual(path, [self.b, self.c, self.e])
+        self.assertEqual(route(self.trainer, self.a, self.a, caps), [])
+        self.assertIsNone(route(self.trainer, self.e, self.a, caps))
+
+    def test_graph_rebuilt_when_connections_change(self):
+        from myPokemonApp.models.Zone import ZoneConnection
+        from myPokemonApp.models.ZoneGraph import get_zone_graph
+        self.assertNotIn(self.c.pk, get_zone_graph().neighbour_ids(self.a.pk))
+        ZoneConnection.objects.create(from_zone=self.a, to_zone=self.c)
+        self.assertIn(self.c.pk, get_zone_graph().neighbour_ids(self.a.pk))
+        self.assertEqual(self.location.can_travel_to(self.c), (True, 'OK'))
+
+    def test_travel_route_view_applies_whole_path(self):
+        from django.urls import reverse
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('travel_route', args=[self.e.pk]))
+        self.assertRedirects(response, reverse('zone_detail', args=[self.e.pk]),
+                             fetch_redirect_response=False)
+        self.location.refresh_from_db()
+        self.assertEqual(self.location.current_zone, self.e)
+        self.assertEqual(set(self.location.visited_zones.values_list('pk', flat=True)),
+                         {self.b.pk, self.c.pk, self.e.pk})
+
+
+# =============================================================================
+# 32. ENCOUNTER TABLE — tirages sauvages par la méthode des alias
+# =============================================================================
+
+class TestEncounterTable(TestCase):
+    """models/EncounterTable + get_random_wild_pokemon / sample_encounters."""
+
+    def setUp(self):
+        from myPokemonApp.models.EncounterTable import invalidate_encounter_tables
+        from myPokemonApp.models.Zone import WildPokemonSpawn, Zone
+        invalidate_encounter_tables()
+        self.zone    = Zone.objects.create(name='Route 1', zone_type='route')
+        self.rattata = make_species(name='Rattata', pokedex_number=19)
+        self.roucool = make_species(name='Roucool', pokedex_number=16)
+        self.absent  = make_species(name='Mew', pokedex_number=151)
+        WildPokemonSpawn.objects.create(zone=self.zone, pokemon=self.rattata, spawn_rate=60,
+                                        level_min=2, level_max=4)
+        WildPokemonSpawn.objects.create(zone=self.zone, pokemon=self.roucool, spawn_rate=40,
+                                        level_min=3, level_max=5)
+        WildPokemonSpawn.objects.create(zone=self.zone, pokemon=self.absent, spawn_rate=0)
+
+    def test_alias_sampler_preserves_weights(self):
+        """Probabilités reconstituées depuis (prob, alias) = poids normalisés."""
+        from myPokemonApp.models.EncounterTable import AliasSampler
+        weights = [50, 25, 15, 7, 3]
+        sampler = AliasSampler(weights)
+        n       = len(weights)
+        implied = [sampler._prob[i] / n for i in range(n)]
+        for column in range(n):
+            implied[sampler._alias[column]] += (1.0 - sampler._prob[column]) / n
+        for got, weight in zip(implied, weights):
+            self.assertAlmostEqual(got, weight / sum(weights))
+
+    def test_random_wild_pokemon_without_queries(self):
+        from myPokemonApp.models.EncounterTable import get_encounter_tables
+        from myPokemonApp.services.capture_service import get_random_wild_pokemon
+        get_encounter_tables()
+        with self.assertNumQueries(0):
+            rolls = [get_random_wild_pokemon(self.zone, 'grass') for _ in range(200)]
+            self.assertEqual(get_random_wild_pokemon(self.zone, 'water'), (None, None))
+        self.assertEqual({species for species, _ in rolls}, {self.rattata, self.roucool})
+        for species, level in rolls:
+            low, high = (2, 4) if species == self.rattata else (3, 5)
+            self.assertTrue(low <= level <= high)
+
+    def test_sample_encounters_batch(self):
+        import random
+        from myPokemonApp.models.EncounterTable import get_encounter_tables
+        from myPokemonApp.services.capture_service import sample_encounters
+        table = get_encounter_tables().table(self.zone.pk, 'grass')
+        self.assertEqual(table.rates(), {self.rattata.pk: 0.6, self.roucool.pk: 0.4})
+
+        first  = sample_encounters(self.zone, 'grass', 4000, rng=random.Random(7))
+        second = sample_encounters(self.zone, 'grass', 4000, rng=random.Random(7))
+        self.assertEqual(first, second)
+        share = sum(species == self.rattata for species, _ in first) / len(first)
+        self.assertAlmostEqual(share, 0.6, delta=0.04)
+        self.assertEqual(sample_encounters(self.zone, 'fishing', 5), [])
+
+    def test_tables_rebuilt_when_spawns_change(self):
+        from myPokemonApp.models.EncounterTable import get_encounter_tables
+        from myPokemonApp.models.Zone import WildPokemonSpawn
+        self.assertIsNone(get_encounter_tables().table(self.zone.pk, 'water'))
+        WildPokemonSpawn.objects.create(zone=self.zone, pokemon=self.absent,
+                                        encounter_type='water', spawn_rate=5)
+        table = get_encounter_tables().table(self.zone.pk, 'water')
+        self.assertEqual(table.species_ids, (self.absent.pk,))
+
+
+# =============================================================================
+# 33. WILD POKEMON — sauvages éphémères sérialisés dans le combat
+# =============================================================================
+
+class TestWildPokemon(TestCase):
+    """models/WildPokemon + create_wild_pokemon / start_battle / capture."""
+
+    def setUp(self):
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        from myPokemonApp.models.PokemonLearnableMove import PokemonLearnableMove
+        from myPokemonApp.services.trainer_service import _reset_wild_trainer_cache
+        _reset_wild_trainer_cache()
+        self.tackle  = make_move(name='Tackle', pp=35, power=40)
+        self.growl   = make_move(name='Growl', pp=40, power=0, category='status')
+        self.species = make_species(name='Rattata', pokedex_number=19, base_hp=200)
+        for level, move in ((1, self.tackle), (3, self.growl)):
+            PokemonLearnableMove.objects.create(pokemon=self.species, move=move,
+                                                level_learned=level, learn_method='level')
+        self.player  = make_trainer(username='Red')
+        mine = make_playable_pokemon(self.player, level=12)
+        PokemonMoveInstance.objects.create(pokemon=mine, move=self.tackle, current_pp=35)
+
+    def _wild(self, level=5):
+        from myPokemonApp.services.pokemon_factory import create_wild_pokemon
+        return create_wild_pokemon(self.species, level, location='Route 1')
+
+    def test_wild_pokemon_is_never_written(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self._wild()   # dresseur « Wild » créé une fois par processus
+        with CaptureQueriesContext(connection) as ctx:
+            wild = self._wild()
+        writes = [q['sql'] for q in ctx.captured_queries
+                  if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(writes, [])
+        self.assertTrue(wild.is_ephemeral)
+        self.assertLess(wild.pk, 0)
+        self.assertEqual([mi.move for mi in wild.move_instances()], [self.tackle, self.growl])
+        self.assertEqual(wild.current_hp, wild.max_hp)
+
+    def test_battle_round_trip_and_replay(self):
+        from myPokemonApp.models.Battle import Battle
+        from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+        from myPokemonApp.services.battle_replay import replay_battle
+        from myPokemonApp.services.battle_service import get_opponent_ai_action, start_battle
+
+        before = PlayablePokemon.objects.count()
+        battle, _ = start_battle(self.player, wild_pokemon=self._wild(), seed=5)
+        self.assertIsNone(battle.opponent_pokemon_id)
+        self.assertTrue(battle.opponent_pokemon.is_ephemeral)
+
+        for _ in range(2):
+            battle = Battle.objects.hydrated().get(pk=battle.pk)
+            battle.execute_turn({'type': 'attack', 'move': self.tackle},
+                                get_opponent_ai_action(battle))
+
+        battle = Battle.objects.hydrated().get(pk=battle.pk)
+        wild   = battle.opponent_pokemon
+        self.assertLess(wild.current_hp, wild.max_hp)
+        self.assertIs(battle.adopt(wild), wild)
+        self.assertEqual(PlayablePokemon.objects.count(), before)
+        self.assertTrue(replay_battle(battle)['matches'])
+
+    def test_capture_inserts_the_pokemon(self):
+        from myPokemonApp.models.PlayablePokemon import PokemonMoveInstance
+        from myPokemonApp.models.WildPokemon import persist_wild_pokemon
+        from myPokemonApp.services.battle_service import start_battle
+
+        battle, _ = start_battle(self.player, wild_pokemon=self._wild(), seed=1)
+        wild = battle.opponent_pokemon
+        wild.current_hp = 3
+        wild._ephemeral_moves[0].current_pp = 20
+        captured = persist_wild_pokemon(wild, trainer=self.player, party_position=2)
+
+        self.assertGreater(captured.pk, 0)
+        self.assertEqual(captured.trainer, self.player)
+        self.assertEqual((captured.current_hp, captured.iv_speed, captured.nature),
+                         (3, wild.iv_speed, wild.nature))
+        self.assertEqual(
+            sorted(PokemonMoveInstance.objects.filter(pokemon=captured)
+                   .values_list('move__name', 'current_pp')),
+            [('Growl', 40), ('Tackle', 20)],
+        )
+        self.assertTrue(wild.is_ephemeral)
+
+
+# =============================================================================
+# 34. QUEST INDEX — déclencheurs de quêtes en mémoire
+# =============================================================================
+
+class TestQuestIndex(TestCase):
+    """models/QuestIndex + questEngine.trigger_quest_event."""
+
+    def setUp(self):
+        from myPokemonApp.models import GameSave, Quest
+        from myPokemonApp.models.QuestIndex import invalidate_quest_index
+        from myPokemonApp.models.Zone import Zone
+        invalidate_quest_index()
+        self.addCleanup(invalidate_quest_index)
+        self.player = make_trainer(username='Red', money=0)
+        self.rival  = make_trainer(username='Rival_red_oak', trainer_type='rival')
+        self.npc    = make_trainer(username='Gamin', trainer_type='npc')
+        GameSave.objects.create(trainer=self.player)
+        self.town, self.route = (Zone.objects.create(name=name, zone_type='route')
+                                 for name in ('Jadielle', 'Route 2'))
+
+        def quest(quest_id, order, **fields):
+            return Quest.objects.create(quest_id=quest_id, title=quest_id.title(),
+                                        description='', order=order, **fields)
+
+        # deliver dépend de arrive (même événement), route_2 dépend de deliver
+        self.deliver = quest('deliver', 2, trigger_type='visit_zone', trigger_zone=self.town,
+                             reward_money=100)
+        self.arrive  = quest('arrive', 1, trigger_type='visit_zone', trigger_zone=self.town,
+                             reward_flag='in_viridian')
+        self.next    = quest('route_2', 3, trigger_type='visit_zone', trigger_zone=self.route)
+        self.deliver.prerequisite_quests.add(self.arrive)
+        self.next.prerequisite_quests.add(self.deliver)
+        self.duel = quest('rival_oak', 4, trigger_type='defeat_trainer', quest_type='rival')
+
+    def test_unmatched_event_costs_no_query(self):
+        from myPokemonApp.models.QuestIndex import get_quest_index
+        from myPokemonApp.questEngine import trigger_quest_event
+        get_quest_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(trigger_quest_event(self.player, 'defeat_trainer',
+                                                 trainer_id=self.npc.pk, trainer_type='npc',
+                                                 player_trainer=self.player), [])
+            self.assertEqual(trigger_quest_event(self.player, 'story_flag', flag='nope'), [])
+        self.assertEqual(self.player.quest_progress.count(), 0)
+
+    def test_matching_event_completes_in_order(self):
+        from myPokemonApp.models import GameSave
+        from myPokemonApp.questEngine import trigger_quest_event
+        notifications = trigger_quest_event(self.player, 'visit_zone', zone=self.town)
+
+        self.assertEqual([n['quest_id'] for n in notifications], ['arrive', 'deliver'])
+        states = dict(self.player.quest_progress.values_list('quest__quest_id', 'state'))
+        self.assertEqual(states, {'arrive': 'completed', 'deliver': 'completed',
+                                  'route_2': 'available'})
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.money, 100)
+        self.assertTrue(GameSave.objects.get(trainer=self.player).story_flags['in_viridian'])
+        self.assertEqual(trigger_quest_event(self.player, 'visit_zone', zone=self.town), [])
+
+    def test_rival_quest_resolved_per_player(self):
+        from myPokemonApp.models import PlayerRival, RivalTemplate
+        from myPokemonApp.models.QuestIndex import get_quest_index
+        from myPokemonApp.questEngine import trigger_quest_event
+        template = RivalTemplate.objects.create(quest_id='rival_oak')
+        PlayerRival.objects.create(player=self.player, template=template, trainer=self.rival)
+        get_quest_index()
+
+        with self.assertNumQueries(1):   # PlayerRival, aucune quête ne correspond
+            self.assertEqual(trigger_quest_event(self.player, 'defeat_trainer',
+                                                 trainer_id=self.npc.pk,
+                                                 player_trainer=self.player), [])
+        notifications = trigger_quest_event(self.player, 'defeat_trainer',
+                                            trainer_id=self.rival.pk, trainer_type='rival',
+                                            player_trainer=self.player)
+        self.assertEqual([n['quest_id'] for n in notifications], ['rival_oak'])
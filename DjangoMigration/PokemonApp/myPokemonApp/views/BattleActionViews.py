@@ -9,14 +9,12 @@ Endpoint secondaire : battle_learn_move_view (POST /battle/<pk>/learn-move/)
 """
 
 import logging
-import time
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.http import require_http_methods
 
-from myPokemonApp.models.Battle import Battle
+from myPokemonApp.models.Battle import Battle, hydrated_pokemon
 from myPokemonApp.models.PlayablePokemon import PlayablePokemon, PokemonMoveInstance
 from myPokemonApp.models.PokemonEvolution import PokemonEvolution
 from myPokemonApp.models.PokemonMove import PokemonMove
@@ -34,30 +32,32 @@ from myPokemonApp.gameUtils import (
     build_battle_response,
     serialize_pokemon_moves,
 )
+from myPokemonApp.services.serializers import apply_state_version
+from myPokemonApp.services.ai_speculation import schedule_ai_speculation
+from myPokemonApp.services.battle_service import (
+    BattleBusy,
+    battle_action_lock,
+    get_idempotent_response,
+    store_idempotent_response,
+)
+from myPokemonApp.services.profiling import profiled_view
 from myPokemonApp.views.AchievementViews import (
     trigger_achievements_after_level_up,
 )
 
 logger = logging.getLogger(__name__)
 
-# Délai minimum entre deux actions de combat (en secondes)
-_BATTLE_ACTION_COOLDOWN = 1.0
-# Actions exclues du rate limiting (pas de tour de jeu)
-_NO_RATE_LIMIT_ACTIONS = frozenset({'confirm_evolution', 'confirm_capture'})
+# Actions pouvant renvoyer la réponse pré-construite (early return) : seules
+# celles-ci paient un build_battle_response() avant le handler.
+_PREBUILT_ACTIONS = frozenset({'item', 'confirm_capture'})
 
 
-def _check_rate_limit(user_id: int, battle_id: int) -> bool:
-    """
-    Retourne True si la requête doit être bloquée (trop rapide).
-    Utilise le cache Django pour tracker le timestamp de la dernière action.
-    """
-    key = f'battle_action:{user_id}:{battle_id}'
-    now = time.time()   # Unix timestamp — cohérent entre tous les workers
-    last = cache.get(key)
-    if last is not None and (now - last) < _BATTLE_ACTION_COOLDOWN:
-        return True
-    cache.set(key, now, timeout=int(_BATTLE_ACTION_COOLDOWN) + 2)
-    return False
+def _parse_since_version(request):
+    """Dernière state_version connue du client (POST since_version), ou None."""
+    try:
+        return int(request.POST['since_version'])
+    except (KeyError, ValueError):
+        return None
 
 
 # =============================================================================
@@ -84,8 +84,7 @@ def _save_hp_snapshot(battle):
             except Exception:
                 pass
 
-        bs = battle.battle_state if isinstance(battle.battle_state, dict) else {}
-        opponent_used_ids = bs.get('opponent_used_ids', [])
+        opponent_used_ids = battle._bstate().side('opponent').used_ids
         for entry in snap.get('opponent_team', []):
             poke = None
             if battle.opponent_trainer and opponent_used_ids:
@@ -128,7 +127,10 @@ def _handle_attack(request, battle, trainer, response_data):
             winner_pokemon=battle.player_pokemon
         )
         exp_result = apply_exp_gain(battle.player_pokemon, exp_amount)
+        battle.emit('exp', side='player', amount=exp_amount,
+                    level_up=exp_result['level_up'], new_level=exp_result['new_level'])
         apply_ev_gains(battle.player_pokemon, battle.opponent_pokemon)
+        battle.record_sync(battle.player_pokemon)
 
         response_data['log'].append(f"+{exp_amount} EXP")
         if exp_result['level_up']:
@@ -172,6 +174,7 @@ def _handle_attack(request, battle, trainer, response_data):
 
 def _handle_flee(request, battle, trainer, response_data):
     """Tentative de fuite."""
+    battle.record_step('F')
     success = battle.attempt_flee()
     response_data['fled'] = success
     if success:
@@ -188,19 +191,16 @@ def _handle_flee(request, battle, trainer, response_data):
 
 def _handle_switch(request, battle, trainer, response_data):
     """Switch de Pokémon (normal ou forcé après KO)."""
-    new_pokemon   = get_object_or_404(
-        PlayablePokemon, pk=request.POST.get('pokemon_id'), trainer=trainer
-    )
+    new_pokemon   = battle.adopt(get_object_or_404(
+        hydrated_pokemon(), pk=request.POST.get('pokemon_id'), trainer=trainer
+    ))
     player_action = {'type': 'switch', 'pokemon': new_pokemon}
 
     # Track player used pokemon IDs
-    bs   = battle.battle_state if isinstance(battle.battle_state, dict) else {}
-    used = bs.get('player_used_ids', [])
+    used = battle._bstate().side('player').used_ids
     if new_pokemon.id not in used:
         used.append(new_pokemon.id)
-    bs['player_used_ids'] = used
-    battle.battle_state   = bs
-    battle.save(update_fields=['battle_state'])
+    battle._save_state()
 
     # Switch forcé (après KO) : l'adversaire ne joue pas ce tour
     if request.POST.get('type') == 'forcedSwitch':
@@ -245,7 +245,7 @@ def _handle_item(request, battle, trainer, response_data):
         if guaranteed:
             shakes, success = 3, True
         else:
-            shakes, success = calculate_shake_count(cap_rate)
+            shakes, success = calculate_shake_count(cap_rate, rng=battle.rng)
 
         request.session['pending_capture'] = {
             'item_id': inv.pk,
@@ -345,23 +345,15 @@ def _handle_confirm_capture(request, battle, trainer, response_data):
         opponent_action = get_opponent_ai_action(battle)
         battle.execute_turn({'type': 'PokeBall'}, opponent_action)
         # Rebuild response_data avec les HP à jour après l'attaque adverse.
-        battle.refresh_from_db()
+        battle.refresh_hydrated()
         fresh = build_battle_response(battle)
         response_data.update(fresh)
 
-        # Récupérer les messages du battle_log générés par execute_turn
+        # Récupérer les messages du journal générés par execute_turn
         # (dégâts, statut, etc. infligés par l'adversaire ce tour).
-        opponent_logs = [
-            entry['message'] for entry in battle.battle_log
-            if entry.get('turn') in (turn_before, turn_before + 1)
-        ]
+        opponent_logs = battle.turn_log(turn_before, turn_before + 1)
         if not opponent_logs:
-            opponent_logs = [entry['message'] for entry in battle.battle_log[-5:]]
-        
-        opponent_logs = [
-            m.get('message', str(m)) if isinstance(m, dict) else m
-            for m in opponent_logs
-        ]
+            opponent_logs = battle.recent_log(5)
         # Le message d'échec de capture est ajouté en premier, suivi des dégâts adverses.
         response_data['log'] = [result['message']] + opponent_logs
     else:
@@ -388,8 +380,9 @@ def _handle_confirm_evolution(request, battle, trainer, response_data):
 
     new_species = evolution.evolves_to
     evolve_msg  = pokemon.evolve_to(new_species)
+    battle.record_sync(pokemon)
 
-    battle.refresh_from_db()
+    battle.refresh_hydrated()
     resp = build_battle_response(battle)
     resp['log']         = [evolve_msg]
     resp['evolved']     = True
@@ -416,111 +409,155 @@ _ACTION_HANDLERS = {
 }
 
 
+def _run_action(request, battle, trainer, action_type, handler, since_version):
+    """
+    Exécute l'action sur le combat verrouillé et construit la réponse.
+    Retourne (données JSON, statut HTTP).
+    """
+    if not battle.is_active and action_type not in ('confirm_evolution', 'confirm_capture'):
+        return {'error': 'Battle already ended'}, 400
+
+    if action_type in _PREBUILT_ACTIONS:
+        response_data = build_battle_response(battle)
+    else:
+        response_data = {'success': True, 'log': [], 'battle_ended': False}
+
+    result = handler(request, battle, trainer, response_data)
+
+    # ── Cas spéciaux : early return ou réponse pré-construite ────────────────
+    if action_type == 'confirm_evolution':
+        if result is None:
+            return {'error': 'Evolution invalide'}, 400
+        if isinstance(result, dict):
+            return apply_state_version(battle, result, since_version), 200
+
+    if action_type in _PREBUILT_ACTIONS and result is True:
+        return apply_state_version(battle, response_data, since_version), 200
+
+    # ── Rebuild de la réponse après exécution du tour ────────────────────────
+    turn_before       = battle.current_turn
+    battle.refresh_hydrated()
+    ended_before      = response_data.get('battle_ended', False)
+    result_before     = response_data.get('result')
+    extra_logs        = list(response_data.get('log', []))
+    pending_evolution = response_data.get('pending_evolution')
+    pending_moves     = response_data.get('pending_moves')
+
+    response_data = build_battle_response(battle)
+
+    if ended_before:
+        response_data['battle_ended'] = True
+    if result_before:
+        response_data['result'] = result_before
+    if pending_evolution:
+        response_data['pending_evolution'] = pending_evolution
+    if pending_moves:
+        response_data['pending_moves'] = pending_moves
+
+    # Logs du tour actuel uniquement (lignes BattleEvent de ce tour)
+    turn_logs = battle.turn_log(turn_before, turn_before + 1) or battle.recent_log(5)
+    if turn_logs:
+        seen   = set(turn_logs)
+        merged = turn_logs + [m for m in extra_logs if m not in seen]
+        response_data['log'] = merged
+    elif extra_logs:
+        response_data['log'] = extra_logs
+
+    # Vérification finale de fin de combat
+    if not response_data.get('battle_ended'):
+        is_ended, winner, end_message = check_battle_end(battle)
+        if is_ended:
+            _save_hp_snapshot(battle)
+            response_data['battle_ended'] = True
+            response_data['winner']       = winner.username if winner else 'Draw'
+            response_data['result']       = 'victory' if winner == battle.player_trainer else 'defeat'
+            response_data['log'].append(end_message)
+
+    return apply_state_version(battle, response_data, since_version), 200
+
+
 # =============================================================================
 # ENDPOINTS
 # =============================================================================
 
 @login_required
 @require_http_methods(['POST'])
+@profiled_view
 def battle_action_view(request, pk):
     """
     API POST pour exécuter une action de combat.
     Retourne du JSON pour mise à jour en temps réel par le client.
+
+    Si le client envoie since_version (dernière state_version reçue),
+    l'état est renvoyé en delta ; sinon (ou version expirée) en entier.
+
+    L'action s'exécute sous verrou par combat (battle_action_lock) dans une
+    seule transaction.  idempotency_key (générée par le client) : un POST
+    rejoué avec la même clé renvoie la réponse déjà servie sans rejouer le tour
+    (BattleActionReceipt, inséré dans la transaction du tour).
+
+    Après le commit, la décision de l'IA pour le tour suivant est calculée en
+    arrière-plan (services/ai_speculation).
     """
     battle  = get_object_or_404(Battle, pk=pk)
     trainer = get_player_trainer(request.user)
 
-    if battle.player_trainer != trainer:
+    if battle.player_trainer_id != trainer.pk:
         return JsonResponse({'error': 'Not your battle'}, status=403)
 
-    action_type = request.POST.get('action')
+    action_type     = request.POST.get('action')
+    idempotency_key = request.POST.get('idempotency_key', '')[:64]
 
-    # ── Rate limiting : 1 action / seconde max (hors résolutions post-combat) ──
-    if action_type not in _NO_RATE_LIMIT_ACTIONS:
-        if _check_rate_limit(request.user.pk, pk):
-            return JsonResponse(
-                {'error': 'Trop vite ! Attendez un instant avant la prochaine action.'},
-                status=429,
-            )
-
-    if not battle.is_active and action_type not in ('confirm_evolution', 'confirm_capture'):
-        return JsonResponse({'error': 'Battle already ended'}, status=400)
+    # ── POST rejoué (réseau, double clic) : même réponse, pas de second tour ──
+    cached = get_idempotent_response(pk, idempotency_key)
+    if cached is not None:
+        return JsonResponse(cached)
 
     handler = _ACTION_HANDLERS.get(action_type)
     if handler is None:
         return JsonResponse({'error': f'Unknown action: {action_type}'}, status=400)
 
-    response_data = build_battle_response(battle)
+    since_version = _parse_since_version(request)
 
     try:
-        result = handler(request, battle, trainer, response_data)
-
-        # ── Cas spéciaux : early return ou réponse pré-construite ────────────
-        if action_type == 'confirm_evolution':
-            if result is None:
-                return JsonResponse({'error': 'Evolution invalide'}, status=400)
-            if isinstance(result, dict):
-                return JsonResponse(result)
-
-        if action_type in ('confirm_capture', 'item') and result is True:
-            return JsonResponse(response_data)
-
-        # ── Rebuild de la réponse après exécution du tour ────────────────────
-        turn_before       = battle.current_turn
-        battle.refresh_from_db()
-        ended_before      = response_data.get('battle_ended', False)
-        result_before     = response_data.get('result')
-        extra_logs        = list(response_data.get('log', []))
-        pending_evolution = response_data.get('pending_evolution')
-        pending_moves     = response_data.get('pending_moves')
-
-        response_data = build_battle_response(battle)
-
-        if ended_before:
-            response_data['battle_ended'] = True
-        if result_before:
-            response_data['result'] = result_before
-        if pending_evolution:
-            response_data['pending_evolution'] = pending_evolution
-        if pending_moves:
-            response_data['pending_moves'] = pending_moves
-
-        # Logs du tour actuel uniquement
-        if battle.battle_log:
-            turn_logs = [
-                entry['message'] for entry in battle.battle_log
-                if entry.get('turn') in (turn_before, turn_before + 1)
-            ]
-            if not turn_logs:
-                turn_logs = [entry['message'] for entry in battle.battle_log[-5:]]
-            turn_logs = [m.get('message', str(m)) if isinstance(m, dict) else m for m in turn_logs]
-            seen   = set(turn_logs)
-            merged = turn_logs + [m for m in extra_logs if m not in seen]
-            response_data['log'] = merged
-        elif extra_logs:
-            response_data['log'] = extra_logs
-
-        # Vérification finale de fin de combat
-        if not response_data.get('battle_ended'):
-            is_ended, winner, end_message = check_battle_end(battle)
-            if is_ended:
-                _save_hp_snapshot(battle)
-                response_data['battle_ended'] = True
-                response_data['winner']       = winner.username if winner else 'Draw'
-                response_data['result']       = 'victory' if winner == battle.player_trainer else 'defeat'
-                response_data['log'].append(end_message)
+        with battle_action_lock(battle) as battle:
+            # Doublon qui attendait le verrou pendant l'exécution de l'original
+            cached = get_idempotent_response(pk, idempotency_key)
+            if cached is not None:
+                return JsonResponse(cached)
+            response_data, status = _run_action(
+                request, battle, trainer, action_type, handler, since_version
+            )
+            if status == 200 and response_data.get('success', True):
+                # Même transaction que le tour : annulé avec lui
+                store_idempotent_response(pk, idempotency_key, response_data)
+                # Décision IA du tour suivant, calculée pendant que le joueur choisit
+                schedule_ai_speculation(battle)
+
+    except BattleBusy:
+        cached = get_idempotent_response(pk, idempotency_key)
+        if cached is not None:
+            return JsonResponse(cached)
+        return JsonResponse(
+            {'error': 'Une autre action est en cours sur ce combat.'}, status=409
+        )
 
-    except Exception as exc:
+    except Exception:
+        # Transaction annulée : aucune écriture partielle du tour
         logger.exception("Erreur inattendue dans battle_action_view pk=%s action=%s", pk, action_type)
-        response_data['success'] = False
-        response_data['error']   = "Une erreur est survenue. Veuillez réessayer."
-        response_data['log']     = ["Erreur serveur. Réessayez dans un instant."]
+        return JsonResponse({
+            'success':      False,
+            'battle_ended': False,
+            'error':        "Une erreur est survenue. Veuillez réessayer.",
+            'log':          ["Erreur serveur. Réessayez dans un instant."],
+        })
 
-    return JsonResponse(response_data)
+    return JsonResponse(response_data, status=status)
 
 
 @login_required
 @require_http_methods(['POST'])
+@profiled_view
 def battle_learn_move_view(request, pk):
     """
     Gère la décision du joueur lors de l'apprentissage d'un move (modal de sélection).
@@ -533,7 +570,7 @@ def battle_learn_move_view(request, pk):
     battle  = get_object_or_404(Battle, pk=pk)
     trainer = get_player_trainer(request.user)
 
-    if battle.player_trainer != trainer:
+    if battle.player_trainer_id != trainer.pk:
         return JsonResponse({'error': 'Not your battle'}, status=403)
 
     new_move_id      = request.POST.get('new_move_id')
@@ -553,6 +590,7 @@ def battle_learn_move_view(request, pk):
             defaults={'current_pp': new_move.pp}
         )
         message = f"{pokemon.species.name} oublie et apprend {new_move.name} !"
+        battle.record_sync(pokemon)
     else:
         message = f"{pokemon.species.name} n'apprend pas {new_move.name}."
 
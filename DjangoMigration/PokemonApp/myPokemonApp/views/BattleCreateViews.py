@@ -22,7 +22,8 @@ from myPokemonApp.models.Battle import Battle
 from myPokemonApp.models.GameSave import GameSave, TrainerBattleHistory
 from myPokemonApp.models.Pokemon import Pokemon
 from myPokemonApp.models.Trainer import GymLeader, Trainer
-from myPokemonApp.models.Zone import PlayerLocation, Zone, ZoneConnection
+from myPokemonApp.models.Zone import PlayerLocation, Zone
+from myPokemonApp.models.ZoneGraph import get_zone_graph
 from myPokemonApp.gameUtils import (
     get_first_alive_pokemon,
     get_player_trainer,
@@ -313,20 +314,7 @@ def battle_challenge_gym_view(request, gym_leader_id):
     # Si le joueur est dans la ville (et pas dans la zone arène), l'inviter à entrer dans l'arène
     if in_city and not in_gym_zone:
         # Chercher la zone arène connectée
-        from myPokemonApp.models.Zone import Zone as ZoneModel, ZoneConnection as ZC
-        arena_conn = ZC.objects.filter(
-            from_zone=current_zone, to_zone__zone_type='building',
-            to_zone__name__startswith='Arène'
-        ).select_related('to_zone').first()
-        if not arena_conn:
-            arena_conn = ZC.objects.filter(
-                to_zone=current_zone, is_bidirectional=True,
-                from_zone__zone_type='building',
-                from_zone__name__startswith='Arène'
-            ).select_related('from_zone').first()
-            gym_zone = arena_conn.from_zone if arena_conn else None
-        else:
-            gym_zone = arena_conn.to_zone
+        gym_zone = get_zone_graph().arena_of(current_zone.id)
 
         if gym_zone:
             messages.warning(
@@ -482,6 +470,7 @@ def battle_trainer_complete_view(request, battle_id):
             quest_notifs = trigger_quest_event(
                 player_trainer, 'defeat_trainer',
                 trainer_id=opponent.id,
+                trainer_type=opponent.trainer_type,
                 player_trainer=player_trainer,
             )
             for notif in quest_notifs:
@@ -516,13 +505,7 @@ def battle_trainer_complete_view(request, battle_id):
             if current_zone.has_pokemon_center:
                 center_zone = current_zone
             else:
-                connected_ids = ZoneConnection.objects.filter(
-                    from_zone=current_zone
-                ).values_list('to_zone_id', flat=True)
-                reverse_ids = ZoneConnection.objects.filter(
-                    to_zone=current_zone, is_bidirectional=True
-                ).values_list('from_zone_id', flat=True)
-                all_ids = list(connected_ids) + list(reverse_ids)
+                all_ids = get_zone_graph().neighbour_ids(current_zone.id)
 
                 center_zone = Zone.objects.filter(
                     id__in=all_ids, has_pokemon_center=True
@@ -5,6 +5,7 @@ Vues Django — vue graphique du combat (rendu battle_game_v2.html).
 
 import logging
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.views import generic
@@ -25,7 +26,7 @@ class BattleGameView(generic.DetailView):
 
     def get_queryset(self):
         trainer = get_player_trainer(self.request.user)
-        return Battle.objects.filter(player_trainer=trainer)
+        return Battle.objects.hydrated().filter(player_trainer=trainer)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -98,6 +99,9 @@ class BattleGameView(generic.DetailView):
             and battle.opponent_trainer.trainer_type == 'rival'
         )
 
+        # Flux SSE des tours : seulement sous ASGI (voir settings.BATTLE_STREAM_ENABLED)
+        context['battle_stream'] = settings.BATTLE_STREAM_ENABLED
+
         # Pourcentage EXP correct (relatif au niveau actuel, pas cumulatif)
         pp = battle.player_pokemon
         if pp:
@@ -1,18 +1,25 @@
 #!/usr/bin/python3
 """
 Vues Django — liste et détail des combats.
+
+Les combats archivés (BattleArchive, commande archive_battles) apparaissent
+dans la même liste, paginée sur l'union des deux tables, et s'ouvrent dans
+la même page de détail : leurs équipes viennent des colonnes de résumé.
 """
 
 from types import SimpleNamespace
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import Case, Count, IntegerField, Prefetch, Q, When
+from django.db.models import BooleanField, Case, Count, IntegerField, Prefetch, Q, Value, When
+from django.http import Http404
 from django.utils.decorators import method_decorator
 from django.views import generic
 
 from myPokemonApp.models.Battle import Battle
+from myPokemonApp.models.BattleArchive import BattleArchive
 from myPokemonApp.models.GameSave import TrainerBattleHistory
 from myPokemonApp.models.PlayablePokemon import PlayablePokemon
+from myPokemonApp.models.WildPokemon import WILD_POKEMON_PK, hydrate_wild_opponents
 from myPokemonApp.gameUtils import get_player_trainer, get_or_create_player_trainer
 
 import logging
@@ -75,27 +82,10 @@ class BattleListView(generic.ListView):
     context_object_name = 'battles'
     paginate_by         = 20
 
-    def get_queryset(self):
-        # Cache trainer sur self pour ne pas le recalculer dans get_context_data
-        self._trainer = get_or_create_player_trainer(self.request.user)
-
-        qs = (
-            Battle.objects
-            .filter(Q(player_trainer=self._trainer) | Q(opponent_trainer=self._trainer))
-            .order_by('-created_at')
-            .select_related(
-                'player_trainer',
-                'opponent_trainer',
-                'winner',
-                'player_pokemon__species',
-                'opponent_pokemon__species',
-            )
-            .prefetch_related(
-                Prefetch(
-                    'opponent_trainer__pokemon_team',
-                    queryset=PlayablePokemon.objects.select_related('species'),
-                )
-            )
+    def _filtered(self, model):
+        """Combats du joueur (Battle ou BattleArchive) selon les filtres GET."""
+        qs = model.objects.filter(
+            Q(player_trainer=self._trainer) | Q(opponent_trainer=self._trainer)
         )
 
         result = self.request.GET.get('result', 'all')
@@ -104,7 +94,7 @@ class BattleListView(generic.ListView):
         elif result == 'loss':
             qs = qs.exclude(winner=self._trainer).exclude(winner__isnull=True)
         elif result == 'active':
-            qs = qs.filter(is_active=True)
+            qs = qs.filter(is_active=True) if model is Battle else qs.none()
 
         battle_type = self.request.GET.get('type', 'all')
         if battle_type in ('wild', 'trainer', 'gym', 'elite_four'):
@@ -112,9 +102,63 @@ class BattleListView(generic.ListView):
 
         return qs
 
+    def get_queryset(self):
+        # Cache trainer sur self pour ne pas le recalculer dans get_context_data
+        self._trainer = get_or_create_player_trainer(self.request.user)
+
+        # Pagination sur (id, date, archivé) des deux tables ; les lignes de
+        # la page sont chargées ensuite par _load_page.
+        live = (self._filtered(Battle)
+                .annotate(archived=Value(False, output_field=BooleanField()))
+                .values_list('id', 'created_at', 'archived'))
+        archived = (self._filtered(BattleArchive)
+                    .annotate(archived=Value(True, output_field=BooleanField()))
+                    .values_list('id', 'created_at', 'archived'))
+        return live.union(archived, all=True).order_by('-created_at')
+
+    def _load_page(self, rows):
+        """Battle / BattleArchive des lignes de la page, dans l'ordre."""
+        team_prefetch = Prefetch(
+            'opponent_trainer__pokemon_team',
+            queryset=PlayablePokemon.objects.select_related('species'),
+        )
+        live = (
+            Battle.objects
+            .select_related(
+                'player_trainer',
+                'opponent_trainer',
+                'winner',
+                'player_pokemon__species',
+                'opponent_pokemon__species',
+            )
+            .prefetch_related(team_prefetch)
+            .in_bulk([pk for pk, _, is_archived in rows if not is_archived])
+        )
+        hydrate_wild_opponents(live.values())   # sauvages éphémères : espèces en lot
+        archived = (
+            BattleArchive.objects
+            .select_related('player_trainer', 'opponent_trainer', 'winner')
+            .defer('payload')
+            .prefetch_related(team_prefetch)
+            .in_bulk([pk for pk, _, is_archived in rows if is_archived])
+        )
+        battles = []
+        for pk, _, is_archived in rows:
+            battle = (archived if is_archived else live).get(pk)
+            if battle is None:
+                continue   # archivé entre la pagination et le chargement
+            if is_archived:
+                snap = battle.battle_snapshot or {}
+                entry = next((e for e in snap.get('player_team', [])
+                              if e['id'] == battle.player_pokemon_id), None)
+                battle.player_pokemon = _snap_to_mock(entry) if entry else None
+            battles.append(battle)
+        return battles
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         trainer = getattr(self, '_trainer', None) or get_or_create_player_trainer(self.request.user)
+        context['battles'] = context['object_list'] = self._load_page(list(context['battles']))
 
         # 1 requête pour 4 counts
         stats = (
@@ -136,6 +180,25 @@ class BattleListView(generic.ListView):
                 ),
             )
         )
+        # + 1 requête pour les combats archivés (aucun n'est actif)
+        archived = (
+            BattleArchive.objects
+            .filter(Q(player_trainer=trainer) | Q(opponent_trainer=trainer))
+            .aggregate(
+                stat_total=Count('id'),
+                stat_win=Count(
+                    Case(When(winner=trainer, then=1), output_field=IntegerField())
+                ),
+                stat_loss=Count(
+                    Case(
+                        When(winner__isnull=False, then=1),
+                        output_field=IntegerField(),
+                    )
+                ),
+            )
+        )
+        for key, value in archived.items():
+            stats[key] += value
         # stat_loss tel que calculé inclut les victoires — on soustrait
         stats['stat_loss'] = stats['stat_loss'] - stats['stat_win']
 
@@ -167,9 +230,19 @@ class BattleDetailView(generic.DetailView):
     template_name       = 'battle/battle_detail.html'
     context_object_name = 'battle'
 
+    def get_object(self, queryset=None):
+        """Battle, ou sa version archivée (même pk) s'il a été archivé."""
+        pk = self.kwargs.get(self.pk_url_kwarg)
+        battle = (Battle.objects.filter(pk=pk).first()
+                  or BattleArchive.objects.filter(pk=pk).first())
+        if battle is None:
+            raise Http404("Combat introuvable")
+        return battle
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         battle  = self.object
+        is_archived = isinstance(battle, BattleArchive)
 
         viewer     = get_player_trainer(self.request.user)
         player_won = (battle.winner == battle.player_trainer) if battle.winner else None
@@ -177,15 +250,18 @@ class BattleDetailView(generic.DetailView):
         snap               = battle.battle_snapshot if isinstance(battle.battle_snapshot, dict) else {}
         player_active_id   = battle.player_pokemon_id
         opponent_active_id = battle.opponent_pokemon_id
+        if not is_archived and battle.wild_pokemon:
+            opponent_active_id = WILD_POKEMON_PK   # sauvage éphémère
 
         # ── Équipe joueur ──────────────────────────────────────────────────────
         player_entries = snap.get('player_team')
         if player_entries:
             player_team = [_snap_to_mock(e, player_active_id) for e in player_entries]
+        elif is_archived:
+            player_team = []
         else:
             # Fallback legacy (combats antérieurs au champ battle_snapshot)
-            bs = battle.battle_state if isinstance(battle.battle_state, dict) else {}
-            used_ids = bs.get('player_used_ids', [])
+            used_ids = battle._bstate().side('player').used_ids
             qs = battle.player_trainer.pokemon_team.select_related(
                 'species', 'species__primary_type', 'species__secondary_type'
             )
@@ -198,7 +274,7 @@ class BattleDetailView(generic.DetailView):
         opponent_entries = snap.get('opponent_team')
         if opponent_entries:
             opponent_team = [_snap_to_mock(e, opponent_active_id) for e in opponent_entries]
-        elif battle.opponent_pokemon:
+        elif not is_archived and battle.opponent_pokemon:
             p = battle.opponent_pokemon
             p.is_last_active = True
             opponent_team = [p]
@@ -206,13 +282,16 @@ class BattleDetailView(generic.DetailView):
             opponent_team = []
 
         money_earned = 0
-        try:
-            history = TrainerBattleHistory.objects.get(
-                battle=battle, player=battle.player_trainer
-            )
-            money_earned = history.money_earned
-        except (TrainerBattleHistory.DoesNotExist, Exception):
-            pass
+        if is_archived:
+            money_earned = battle.money_earned
+        else:
+            try:
+                history = TrainerBattleHistory.objects.get(
+                    battle=battle, player=battle.player_trainer
+                )
+                money_earned = history.money_earned
+            except (TrainerBattleHistory.DoesNotExist, Exception):
+                pass
 
         context.update({
             'viewer':        viewer,
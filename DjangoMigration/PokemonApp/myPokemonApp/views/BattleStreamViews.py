@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Vues Django — flux en direct des événements de tour (Server-Sent Events).
+
+Endpoint : battle_stream_view (GET /battle/<pk>/stream/), vue asynchrone.
+Chaque événement publié par le moteur (services/turn_stream) pendant un tour
+est relayé au navigateur (EventSource dans battle-game.js).
+
+Le flux n'est servi que sous ASGI (settings.BATTLE_STREAM_ENABLED) : sous
+WSGI, StreamingHttpResponse consommerait le générateur sans fin en entier.
+La vue répond alors 204 (l'EventSource ne se reconnecte pas) et l'URL n'est
+pas exposée dans BATTLE_CONFIG.  Les middlewares synchrones (profilage,
+starter) font tout de même exécuter la vue dans un thread.
+
+Authentification et méthode sont contrôlées dans la coroutine :
+login_required / require_http_methods n'acceptent les vues asynchrones
+qu'à partir de Django 5.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import (
+    HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse,
+)
+
+from myPokemonApp.models.Battle import Battle
+from myPokemonApp.services import turn_stream
+
+# Commentaire SSE envoyé sans événement pendant ce délai (proxies, timeouts)
+HEARTBEAT_SECONDS = 15
+
+
+async def _event_source(subscription):
+    """Générateur text/event-stream ; libère l'abonnement à la déconnexion."""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield turn_stream.format_sse(event)
+    finally:
+        subscription.close()
+
+
+async def battle_stream_view(request, pk):
+    """Abonne le client aux événements de tour de son combat actif."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    # request.user est paresseux (session en base) : résolu hors boucle async
+    user_id = await sync_to_async(lambda: request.user.pk)()
+    if user_id is None:
+        return redirect_to_login(request.get_full_path())
+    if not settings.BATTLE_STREAM_ENABLED:
+        return HttpResponse(status=204)
+
+    owned = await Battle.objects.filter(
+        pk=pk, player_trainer__user_id=user_id, is_active=True
+    ).aexists()
+    if not owned:
+        return JsonResponse({'error': 'Combat introuvable'}, status=404)
+
+    response = StreamingHttpResponse(
+        _event_source(turn_stream.broker.subscribe(pk)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control']     = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'   # nginx : ne pas bufferiser le flux
+    return response
@@ -9,6 +9,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.contrib import messages
+from django.db import transaction
 
 from myPokemonApp.models.Battle import Battle
 from myPokemonApp.models.GameSave import GameSave
@@ -17,14 +18,20 @@ from myPokemonApp.models.PokemonCenter import PokemonCenter
 from myPokemonApp.models.ShopModel import Shop
 from myPokemonApp.models.Trainer import GymLeader, Trainer, TrainerInventory
 from myPokemonApp.models.Zone import Zone, ZoneConnection
+from myPokemonApp.models.ZoneGraph import get_zone_graph, is_arena
 from myPokemonApp.gameUtils import (
     get_random_wild_pokemon, get_player_trainer, get_player_location,
     get_defeated_trainer_ids, ZONE_TRANSLATIONS,
     create_wild_pokemon, get_first_alive_pokemon,
-    cleanup_orphan_wild_pokemon, start_battle,
+    start_battle,
 )
-from myPokemonApp.questEngine import trigger_quest_event, check_rival_encounter, get_active_quests, can_access_floor
+from myPokemonApp.questEngine import (
+    trigger_quest_event, check_rival_encounter, get_active_quests, can_access_floor,
+    TrainerCapabilities, evaluate_zone_access,
+)
+from myPokemonApp.services.travel_service import battle_blocker, route
 from myPokemonApp.views.AchievementViews import trigger_achievements_after_zone_visit
+from myPokemonApp.services.profiling import profiled_view
 
 # Zones où un Ronflex bloque le passage et le flag story correspondant
 _SNORLAX_ZONES = {
@@ -39,8 +46,13 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 
 @login_required
+@profiled_view
 def map_view(request):
-    """Vue de la carte Kanto avec zones"""
+    """
+    Vue de la carte Kanto avec zones.
+    Accès, passages CS et zones visitées sont évalués en mémoire à partir d'un
+    TrainerCapabilities : nombre de requêtes fixe, quel que soit le nombre de zones.
+    """
     trainer         = get_player_trainer(request.user)
     player_location = get_player_location(trainer)   # crée si absent
 
@@ -53,35 +65,35 @@ def map_view(request):
     zones_with_gym  = {fr for fr, en in ZONE_TRANSLATIONS.items() if en in gym_cities}
 
     # IDs des zones directement connectées à la zone courante (pour le bouton "Voyager")
+    graph           = get_zone_graph()
     current_zone    = player_location.current_zone
-    outgoing_ids    = set(ZoneConnection.objects.filter(from_zone=current_zone).values_list('to_zone_id', flat=True))
-    incoming_ids    = set(ZoneConnection.objects.filter(to_zone=current_zone, is_bidirectional=True).values_list('from_zone_id', flat=True))
-    connected_zone_ids = list(outgoing_ids | incoming_ids)
+    connected_zone_ids = list(graph.neighbour_ids(current_zone.id))
+
+    # ── Accès de toutes les zones en mémoire (TrainerCapabilities : 5 requêtes) ─
+    caps        = TrainerCapabilities.build(trainer)
+    zone_access = evaluate_zone_access(trainer, all_zones, caps)
 
     # ── Pré-calcul : arènes verrouillées par badge → associer à leur ville ──────
     # Les arènes (type building) n'ont pas de coordonnées POS sur la carte.
     # On reporte leur verrouillage badge sur la ville parente pour qu'il soit visible.
     city_gym_locks = {}  # {city_zone_id: reason_str}
-    arena_connections = ZoneConnection.objects.filter(
-        to_zone__zone_type='building',
-        is_bidirectional=True,
-    ).select_related('from_zone', 'to_zone', 'to_zone__required_badge')
-    for conn in arena_connections:
-        arena = conn.to_zone
-        if not arena.name.startswith('Arène'):
+    for conn in graph.connections():
+        arena = graph.zone(conn.to_zone_id)
+        if not (conn.is_bidirectional and is_arena(arena)):
             continue
-        can_enter, reason = arena.is_accessible_by(trainer)
-        if not can_enter and conn.from_zone.zone_type == 'city':
-            city_gym_locks[conn.from_zone.id] = reason
+        can_enter, reason = zone_access[arena.id]
+        if not can_enter and graph.zone(conn.from_zone_id).zone_type == 'city':
+            city_gym_locks[conn.from_zone_id] = reason
 
     # ── Pré-calcul : zones bloquées par connexion CS (Zone.required_hm absent) ─
     # Une zone peut être entièrement inatteignable parce que toutes les connexions
     # entrantes exigent une CS que le trainer n'a pas — même si la zone elle-même
     # n'a pas de required_hm.
-    from myPokemonApp.questEngine import trainer_has_hm as _has_hm, HM_MOVE_NAMES
     all_incoming = {}  # {zone_id: [(passable, reason), ...]}
-    for conn in ZoneConnection.objects.exclude(required_hm='').select_related('from_zone', 'to_zone'):
-        passable, reason = conn.is_passable_by(trainer)
+    for conn in graph.connections():
+        if not conn.required_hm:
+            continue
+        passable, reason = caps.connection_access(conn)
         for zid in ([conn.to_zone_id] + ([conn.from_zone_id] if conn.is_bidirectional else [])):
             all_incoming.setdefault(zid, []).append((passable, reason))
 
@@ -100,7 +112,7 @@ def map_view(request):
 
     accessible_zones = []
     for zone in all_zones:
-        can_access, reason = zone.is_accessible_by(trainer)
+        can_access, reason = zone_access[zone.id]
 
         # Si accessible via la zone elle-même, vérifier les connexions entrantes
         if can_access and zone.zone_type != 'building':
@@ -117,25 +129,14 @@ def map_view(request):
             'accessible': can_access,
             'reason':     reason,
             'gym_lock':   gym_lock,
-            'visited':    player_location.visited_zones.filter(id=zone.id).exists(),
+            'visited':    caps.has_visited(zone),
             'has_gym':    zone.name in zones_with_gym,
         })
 
     # Si le joueur est dans une arène, pointer le point vert sur la ville parente
     map_zone = current_zone
-    if current_zone.zone_type == 'building' and current_zone.name.startswith('Arène'):
-        from myPokemonApp.models.Zone import ZoneConnection as ZC
-        pc = ZC.objects.filter(
-            to_zone=current_zone, from_zone__zone_type='city'
-        ).select_related('from_zone').first()
-        if pc:
-            map_zone = pc.from_zone
-        else:
-            pc = ZC.objects.filter(
-                from_zone=current_zone, to_zone__zone_type='city', is_bidirectional=True
-            ).select_related('to_zone').first()
-            if pc:
-                map_zone = pc.to_zone
+    if is_arena(current_zone):
+        map_zone = graph.parent_city(current_zone.id) or current_zone
 
     return render(request, 'map/map_overview.html', {
         'current_zone':       current_zone,
@@ -250,20 +251,12 @@ def zone_detail_view(request, zone_id):
     gym_leader = GymLeader.objects.filter(gym_city__icontains=english_zone_name).first()
 
     # Détecter si la zone courante EST une arène (building "Arène de X")
-    is_gym_zone = (zone.zone_type == 'building' and zone.name.startswith('Arène'))
+    is_gym_zone = is_arena(zone)
 
     # Si c'est une arène, retrouver le GymLeader via la ville parente
     if not gym_leader and is_gym_zone:
-        from myPokemonApp.models.Zone import ZoneConnection as ZC
-        pc = ZC.objects.filter(
-            to_zone=zone, from_zone__zone_type='city'
-        ).select_related('from_zone').first()
-        if not pc:
-            pc = ZC.objects.filter(
-                from_zone=zone, to_zone__zone_type='city', is_bidirectional=True
-            ).select_related('to_zone').first()
-        if pc:
-            pz = pc.from_zone if pc.to_zone_id == zone.id else pc.to_zone
+        pz = get_zone_graph().parent_city(zone.id)
+        if pz:
             pz_en = ZONE_TRANSLATIONS.get(pz.name, pz.name).strip()
             gym_leader = GymLeader.objects.filter(gym_city__icontains=pz_en).first()
 
@@ -273,19 +266,7 @@ def zone_detail_view(request, zone_id):
     # Zone arène connectée à cette ville (bouton "Entrer dans l'Arène")
     gym_zone = None
     if gym_leader and not is_gym_zone and zone.zone_type == 'city':
-        from myPokemonApp.models.Zone import ZoneConnection as ZC
-        ac = ZC.objects.filter(
-            from_zone=zone, to_zone__zone_type='building', to_zone__name__startswith='Arène'
-        ).select_related('to_zone').first()
-        if ac:
-            gym_zone = ac.to_zone
-        else:
-            ac = ZC.objects.filter(
-                to_zone=zone, is_bidirectional=True,
-                from_zone__zone_type='building', from_zone__name__startswith='Arène'
-            ).select_related('from_zone').first()
-            if ac:
-                gym_zone = ac.from_zone
+        gym_zone = get_zone_graph().arena_of(zone.id)
 
     # Rival présent dans cette zone ?
     rival_encounter = check_rival_encounter(trainer, zone)
@@ -347,143 +328,172 @@ def zone_detail_view(request, zone_id):
         'can_fly':            can_fly,
     })
 
+
+def _on_arrival(request, trainer, zone):
+    """
+    Conséquences de l'arrivée dans `zone` (un passage) : succès d'exploration,
+    quêtes visit_zone, colis de Chen, position de la save, rencontre sauvage.
+    Retourne une redirection si un combat sauvage démarre, sinon None.
+    """
+    # Achievements exploration (Explorateur 10 zones, Globe-Trotter 30 zones)
+    for notif in trigger_achievements_after_zone_visit(trainer):
+        messages.success(request, f"🏆 {notif['title']} : {notif['message']}")
+
+    # ── Déclencher quêtes visit_zone ──────────────────────────────────
+    quest_notifications = trigger_quest_event(trainer, 'visit_zone', zone=zone)
+    for notif in quest_notifications:
+        msg = f"✅ Quête terminée : « {notif['title']} »"
+        if notif.get('reward_money'):
+            msg += f" (+{notif['reward_money']}₽)"
+        if notif.get('reward_item'):
+            msg += f" · Objet reçu : {notif['reward_item']}"
+        messages.success(request, msg)
+
+    # ── Remise du colis à Bourg Palette ───────────────────────────────
+    if 'bourg' in zone.name.lower() or 'palette' in zone.name.lower():
+        try:
+            from myPokemonApp.questEngine import get_quest_progress, trigger_quest_event as tqe
+            parcel = Item.objects.filter(name='Colis de Chen').first()
+            if parcel:
+                has_parcel = TrainerInventory.objects.filter(
+                    trainer=trainer, item=parcel, quantity__gt=0
+                ).exists()
+                if has_parcel:
+                    prog = get_quest_progress(trainer, 'give_parcel_to_oak')
+                    if prog and prog.state in ('active', 'available'):
+                        parcel_notifs = tqe(trainer, 'give_item', item=parcel)
+                        for notif in parcel_notifs:
+                            msg = f"✅ Quête terminée : « {notif['title']} »"
+                            if notif.get('reward_item'):
+                                msg += f" · Vous recevez : {notif['reward_item']}"
+                            messages.success(request, msg)
+        except Exception as e:
+            logger.warning("Erreur trigger give_item Bourg Palette : %s", e)
+
+    try:
+        save = GameSave.objects.filter(trainer=trainer, is_active=True).first()
+        if save:
+            save.current_location = zone.name
+            save.save(update_fields=['current_location'])
+    except Exception as exc:
+        logger.warning("Impossible de mettre à jour la position dans la save : %s", exc)
+
+    # ── Wild battle aléatoire en traversant ──────────────────────────
+    # Taux selon le type de zone (grass=35%, cave=45%, water=40%)
+    zone_encounter_rates = {
+        'route':    0.35,
+        'cave':     0.45,
+        'forest':   0.40,
+        'water':    0.40,
+    }
+    encounter_chance = zone_encounter_rates.get(zone.zone_type, 0.25)
+
+    # Vérifier si une Repousse est active en session
+    repel_active = False
+    repel_session = request.session.get('active_repel')
+    if repel_session and repel_session.get('steps_left', 0) > 0:
+        repel_active = True
+        repel_session['steps_left'] -= 1
+        if repel_session['steps_left'] <= 0:
+            request.session.pop('active_repel', None)
+            messages.info(request, f"🚫 La {repel_session['name']} n'a plus d'effet !")
+        else:
+            request.session['active_repel'] = repel_session
+        request.session.modified = True
+
+    if not repel_active and not zone.is_safe_zone and zone.wild_spawns.exists() and random.random() < encounter_chance:
+
+        active_battle = Battle.objects.filter(player_trainer=trainer, is_active=True).first()
+        if not active_battle:
+            player_pokemon = get_first_alive_pokemon(trainer)
+            wild_species, level = get_random_wild_pokemon(zone, 'grass')
+            if wild_species and player_pokemon:
+                wild_pokemon = create_wild_pokemon(wild_species, level, location=zone.name)
+
+                battle, msg = start_battle(trainer, wild_pokemon=wild_pokemon)
+                if battle:
+                    zone_flavors = {
+                        'cave':   f"⚡ Dans l'obscurité de {zone.name}, un {wild_species.name} sauvage (Niv.{level}) surgit !",
+                        'forest': f"🌿 Une branche craque ! Un {wild_species.name} sauvage (Niv.{level}) bondit devant vous !",
+                        'water':  f"🌊 Les eaux s'agitent ! Un {wild_species.name} sauvage (Niv.{level}) émerge !",
+                    }
+                    flavor = zone_flavors.get(
+                        zone.zone_type,
+                        f"⚡ En traversant {zone.name}, un {wild_species.name} sauvage (Niv.{level}) surgit !"
+                    )
+                    messages.warning(request, flavor)
+                    return redirect('BattleGameView', pk=battle.id)
+    return None
+
+
 @login_required
 def travel_to_zone_view(request, zone_id):
     """Voyager vers une zone"""
     trainer         = get_player_trainer(request.user)
     zone            = get_object_or_404(Zone, pk=zone_id)
     player_location = get_player_location(trainer)
-    current_zone    = player_location.current_zone
 
     # ── Dresseur obligatoire non vaincu dans la zone actuelle ? ────────────
-    if not current_zone.is_safe_zone:
-        defeated_ids = get_defeated_trainer_ids(trainer)
-
-        # Chercher uniquement les dresseurs marqués is_battle_required
-        required_qs = Trainer.objects.filter(
-            is_npc=True,
-            is_battle_required=True,
-            location=current_zone.name,
-        ).exclude(id__in=defeated_ids)
-
-        # Même logique pour les étages accessibles
-        if current_zone.has_floors:
-            for floor in current_zone.floors.all():
-                accessible, _ = can_access_floor(trainer, floor)
-                if accessible:
-                    floor_key = f"{current_zone.name}-{floor.floor_number}"
-                    required_qs = required_qs | Trainer.objects.filter(
-                        is_npc=True,
-                        is_battle_required=True,
-                        location=floor_key,
-                    ).exclude(id__in=defeated_ids)
-
-        blocker = required_qs.first()
-        if blocker:
-            messages.warning(
-                request,
-                f"⚠️ {blocker.get_full_title()} vous barre le passage !"
-            )
-            return redirect('battle_create_trainer', trainer_id=blocker.id)
+    blocker = battle_blocker(trainer, player_location.current_zone)
+    if blocker:
+        messages.warning(
+            request,
+            f"⚠️ {blocker.get_full_title()} vous barre le passage !"
+        )
+        return redirect('battle_create_trainer', trainer_id=blocker.id)
 
     success, message = player_location.travel_to(zone)
     if success:
         messages.success(request, message)
+        encounter = _on_arrival(request, trainer, zone)
+        if encounter:
+            return encounter
+    else:
+        messages.error(request, message)
 
-        # Achievements exploration (Explorateur 10 zones, Globe-Trotter 30 zones)
-        for notif in trigger_achievements_after_zone_visit(trainer):
-            messages.success(request, f"🏆 {notif['title']} : {notif['message']}")
+    return redirect('zone_detail', zone_id=zone.id)
 
-        # ── Déclencher quêtes visit_zone ──────────────────────────────────
-        quest_notifications = trigger_quest_event(trainer, 'visit_zone', zone=zone)
-        for notif in quest_notifications:
-            msg = f"✅ Quête terminée : « {notif['title']} »"
-            if notif.get('reward_money'):
-                msg += f" (+{notif['reward_money']}₽)"
-            if notif.get('reward_item'):
-                msg += f" · Objet reçu : {notif['reward_item']}"
-            messages.success(request, msg)
 
-        # ── Remise du colis à Bourg Palette ───────────────────────────────
-        if 'bourg' in zone.name.lower() or 'palette' in zone.name.lower():
-            try:
-                from myPokemonApp.questEngine import get_quest_progress, trigger_quest_event as tqe
-                parcel = Item.objects.filter(name='Colis de Chen').first()
-                if parcel:
-                    has_parcel = TrainerInventory.objects.filter(
-                        trainer=trainer, item=parcel, quantity__gt=0
-                    ).exists()
-                    if has_parcel:
-                        prog = get_quest_progress(trainer, 'give_parcel_to_oak')
-                        if prog and prog.state in ('active', 'available'):
-                            parcel_notifs = tqe(trainer, 'give_item', item=parcel)
-                            for notif in parcel_notifs:
-                                msg = f"✅ Quête terminée : « {notif['title']} »"
-                                if notif.get('reward_item'):
-                                    msg += f" · Vous recevez : {notif['reward_item']}"
-                                messages.success(request, msg)
-            except Exception as e:
-                logger.warning("Erreur trigger give_item Bourg Palette : %s", e)
+@login_required
+def travel_route_view(request, zone_id):
+    """
+    Voyager vers une zone non adjacente en suivant le plus court itinéraire
+    praticable (services/travel_service.route), en une seule requête.
 
-        try:
-            save = GameSave.objects.filter(trainer=trainer, is_active=True).first()
-            if save:
-                save.current_location = zone.name
-                save.save(update_fields=['current_location'])
-        except Exception as exc:
-            logger.warning("Impossible de mettre à jour la position dans la save : %s", exc)
-
-        # ── Wild battle aléatoire en traversant ──────────────────────────
-        # Taux selon le type de zone (grass=35%, cave=45%, water=40%)
-        zone_encounter_rates = {
-            'route':    0.35,
-            'cave':     0.45,
-            'forest':   0.40,
-            'water':    0.40,
-        }
-        encounter_chance = zone_encounter_rates.get(zone.zone_type, 0.25)
-
-        # Vérifier si une Repousse est active en session
-        repel_active = False
-        repel_session = request.session.get('active_repel')
-        if repel_session and repel_session.get('steps_left', 0) > 0:
-            repel_active = True
-            repel_session['steps_left'] -= 1
-            if repel_session['steps_left'] <= 0:
-                request.session.pop('active_repel', None)
-                messages.info(request, f"🚫 La {repel_session['name']} n'a plus d'effet !")
-            else:
-                request.session['active_repel'] = repel_session
-            request.session.modified = True
-
-        if not repel_active and not zone.is_safe_zone and zone.wild_spawns.exists() and random.random() < encounter_chance:
-
-            active_battle = Battle.objects.filter(player_trainer=trainer, is_active=True).first()
-            if not active_battle:
-                player_pokemon = get_first_alive_pokemon(trainer)
-                wild_species, level = get_random_wild_pokemon(zone, 'grass')
-                if wild_species and player_pokemon:
-                    cleanup_orphan_wild_pokemon()
-                    wild_pokemon = create_wild_pokemon(wild_species, level, location=zone.name)
-
-                    battle, msg = start_battle(trainer, wild_pokemon=wild_pokemon)
-                    if battle:
-                        zone_flavors = {
-                            'cave':   f"⚡ Dans l'obscurité de {zone.name}, un {wild_species.name} sauvage (Niv.{level}) surgit !",
-                            'forest': f"🌿 Une branche craque ! Un {wild_species.name} sauvage (Niv.{level}) bondit devant vous !",
-                            'water':  f"🌊 Les eaux s'agitent ! Un {wild_species.name} sauvage (Niv.{level}) émerge !",
-                        }
-                        flavor = zone_flavors.get(
-                            zone.zone_type,
-                            f"⚡ En traversant {zone.name}, un {wild_species.name} sauvage (Niv.{level}) surgit !"
-                        )
-                        messages.warning(request, flavor)
-                        return redirect('BattleGameView', pk=battle.id)
+    Chaque passage a les effets d'un voyage simple (dresseur bloquant,
+    quêtes, rencontre sauvage) ; le trajet s'arrête au premier combat.
+    Tout le trajet est appliqué dans une transaction.
+    """
+    trainer         = get_player_trainer(request.user)
+    target          = get_object_or_404(Zone, pk=zone_id)
+    player_location = get_player_location(trainer)
 
-    else:
-        messages.error(request, message)
+    path = route(trainer, player_location.current_zone, target)
+    if not path:
+        if path is None:
+            messages.error(request, f"Aucun itinéraire praticable vers {target.name}.")
+        return redirect('zone_detail', zone_id=player_location.current_zone_id)
 
-    return redirect('zone_detail', zone_id=zone.id)
+    with transaction.atomic():
+        for zone in path:
+            blocker = battle_blocker(trainer, player_location.current_zone)
+            if blocker:
+                messages.warning(
+                    request,
+                    f"⚠️ {blocker.get_full_title()} vous barre le passage !"
+                )
+                return redirect('battle_create_trainer', trainer_id=blocker.id)
+
+            player_location.current_zone = zone
+            player_location.visited_zones.add(zone)
+            player_location.save()
+
+            encounter = _on_arrival(request, trainer, zone)
+            if encounter:
+                return encounter
+
+    messages.success(request, f"Arrivé à {target.name} ({len(path)} zone(s) traversée(s))")
+    return redirect('zone_detail', zone_id=target.id)
 
 
 @login_required
@@ -566,6 +576,7 @@ def fly_view(request, zone_id=None):
 
 
 @login_required
+@profiled_view
 def wild_encounter_view(request, zone_id):
     """Déclencher une rencontre sauvage dans une zone"""
 
@@ -593,7 +604,6 @@ def wild_encounter_view(request, zone_id):
         messages.error(request, "Vous n'avez pas de Pokémon en état de combattre !")
         return redirect('PokemonCenterListView')
 
-    cleanup_orphan_wild_pokemon()
     wild_pokemon = create_wild_pokemon(wild_species, level, location=zone.name)
 
     battle, msg = start_battle(trainer, wild_pokemon=wild_pokemon)
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+"""
+Vue Django — profils des endpoints chauds (réservée au staff).
+
+  GET /api/debug/profiling/  → profiling_view : derniers profils du buffer
+                                (services/profiling.py) + agrégat par vue.
+  ?clear=1 vide le buffer après lecture.
+"""
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from myPokemonApp.services.profiling import (
+    recent_profiles, clear_profiles, summarize, get_config,
+)
+
+
+@staff_member_required
+@require_http_methods(['GET'])
+def profiling_view(request):
+    """Profils récents (buffer circulaire du processus) et moyennes par vue."""
+    profiles = recent_profiles()
+    if request.GET.get('clear'):
+        clear_profiles()
+    return JsonResponse({
+        'config':   get_config(),
+        'summary':  summarize(profiles),
+        'profiles': profiles,
+    })
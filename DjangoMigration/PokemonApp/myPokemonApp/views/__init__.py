@@ -47,6 +47,7 @@ from myPokemonApp.views.MapViews import (
     map_view,
     zone_detail_view,
     travel_to_zone_view,
+    travel_route_view,
     wild_encounter_view,
     fly_view,
     use_repel_view,
@@ -138,6 +139,11 @@ from myPokemonApp.views.BattleActionViews import (
     battle_learn_move_view,
 )
 
+# ── Combat : flux SSE des événements de tour (ASGI) ───────────────────────────
+from myPokemonApp.views.BattleStreamViews import (
+    battle_stream_view,
+)
+
 # ── Combat : création + écran de fin dresseur ─────────────────────────────────
 from myPokemonApp.views.BattleCreateViews import (
     battle_create_view,
@@ -152,4 +158,9 @@ from myPokemonApp.views.BattleCreateViews import (
 from myPokemonApp.views.BattleApiViews import (
     GetTrainerTeam,
     GetTrainerItems,
-)
\ No newline at end of file
+)
+
+# ── Profilage des endpoints chauds (staff) ────────────────────────────────────
+from myPokemonApp.views.ProfilingViews import (
+    profiling_view,
+)
@@ -13,6 +13,10 @@ const csrfToken  = BATTLE_CONFIG.csrfToken;
 let currentPlayerPokemonId = BATTLE_CONFIG.playerPokemonId;
 let currentOpponentPokemonId = BATTLE_CONFIG.opponentPokemonId;
 
+// Dernier état complet reçu (base des réponses delta) et sa version serveur
+let battleStateVersion = null;
+let lastBattleState    = null;
+
 // ============================================================================
 // INITIALIZATION
 // ============================================================================
@@ -192,6 +196,8 @@ $(document).ready(function() {
     // Wild battle — start immediately
     startBattle();
   }
+
+  openTurnStream();
 });
 
 // ============================================================================
@@ -311,19 +317,146 @@ function setBattleLoading(loading, label) {
  * Affiche le bon message selon le statut HTTP.
  */
 function _handleActionError(xhr, fallbackMsg) {
-  if (xhr.status === 429) {
-    addBattleLog('⏳ Trop rapide ! Attendez un instant.');
+  if (xhr.status === 409) {
+    addBattleLog('⏳ Action déjà en cours… Attendez un instant.');
   } else {
     addBattleLog(fallbackMsg || 'Erreur lors de l\'action.');
   }
   setBattleLoading(false);
 }
 
+// ============================================================================
+// FLUX DES ÉVÉNEMENTS DE TOUR (SSE — services/turn_stream)
+// ============================================================================
+
+// Messages du journal déjà affichés par le flux pendant l'action en cours :
+// la réponse du POST ne les réaffiche pas (voir unstreamedLog).
+let streamedLog = [];
+let turnStream  = null;
+
+// urls.stream est vide hors ASGI (settings.BATTLE_STREAM_ENABLED) : pas de flux,
+// le journal arrive avec la réponse du POST.
+function openTurnStream() {
+  if (!window.EventSource || !BATTLE_CONFIG.urls.stream) return;
+  turnStream = new EventSource(BATTLE_CONFIG.urls.stream);
+
+  turnStream.addEventListener('log', e => {
+    const message = JSON.parse(e.data).message;
+    streamedLog.push(message);
+    addBattleLog(message);
+  });
+  // Tour annulé ou abonné en retard : la réponse du POST fait foi
+  turnStream.addEventListener('resync', () => { streamedLog = []; });
+}
+
+function closeTurnStream() {
+  if (turnStream) turnStream.close();
+  turnStream  = null;
+  streamedLog = [];
+}
+
+/**
+ * Filtre le journal d'une réponse POST : retire les messages déjà
+ * affichés en direct par le flux, puis vide la liste des messages streamés.
+ */
+function unstreamedLog(messages) {
+  const fresh = (messages || []).filter(msg => {
+    const i = streamedLog.indexOf(msg);
+    if (i === -1) return true;
+    streamedLog.splice(i, 1);
+    return false;
+  });
+  streamedLog = [];
+  return fresh;
+}
+
+// ============================================================================
+// RÉPONSES DELTA (state_version)
+// ============================================================================
+
+// Clés d'état versionnées côté serveur (services/serializers.STATE_KEYS)
+const BATTLE_STATE_KEYS = [
+  'player_pokemon', 'opponent_pokemon',
+  'player_hp', 'player_max_hp', 'opponent_hp', 'opponent_max_hp',
+  'battle_state', 'turn_info', 'hp_before_eot',
+];
+
+function _isPlainObject(value) {
+  return value !== null && typeof value === 'object' && !Array.isArray(value);
+}
+
+/** Applique récursivement un delta serveur sur l'état local. */
+function mergeStateDelta(target, delta) {
+  Object.keys(delta).forEach(key => {
+    if (_isPlainObject(delta[key]) && _isPlainObject(target[key])) {
+      mergeStateDelta(target[key], delta[key]);
+    } else {
+      target[key] = delta[key];
+    }
+  });
+}
+
+/**
+ * Reconstitue une réponse complète à partir d'une réponse delta.
+ * data._changed = clés modifiées (null → tout a changé, ex. resync complet)
+ * pour que l'affichage saute les mises à jour DOM inutiles.
+ */
+function resolveBattleResponse(data) {
+  if (data.delta) {
+    if (lastBattleState === null || data.base_version !== battleStateVersion) {
+      // Base inconnue : on redemandera un état complet à la prochaine action
+      battleStateVersion = null;
+      lastBattleState    = null;
+      return data;
+    }
+    mergeStateDelta(lastBattleState, data.delta);
+    Object.assign(data, JSON.parse(JSON.stringify(lastBattleState)));
+    data._changed = data.delta;
+  } else if (data.state_version !== undefined) {
+    lastBattleState = {};
+    BATTLE_STATE_KEYS.forEach(key => {
+      if (key in data) lastBattleState[key] = JSON.parse(JSON.stringify(data[key]));
+    });
+    data._changed = null;
+  }
+  if (data.state_version !== undefined) battleStateVersion = data.state_version;
+  return data;
+}
+
+/** Clé d'idempotence d'une action (une par clic, réutilisée par les retries). */
+function newIdempotencyKey() {
+  if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+/**
+ * POST d'une action de combat, en delta depuis la dernière version reçue.
+ * Réseau coupé (status 0) ou combat occupé (409) : un nouvel essai avec la
+ * même clé — le serveur renvoie la réponse déjà servie au lieu de rejouer le tour.
+ */
+function postBattleAction(params, retries = 2) {
+  if (!params.idempotency_key) {
+    params.idempotency_key = newIdempotencyKey();
+    if (battleStateVersion !== null) params.since_version = battleStateVersion;
+  }
+  return $.post(BATTLE_CONFIG.urls.action, params).then(
+    resolveBattleResponse,
+    function(xhr) {
+      if (retries > 0 && (xhr.status === 0 || xhr.status === 409)) {
+        const retry = $.Deferred();
+        setTimeout(() => postBattleAction(params, retries - 1).then(retry.resolve, retry.reject), 400);
+        return retry.promise();
+      }
+      return $.Deferred().reject(xhr).promise();
+    }
+  );
+}
+
 function useMove(moveId) {
   setBattleLoading(true, 'Attaque…');
   audioManager.playSFX('ui/confirm');
 
-  $.post(BATTLE_CONFIG.urls.action, {
+  postBattleAction({
     action: 'attack',
     move_id: moveId,
     csrfmiddlewaretoken: csrfToken
@@ -529,7 +662,7 @@ function triggerEotHealFlash(side) {
 function switchPokemon(pokemonId) {
   setBattleLoading(true, 'Changement…');
   
-  $.post(BATTLE_CONFIG.urls.action, {
+  postBattleAction({
     action: 'switch',
     pokemon_id: pokemonId,
     csrfmiddlewaretoken: csrfToken
@@ -552,7 +685,7 @@ function switchPokemon(pokemonId) {
 function useItem(itemId) {
   setBattleLoading(true, 'Utilisation…');
   
-  $.post(BATTLE_CONFIG.urls.action, {
+  postBattleAction({
     action: 'item',
     item_id: itemId,
     csrfmiddlewaretoken: csrfToken
@@ -567,9 +700,7 @@ function useItem(itemId) {
     }
 
     // Objet normal (potion, antidote, réveil, etc.)
-    if (data.log && data.log.length) {
-      data.log.forEach(msg => addBattleLog(msg));
-    }
+    unstreamedLog(data.log).forEach(msg => addBattleLog(msg));
     updateBattleState(data);
     updateVolatileStates(data);
     if (!data.battle_ended) {
@@ -594,7 +725,7 @@ function tryRun() {
 function _doFlee() {
   setBattleLoading(true, 'Fuite…');
   
-  $.post(BATTLE_CONFIG.urls.action, {
+  postBattleAction({
     action: 'flee',
     csrfmiddlewaretoken: csrfToken
   })
@@ -764,8 +895,11 @@ function loadTeam() {
 function updateBattleState(data, skipHpUpdates = false) {
   console.log('Updating battle state:', data);
 
+  // Réponse delta : on ne touche pas au DOM des parties inchangées
+  const changed = data._changed || null;
+
   // Update Pokemon data
-  if (data.player_pokemon) {
+  if (data.player_pokemon && (!changed || changed.player_pokemon)) {
     updatePokemonDisplay('player', data.player_pokemon);
   }
 
@@ -786,7 +920,7 @@ function updateBattleState(data, skipHpUpdates = false) {
   // Opponent pokemon display:
   // If the incoming pokemon has a different ID than the current one, the previous
   // pokemon just fainted — trigger death animation on old sprite first, then swap.
-  if (data.opponent_pokemon) {
+  if (data.opponent_pokemon && (!changed || changed.opponent_pokemon)) {
     const isNewOpponent = data.opponent_pokemon.id !== currentOpponentPokemonId;
 
     // FIX Bug 3 : mettre à jour currentOpponentPokemonId IMMÉDIATEMENT,
@@ -817,9 +951,7 @@ function updateBattleState(data, skipHpUpdates = false) {
 
   
   // Add logs
-  if (data.log && data.log.length > 0) {
-    data.log.forEach(msg => addBattleLog(msg));
-  }
+  unstreamedLog(data.log).forEach(msg => addBattleLog(msg));
   
   // Check battle end — l'évolution est PRIORITAIRE sur la victoire :
   // si le pokemon évolue sur le dernier coup, on montre l'évolution d'abord,
@@ -1053,9 +1185,13 @@ function updateMovesMenu(moves) {
     const catMap = { physical: 'move-physical', special: 'move-special', status: 'move-status' };
     const catFile = catMap[move.category] || 'move-status';
     const catImg = `<img src="/static/img/movesTypesSprites/${catFile}.png" alt="${move.category}" title="${move.category}" style="width:18px;height:18px;object-fit:contain;vertical-align:middle;">`;
+    // Aperçu des dégâts contre l'adversaire actif (services/damage_calc)
+    const preview = move.damage_preview
+      ? `title="Dégâts estimés : ${move.damage_preview.min}–${move.damage_preview.max} PV (K.O. : ${Math.round(move.damage_preview.ko_chance * 100)} %)"`
+      : '';
     const html = `
       <button class="move-btn move-type-${move.type}" 
-              onclick="useMove(${move.id})" ${disabled}>
+              onclick="useMove(${move.id})" ${disabled} ${preview}>
         <div class="move-header">
           <span class="move-name">${move.name}</span>
           <span class="move-pp">PP: ${move.current_pp}/${move.max_pp}</span>
@@ -1155,6 +1291,7 @@ function handleBattleEnd(data) {
   
   // ── Désactiver IMMÉDIATEMENT la garde beforeunload ────────────────────────
   window.__battleInProgress = false;
+  closeTurnStream();
 
   // Arrêter la musique
   if (audioManager) {
@@ -1368,7 +1505,7 @@ function forcedSwitch(pokemonId) {
   $('#forced-switch-list button').prop('disabled', true);
   
   // Faire le switch
-  $.post(BATTLE_CONFIG.urls.action, {
+  postBattleAction({
     action: 'switch',
     type: 'forcedSwitch',
     pokemon_id: pokemonId,
@@ -1645,7 +1782,7 @@ async function runEvolutionSequence(fromName, toName) {
 }
 
 function applyEvolutionOnServer() {
-  $.post(BATTLE_CONFIG.urls.action, {
+  postBattleAction({
     action:       'confirm_evolution',
     evolution_id: pendingEvolutionData.evolution_id,
     csrfmiddlewaretoken: csrfToken
@@ -1767,7 +1904,7 @@ async function initiateCaptureSequence(itemId, captureData) {
 
   try {
     // captureData est déjà disponible (passé par useItem) — pas de second POST
-    const response = captureData || await $.post(BATTLE_CONFIG.urls.action, {
+    const response = captureData || await postBattleAction({
       action: 'item',
       item_id: itemId,
       csrfmiddlewaretoken: csrfToken
@@ -1789,7 +1926,7 @@ async function initiateCaptureSequence(itemId, captureData) {
     );
 
     // Confirmer la capture au serveur (consomme la ball, déclenche l'attaque adverse si échec)
-    const finalResult = await $.post(BATTLE_CONFIG.urls.action, {
+    const finalResult = await postBattleAction({
       action: 'confirm_capture',
       item_id: itemId,
       csrfmiddlewaretoken: csrfToken
@@ -68,6 +68,7 @@ const _prevStages = { player: {}, opponent: {} };
  */
 function updateVolatileStates(data) {
     if (!data || !data.battle_state) return;
+    if (data._changed && !data._changed.battle_state) return;   // delta : rien de neuf
     const bs = data.battle_state;
 
     updateWeather(bs.weather, bs.weather_turns);